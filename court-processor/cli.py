@@ -1003,6 +1003,54 @@ def judge(judge_name, court, years, limit):
     
     asyncio.run(run_collection())
 
+@collect.command('sync')
+@click.argument('court_ids', nargs=-1, required=True)
+@click.option('--endpoint', 'endpoints', multiple=True, type=click.Choice(['opinions', 'dockets']), default=['opinions'], help='Endpoint to sync (repeatable)')
+@click.option('--since', help='Sync records modified since this date (YYYY-MM-DD) instead of the stored watermark')
+@click.option('--limit', default=None, type=int, help='Maximum records per court and endpoint')
+def sync(court_ids, endpoints, since, limit):
+    """Fetch only the records modified since the last sync of each court
+    
+    Examples:
+        court-processor collect sync txed ded
+        court-processor collect sync txed --endpoint opinions --endpoint dockets
+        court-processor collect sync cafc --since 2024-01-01
+    """
+    from services.ingestion import DocumentIngestionService
+    
+    console.print(f"\n[bold blue]🔄 Incremental sync of {', '.join(court_id.upper() for court_id in court_ids)}[/bold blue]\n")
+    
+    async def run_sync():
+        async with DocumentIngestionService() as service:
+            return await service.sync_courts(
+                court_ids=[court_id.lower() for court_id in court_ids],
+                endpoints=list(endpoints),
+                since=since,
+                max_records=limit
+            )
+    
+    results = asyncio.run(run_sync())
+    
+    table = Table(title="Sync Results")
+    table.add_column("Court", style="cyan")
+    table.add_column("Endpoint")
+    table.add_column("Fetched", justify="right")
+    table.add_column("New", justify="right")
+    table.add_column("Updated", justify="right")
+    table.add_column("Unchanged", justify="right")
+    table.add_column("Watermark")
+    for result in results['results']:
+        watermark = result['watermark'].isoformat() if result['watermark'] else '-'
+        table.add_row(result['court_id'], result['endpoint'], str(result['fetched']),
+                      str(result['stored']), str(result['updated']),
+                      str(result['unchanged'] + result['skipped']), watermark)
+    console.print(table)
+    
+    if results['errors']:
+        console.print(f"\n[yellow]⚠️ Errors encountered:[/yellow]")
+        for error in results['errors']:
+            console.print(f"  - {error}")
+
 @data.command()
 @click.option('--type', 'doc_type', type=click.Choice(['opinion', 'docket', 'order', 'all']), default='all', help='Document type filter')
 @click.option('--court', help='Filter by court ID')
@@ -1680,17 +1728,38 @@ def pipeline():
 @click.option('--unprocessed', is_flag=True, help='Only process new documents')
 @click.option('--extract-pdfs', is_flag=True, help='Extract content from PDFs')
 @click.option('--no-strict', is_flag=True, help='Process with warnings instead of skipping')
-def run(limit, force, unprocessed, extract_pdfs, no_strict):
+@click.option('--workers', default=1, type=click.IntRange(min=1), help='Worker processes for stages 2-8')
+@click.option('--window-size', default=1000, type=click.IntRange(min=1), help='Documents streamed and processed per window')
+@click.option('--chunk-size', default=None, type=click.IntRange(min=1), help='Documents per storage upsert/commit')
+@click.option('--no-incremental', is_flag=True, help='Recompute every stage instead of reusing stored stage results')
+@click.option('--trace', 'trace_path', type=click.Path(dir_okay=False), help='Write per-stage timings as JSONL to this file')
+@click.option('--tokenizer', type=click.Choice(['default', 'hyperscan']), default=None,
+              help='eyecite tokenizer for citation extraction (default: CITATION_TOKENIZER)')
+@click.option('--stage-executor', type=click.Choice(['serial', 'thread', 'process']), default=None,
+              help='Run independent stages of a document concurrently (default: STAGE_EXECUTOR)')
+@click.option('--resume', 'resume_run_id', default=None, metavar='RUN_ID',
+              help='Continue a run that stopped, after its last checkpointed window')
+@click.option('--verification-export', type=click.Path(dir_okay=False), default=None,
+              help='Write per-document verification results to this .parquet, .csv or .jsonl file')
+def run(limit, force, unprocessed, extract_pdfs, no_strict, workers, window_size, chunk_size, no_incremental, trace_path,
+        tokenizer, stage_executor, resume_run_id, verification_export):
     """Run the 11-stage enhancement pipeline
     
     Example:
         court-processor pipeline run --limit 100 --unprocessed
+        court-processor pipeline run --limit 20000 --workers 16
+        court-processor pipeline run --limit 500000 --window-size 2000
+        court-processor pipeline run --limit 1000 --tokenizer hyperscan
+        court-processor pipeline run --resume run_2025-08-01T02:00:00.123456
     """
     console.print(f"\n[bold blue]⚙️  Running Enhancement Pipeline[/bold blue]\n")
-    console.print(f"Options: limit={limit}, force={force}, unprocessed={unprocessed}, PDFs={extract_pdfs}, strict={not no_strict}")
+    if resume_run_id:
+        console.print(f"Resuming {resume_run_id} with its original document selection, workers={workers}")
+    else:
+        console.print(f"Options: limit={limit}, force={force}, unprocessed={unprocessed}, PDFs={extract_pdfs}, strict={not no_strict}, workers={workers}, window={window_size}")
     
     async def run_pipeline_async():
-        pipeline = RobustElevenStagePipeline()
+        pipeline = RobustElevenStagePipeline(citation_tokenizer=tokenizer, stage_executor=stage_executor)
         
         with Progress(
             SpinnerColumn(),
@@ -1709,13 +1778,29 @@ def run(limit, force, unprocessed, extract_pdfs, no_strict):
                     validate_strict=not no_strict,
                     force_reprocess=force,
                     only_unprocessed=unprocessed,
-                    extract_pdfs=extract_pdfs
+                    extract_pdfs=extract_pdfs,
+                    workers=workers,
+                    window_size=window_size,
+                    storage_chunk_size=chunk_size,
+                    incremental=not no_incremental,
+                    trace_path=trace_path,
+                    resume_run_id=resume_run_id,
+                    verification_export=verification_export
                 )
                 
                 if results['success']:
                     stats = results['statistics']
                     console.print(f"\n[green]✅ Pipeline Complete[/green]")
+                    if results.get('run_id'):
+                        console.print(f"  Run: {results['run_id']}" + (" (resumed)" if results.get('resumed') else ""))
                     console.print(f"  Documents processed: {stats['documents_processed']}")
+                    console.print(f"  Stage results reused: {stats.get('stage_results_reused', 0)}")
+                    console.print(f"  Citation cache: {stats.get('citation_cache_hits', 0)} hits, "
+                                  f"{stats.get('citation_cache_misses', 0)} misses")
+                    storage = results.get('storage_results', {})
+                    console.print(f"  Stored: {storage.get('stored_count', 0)} new, "
+                                  f"{storage.get('updated_count', 0)} updated, "
+                                  f"{storage.get('skipped_count', 0)} unchanged")
                     console.print(f"  Courts resolved: {stats['courts_resolved']}")
                     console.print(f"  Citations extracted: {stats['citations_extracted']}")
                     console.print(f"  Judges identified: {stats['judges_enhanced'] + stats['judges_extracted_from_content']}")
@@ -1726,14 +1811,198 @@ def run(limit, force, unprocessed, extract_pdfs, no_strict):
                         console.print(f"\n[cyan]Quality Metrics:[/cyan]")
                         console.print(f"  Completeness: {metrics.get('average_completeness', 0):.1f}%")
                         console.print(f"  Quality score: {metrics.get('average_quality', 0):.1f}%")
+                    if results.get('verification_export'):
+                        console.print(f"  Verification table: {results['verification_export']}")
+                    
+                    # Show where the time went
+                    timings = results.get('stage_timings', {})
+                    if timings:
+                        console.print(f"\n[cyan]Stage Timings (wall seconds):[/cyan]")
+                        slowest = sorted(timings.items(), key=lambda item: item[1]['wall_seconds']['total'], reverse=True)
+                        for stage_name, timing in slowest:
+                            wall = timing['wall_seconds']
+                            console.print(f"  {stage_name}: total {wall['total']:.2f}, "
+                                          f"p50 {wall['p50']:.4f}, p99 {wall['p99']:.4f}, "
+                                          f"{timing['documents_per_second']:.1f} docs/s")
                 else:
                     console.print(f"[red]Pipeline failed: {results.get('error', 'Unknown error')}[/red]")
+                    if results.get('resumable') and results.get('partial_stats', {}).get('documents_stored'):
+                        console.print(f"Continue with: court-processor pipeline run --resume {results['run_id']}")
                     
             except Exception as e:
                 console.print(f"[red]Error: {str(e)}[/red]")
     
     asyncio.run(run_pipeline_async())
 
+@pipeline.command()
+@click.option('--batch-size', default=None, type=click.IntRange(min=1), help='Most documents per pipeline run (default: PIPELINE_SERVE_BATCH_SIZE)')
+@click.option('--max-latency', default=None, type=click.FloatRange(min=0), help='Seconds a new document waits for its batch to fill (default: PIPELINE_SERVE_MAX_LATENCY)')
+@click.option('--health-port', default=None, type=click.IntRange(min=0, max=65535), help='Port for GET /health, 0 to disable (default: PIPELINE_HEALTH_PORT)')
+@click.option('--no-catch-up', is_flag=True, help='Skip queueing unprocessed documents at startup')
+@click.option('--extract-pdfs', is_flag=True, help='Extract content from PDFs')
+@click.option('--no-strict', is_flag=True, help='Process with warnings instead of skipping')
+@click.option('--workers', default=1, type=click.IntRange(min=1), help='Worker processes for stages 2-8')
+@click.option('--tokenizer', type=click.Choice(['default', 'hyperscan']), default=None,
+              help='eyecite tokenizer for citation extraction (default: CITATION_TOKENIZER)')
+@click.option('--stage-executor', type=click.Choice(['serial', 'thread', 'process']), default=None,
+              help='Run independent stages of a document concurrently (default: STAGE_EXECUTOR)')
+def serve(batch_size, max_latency, health_port, no_catch_up, extract_pdfs, no_strict, workers, tokenizer, stage_executor):
+    """Process new documents continuously as they are inserted
+    
+    Listens for the notifications sent as documents are queued in
+    court_data.pipeline_jobs (see schema.sql) and runs new or changed
+    documents through the pipeline in micro-batches. Batches are leased from
+    the job queue, so `pipeline work` nodes can run alongside. Replaces
+    cron-driven `pipeline run --unprocessed`.
+    
+    Example:
+        court-processor pipeline serve
+        court-processor pipeline serve --batch-size 100 --max-latency 5 --workers 4
+    """
+    from services.pipeline_daemon import PipelineDaemon
+    from services.config import PIPELINE_SERVE_BATCH_SIZE, PIPELINE_SERVE_MAX_LATENCY, PIPELINE_HEALTH_PORT
+    
+    daemon = PipelineDaemon(
+        batch_size=batch_size or PIPELINE_SERVE_BATCH_SIZE,
+        max_latency=PIPELINE_SERVE_MAX_LATENCY if max_latency is None else max_latency,
+        health_port=PIPELINE_HEALTH_PORT if health_port is None else (health_port or None),
+        catch_up=not no_catch_up,
+        pipeline_options={'citation_tokenizer': tokenizer, 'stage_executor': stage_executor},
+        batch_options={
+            'validate_strict': not no_strict,
+            'extract_pdfs': extract_pdfs,
+            'workers': workers
+        }
+    )
+    
+    console.print(f"\n[bold blue]⚙️  Pipeline Daemon[/bold blue]\n")
+    console.print(f"Listening on '{daemon.channel}': batch size {daemon.batch_size}, "
+                  f"max latency {daemon.max_latency}s, workers={workers}")
+    if daemon.health_port:
+        console.print(f"Health: http://localhost:{daemon.health_port}/health")
+    console.print("Press Ctrl+C to stop\n")
+    
+    asyncio.run(daemon.run())
+
+@pipeline.command()
+@click.option('--batch-size', default=None, type=click.IntRange(min=1), help='Most documents claimed per pipeline run (default: PIPELINE_SERVE_BATCH_SIZE)')
+@click.option('--lease-seconds', default=None, type=click.IntRange(min=3), help='Lease held on claimed documents, renewed while they run (default: PIPELINE_JOB_LEASE_SECONDS)')
+@click.option('--max-attempts', default=None, type=click.IntRange(min=1), help='Claims before a document is marked failed (default: PIPELINE_JOB_MAX_ATTEMPTS)')
+@click.option('--poll-interval', default=None, type=click.FloatRange(min=0), help='Seconds to wait when the queue is empty (default: PIPELINE_WORK_POLL_INTERVAL)')
+@click.option('--backfill', is_flag=True, help='Queue unprocessed documents before starting')
+@click.option('--once', is_flag=True, help='Exit when nothing is left to claim')
+@click.option('--extract-pdfs', is_flag=True, help='Extract content from PDFs')
+@click.option('--no-strict', is_flag=True, help='Process with warnings instead of skipping')
+@click.option('--workers', default=1, type=click.IntRange(min=1), help='Worker processes for stages 2-8')
+@click.option('--tokenizer', type=click.Choice(['default', 'hyperscan']), default=None,
+              help='eyecite tokenizer for citation extraction (default: CITATION_TOKENIZER)')
+@click.option('--stage-executor', type=click.Choice(['serial', 'thread', 'process']), default=None,
+              help='Run independent stages of a document concurrently (default: STAGE_EXECUTOR)')
+def work(batch_size, lease_seconds, max_attempts, poll_interval, backfill, once, extract_pdfs, no_strict,
+         workers, tokenizer, stage_executor):
+    """Claim documents from the shared job queue and process them
+    
+    Any number of nodes can run this against the same database. Each claims
+    batches from court_data.pipeline_jobs with FOR UPDATE SKIP LOCKED, so no
+    two nodes process the same document, and holds a lease on them that is
+    renewed while the batch runs. Documents of a node that dies are claimed
+    again once its lease expires.
+    
+    Example:
+        court-processor pipeline work --backfill
+        court-processor pipeline work --batch-size 100 --workers 4 --once
+    """
+    from services.job_queue import PipelineQueueWorker
+    from services.config import (
+        PIPELINE_SERVE_BATCH_SIZE, PIPELINE_JOB_LEASE_SECONDS,
+        PIPELINE_JOB_MAX_ATTEMPTS, PIPELINE_WORK_POLL_INTERVAL
+    )
+    
+    worker = PipelineQueueWorker(
+        batch_size=batch_size or PIPELINE_SERVE_BATCH_SIZE,
+        lease_seconds=lease_seconds or PIPELINE_JOB_LEASE_SECONDS,
+        max_attempts=max_attempts or PIPELINE_JOB_MAX_ATTEMPTS,
+        poll_interval=PIPELINE_WORK_POLL_INTERVAL if poll_interval is None else poll_interval,
+        pipeline_options={'citation_tokenizer': tokenizer, 'stage_executor': stage_executor},
+        batch_options={
+            'validate_strict': not no_strict,
+            'extract_pdfs': extract_pdfs,
+            'workers': workers
+        }
+    )
+    
+    console.print(f"\n[bold blue]⚙️  Pipeline Worker {worker.queue.owner}[/bold blue]\n")
+    if backfill:
+        queued = worker.queue.backfill()
+        console.print(f"Queued {queued} unprocessed documents")
+    console.print(f"Batch size {worker.batch_size}, lease {worker.queue.lease_seconds}s, "
+                  f"max attempts {worker.queue.max_attempts}, workers={workers}")
+    if not once:
+        console.print("Press Ctrl+C to stop\n")
+    
+    stats = asyncio.run(worker.run(drain=once))
+    console.print(f"\n[green]Batches: {stats['batches']}, completed: {stats['completed']}, "
+                  f"released or failed: {stats['failed']}[/green]")
+    if stats['lost_leases']:
+        console.print(f"[yellow]Leases lost to other workers: {stats['lost_leases']}[/yellow]")
+
+@pipeline.command('queue-status')
+def queue_status():
+    """Show the pipeline job queue by state"""
+    from services.job_queue import PipelineJobQueue
+    
+    conn = get_db_connection()
+    try:
+        counts = PipelineJobQueue(conn).counts()
+    finally:
+        conn.close()
+    
+    table = Table(title="Pipeline Job Queue")
+    table.add_column("State", style="cyan")
+    table.add_column("Documents", justify="right")
+    for state in ('pending', 'leased', 'done', 'failed', 'expired_leases'):
+        table.add_row(state.replace('_', ' '), str(counts.get(state, 0)))
+    console.print(table)
+
+@pipeline.command('checkpoint-purge')
+@click.option('--older-than-days', default=None, type=click.FloatRange(min=0),
+              help='Delete checkpoints last updated longer ago than this (default: PIPELINE_CHECKPOINT_RETENTION_DAYS)')
+@click.option('--include-failed', is_flag=True, help='Also delete failed runs, which can then no longer be resumed')
+def checkpoint_purge(older_than_days, include_failed):
+    """Delete checkpoints of finished pipeline runs
+    
+    Checkpoints of completed runs are also purged whenever a run completes.
+    """
+    from services.run_checkpoints import RunCheckpointStore
+    from services.config import PIPELINE_CHECKPOINT_RETENTION_DAYS
+    
+    days = PIPELINE_CHECKPOINT_RETENTION_DAYS if older_than_days is None else older_than_days
+    conn = get_db_connection()
+    try:
+        deleted = RunCheckpointStore(conn).purge(days, include_failed=include_failed)
+    finally:
+        conn.close()
+    console.print(f"[green]Deleted {deleted} run checkpoints older than {days:g} days[/green]")
+
+@pipeline.command('queue-purge')
+@click.option('--older-than-days', default=None, type=click.FloatRange(min=0),
+              help='Delete done jobs settled longer ago than this (default: PIPELINE_JOB_RETENTION_DAYS)')
+def queue_purge(older_than_days):
+    """Delete done jobs from the pipeline job queue
+    
+    Idle `pipeline work` nodes do this on their own about once an hour.
+    """
+    from services.job_queue import PipelineJobQueue
+    from services.config import PIPELINE_JOB_RETENTION_DAYS
+    
+    days = PIPELINE_JOB_RETENTION_DAYS if older_than_days is None else older_than_days
+    conn = get_db_connection()
+    try:
+        purged = PipelineJobQueue(conn).purge(days)
+    finally:
+        conn.close()
+    console.print(f"[green]Deleted {purged} done jobs older than {days:g} days[/green]")
+
 @cli.command()
 def version():
     """Show version and system information"""
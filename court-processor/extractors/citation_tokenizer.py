@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Citation Tokenizer Selection
+
+eyecite finds citation candidates with a tokenizer. The default one scans
+with per-pattern regexes; eyecite's HyperscanTokenizer compiles every
+pattern into one Hyperscan database and finds them all in a single pass,
+which is much faster on long opinions. Compiling that database takes
+several seconds, so it is cached on disk in HYPERSCAN_CACHE_DIR and reused
+by later runs and by every pool worker.
+
+'hyperscan' falls back to the default tokenizer, with a warning, when the
+hyperscan package is not installed.
+"""
+
+import logging
+import os
+from typing import Dict, Any
+
+from eyecite.tokenizers import default_tokenizer, HyperscanTokenizer, Tokenizer
+
+from exceptions import ConfigurationError
+from services.config import HYPERSCAN_CACHE_DIR
+
+try:
+    import hyperscan  # noqa: F401 (eyecite imports it lazily)
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER_CHOICES = ('default', 'hyperscan')
+
+# Tokenizers built in this process, by requested name
+_tokenizers: Dict[str, Tokenizer] = {}
+
+
+def resolve_tokenizer_name(name: str) -> str:
+    """
+    The tokenizer that will actually run for a requested name
+
+    Raises:
+        ConfigurationError: If name is not one of TOKENIZER_CHOICES
+    """
+    name = (name or 'default').lower()
+    if name not in TOKENIZER_CHOICES:
+        raise ConfigurationError(
+            f"Unknown citation tokenizer: {name}",
+            details={'choices': list(TOKENIZER_CHOICES)}
+        )
+    if name == 'hyperscan' and not HYPERSCAN_AVAILABLE:
+        return 'default'
+    return name
+
+
+def get_citation_tokenizer(name: str = 'default') -> Tokenizer:
+    """
+    Tokenizer to pass to eyecite.get_citations
+
+    Args:
+        name: 'default' or 'hyperscan'
+    """
+    resolved = resolve_tokenizer_name(name)
+    tokenizer = _tokenizers.get(resolved)
+    if tokenizer is None:
+        if resolved == 'hyperscan':
+            os.makedirs(HYPERSCAN_CACHE_DIR, exist_ok=True)
+            tokenizer = HyperscanTokenizer(cache_dir=HYPERSCAN_CACHE_DIR)
+            # Load or compile the database now rather than inside the first document
+            tokenizer.hyperscan_db
+            logger.info(f"Hyperscan citation tokenizer ready (cache: {HYPERSCAN_CACHE_DIR})")
+        else:
+            if name and name.lower() == 'hyperscan':
+                logger.warning("hyperscan is not installed; using the default citation tokenizer")
+            tokenizer = default_tokenizer
+        _tokenizers[resolved] = tokenizer
+    return tokenizer
+
+
+def tokenizer_info(name: str = 'default') -> Dict[str, Any]:
+    """Requested and effective tokenizer, for logs and statistics"""
+    return {
+        'requested': name,
+        'effective': resolve_tokenizer_name(name),
+        'hyperscan_available': HYPERSCAN_AVAILABLE,
+        'hyperscan_cache_dir': HYPERSCAN_CACHE_DIR
+    }
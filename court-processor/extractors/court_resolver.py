@@ -0,0 +1,482 @@
+"""
+Court resolution from metadata hints, case numbers and document text
+
+courts_db ships one or more regexes per court (about 8,400 in all). Running
+every regex over a document costs hundreds of milliseconds, so the
+resolver compiles them once per process into a literal prefilter:
+reading each courts_db regex string gives the literals any match must
+contain (see _LiteralMiner), all
+literals go into one Aho-Corasick automaton (str.find without
+pyahocorasick), and a regex is only run where its rarest literal occurs,
+within the longest match the regex can produce. The result equals running
+every regex over the scanned text.
+
+Matches are ranked by specificity (see rank_matches), and a match that only
+names a kind of court ("United States District Court") resolves nothing.
+Hint and case-number lookups are memoized, since a batch repeats the same
+few values.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+import courts_db
+
+# Characters of the start of a document scanned for a court caption
+COURT_SCAN_CHARS = 4096
+
+# Literals shorter than this are too common to filter on
+_MIN_LITERAL_LENGTH = 2
+# Regexes that can match more characters than this are run over the whole text
+_MAX_WINDOW = 1000
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_NAME_PUNCTUATION_PATTERN = re.compile(r'[.,]')
+_CASE_PREFIX_PATTERN = re.compile(r'^([A-Za-z]{2,10})[-:]')
+
+
+class _Unsupported(Exception):
+    """Regex syntax the literal miner does not read; the regex runs unfiltered"""
+
+
+class _LiteralMiner:
+    """
+    Reads a courts_db regex string for the lowercase literals every match
+    must contain and for the longest match it can produce
+
+    Covers the syntax courts_db uses (literals, escapes, classes, groups,
+    lookarounds, alternation, quantifiers); anything else raises
+    _Unsupported. Missing a literal only weakens the filter, so runs of
+    literals are cut wherever the syntax is not a plain character. The
+    width also counts the characters assertions look at (lookarounds, \\b,
+    $), so a search window always holds everything a match examines.
+    """
+
+    _QUANTIFIER_PATTERN = re.compile(r'\{(\d*)(?:(,)(\d*))?\}')
+    _ESCAPED_CHARS = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v'}
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.pos = 0
+
+    def mine(self) -> Tuple[List[FrozenSet[str]], Optional[int]]:
+        """(literal sets, max width or None when unbounded)"""
+        sets, width = self._alternation()
+        if self.pos != len(self.pattern):
+            raise _Unsupported(self.pattern)
+        return sets, width
+
+    def _peek(self) -> str:
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else ''
+
+    def _braces_at(self, pos: int):
+        """Match of a {m,n} repeat at pos; other braces are literal characters"""
+        match = self._QUANTIFIER_PATTERN.match(self.pattern, pos)
+        return match if match and (match.group(1) or match.group(2)) else None
+
+    def _alternation(self):
+        branches = [self._sequence()]
+        while self._peek() == '|':
+            self.pos += 1
+            branches.append(self._sequence())
+        if len(branches) == 1:
+            return branches[0]
+        sets = []
+        if all(found for found, _ in branches):
+            # One of the alternatives matches: any of their literals will do
+            sets.append(frozenset().union(*(min(found, key=len) for found, _ in branches)))
+        widths = [width for _, width in branches]
+        return sets, None if None in widths else max(widths)
+
+    def _sequence(self):
+        sets = []
+        run = []
+        width = 0
+
+        def end_run():
+            literal = ''.join(run).strip()
+            if len(literal) >= _MIN_LITERAL_LENGTH:
+                sets.append(frozenset([literal]))
+            run.clear()
+
+        while self._peek() not in ('', '|', ')'):
+            atom_sets, atom_width, char = self._atom()
+            low, high = self._quantifier()
+            if char is not None and (low, high) == (1, 1):
+                run.append(char)
+            else:
+                end_run()
+                if low >= 1:
+                    sets.extend(atom_sets)
+            if width is not None:
+                width = None if atom_width is None or high is None else width + atom_width * high
+        end_run()
+        return sets, width
+
+    def _atom(self):
+        """(literal sets, width, lowercase char if a plain character)"""
+        char = self._peek()
+        self.pos += 1
+        if char == '(':
+            return self._group()
+        if char == '[':
+            self._skip_class()
+            return [], 1, None
+        if char == '.':
+            return [], 1, None
+        if char == '^':
+            return [], 0, None
+        if char == '$':
+            return [], 1, None
+        if char == '\\':
+            return self._escape()
+        if char in '*+?' or (char == '{' and self._braces_at(self.pos - 1)):
+            raise _Unsupported(self.pattern)
+        return [], 1, char.lower()
+
+    def _group(self):
+        lookaround = None
+        if self._peek() == '?':
+            self.pos += 1
+            kind = self._peek()
+            if kind == ':':
+                self.pos += 1
+            elif kind == 'P' and self.pattern.startswith('P<', self.pos):
+                self.pos = self.pattern.index('>', self.pos) + 1
+            elif kind and kind in '=!':
+                self.pos += 1
+                lookaround = kind
+            elif self.pattern.startswith(('<=', '<!'), self.pos):
+                lookaround = self.pattern[self.pos + 1]
+                self.pos += 2
+            elif kind and kind in 'iu':
+                # Global flags courts_db regexes are compiled with anyway
+                while self._peek() and self._peek() in 'iu':
+                    self.pos += 1
+                if self._peek() != ')':
+                    raise _Unsupported(self.pattern)
+                self.pos += 1
+                return [], 0, None
+            else:
+                raise _Unsupported(self.pattern)
+        sets, width = self._alternation()
+        if self._peek() != ')':
+            raise _Unsupported(self.pattern)
+        self.pos += 1
+        if lookaround == '!':
+            return [], width, None
+        return sets, width, None
+
+    def _skip_class(self):
+        if self._peek() == '^':
+            self.pos += 1
+        if self._peek() == ']':
+            self.pos += 1
+        while self._peek() != ']':
+            if not self._peek():
+                raise _Unsupported(self.pattern)
+            self.pos += 2 if self._peek() == '\\' else 1
+        self.pos += 1
+
+    def _escape(self):
+        char = self._peek()
+        self.pos += 1
+        if char == 'A':
+            return [], 0, None
+        if char in ('b', 'B', 'Z', 'd', 'D', 'w', 'W', 's', 'S'):
+            return [], 1, None
+        if char in self._ESCAPED_CHARS:
+            return [], 1, self._ESCAPED_CHARS[char]
+        if char == 'x' and re.fullmatch(r'[0-9A-Fa-f]{2}', self.pattern[self.pos:self.pos + 2]):
+            self.pos += 2
+            return [], 1, chr(int(self.pattern[self.pos - 2:self.pos], 16)).lower()
+        if not char or char.isalnum():
+            # Backreferences and other escapes: no literal, unknown width
+            raise _Unsupported(self.pattern)
+        return [], 1, char.lower()
+
+    def _quantifier(self) -> Tuple[int, Optional[int]]:
+        """(min, max or None) repeats of the atom just read"""
+        char = self._peek()
+        if char and char in '*+?':
+            self.pos += 1
+            bounds = {'*': (0, None), '+': (1, None), '?': (0, 1)}[char]
+        else:
+            match = self._braces_at(self.pos) if char == '{' else None
+            if match is None:
+                return 1, 1
+            self.pos = match.end()
+            low = int(match.group(1) or 0)
+            if match.group(2):
+                bounds = (low, int(match.group(3)) if match.group(3) else None)
+            else:
+                bounds = (low, low)
+        if self._peek() and self._peek() in '?+':
+            self.pos += 1  # Lazy and possessive repeats match the same characters
+        return bounds
+
+
+def mine_literals(pattern: str) -> Tuple[List[FrozenSet[str]], Optional[int]]:
+    """
+    Sets of lowercase literals of a courts_db regex, such that every match
+    contains at least one literal of each set, and the longest match it can
+    produce (None when unbounded or unreadable)
+    """
+    try:
+        return _LiteralMiner(pattern).mine()
+    except _Unsupported:
+        return [], None
+
+
+def _normalize_name(name: str) -> str:
+    return _WHITESPACE_PATTERN.sub(' ', _NAME_PUNCTUATION_PATTERN.sub(' ', name.lower())).strip()
+
+
+def rank_matches(matches: List[Dict[str, Any]], courts: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Order regex matches from most to least specific, one entry per court
+
+    A match inside a longer match of another court is dropped ("District
+    Court" inside "District Court for the Eastern District of Texas"), as
+    are parents of matched courts and bankruptcy courts whose match does
+    not mention bankruptcy. The rest are ordered by position (captions come
+    first), then by match length.
+    """
+    best: Dict[str, Dict[str, Any]] = {}
+    for match in matches:
+        court = courts.get(match['court_id'], {})
+        if court.get('type') == 'bankruptcy' and 'bankr' not in match['text'].lower():
+            continue
+        current = best.get(match['court_id'])
+        if current is None or (match['end'] - match['start'], -match['start']) > \
+                (current['end'] - current['start'], -current['start']):
+            best[match['court_id']] = match
+
+    parents = {courts.get(court_id, {}).get('parent') for court_id in best}
+    ranked = []
+    for court_id, match in best.items():
+        if court_id in parents:
+            continue
+        if any(other is not match
+               and other['start'] <= match['start'] and match['end'] <= other['end']
+               and other['end'] - other['start'] > match['end'] - match['start']
+               for other in best.values()):
+            continue
+        ranked.append(match)
+    ranked.sort(key=lambda match: (match['start'], match['start'] - match['end']))
+    return ranked
+
+
+class CourtResolver:
+    """courts_db regexes behind a literal prefilter, plus memoized hint lookups"""
+
+    def __init__(self, courts: Optional[List[Dict[str, Any]]] = None):
+        if courts is None:
+            courts = courts_db.courts
+            regexes = courts_db.regexes
+        else:
+            regexes = courts_db.gather_regexes(courts)
+        self.courts: Dict[str, Dict[str, Any]] = {court['id']: court for court in courts}
+        self.engine = 'aho_corasick' if AHOCORASICK_AVAILABLE else 'find'
+
+        # (compiled regex, court id, literal sets, rarest literal set, max width)
+        self._regexes: List[Tuple[Any, str, List[FrozenSet[str]], Optional[FrozenSet[str]], Optional[int]]] = []
+        parsed = []
+        for regex, court_id, *_ in regexes:
+            sets, width = mine_literals(regex.pattern)
+            parsed.append((regex, court_id, sets, width if width is not None and width <= _MAX_WINDOW else None))
+
+        frequency = Counter(literal for *_, sets, _ in parsed for found in sets for literal in found)
+        self._by_literal: Dict[str, List[int]] = {}
+        self._unfiltered: List[int] = []
+        for position, (regex, court_id, sets, width) in enumerate(parsed):
+            key = min(sets, key=lambda found: (sum(frequency[literal] for literal in found), len(found))) \
+                if sets else None
+            self._regexes.append((regex, court_id, sets, key, width))
+            if key is None:
+                self._unfiltered.append(position)
+            else:
+                for literal in key:
+                    self._by_literal.setdefault(literal, []).append(position)
+
+        self.literals = sorted(frequency)
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for literal in self.literals:
+                self._automaton.add_word(literal, literal)
+            self._automaton.make_automaton()
+
+        # Courts other courts name as parent ("District Court" for every
+        # federal district court); a match of one alone names no single court
+        self._umbrellas = {court.get('parent') for court in courts} & set(self.courts)
+        # Normalized court names and citation strings, where they name one court
+        self._names: Dict[str, Optional[str]] = {}
+        for court in courts:
+            for name in (court.get('name'), court.get('citation_string')):
+                if name and not self.is_generic({'court_id': court['id'], 'text': name}):
+                    key = _normalize_name(name)
+                    self._names[key] = court['id'] if self._names.get(key, court['id']) == court['id'] else None
+
+        self._hint_cache: Dict[Any, Optional[str]] = {}
+        self._case_prefix_cache: Dict[str, Optional[str]] = {}
+
+    def _literal_ends(self, text_lower: str) -> Dict[str, List[int]]:
+        """End offset of every occurrence of every literal"""
+        ends: Dict[str, List[int]] = {}
+        if self.engine == 'aho_corasick':
+            for end, literal in self._automaton.iter(text_lower):
+                ends.setdefault(literal, []).append(end)
+        else:
+            for literal in self.literals:
+                start = text_lower.find(literal)
+                while start != -1:
+                    ends.setdefault(literal, []).append(start + len(literal) - 1)
+                    start = text_lower.find(literal, start + 1)
+        return ends
+
+    def find_matches(self, text: str) -> List[Dict[str, Any]]:
+        """
+        First match of every courts_db regex in text (whitespace collapsed)
+
+        Returns:
+            [{'court_id', 'text', 'start', 'end'}] in regex order
+        """
+        text = _WHITESPACE_PATTERN.sub(' ', text).strip()
+        text_lower = text.lower()
+        # Offsets only carry over when lowercasing kept every character's length
+        windowed = len(text_lower) == len(text)
+        ends = self._literal_ends(text_lower)
+
+        candidates = set(self._unfiltered)
+        for literal in ends:
+            candidates.update(self._by_literal.get(literal, ()))
+
+        matches = []
+        for position in sorted(candidates):
+            regex, court_id, sets, key, width = self._regexes[position]
+            if not all(any(literal in ends for literal in found) for found in sets):
+                continue
+            if key is None or width is None or not windowed:
+                match = regex.search(text)
+            else:
+                # A match contains an occurrence of a key literal and is at
+                # most width long, so only text around occurrences is searched
+                match = None
+                for end in sorted(end for literal in key for end in ends.get(literal, ())):
+                    match = regex.search(text, max(0, end + 1 - width), min(len(text), end + width))
+                    if match:
+                        break
+            if match and match.end() > match.start():
+                matches.append({'court_id': court_id, 'text': match.group(0),
+                                'start': match.start(), 'end': match.end()})
+        return matches
+
+    def is_generic(self, match: Dict[str, Any]) -> bool:
+        """
+        Whether a match names only a kind of court: an umbrella court
+        ("United States District Court") whose match does not name its
+        state. Federal umbrellas span the country and are always generic.
+        """
+        if match['court_id'] not in self._umbrellas:
+            return False
+        court = self.courts[match['court_id']]
+        location = court.get('location')
+        if court.get('system') == 'federal' or not location:
+            return True
+        return location.lower() not in match['text'].lower()
+
+    def resolve_content(self, content: str, max_chars: int = COURT_SCAN_CHARS) -> Optional[Dict[str, Any]]:
+        """
+        Most specific court named in the start of a document; a caption
+        that only names a kind of court ("UNITED STATES DISTRICT COURT")
+        resolves to None
+
+        Returns:
+            {'court_id', 'matched_text', 'candidates'} or None
+        """
+        if not content:
+            return None
+        ranked = [match for match in rank_matches(self.find_matches(content[:max_chars]), self.courts)
+                  if not self.is_generic(match)]
+        if not ranked:
+            return None
+        return {
+            'court_id': ranked[0]['court_id'],
+            'matched_text': ranked[0]['text'].strip(),
+            'candidates': [match['court_id'] for match in ranked]
+        }
+
+    def resolve_hint(self, hint: Any) -> Optional[str]:
+        """
+        Court id for a metadata value (memoized per value): an id
+        ('txed'), a CourtListener court URL, a courts_db name or citation
+        string ('E.D. Tex.'), a court caption ('United States District
+        Court for the Eastern District of Texas') or a federal district
+        ('Eastern District of Texas')
+        """
+        if not isinstance(hint, str) or not hint.strip():
+            return None
+        if hint in self._hint_cache:
+            return self._hint_cache[hint]
+
+        value = hint.strip()
+        court_id = None
+        if value.lower() in self.courts:
+            court_id = value.lower()
+        elif '/' in value:
+            # e.g. https://www.courtlistener.com/api/rest/v4/courts/txed/
+            segments = [segment.lower() for segment in value.split('/') if segment]
+            court_id = next((segment for segment in reversed(segments) if segment in self.courts), None)
+        elif self._names.get(_normalize_name(value)):
+            court_id = self._names[_normalize_name(value)]
+        else:
+            resolved = self.resolve_content(value, max_chars=len(value))
+            if resolved is None and 'district' in value.lower() and 'court' not in value.lower():
+                # courts_db captions name the court before the district
+                caption = f"United States District Court for the {value}"
+                resolved = self.resolve_content(caption, max_chars=len(caption))
+            court_id = resolved['court_id'] if resolved else None
+
+        self._hint_cache[hint] = court_id
+        return court_id
+
+    def resolve_case_number(self, case_number: Any) -> Optional[str]:
+        """Court id prefixed to a case number ('txed:2:21-cv-00316'), memoized per prefix"""
+        if not isinstance(case_number, str):
+            return None
+        match = _CASE_PREFIX_PATTERN.match(case_number.strip())
+        if not match:
+            return None
+        prefix = match.group(1).lower()
+        if prefix not in self._case_prefix_cache:
+            self._case_prefix_cache[prefix] = prefix if prefix in self.courts else None
+        return self._case_prefix_cache[prefix]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'engine': self.engine,
+            'regexes': len(self._regexes),
+            'literals': len(self.literals),
+            'unfiltered_regexes': len(self._unfiltered),
+            'memoized_hints': len(self._hint_cache),
+            'memoized_case_prefixes': len(self._case_prefix_cache)
+        }
+
+
+_default_resolver: Optional[CourtResolver] = None
+
+
+def get_court_resolver() -> CourtResolver:
+    """Shared resolver over the installed courts_db, built on first use"""
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = CourtResolver()
+    return _default_resolver
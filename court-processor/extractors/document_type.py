@@ -4,61 +4,115 @@ Simple Document Type Detection for Court Documents
 Based on content characteristics, not just metadata labels
 """
 
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Tuple, Optional
 import re
-import json
+
+from pipeline_document import PipelineDocument
+
+# Simple citation pattern ("123 F.3d 456"), counted once per document
+CITATION_PATTERN = re.compile(r'\d+\s+[A-Z][a-z]+\.?\s*\d+d?\s+\d+')
+
+# CourtListener opinion types that mark a document as an opinion
+OPINION_TYPES = ('010combined', '020lead', '030concurrence', '040dissent')
+OPINION_FIELDS = ('cluster', 'author', 'author_str', 'opinions_cited', 'per_curiam')
+DOCKET_FIELDS = ('docket_id', 'cause', 'nature_of_suit')
+
+# Characters of the head searched for the order marker by the pipeline rules
+ORDER_MARKER_WINDOW = 500
+
 
 class DocumentTypeDetector:
     """Detect actual document type based on content and structure"""
     
+    # Characteristics of each document type. required_patterns are matched
+    # case-insensitively, section_markers case-sensitively.
+    TYPE_CRITERIA = {
+        'opinion': {
+            'min_length': 5000,
+            'required_patterns': [
+                r'(opinion|judgment|decision)',
+                r'(court|district|circuit)',
+                r'(judge|justice)'
+            ],
+            'section_markers': [
+                r'I+\.\s+[A-Z]',  # I. BACKGROUND
+                r'CONCLUSION',
+                r'DISCUSSION',
+                r'ANALYSIS'
+            ],
+            'citation_threshold': 5  # Expect at least 5 citations
+        },
+        'order': {
+            'min_length': 1000,
+            'required_patterns': [
+                r'(ORDER|ORDERED)',
+                r'(IT IS HEREBY|IT IS SO)'
+            ],
+            'section_markers': [],
+            'citation_threshold': 1
+        },
+        'docket': {
+            'min_length': 0,
+            'required_patterns': [
+                r'(docket|case number)',
+                r'(filed|entered)'
+            ],
+            'metadata_fields': ['docket_id', 'recap_documents', 'assigned_to'],
+            'citation_threshold': 0
+        },
+        'brief': {
+            'min_length': 3000,
+            'required_patterns': [
+                r'(plaintiff|defendant|appellant|appellee)',
+                r'(motion|brief|memorandum)'
+            ],
+            'section_markers': [
+                r'ARGUMENT',
+                r'STATEMENT OF THE CASE'
+            ],
+            'citation_threshold': 10
+        }
+    }
+    
     def __init__(self):
-        # Define characteristics of each document type
-        self.patterns = {
-            'opinion': {
-                'min_length': 5000,
-                'required_patterns': [
-                    r'(opinion|judgment|decision)',
-                    r'(court|district|circuit)',
-                    r'(judge|justice)'
-                ],
-                'section_markers': [
-                    r'I+\.\s+[A-Z]',  # I. BACKGROUND
-                    r'CONCLUSION',
-                    r'DISCUSSION',
-                    r'ANALYSIS'
-                ],
-                'citation_threshold': 5  # Expect at least 5 citations
-            },
-            'order': {
-                'min_length': 1000,
-                'required_patterns': [
-                    r'(ORDER|ORDERED)',
-                    r'(IT IS HEREBY|IT IS SO)'
-                ],
-                'section_markers': [],
-                'citation_threshold': 1
-            },
-            'docket': {
-                'min_length': 0,
-                'required_patterns': [
-                    r'(docket|case number)',
-                    r'(filed|entered)'
-                ],
-                'metadata_fields': ['docket_id', 'recap_documents', 'assigned_to'],
-                'citation_threshold': 0
-            },
-            'brief': {
-                'min_length': 3000,
-                'required_patterns': [
-                    r'(plaintiff|defendant|appellant|appellee)',
-                    r'(motion|brief|memorandum)'
-                ],
-                'section_markers': [
-                    r'ARGUMENT',
-                    r'STATEMENT OF THE CASE'
-                ],
-                'citation_threshold': 10
-            }
+        self.patterns = self.TYPE_CRITERIA
+        
+        # Every distinct pattern is compiled once and searched at most once per
+        # document, however many types use it. Case-insensitive patterns run
+        # on the lowercased text, which the pipeline document caches, when
+        # the text is ASCII; otherwise with IGNORECASE, since lowercasing
+        # does not fold every character re does ('İ', 'ſ').
+        self._required = {}
+        self._required_ignorecase = {}
+        self._markers = {}
+        for criteria in self.patterns.values():
+            for pattern in criteria.get('required_patterns', []):
+                self._required.setdefault(pattern, re.compile(pattern.lower()))
+                self._required_ignorecase.setdefault(pattern, re.compile(pattern, re.IGNORECASE))
+            for pattern in criteria.get('section_markers', []):
+                self._markers.setdefault(pattern, re.compile(pattern))
+    
+    def scan(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Content features shared by all types, computed in one pass over the patterns
+        
+        Returns:
+            {'length', 'citation_count', 'required': {pattern: bool},
+             'markers': {pattern: bool}}
+        """
+        document = PipelineDocument.wrap(document)
+        content = document.content
+        if content.isascii():
+            text, required = document.content_lower, self._required
+        else:
+            text, required = content, self._required_ignorecase
+        return {
+            'length': len(content),
+            'citation_count': len(CITATION_PATTERN.findall(content)),
+            'required': {pattern: compiled.search(text) is not None
+                         for pattern, compiled in required.items()},
+            'markers': {pattern: compiled.search(content) is not None
+                        for pattern, compiled in self._markers.items()}
         }
     
     def detect_type(self, document: Dict[str, Any]) -> Tuple[str, float, Dict[str, Any]]:
@@ -70,20 +124,16 @@ class DocumentTypeDetector:
             - confidence: 0-1 confidence score
             - characteristics: What was found
         """
-        content = document.get('content', '')
-        metadata = document.get('metadata', {})
-        
-        # Parse metadata if string
-        if isinstance(metadata, str):
-            try:
-                metadata = json.loads(metadata)
-            except:
-                metadata = {}
+        document = PipelineDocument.wrap(document)
+        metadata = document.metadata
+        features = self.scan(document)
+        length = features['length']
+        citation_count = features['citation_count']
         
         # Track scores for each type
         scores = {}
         characteristics = {
-            'content_length': len(content),
+            'content_length': length,
             'has_citations': False,
             'citation_count': 0,
             'has_structure': False,
@@ -97,24 +147,23 @@ class DocumentTypeDetector:
             
             # Length check
             max_score += 1
-            if len(content) >= criteria['min_length']:
+            if length >= criteria['min_length']:
                 score += 1
             elif criteria['min_length'] > 0:
                 # Partial credit based on how close
-                score += len(content) / criteria['min_length']
+                score += length / criteria['min_length']
             
             # Pattern matching
-            if 'required_patterns' in criteria:
-                for pattern in criteria['required_patterns']:
-                    max_score += 1
-                    if re.search(pattern, content, re.IGNORECASE):
-                        score += 1
+            for pattern in criteria.get('required_patterns', []):
+                max_score += 1
+                if features['required'][pattern]:
+                    score += 1
             
             # Section markers (indicates structured document)
-            if 'section_markers' in criteria and criteria['section_markers']:
+            if criteria.get('section_markers'):
                 max_score += 1
                 sections_found = sum(1 for marker in criteria['section_markers'] 
-                                   if re.search(marker, content))
+                                   if features['markers'][marker])
                 if sections_found > 0:
                     score += min(1.0, sections_found / len(criteria['section_markers']))
                     characteristics['has_structure'] = True
@@ -122,15 +171,13 @@ class DocumentTypeDetector:
             # Citation check
             if criteria['citation_threshold'] > 0:
                 max_score += 1
-                # Simple citation pattern
-                citations = re.findall(r'\d+\s+[A-Z][a-z]+\.?\s*\d+d?\s+\d+', content)
-                characteristics['citation_count'] = len(citations)
-                characteristics['has_citations'] = len(citations) > 0
+                characteristics['citation_count'] = citation_count
+                characteristics['has_citations'] = citation_count > 0
                 
-                if len(citations) >= criteria['citation_threshold']:
+                if citation_count >= criteria['citation_threshold']:
                     score += 1
-                elif criteria['citation_threshold'] > 0:
-                    score += len(citations) / criteria['citation_threshold']
+                else:
+                    score += citation_count / criteria['citation_threshold']
             
             # Metadata field check (for dockets)
             if 'metadata_fields' in criteria:
@@ -155,6 +202,43 @@ class DocumentTypeDetector:
         
         return best_type, best_confidence, characteristics
     
+    def detect_pipeline_type(self, document: Dict[str, Any]) -> Tuple[str, float, Dict[str, Any]]:
+        """
+        Classify a document for the enhancement pipeline
+        
+        Uses metadata and case number signals first and only looks at the
+        head of the text, so it costs nothing per byte of content. The type
+        is one of 'opinion', 'docket', 'order' or 'unknown'.
+        
+        Returns:
+            (detected_type, confidence, characteristics) like detect_type;
+            characteristics['signal'] names the rule that decided
+        """
+        document = PipelineDocument.wrap(document)
+        metadata = document.metadata
+        
+        # Check case number pattern for opinions
+        case_number = document.get('case_number', '')
+        if case_number.startswith('OPINION-'):
+            return 'opinion', 1.0, {'signal': 'case_number'}
+        
+        # Check metadata type field
+        metadata_type = metadata.get('type', '')
+        if metadata_type and any(op_type in str(metadata_type) for op_type in OPINION_TYPES):
+            return 'opinion', 1.0, {'signal': 'metadata_type'}
+        
+        # Check for opinion- and docket-specific fields
+        if any(key in metadata for key in OPINION_FIELDS):
+            return 'opinion', 0.9, {'signal': 'opinion_fields'}
+        if any(key in metadata for key in DOCKET_FIELDS):
+            return 'docket', 0.9, {'signal': 'docket_fields'}
+        
+        # Check for order patterns in content
+        if 'IT IS HEREBY ORDERED' in document.head_upper(ORDER_MARKER_WINDOW):
+            return 'order', 0.8, {'signal': 'order_marker'}
+        
+        return 'unknown', 0.0, {'signal': None}
+    
     def get_processing_strategy(self, detected_type: str) -> Dict[str, Any]:
         """Get recommended processing strategy for document type"""
         
@@ -194,6 +278,17 @@ class DocumentTypeDetector:
         return strategies.get(detected_type, strategies['unknown'])
 
 
+_default_detector: Optional[DocumentTypeDetector] = None
+
+
+def get_document_type_detector() -> DocumentTypeDetector:
+    """Shared detector, built on first use"""
+    global _default_detector
+    if _default_detector is None:
+        _default_detector = DocumentTypeDetector()
+    return _default_detector
+
+
 # Example usage
 if __name__ == "__main__":
     detector = DocumentTypeDetector()
@@ -1,15 +1,57 @@
 #!/usr/bin/env python3
 """
 Comprehensive judge extraction using all available sources from the 3-step traversal
+
+Names, docket initials and names found in document text are resolved
+against the shared judge index (extractors/judge_index.py), so every court
+with known judges is covered.
 """
 
 import re
-from typing import Dict, Optional, Tuple, List
+from typing import Any, Dict, Optional, Tuple, List
 from dataclasses import dataclass
 import logging
 
+from extractors.judge_index import get_judge_index, display_judge_name
+
 logger = logging.getLogger(__name__)
 
+# A capitalized name of two to four words ("Roy S. Payne", "J. Campbell Barker")
+_NAME = r"\b[A-Z][A-Za-z'\-]*\.?(?:[ \t]+[A-Z][A-Za-z'\-]*\.?){1,3}"
+
+# Judge names in document text are found next to a keyword: lowercase
+# keyword -> (pattern matched right after it, pattern name, base confidence).
+# Keywords are located with str.find on the lowercased text, which is much
+# cheaper than scanning the text with one regex per pattern.
+CONTENT_PATTERNS = {
+    '/s/': (re.compile(rf"[ \t]*({_NAME})"), 'electronic_signature', 95),
+    'by the court': (re.compile(rf":?\s*(?:/s/[ \t]*)?({_NAME})"), 'by_the_court', 90),
+    'honorable': (re.compile(rf"[ \t]+({_NAME})"), 'honorable', 85),
+    'hon.': (re.compile(rf"[ \t]+({_NAME})"), 'honorable', 85),
+    'before': (re.compile(rf":?[ \t]+(?:(?i:the)[ \t]+)?(?:(?i:honorable)[ \t]+)?({_NAME})"), 'before', 70),
+    'judge': (re.compile(r"[ \t]+([A-Z][A-Za-z'\-]+)"), 'judge_last_name', 65),
+}
+
+# "Rodney Gilstrap, United States District Judge": at a "judge" keyword
+# preceded by a court title, the name is read from the text before the title
+_TITLE_BEFORE_JUDGE = re.compile(r"(?:district|circuit|magistrate|bankruptcy)[ \t]+$", re.IGNORECASE)
+_NAME_BEFORE_TITLE = re.compile(
+    rf"({_NAME}),?\s*(?i:(?:chief[ \t]+)?(?:(?:united[ \t]+states|u\.[ \t]?s\.)[ \t]+)?)$"
+)
+NAME_BEFORE_TITLE_SCORE = 85
+
+# Words that end a captured name (titles, headings, common capitalized words)
+_NOT_NAME_WORDS = {
+    'united', 'states', 'district', 'circuit', 'magistrate', 'bankruptcy', 'court', 'judge',
+    'memorandum', 'opinion', 'order', 'pursuant', 'federal', 'civil', 'criminal', 'action',
+    'before', 'signed', 'the', 'of', 'in', 'and', 'for', 'with', 'to', 'by', 'is', 'was',
+    'defendant', 'defendants', 'plaintiff', 'plaintiffs', 'filed', 'claim', 'motion', 'texas',
+    'delaware', 'eastern', 'western', 'northern', 'southern', 'division', 'appeals', 'patent'
+}
+
+# Characters of each end of a document searched for judge names
+CONTENT_SEARCH_CHARS = 2000
+
 
 @dataclass
 class JudgeInfo:
@@ -34,22 +76,6 @@ class ComprehensiveJudgeExtractor:
         ('docket_pattern', None, 0.5),           # Extracted from docket number
     ]
     
-    # E.D. Texas judge initials mapping (from docket patterns like 2:21-cv-00316-JRG)
-    TXED_JUDGE_INITIALS = {
-        'JRG': 'Rodney Gilstrap',
-        'RSP': 'Roy S. Payne',
-        'RWS': 'Robert W. Schroeder III',
-        'JDC': 'J. Campbell Barker',
-        'MAC': 'Marcia A. Crone',
-        'RC': 'Ron Clark',
-        'TJW': 'T. John Ward',
-        'DF': 'David Folsom',
-        'CD': 'Charles Everingham',
-        'MHS': 'Michael H. Schneider',
-        'NM': 'Neal Manne',
-        'AML': 'Amos L. Mazzant III',
-    }
-    
     @classmethod
     def extract_comprehensive_judge_info(
         cls,
@@ -57,7 +83,8 @@ class ComprehensiveJudgeExtractor:
         opinion_data: Optional[Dict] = None,
         cluster_data: Optional[Dict] = None,
         docket_data: Optional[Dict] = None,
-        docket_number: Optional[str] = None
+        docket_number: Optional[str] = None,
+        court_id: Optional[str] = None
     ) -> Optional[JudgeInfo]:
         """
         Extract judge information from all available sources
@@ -92,7 +119,7 @@ class ComprehensiveJudgeExtractor:
         
         # Try docket number pattern extraction
         if docket_number:
-            judge_from_pattern = cls.extract_from_docket_number(docket_number)
+            judge_from_pattern = cls.extract_from_docket_number(docket_number, court_id)
             if judge_from_pattern:
                 all_sources['docket_pattern'] = judge_from_pattern
         
@@ -129,7 +156,7 @@ class ComprehensiveJudgeExtractor:
         return None
     
     @classmethod
-    def extract_from_docket_number(cls, docket_number: str) -> Optional[str]:
+    def extract_from_docket_number(cls, docket_number: str, court_id: Optional[str] = None) -> Optional[str]:
         """Extract judge from docket number pattern (e.g., 2:21-cv-00316-JRG)"""
         if not docket_number:
             return None
@@ -138,9 +165,10 @@ class ComprehensiveJudgeExtractor:
         match = re.search(r'-([A-Z]{2,3})(?:-\d+)?$', docket_number)
         if match:
             initials = match.group(1)
-            # Check if we have a mapping for these initials
-            if initials in cls.TXED_JUDGE_INITIALS:
-                return cls.TXED_JUDGE_INITIALS[initials]
+            # Check if the judge index knows these initials
+            judge_name = get_judge_index().lookup_initials(initials, court_id)
+            if judge_name:
+                return judge_name
             # Return initials if no mapping
             return initials
             
@@ -164,14 +192,140 @@ class ComprehensiveJudgeExtractor:
         return judge_name
     
     @classmethod
-    def expand_author_name(cls, author_str: str) -> Optional[str]:
+    def expand_author_name(cls, author_str: str, court_id: Optional[str] = None) -> Optional[str]:
         """
         Try to expand author string (usually just last name) to full name
-        This would need a database of judges or additional API calls
+        
+        Uses the judge index; returns the string as-is when the last name is
+        unknown or shared by several of the court's judges.
+        """
+        if not author_str:
+            return None
+        index = get_judge_index()
+        if len(author_str.split()) > 1:
+            return index.get(author_str, court_id) or author_str
+        return index.lookup_last_name(author_str, court_id) or author_str
+    
+    @staticmethod
+    def _content_matches(text: str):
+        """Yield (captured name, pattern name, base confidence) for every pattern match"""
+        lowered = text.lower()
+        for keyword, (pattern, pattern_name, base_score) in CONTENT_PATTERNS.items():
+            position = lowered.find(keyword)
+            while position != -1:
+                # Whole words only ("judge" but not "prejudge")
+                if position == 0 or not lowered[position - 1].isalpha():
+                    end = position + len(keyword)
+                    match = pattern.match(text, end)
+                    if match:
+                        yield match.group(1), pattern_name, base_score
+                    if keyword == 'judge':
+                        title = _TITLE_BEFORE_JUDGE.search(text, max(0, position - 20), position)
+                        if title:
+                            match = _NAME_BEFORE_TITLE.search(text, max(0, title.start() - 80), title.start())
+                            if match:
+                                yield match.group(1), 'name_before_title', NAME_BEFORE_TITLE_SCORE
+                position = lowered.find(keyword, position + 1)
+    
+    @classmethod
+    def _content_candidates(cls, content: str) -> List[Tuple[str, str, int]]:
+        """(name, pattern_location, confidence) of judge names near the start and end of a document"""
+        if len(content) > 2 * CONTENT_SEARCH_CHARS:
+            search_areas = [(content[:CONTENT_SEARCH_CHARS], 'start'), (content[-CONTENT_SEARCH_CHARS:], 'end')]
+        else:
+            search_areas = [(content, 'end')]
+        
+        candidates = []
+        for search_text, location in search_areas:
+            for captured, pattern_name, base_score in cls._content_matches(search_text):
+                # Keep the first run of words that are not titles or headings
+                words = []
+                for word in captured.split():
+                    if word.strip(".,").lower() not in _NOT_NAME_WORDS:
+                        words.append(word)
+                    elif words:
+                        break
+                if not words or (len(words) == 1 and pattern_name != 'judge_last_name'):
+                    continue
+                name = display_judge_name(' '.join(words))
+                # Signatures at the end of a document are the most reliable
+                score = base_score + (5 if location == 'end' else 0)
+                candidates.append((name, f"{pattern_name}_{location}", score))
+        candidates.sort(key=lambda candidate: candidate[2], reverse=True)
+        return candidates
+    
+    @classmethod
+    def extract_judge_from_content(cls, content: str, document_type: str = 'unknown',
+                                   court_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Find the judge's name in document text
+        
+        Names captured by CONTENT_PATTERNS are matched against the judge
+        index (the court's roster first); a name the index knows wins over
+        an unknown one, and single last names are only accepted when the
+        index resolves them.
+        
+        Returns:
+            Dict with 'found' and either judge_name, extracted_text, pattern,
+            confidence (0-100), fuzzy_matched and fuzzy_score, or a reason
         """
-        # For now, just return as-is
-        # In production, this could query a judge database
-        return author_str if author_str else None
+        # Skip extraction for document types that don't contain judges
+        if document_type in ('docket', 'recap_docket', 'civil_case'):
+            return {
+                'found': False,
+                'reason': f'Document type {document_type} typically lacks judge signatures',
+                'attempted': False
+            }
+        if not content:
+            return {'found': False, 'reason': 'No content', 'attempted': False}
+        
+        candidates = cls._content_candidates(content)
+        if not candidates:
+            return {'found': False, 'reason': 'No judge patterns matched', 'attempted': True}
+        
+        index = get_judge_index()
+        best_known = best_unknown = None
+        seen = set()
+        for extracted_name, pattern, confidence in candidates:
+            if extracted_name in seen:
+                continue
+            seen.add(extracted_name)
+            
+            if len(extracted_name.split()) == 1:
+                known_name = index.lookup_last_name(extracted_name, court_id)
+                matches = [(known_name, 100.0)] if known_name else []
+            else:
+                matches = index.match(extracted_name, court_id)
+            
+            if matches:
+                known_name, fuzzy_score = matches[0]
+                result = {
+                    'found': True,
+                    'judge_name': known_name,
+                    'extracted_text': extracted_name,
+                    'pattern': pattern,
+                    'confidence': (confidence + fuzzy_score) / 2,
+                    'fuzzy_matched': known_name != extracted_name,
+                    'fuzzy_score': fuzzy_score / 100
+                }
+                if not best_known or result['confidence'] > best_known['confidence']:
+                    best_known = result
+            elif not best_unknown and len(extracted_name.split()) > 1:
+                best_unknown = {
+                    'found': True,
+                    'judge_name': extracted_name,
+                    'extracted_text': extracted_name,
+                    'pattern': pattern,
+                    'confidence': confidence,
+                    'fuzzy_matched': False
+                }
+        
+        return best_known or best_unknown or {
+            'found': False,
+            'reason': 'Extracted names failed validation',
+            'attempted': True,
+            'candidates': candidates[:3]
+        }
     
     @classmethod
     def get_judge_summary(cls, judge_info: Optional[JudgeInfo]) -> Dict:
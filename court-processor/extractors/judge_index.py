@@ -0,0 +1,316 @@
+"""
+Judge name index
+
+Built once per process from the bundled roster (config/judge_roster.txt),
+the judge-pics people list and the judge names already stored in
+court_documents.metadata. Names are keyed by court and looked up by
+normalized name, last name and docket-number initials; fuzzy lookups score
+a candidate against the court's whole roster in one rapidfuzz
+process.extract call (difflib is used when rapidfuzz is not installed).
+
+Names not tied to a court (judge-pics) and every court's names are also kept
+under ANY_COURT, which is searched when a court is unknown or its roster has
+no match.
+"""
+
+import difflib
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    from rapidfuzz import fuzz, process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    fuzz = process = None
+    RAPIDFUZZ_AVAILABLE = False
+
+try:
+    import judge_pics
+    JUDGE_PICS_AVAILABLE = True
+except ImportError:
+    judge_pics = None
+    JUDGE_PICS_AVAILABLE = False
+
+from services.config import JUDGE_ROSTER_PATH, JUDGE_INDEX_FROM_DATABASE
+from services.database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+ANY_COURT = ''
+
+# Lowest fuzzy score (0-100) accepted as the same judge
+DEFAULT_SCORE_CUTOFF = 85.0
+
+_TITLE_PATTERN = re.compile(
+    r'^(?:(?:the|hon\.?|honorable|chief|senior|u\.?\s?s\.?|united\s+states|district|circuit|'
+    r'magistrate|bankruptcy|judge|justice)\s+)+',
+    re.IGNORECASE
+)
+_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv'}
+_NON_NAME_PATTERN = re.compile(r"[^a-z\s]")
+_INVALID_NAME_PATTERN = re.compile(r'[\d/@:]')
+
+
+def normalize_judge_name(name: str) -> str:
+    """Lowercase name without titles, suffixes or punctuation ('Hon. Roy S. Payne' -> 'roy s payne')"""
+    name = _TITLE_PATTERN.sub('', name.strip())
+    name = _NON_NAME_PATTERN.sub(' ', name.replace("'", '').lower())
+    tokens = name.split()
+    while tokens and tokens[-1] in _SUFFIXES:
+        tokens.pop()
+    return ' '.join(tokens)
+
+
+def display_judge_name(name: str) -> str:
+    """Name without titles and with normalized spacing, title-cased if all capitals"""
+    name = ' '.join(_TITLE_PATTERN.sub('', name.strip()).split()).rstrip(',;')
+    return name.title() if name.isupper() else name
+
+
+def _initials_fit(initials: str, normalized: str) -> bool:
+    """Docket initials end with the last-name initial (JRG -> ... Gilstrap)"""
+    return bool(normalized) and initials[-1].lower() == normalized.split()[-1][0]
+
+
+class JudgeIndex:
+    """Judge names keyed by court, normalized name, last name and initials"""
+
+    def __init__(self):
+        self._names: Dict[str, Dict[str, str]] = {}  # court -> normalized -> display name
+        self._last_names: Dict[str, Dict[str, Set[str]]] = {}  # court -> last name -> display names
+        self._initials: Dict[str, Dict[str, Set[str]]] = {}  # court -> initials -> display names
+        self._choice_names: Dict[str, List[str]] = {}  # court -> normalized names, for fuzzy matching
+        self._choices: Dict[str, List[str]] = {}  # court -> the same names with their words sorted
+        self._digest = 0  # Sum of the hashes of every judge added, see fingerprint
+
+    def __len__(self) -> int:
+        return len(self._names.get(ANY_COURT, {}))
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Identifies the judges added from every source (roster, judge-pics,
+        stored names); part of the Stage 5 input hash. The same judges give
+        the same fingerprint in any order.
+        """
+        return f"{self._digest:032x}"
+
+    @property
+    def courts(self) -> List[str]:
+        return sorted(court for court in self._names if court != ANY_COURT)
+
+    def add(self, name: str, court_id: Optional[str] = None, initials: Optional[List[str]] = None) -> bool:
+        """
+        Add a judge; the first spelling added for a normalized name is kept
+
+        Returns False for values that are not a full name (a single word, or
+        containing digits or URL characters).
+        """
+        if not name or _INVALID_NAME_PATTERN.search(name):
+            return False
+        normalized = normalize_judge_name(name)
+        if len(normalized.split()) < 2:
+            return False
+        display = display_judge_name(name)
+        entry = '|'.join([court_id or '', display, ' '.join(initials or ())])
+        self._digest = (self._digest + int.from_bytes(
+            hashlib.sha256(entry.encode('utf-8')).digest()[:16], 'big')) % (1 << 128)
+
+        courts = [ANY_COURT] if not court_id else [court_id.lower(), ANY_COURT]
+        for court in courts:
+            names = self._names.setdefault(court, {})
+            if normalized not in names:
+                names[normalized] = display
+                self._choices.pop(court, None)
+            display_name = names[normalized]
+            self._last_names.setdefault(court, {}).setdefault(normalized.split()[-1], set()).add(display_name)
+            for value in initials or ():
+                self._initials.setdefault(court, {}).setdefault(value.upper(), set()).add(display_name)
+        return True
+
+    # Lookups
+
+    def _court_order(self, court_id: Optional[str]) -> List[str]:
+        return [ANY_COURT] if not court_id else [court_id.lower(), ANY_COURT]
+
+    def get(self, name: str, court_id: Optional[str] = None) -> Optional[str]:
+        """Indexed spelling of an exactly matching (normalized) name"""
+        normalized = normalize_judge_name(name or '')
+        for court in self._court_order(court_id):
+            display = self._names.get(court, {}).get(normalized)
+            if display:
+                return display
+        return None
+
+    def lookup_initials(self, initials: str, court_id: Optional[str] = None) -> Optional[str]:
+        """Judge with these docket initials, if exactly one is known"""
+        if not initials:
+            return None
+        for court in self._court_order(court_id):
+            names = self._initials.get(court, {}).get(initials.upper())
+            if names:
+                return next(iter(names)) if len(names) == 1 else None
+        return None
+
+    def lookup_last_name(self, last_name: str, court_id: Optional[str] = None) -> Optional[str]:
+        """Judge with this last name, if exactly one is known"""
+        normalized = normalize_judge_name(last_name or '')
+        if not normalized:
+            return None
+        for court in self._court_order(court_id):
+            names = self._last_names.get(court, {}).get(normalized.split()[-1])
+            if names:
+                return next(iter(names)) if len(names) == 1 else None
+        return None
+
+    def match(self, name: str, court_id: Optional[str] = None, limit: int = 1,
+              score_cutoff: float = DEFAULT_SCORE_CUTOFF) -> List[Tuple[str, float]]:
+        """
+        Best (name, score 0-100) matches for a possibly misspelled name
+
+        Searches the court's roster, then all names if the court has no match.
+        """
+        normalized = normalize_judge_name(name or '')
+        if not normalized:
+            return []
+        for court in self._court_order(court_id):
+            names = self._names.get(court)
+            if not names:
+                continue
+            if normalized in names:
+                return [(names[normalized], 100.0)]
+            matches = self._extract(court, normalized, limit, score_cutoff)
+            if matches:
+                return [(names[choice], score) for choice, score in matches]
+        return []
+
+    def _extract(self, court: str, normalized: str, limit: int, score_cutoff: float) -> List[Tuple[str, float]]:
+        """Token-sort similarity: names compared with their words in sorted order"""
+        choices = self._choices.get(court)
+        if choices is None:
+            self._choice_names[court] = list(self._names[court])
+            choices = self._choices[court] = [' '.join(sorted(name.split())) for name in self._choice_names[court]]
+        names = self._choice_names[court]
+        key = ' '.join(sorted(normalized.split()))
+
+        if RAPIDFUZZ_AVAILABLE:
+            return [
+                (names[position], float(score)) for _, score, position in process.extract(
+                    key, choices, scorer=fuzz.ratio, limit=limit, score_cutoff=score_cutoff
+                )
+            ]
+
+        positions = {choice: position for position, choice in enumerate(choices)}
+        return [
+            (names[positions[close]], difflib.SequenceMatcher(None, key, close).ratio() * 100)
+            for close in difflib.get_close_matches(key, choices, n=limit, cutoff=score_cutoff / 100)
+        ]
+
+    # Sources
+
+    def load_roster(self, path: str = JUDGE_ROSTER_PATH) -> int:
+        """Add the judges of a roster file ('court_id | name | initials' lines, '#' comments)"""
+        added = 0
+        with open(path, encoding='utf-8') as roster_file:
+            for line in roster_file:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                court_id, name, *initials = [field.strip() for field in line.split('|')]
+                added += self.add(name, court_id, initials[0].split() if initials else None)
+        return added
+
+    def load_judge_pics(self) -> int:
+        """Add the people of the judge-pics package (names only, no courts)"""
+        if not JUDGE_PICS_AVAILABLE:
+            return 0
+        with open(os.path.join(judge_pics.judge_root, 'people.json'), encoding='utf-8') as people_file:
+            people = json.load(people_file)
+        added = 0
+        for person in people:
+            # Paths are last-first[-middle][-suffix][-birth year] slugs
+            parts = [part for part in (person.get('path') or '').split('-') if part and not part.isdigit()]
+            suffixes = [part for part in parts[1:] if part in _SUFFIXES]
+            parts = [part for part in parts if part not in _SUFFIXES]
+            if len(parts) >= 2:
+                added += self.add(' '.join(parts[1:] + parts[:1] + suffixes).title())
+        return added
+
+    def load_database(self, db_conn) -> int:
+        """
+        Add judge names stored in court_documents.metadata, with their court
+
+        Docket initials (federal_dn_judge_initials_assigned, or the suffix of
+        case_number) are recorded when they fit the name's last name.
+        """
+        try:
+            with db_conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT metadata->>'court_id' AS court_id,
+                           COALESCE(NULLIF(metadata->>'judge_name', ''), NULLIF(metadata->>'judge', ''),
+                                    NULLIF(metadata->>'assigned_to_str', ''), NULLIF(metadata->>'assigned_to', '')) AS judge_name,
+                           COALESCE(NULLIF(metadata->>'federal_dn_judge_initials_assigned', ''),
+                                    substring(upper(case_number) from '-([A-Z]{2,3})(?:-[0-9]+)?$')) AS initials,
+                           COUNT(*) AS documents
+                    FROM public.court_documents
+                    WHERE COALESCE(NULLIF(metadata->>'judge_name', ''), NULLIF(metadata->>'judge', ''),
+                                   NULLIF(metadata->>'assigned_to_str', ''), NULLIF(metadata->>'assigned_to', '')) IS NOT NULL
+                    GROUP BY 1, 2, 3
+                    ORDER BY documents DESC
+                """)
+                rows = cursor.fetchall()
+            db_conn.commit()
+        except Exception:
+            db_conn.rollback()
+            raise
+
+        added = 0
+        for court_id, judge_name, initials, _ in rows:
+            normalized = normalize_judge_name(judge_name)
+            fitting = [initials] if initials and _initials_fit(initials, normalized) else None
+            added += self.add(judge_name, court_id, fitting)
+        return added
+
+
+_default_index: Optional[JudgeIndex] = None
+
+
+def get_judge_index(db_conn=None) -> JudgeIndex:
+    """
+    Shared index, built on first use
+
+    Args:
+        db_conn: Connection to read stored judge names from when the index is
+            built (a new one is opened if None); ignored afterwards
+    """
+    global _default_index
+    if _default_index is None:
+        index = JudgeIndex()
+        index.load_roster()
+        index.load_judge_pics()
+        if JUDGE_INDEX_FROM_DATABASE:
+            conn = None
+            try:
+                conn = db_conn or get_db_connection()
+                index.load_database(conn)
+            except Exception as e:
+                logger.warning(f"Judge index built without stored judge names: {e}")
+            finally:
+                if conn is not None and db_conn is None:
+                    conn.close()
+        logger.info(f"Judge index: {len(index)} judges, {len(index.courts)} courts")
+        _default_index = index
+    return _default_index
+
+
+def set_judge_index(index: JudgeIndex):
+    """
+    Make index the shared one; process pool workers install the index built
+    by their parent, so every worker sees the same judges without a database
+    """
+    global _default_index
+    _default_index = index
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Legal Keyword Engine
+
+Compiles the pipeline's built-in legal phrases and the terms in
+legal_dictionary.txt into a single matcher that scans a document once.
+Matches respect word boundaries ("denied" does not match inside
+"undenied") and are reported with a count and the offset of the first
+occurrence.
+
+Uses a pyahocorasick automaton when the package is installed; otherwise a
+word-start dispatch table gives the same results in pure Python.
+"""
+
+import hashlib
+import os
+import re
+from typing import Dict, Any, Iterable, List, Optional
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+DEFAULT_DICTIONARY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'legal_dictionary.txt'
+)
+
+_WORD_PATTERN = re.compile(r'\w+')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def normalize_term(term: str) -> str:
+    """Lowercase and collapse whitespace, the form terms are matched in"""
+    return _WHITESPACE_PATTERN.sub(' ', term.strip().lower())
+
+
+def load_dictionary(path: str = DEFAULT_DICTIONARY_PATH) -> List[str]:
+    """Read one term per line, skipping blank lines and '#' comments"""
+    with open(path, encoding='utf-8') as dictionary_file:
+        return [
+            line.strip() for line in dictionary_file
+            if line.strip() and not line.lstrip().startswith('#')
+        ]
+
+
+class KeywordMatcher:
+    """Finds every occurrence of a fixed set of terms in one pass over the text"""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = sorted({normalize_term(term) for term in terms if term and term.strip()})
+        self.engine = 'aho_corasick' if AHOCORASICK_AVAILABLE else 'word_dispatch'
+
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for term in self.terms:
+                self._automaton.add_word(term, term)
+            if self.terms:
+                self._automaton.make_automaton()
+        else:
+            # Terms grouped by their first word; checked only where a text
+            # word equals it. Terms that start with punctuation are scanned
+            # separately.
+            self._by_first_word: Dict[str, List[str]] = {}
+            self._other_terms = []
+            for term in self.terms:
+                first_word = _WORD_PATTERN.match(term)
+                if first_word:
+                    self._by_first_word.setdefault(first_word.group(), []).append(term)
+                else:
+                    self._other_terms.append(term)
+
+    def find(self, text: str) -> Dict[str, Dict[str, int]]:
+        """
+        Match terms in already lowercased text
+
+        Returns:
+            {term: {'count': n, 'first_offset': i}} ordered by first occurrence
+        """
+        matches: Dict[str, Dict[str, int]] = {}
+        if not text or not self.terms:
+            return matches
+
+        if self.engine == 'aho_corasick':
+            for end, term in self._automaton.iter(text):
+                start = end - len(term) + 1
+                self._add_match(matches, text, term, start, end + 1)
+        else:
+            for word in _WORD_PATTERN.finditer(text):
+                candidates = self._by_first_word.get(word.group())
+                if candidates:
+                    start = word.start()
+                    for term in candidates:
+                        if text.startswith(term, start):
+                            self._add_match(matches, text, term, start, start + len(term))
+            for term in self._other_terms:
+                start = text.find(term)
+                while start != -1:
+                    self._add_match(matches, text, term, start, start + len(term))
+                    start = text.find(term, start + 1)
+
+        return dict(sorted(matches.items(), key=lambda item: item[1]['first_offset']))
+
+    @staticmethod
+    def _add_match(matches: Dict[str, Dict[str, int]], text: str, term: str, start: int, end: int):
+        """Record a match if it sits on word boundaries"""
+        if _is_word_char(term[0]) and start > 0 and _is_word_char(text[start - 1]):
+            return
+        if _is_word_char(term[-1]) and end < len(text) and _is_word_char(text[end]):
+            return
+        match = matches.get(term)
+        if match is None:
+            matches[term] = {'count': 1, 'first_offset': start}
+        else:
+            match['count'] += 1
+            match['first_offset'] = min(match['first_offset'], start)
+
+
+class LegalKeywordEngine:
+    """Keyword extraction for pipeline Stage 7"""
+
+    LEGAL_KEYWORDS = [
+        'summary judgment', 'motion to dismiss', 'claim construction',
+        'patent infringement', 'preliminary injunction', 'class action',
+        'jurisdiction', 'standing', 'damages', 'liability', 'negligence',
+        'breach of contract', 'due process', 'equal protection'
+    ]
+
+    # Search term -> reported legal standard
+    LEGAL_STANDARDS = {
+        'de novo': 'de novo review',
+        'abuse of discretion': 'abuse of discretion',
+        'clear error': 'clear error',
+        'arbitrary and capricious': 'arbitrary and capricious',
+        'rational basis': 'rational basis review',
+        'strict scrutiny': 'strict scrutiny'
+    }
+
+    # Search term -> reported procedural outcome
+    PROCEDURAL_TERMS = {
+        'granted': 'motion granted',
+        'denied': 'motion denied',
+        'reversed': 'reversed',
+        'affirmed': 'affirmed',
+        'remanded': 'remanded',
+        'dismissed': 'dismissed',
+        'sustained': 'objection sustained',
+        'overruled': 'objection overruled'
+    }
+
+    _LEGAL_KEYWORD_SET = frozenset(LEGAL_KEYWORDS)
+
+    def __init__(self, dictionary_terms: Optional[Iterable[str]] = None):
+        """
+        Args:
+            dictionary_terms: Domain vocabulary; defaults to legal_dictionary.txt
+        """
+        if dictionary_terms is None:
+            dictionary_terms = load_dictionary() if os.path.exists(DEFAULT_DICTIONARY_PATH) else []
+        self.dictionary_terms = {normalize_term(term) for term in dictionary_terms if term.strip()}
+        # Identifies the vocabulary; part of the Stage 7 input hash, so stored
+        # outputs are recomputed when the dictionary file changes
+        self.fingerprint = hashlib.sha256('\n'.join(sorted(self.dictionary_terms)).encode()).hexdigest()
+        self.matcher = KeywordMatcher(
+            list(self.LEGAL_KEYWORDS) + list(self.LEGAL_STANDARDS) +
+            list(self.PROCEDURAL_TERMS) + list(self.dictionary_terms)
+        )
+
+    def extract(self, content_lower: str) -> Dict[str, Any]:
+        """
+        Extract keywords from lowercased document text
+
+        Returns:
+            keywords, legal_terms and procedural_terms from the built-in
+            lists, dictionary_terms from the vocabulary (most frequent first),
+            and matches with count and first offset for every matched term
+        """
+        matches = self.matcher.find(content_lower)
+        return {
+            'keywords': [term for term in matches if term in self._LEGAL_KEYWORD_SET],
+            'legal_terms': [self.LEGAL_STANDARDS[term] for term in matches if term in self.LEGAL_STANDARDS],
+            'procedural_terms': [self.PROCEDURAL_TERMS[term] for term in matches if term in self.PROCEDURAL_TERMS],
+            'dictionary_terms': sorted(
+                (term for term in matches if term in self.dictionary_terms),
+                key=lambda term: -matches[term]['count']
+            ),
+            'matches': matches
+        }
+
+
+_default_engine: Optional[LegalKeywordEngine] = None
+
+
+def get_keyword_engine() -> LegalKeywordEngine:
+    """Shared engine with the bundled dictionary, built on first use"""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = LegalKeywordEngine()
+    return _default_engine
@@ -0,0 +1,47 @@
+-- One-off migration: collapse court_documents rows stored twice for the same
+-- CourtListener record, so that schema.sql can create the partial unique
+-- indexes on metadata->>'opinion_id' and metadata->>'docket_id'.
+--
+-- Before this, `collect` matched rows by case_number and `collect sync` by
+-- CourtListener id, so one opinion or docket could end up in several rows.
+-- The most recently updated row is kept; the others are copied to
+-- court_data.court_documents_dedupe_backup before they are deleted.
+--
+-- Run once, before applying schema.sql to an existing database:
+--   psql "$DATABASE_URL" -f migrations/001_dedupe_courtlistener_ids.sql
+
+BEGIN;
+
+CREATE SCHEMA IF NOT EXISTS court_data;
+
+CREATE TABLE IF NOT EXISTS court_data.court_documents_dedupe_backup
+    (LIKE public.court_documents INCLUDING DEFAULTS);
+
+CREATE TEMPORARY TABLE court_documents_superseded ON COMMIT DROP AS
+SELECT older.id
+FROM public.court_documents older
+JOIN public.court_documents newer
+  ON older.document_type = newer.document_type
+ AND older.metadata->>(CASE older.document_type WHEN 'opinion' THEN 'opinion_id' ELSE 'docket_id' END)
+   = newer.metadata->>(CASE newer.document_type WHEN 'opinion' THEN 'opinion_id' ELSE 'docket_id' END)
+ AND (COALESCE(older.updated_at, older.created_at, '-infinity'), older.id)
+   < (COALESCE(newer.updated_at, newer.created_at, '-infinity'), newer.id)
+WHERE older.document_type IN ('opinion', 'recap_docket')
+GROUP BY older.id;
+
+INSERT INTO court_data.court_documents_dedupe_backup
+SELECT d.* FROM public.court_documents d
+WHERE d.id IN (SELECT id FROM court_documents_superseded);
+
+DELETE FROM public.court_documents
+WHERE id IN (SELECT id FROM court_documents_superseded);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_court_documents_opinion_id
+    ON public.court_documents ((metadata->>'opinion_id'))
+    WHERE document_type = 'opinion';
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_court_documents_docket_id
+    ON public.court_documents ((metadata->>'docket_id'))
+    WHERE document_type = 'recap_docket';
+
+COMMIT;
@@ -0,0 +1,191 @@
+"""
+Pipeline document model
+
+Wraps the raw document dict that flows through the pipeline so that derived
+views (parsed metadata, lowered and uppercased text) are computed
+once per document instead of once per stage. The wrapper behaves like the
+dict it wraps, so stages, validators and storage keep using get()/[]
+access, and to_dict() hands back the original dict at the output boundary.
+"""
+
+import json
+from collections.abc import MutableMapping
+from typing import Dict, Any, Optional, Iterator
+
+
+class PipelineDocument:
+    """Dict-like pipeline document with cached, parse-once views"""
+
+    __slots__ = ('_fields', '_metadata', '_metadata_error', '_content_lower',
+                 '_upper_heads')
+
+    # Fields whose derived views must be rebuilt when they are replaced
+    _VIEW_SOURCES = ('content', 'metadata')
+
+    def __init__(self, fields: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            fields: Raw document dict. It is wrapped, not copied, so stage
+                outputs written to the document land in this dict.
+        """
+        self._fields = fields if fields is not None else {}
+        self._reset_views()
+
+    @classmethod
+    def wrap(cls, document: Any) -> 'PipelineDocument':
+        """Return document itself if already wrapped, otherwise wrap the dict"""
+        if isinstance(document, cls):
+            return document
+        return cls(document)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The underlying document dict, in the pipeline's output shape"""
+        return self._fields
+
+    def _reset_views(self):
+        self._metadata = None
+        self._metadata_error = None
+        self._content_lower = None
+        self._upper_heads = None
+
+    # Dict interface
+
+    def __getitem__(self, key: str) -> Any:
+        return self._fields[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self._fields[key] = value
+        if key in self._VIEW_SOURCES:
+            self._reset_views()
+
+    def __delitem__(self, key: str):
+        del self._fields[key]
+        if key in self._VIEW_SOURCES:
+            self._reset_views()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PipelineDocument):
+            return self._fields == other._fields
+        return self._fields == other
+
+    def __repr__(self) -> str:
+        return f"PipelineDocument(id={self._fields.get('id')!r}, fields={list(self._fields)})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._fields.get(key, default)
+
+    def keys(self):
+        return self._fields.keys()
+
+    def items(self):
+        return self._fields.items()
+
+    def values(self):
+        return self._fields.values()
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        return self._fields.setdefault(key, default)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        value = self._fields.pop(key, *default)
+        if key in self._VIEW_SOURCES:
+            self._reset_views()
+        return value
+
+    def update(self, *args, **kwargs):
+        self._fields.update(*args, **kwargs)
+        self._reset_views()
+
+    def copy(self) -> 'PipelineDocument':
+        """Shallow copy that keeps the already computed views"""
+        duplicate = PipelineDocument(dict(self._fields))
+        duplicate._metadata = self._metadata
+        duplicate._metadata_error = self._metadata_error
+        duplicate._content_lower = self._content_lower
+        duplicate._upper_heads = dict(self._upper_heads) if self._upper_heads else None
+        return duplicate
+
+    # Pickling (process pool workers): ship the fields and parsed metadata,
+    # rebuild the text views on demand
+
+    def __getstate__(self):
+        return self._fields, self._metadata, self._metadata_error
+
+    def __setstate__(self, state):
+        self._fields = state[0]
+        self._reset_views()
+        self._metadata, self._metadata_error = state[1], state[2]
+
+    # Derived views
+
+    @property
+    def content(self) -> str:
+        """Document text ('' when missing)"""
+        return self._fields.get('content') or ''
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """
+        Metadata as a dict, parsed from JSON at most once
+
+        Unparseable or non-dict metadata yields {}; metadata_error says why.
+        """
+        if self._metadata is None:
+            raw = self._fields.get('metadata', {})
+            if isinstance(raw, dict):
+                self._metadata = raw
+            elif isinstance(raw, str):
+                try:
+                    parsed = json.loads(raw)
+                except json.JSONDecodeError:
+                    parsed = None
+                    self._metadata_error = 'invalid_json'
+                if isinstance(parsed, dict):
+                    self._metadata = parsed
+                else:
+                    if parsed is not None:
+                        self._metadata_error = f"unexpected_type:{type(parsed).__name__}"
+                    self._metadata = {}
+            else:
+                self._metadata_error = f"unexpected_type:{type(raw).__name__}"
+                self._metadata = {}
+        return self._metadata
+
+    @property
+    def metadata_error(self) -> Optional[str]:
+        """Why metadata could not be used: 'invalid_json', 'unexpected_type:<name>' or None"""
+        self.metadata  # parses on first access
+        return self._metadata_error
+
+    @property
+    def content_lower(self) -> str:
+        """Lowercased document text"""
+        if self._content_lower is None:
+            self._content_lower = self.content.lower()
+        return self._content_lower
+
+    def head(self, length: int) -> str:
+        """First length characters of the text"""
+        return self.content[:length]
+
+    def head_upper(self, length: int) -> str:
+        """First length characters of the text, uppercased"""
+        if self._upper_heads is None:
+            self._upper_heads = {}
+        head = self._upper_heads.get(length)
+        if head is None:
+            head = self._upper_heads[length] = self.content[:length].upper()
+        return head
+
+
+# Code that accepts any document (e.g. the stage profiler) tests for Mapping
+MutableMapping.register(PipelineDocument)
@@ -15,8 +15,11 @@ import logging
 import json
 import hashlib
 import re
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Executor
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterator
 # from enhancements.enhanced_storage_with_dockets import EnhancedStorageProcessor  # Archived
 import aiohttp
 import psycopg2
@@ -29,18 +32,31 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from services.database import get_db_connection
-from services.config import SERVICES
+from services.config import SERVICES, CITATION_TOKENIZER, STAGE_EXECUTOR, STAGE_EXECUTOR_WORKERS
+from services.storage import OpinionStorageService
+from services.stage_results import StageResultStore
+from services.citation_cache import CitationCache
+from services.run_checkpoints import RunCheckpointStore
 
 # Import FLP components
 from courts_db import find_court, courts
 from eyecite import get_citations
-from reporters_db import REPORTERS
 
 # Import our custom components
 from exceptions import *
 from validators import *
 from utils.reporter import ErrorCollector
+from utils.instrumentation import StageProfiler
+from utils.stage_scheduler import StageScheduler
+from utils.verification_table import VerificationTable, VerificationExport
+from pipeline_document import PipelineDocument
+from utils.reporter_index import lookup_reporter
 from extractors.judge import ComprehensiveJudgeExtractor as EnhancedJudgeExtractor  # Using renamed simple version
+from extractors.judge_index import JudgeIndex, get_judge_index, set_judge_index
+from extractors.court_resolver import get_court_resolver, COURT_SCAN_CHARS
+from extractors.keywords import get_keyword_engine
+from extractors.document_type import get_document_type_detector
+from extractors.citation_tokenizer import get_citation_tokenizer, resolve_tokenizer_name
 
 # Create courts dictionary for direct lookup
 COURTS_DICT = {court['id']: court for court in courts if isinstance(court, dict)}
@@ -53,8 +69,124 @@ logger = logging.getLogger(__name__)
 class RobustElevenStagePipeline:
     """Eleven stage document processing pipeline with robust error handling"""
     
-    def __init__(self):
-        """Initialize pipeline with error tracking"""
+    # Enhancement stages 2-8 in execution order:
+    # (stage number, banner title, error stage name, apply method, exception raised on failure)
+    ENHANCEMENT_STAGES = [
+        (2, 'Court Resolution Enhancement', 'Court Resolution', '_apply_court_resolution', CourtResolutionError),
+        (3, 'Citation Extraction and Analysis', 'Citation Extraction', '_apply_citation_extraction', CitationExtractionError),
+        (4, 'Reporter Normalization', 'Reporter Normalization', '_apply_reporter_normalization', ReporterNormalizationError),
+        (5, 'Judge Information Enhancement', 'Judge Enhancement', '_apply_judge_enhancement', JudgeEnhancementError),
+        (6, 'Document Structure Analysis', 'Document Structure Analysis', '_apply_structure_analysis', EnhancementError),
+        (7, 'Legal Keyword Extraction', 'Keyword Extraction', '_apply_keyword_extraction', EnhancementError),
+        (8, 'Comprehensive Metadata Assembly', 'Metadata Assembly', '_apply_metadata_assembly', EnhancementError),
+    ]
+    
+    # Document key each enhancement stage writes its output to
+    STAGE_OUTPUT_KEYS = {
+        2: 'court_enhancement',
+        3: 'citations_extracted',
+        4: 'reporters_normalized',
+        5: 'judge_enhancement',
+        6: 'structure_analysis',
+        7: 'keyword_extraction',
+        8: 'comprehensive_metadata',
+    }
+    
+    # Bump a stage's version whenever its logic or output changes; stored
+    # outputs from an older version are recomputed on the next run
+    STAGE_VERSIONS = {2: 2, 3: 3, 4: 3, 5: 2, 6: 1, 7: 2, 8: 1}
+    
+    # Earlier stages whose outputs each stage reads
+    STAGE_DEPENDENCIES = {
+        2: [],
+        3: [],
+        4: [3],
+        5: [],
+        6: [],
+        7: [],
+        8: [2, 3, 4, 5, 6, 7],
+    }
+    
+    # Stage methods timed by the profiler: (method name, stage name, document count mode)
+    PROFILED_STAGES = [
+        ('_validate_documents', 'Document Validation', 'batch'),
+        ('_detect_document_type', 'Document Type Detection', 'document'),
+        ('_enhance_court_info_validated', 'Court Resolution', 'document'),
+        ('_extract_citations_validated', 'Citation Extraction', 'document'),
+        ('_normalize_reporters_validated', 'Reporter Normalization', 'document'),
+        ('_enhance_judge_info_validated', 'Judge Enhancement', 'document'),
+        ('_analyze_structure', 'Document Structure Analysis', 'document'),
+        ('_extract_legal_keywords', 'Keyword Extraction', 'document'),
+        ('_assemble_metadata_validated', 'Metadata Assembly', 'document'),
+        ('_store_enhanced_documents_validated', 'Enhanced Storage', 'batch'),
+        ('_index_to_haystack_validated', 'Haystack Integration', 'batch'),
+        ('_accumulate_verification', 'Pipeline Verification', 'batch'),
+    ]
+    
+    def __init__(self, connect_db: bool = True, citation_tokenizer: Optional[str] = None,
+                 stage_executor: Optional[str] = None, judge_index: Optional[JudgeIndex] = None,
+                 persistent: bool = False):
+        """
+        Initialize pipeline with error tracking
+        
+        Args:
+            connect_db: Open a database connection. Process pool workers only run
+                the in-memory enhancement stages and skip it.
+            citation_tokenizer: eyecite tokenizer for Stage 3, 'default' or
+                'hyperscan' (defaults to CITATION_TOKENIZER)
+            stage_executor: How independent stages 2-8 of one document run:
+                'serial', 'thread' or 'process' (defaults to STAGE_EXECUTOR)
+            judge_index: Judge index for Stage 5 (defaults to the shared one,
+                built on first use). Pool workers get their parent's.
+            persistent: Keep the database connection and worker pools open
+                between process_batch calls, for long-running services that
+                reuse one pipeline; close() releases them. By default every
+                run closes them when it finishes.
+        """
+        self.citation_tokenizer = citation_tokenizer or CITATION_TOKENIZER
+        resolve_tokenizer_name(self.citation_tokenizer)  # Fail fast on an unknown name
+        
+        self.stage_executor = (stage_executor or STAGE_EXECUTOR).lower()
+        if self.stage_executor not in StageScheduler.EXECUTORS:
+            raise ConfigurationError(
+                f"Unknown stage executor: {self.stage_executor}",
+                details={'choices': list(StageScheduler.EXECUTORS)}
+            )
+        self.stage_scheduler = StageScheduler(self.STAGE_DEPENDENCIES)
+        self._stage_pool = None
+        self.persistent = persistent
+        
+        self.db_conn = None
+        if connect_db:
+            self._connect()
+        else:
+            self.storage = self.stage_results = self.checkpoints = None
+        self.citation_cache = CitationCache.from_config()
+        self.type_detector = get_document_type_detector()
+        self.judge_index = judge_index or get_judge_index(self.db_conn)
+        self.court_resolver = get_court_resolver()
+        
+        self.stats = self._new_stats()
+        # Stages on the thread executor count into self.stats concurrently
+        self._stats_lock = threading.Lock()
+        
+        self.error_collector = None
+        self.profiler = StageProfiler()
+        for method_name, stage_name, count in self.PROFILED_STAGES:
+            setattr(self, method_name, self.profiler.wrap(getattr(self, method_name), stage_name, count))
+        self._worker_pool = None
+        self._worker_pool_size = 0
+        
+        # Document type statistics
+        self.document_type_stats = {
+            'opinion': 0,
+            'docket': 0,
+            'order': 0,
+            'unknown': 0
+        }
+    
+    def _connect(self):
+        """Open the database connection and the stores that use it"""
         try:
             self.db_conn = get_db_connection()
         except Exception as e:
@@ -62,8 +194,20 @@ class RobustElevenStagePipeline:
                 f"Failed to connect to database: {str(e)}",
                 details={'connection_string': os.getenv('DATABASE_URL', 'Not set')}
             )
-        
-        self.stats = {
+        self.storage = OpinionStorageService(self.db_conn)
+        self.stage_results = StageResultStore(self.db_conn)
+        self.checkpoints = RunCheckpointStore(self.db_conn)
+    
+    def close(self):
+        """Close the database connection and shut down worker pools"""
+        self._shutdown_worker_pool()
+        if self.db_conn and not self.db_conn.closed:
+            self.db_conn.close()
+    
+    @staticmethod
+    def _new_stats() -> Dict[str, int]:
+        """Zeroed statistics counters for a pipeline run"""
+        return {
             'documents_processed': 0,
             'documents_validated': 0,
             'validation_failures': 0,
@@ -77,59 +221,23 @@ class RobustElevenStagePipeline:
             'keywords_extracted': 0,
             'documents_stored': 0,
             'documents_indexed': 0,
+            'stage_results_reused': 0,
+            'stage_results_computed': 0,
+            'citation_cache_hits': 0,
+            'citation_cache_misses': 0,
             'total_errors': 0,
             'total_warnings': 0
         }
-        
-        self.error_collector = None
-        
-        # Document type statistics
-        self.document_type_stats = {
-            'opinion': 0,
-            'docket': 0,
-            'order': 0,
-            'unknown': 0
-        }
     
     def _detect_document_type(self, document: Dict[str, Any]) -> str:
         """Detect document type based on metadata and case number patterns"""
-        metadata = document.get('metadata', {})
-        if isinstance(metadata, str):
-            try:
-                metadata = json.loads(metadata)
-            except:
-                metadata = {}
-        
-        # Check case number pattern for opinions
-        case_number = document.get('case_number', '')
-        if case_number.startswith('OPINION-'):
-            return 'opinion'
-        
-        # Check metadata type field
-        metadata_type = metadata.get('type', '')
-        if metadata_type:
-            # Common CourtListener opinion types
-            if any(op_type in str(metadata_type) for op_type in ['010combined', '020lead', '030concurrence', '040dissent']):
-                return 'opinion'
-        
-        # Check for opinion-specific fields
-        if any(key in metadata for key in ['cluster', 'author', 'author_str', 'opinions_cited', 'per_curiam']):
-            return 'opinion'
-        
-        # Check for docket-specific fields
-        if any(key in metadata for key in ['docket_id', 'cause', 'nature_of_suit']):
-            return 'docket'
-        
-        # Check for order patterns in content
-        content = document.get('content', '')[:500]
-        if 'IT IS HEREBY ORDERED' in content.upper():
-            return 'order'
-        
-        return 'unknown'
+        doc_type, _, _ = self.type_detector.detect_pipeline_type(document)
+        return doc_type
     
     async def process_documents_in_memory(self,
                                           documents: List[Dict[str, Any]],
-                                          validate_strict: bool = True) -> Dict[str, Any]:
+                                          validate_strict: bool = True,
+                                          workers: int = 1) -> Dict[str, Any]:
         """
         Process documents in memory through stages 2-11 (skips database fetch)
         
@@ -139,6 +247,7 @@ class RobustElevenStagePipeline:
         Args:
             documents: List of document dictionaries with 'content', 'metadata', etc.
             validate_strict: If True, skip documents with validation errors
+            workers: Number of worker processes for stages 2-8 (1 runs in-process)
             
         Returns:
             Enhanced documents with pipeline processing applied
@@ -146,6 +255,7 @@ class RobustElevenStagePipeline:
         start_time = datetime.now()
         run_id = f"run_memory_{start_time.isoformat()}"
         self.error_collector = ErrorCollector(run_id)
+        self.profiler.reset(run_id)
         stages_completed = []
         
         try:
@@ -168,103 +278,22 @@ class RobustElevenStagePipeline:
                     'errors': []
                 }
             
-            # Run stages 2-8 using the existing stage methods (matching actual pipeline stages)
-            # Stage 2: Court Resolution Enhancement
-            try:
-                logger.info("STAGE 2: Court Resolution Enhancement")
-                for doc in documents:
-                    court_info = self._enhance_court_info_validated(doc)
-                    doc['court_enhancement'] = court_info
-                    
-                    if court_info.get('resolved'):
-                        self.stats['courts_resolved'] = self.stats.get('courts_resolved', 0) + 1
-                    else:
-                        self.stats['courts_unresolved'] = self.stats.get('courts_unresolved', 0) + 1
-                        
-                stages_completed.append("Court Resolution Enhancement")
-            except Exception as e:
-                logger.error(f"Court resolution failed: {str(e)}")
-                self.error_collector.add_error(e, "Court Resolution")
-            
-            # Stage 3: Citation Extraction and Analysis
-            try:
-                logger.info("STAGE 3: Citation Extraction and Analysis")
-                for doc in documents:
-                    citations_data = self._extract_citations_validated(doc)
-                    doc['citations_extracted'] = citations_data
-                    self.stats['citations_extracted'] = self.stats.get('citations_extracted', 0) + citations_data.get('count', 0)
-                    self.stats['citations_validated'] = self.stats.get('citations_validated', 0) + citations_data.get('valid_count', 0)
-                stages_completed.append("Citation Extraction")
-            except Exception as e:
-                logger.error(f"Citation extraction failed: {str(e)}")
-                self.error_collector.add_error(e, "Citation Extraction")
-            
-            # Stage 4: Reporter Normalization
-            try:
-                logger.info("STAGE 4: Reporter Normalization")
-                for doc in documents:
-                    if doc.get('citations_extracted', {}).get('count', 0) > 0:
-                        reporters_data = self._normalize_reporters_validated(
-                            doc['citations_extracted']['citations']
-                        )
-                        doc['reporters_normalized'] = reporters_data
-                        self.stats['reporters_normalized'] = self.stats.get('reporters_normalized', 0) + reporters_data.get('normalized_count', 0)
-                    else:
-                        doc['reporters_normalized'] = {'count': 0, 'normalized_reporters': []}
-                stages_completed.append("Reporter Normalization")
-            except Exception as e:
-                logger.error(f"Reporter normalization failed: {str(e)}")
-                self.error_collector.add_error(e, "Reporter Normalization")
-            
-            # Stage 5: Judge Information Enhancement
-            try:
-                logger.info("STAGE 5: Judge Information Enhancement")
-                for doc in documents:
-                    judge_info = self._enhance_judge_info_validated(doc)
-                    doc['judge_enhancement'] = judge_info
-                    
-                    if judge_info.get('enhanced'):
-                        self.stats['judges_enhanced'] = self.stats.get('judges_enhanced', 0) + 1
-                    if judge_info.get('extracted_from_content'):
-                        self.stats['judges_extracted_from_content'] = self.stats.get('judges_extracted_from_content', 0) + 1
-                stages_completed.append("Judge Enhancement")
-            except Exception as e:
-                logger.error(f"Judge enhancement failed: {str(e)}")
-                self.error_collector.add_error(e, "Judge Enhancement")
-            
-            # Stage 6: Document Structure Analysis
-            try:
-                logger.info("STAGE 6: Document Structure Analysis")
-                for doc in documents:
-                    structure = self._analyze_structure(doc)
-                    doc['structure_analysis'] = structure
-                stages_completed.append("Document Structure Analysis")
-            except Exception as e:
-                logger.error(f"Structure analysis failed: {str(e)}")
-                self.error_collector.add_error(e, "Document Structure Analysis")
-            
-            # Stage 7: Legal Keyword Extraction
-            try:
-                logger.info("STAGE 7: Legal Keyword Extraction")
-                for doc in documents:
-                    keyword_extraction = self._extract_legal_keywords(doc)
-                    doc['keyword_extraction'] = keyword_extraction
-                    self.stats['keywords_extracted'] = self.stats.get('keywords_extracted', 0) + len(keyword_extraction.get('keywords', []))
-                stages_completed.append("Keyword Extraction")
-            except Exception as e:
-                logger.error(f"Keyword extraction failed: {str(e)}")
-                self.error_collector.add_error(e, "Keyword Extraction")
-            
-            # Stage 8: Comprehensive Metadata Assembly
-            try:
-                logger.info("STAGE 8: Comprehensive Metadata Assembly")
-                for doc in documents:
-                    metadata = self._assemble_metadata_validated(doc)
-                    doc['comprehensive_metadata'] = metadata
-                stages_completed.append("Metadata Assembly")
-            except Exception as e:
-                logger.error(f"Metadata assembly failed: {str(e)}")
-                self.error_collector.add_error(e, "Metadata Assembly")
+            # Run stages 2-8 per document; a failing stage is recorded and the
+            # remaining stages still run, so every input document is returned
+            enhanced_documents = await self._enhance_documents(
+                [PipelineDocument.wrap(doc) for doc in documents],
+                workers=workers, tolerate_stage_errors=True
+            )
+            documents = [doc.to_dict() for doc in enhanced_documents]
+            stages_completed.extend([
+                "Court Resolution Enhancement",
+                "Citation Extraction",
+                "Reporter Normalization",
+                "Judge Enhancement",
+                "Document Structure Analysis",
+                "Keyword Extraction",
+                "Metadata Assembly"
+            ])
             
             # Return enhanced documents
             processing_time = (datetime.now() - start_time).total_seconds()
@@ -274,6 +303,7 @@ class RobustElevenStagePipeline:
                 'statistics': self.stats,
                 'stages_completed': stages_completed,
                 'processing_time': processing_time,
+                'stage_timings': self.profiler.summary(),
                 'errors': self.error_collector.errors if self.error_collector else []
             }
             
@@ -285,6 +315,9 @@ class RobustElevenStagePipeline:
                 'stages_completed': stages_completed,
                 'errors': [str(e)]
             }
+        finally:
+            if not self.persistent:
+                self._shutdown_worker_pool()
     
     async def process_batch(self, 
                           limit: int = 10,
@@ -292,7 +325,15 @@ class RobustElevenStagePipeline:
                           validate_strict: bool = True,
                           extract_pdfs: bool = True,
                           force_reprocess: bool = False,
-                          only_unprocessed: bool = False) -> Dict[str, Any]:
+                          only_unprocessed: bool = False,
+                          workers: int = 1,
+                          window_size: Optional[int] = None,
+                          storage_chunk_size: Optional[int] = None,
+                          incremental: bool = True,
+                          trace_path: Optional[str] = None,
+                          document_ids: Optional[List[Any]] = None,
+                          resume_run_id: Optional[str] = None,
+                          verification_export: Optional[str] = None) -> Dict[str, Any]:
         """
         Process a batch of documents through all 11 stages with full error handling
         
@@ -301,14 +342,53 @@ class RobustElevenStagePipeline:
             source_table: Table to fetch documents from
             validate_strict: If True, skip documents with validation errors
             extract_pdfs: If True, attempt to extract content from PDFs when missing
+            force_reprocess: If True, rewrite stored documents even when unchanged
+            workers: Number of worker processes for stages 2-8 (1 runs in-process)
+            window_size: Stream documents from a server-side cursor and run
+                stages 1-10 on this many at a time, keeping memory flat for
+                large batches, with a checkpoint after every window. None
+                fetches the whole batch at once and does not checkpoint.
+            storage_chunk_size: Documents per Stage 9 upsert and commit
+                (defaults to STORAGE_CHUNK_SIZE)
+            incremental: Reuse stored stage 2-8 outputs whose stage version and
+                input hash still match, and store freshly computed ones.
+                force_reprocess recomputes every stage but still stores them.
+            trace_path: Append a JSONL record for every timed stage call
+                to this file
+            document_ids: Process exactly these source rows (by id) instead
+                of the newest ones; limit and only_unprocessed are ignored.
+                Used by the `pipeline serve` daemon.
+            resume_run_id: Continue this earlier windowed run after the last
+                window it checkpointed. The run's own limit, source_table,
+                only_unprocessed, document_ids, window_size, validate_strict,
+                extract_pdfs, force_reprocess and incremental are used in
+                place of the arguments given here, and the result covers the
+                whole run.
+            verification_export: Stream the per-document Stage 11 rows to
+                this .parquet, .csv or .jsonl file, one window at a time
         
         Returns:
             Comprehensive results including errors and validation reports
         """
         start_time = datetime.now()
-        run_id = f"run_{start_time.isoformat()}"
+        run_id = resume_run_id or f"run_{start_time.isoformat()}"
         self.error_collector = ErrorCollector(run_id)
+        self.profiler.reset(run_id)
+        self.stats = self._new_stats()
+        self.document_type_stats = dict.fromkeys(self.document_type_stats, 0)
+        if self.persistent and self.db_conn is not None and self.db_conn.closed:
+            # A long-running service outlives dropped connections
+            self._connect()
         stages_completed = []
+        windows = None
+        export = None
+        checkpoint = None
+        checkpointing = False
+        
+        def complete(*stages):
+            for stage in stages:
+                if stage not in stages_completed:
+                    stages_completed.append(stage)
         
         try:
             # ==========================================
@@ -318,24 +398,198 @@ class RobustElevenStagePipeline:
             logger.info("STAGE 1: Document Retrieval")
             logger.info("=" * 60)
             
-            try:
-                documents = self._fetch_documents(limit, source_table, only_unprocessed)
+            if trace_path:
+                self.profiler.start_trace(trace_path)
+            
+            if verification_export:
+                VerificationTable.export_format(verification_export)  # Fail before the run, not after
+            
+            if resume_run_id:
+                checkpoint = self.checkpoints.load(resume_run_id)
+                if checkpoint is None:
+                    raise ValidationError(
+                        f"No checkpoint found for run {resume_run_id}",
+                        stage="Document Retrieval",
+                        details={'run_id': resume_run_id}
+                    )
+                parameters = checkpoint['parameters']
+                limit = parameters['limit']
+                source_table = parameters['source_table']
+                only_unprocessed = parameters['only_unprocessed']
+                document_ids = parameters['document_ids']
+                window_size = parameters['window_size']
+                validate_strict = parameters['validate_strict']
+                extract_pdfs = parameters['extract_pdfs']
+                force_reprocess = parameters['force_reprocess']
+                incremental = parameters['incremental']
+            else:
+                if document_ids is not None:
+                    limit = len(document_ids)
+                parameters = {
+                    'limit': limit,
+                    'source_table': source_table,
+                    'only_unprocessed': only_unprocessed,
+                    'document_ids': list(document_ids) if document_ids is not None else None,
+                    'window_size': window_size,
+                    'validate_strict': validate_strict,
+                    'extract_pdfs': extract_pdfs,
+                    'force_reprocess': force_reprocess,
+                    'incremental': incremental
+                }
+            
+            storage_results = {}
+            haystack_results = None
+            verification_table = VerificationTable()
+            window_index = 0
+            last_document = None
+            previous_seconds = 0.0
+            # Only windowed runs are resumable; a run that fetches its
+            # documents at once (including `pipeline serve` and `pipeline
+            # work` batches) leaves no checkpoint behind
+            checkpointing = bool(window_size) and self.checkpoints is not None
+            # Ids of the stored documents, reported for runs given document_ids
+            stored_document_ids = [] if document_ids is not None else None
+            if checkpoint is not None:
+                state = checkpoint['state']
+                self.stats.update(state['statistics'])
+                self.document_type_stats.update(state['document_type_statistics'])
+                self.error_collector = ErrorCollector.from_state(state['errors'])
+                stages_completed.extend(state['stages_completed'])
+                storage_results = state['storage_results']
+                haystack_results = state['haystack_results']
+                verification_table = VerificationTable.from_state(state['verification_table'])
+                previous_seconds = state['processing_time_seconds']
+                window_index = checkpoint['windows_completed']
+                last_document = checkpoint['last_document']
+                logger.info(f"Resuming run {run_id} after {self.stats['documents_processed']} documents "
+                            f"({window_index} windows)")
+            if checkpointing:
+                self._start_checkpoint(run_id, parameters, start_time, previous_seconds, stages_completed,
+                                       storage_results, haystack_results, verification_table)
+            if verification_export:
+                # A resumed run keeps the rows of the windows it checkpointed
+                export = VerificationExport(verification_export, keep_rows=len(verification_table))
+            
+            # Documents still to fetch, after the last one a resumed run saw
+            remaining = max(0, limit - self.stats['documents_processed'])
+            if window_size:
+                logger.info(f"Streaming up to {remaining} documents in windows of {window_size}")
+                windows = self._iter_document_windows(remaining, source_table, only_unprocessed, window_size,
+                                                      document_ids, after=last_document)
+            
+            if storage_chunk_size:
+                self.storage.chunk_size = storage_chunk_size
+            
+            while True:
+                try:
+                    with self.profiler.measure("Document Retrieval") as retrieval:
+                        if windows is not None:
+                            documents = next(windows, None)
+                        elif window_index == 0:
+                            documents = self._fetch_documents(remaining, source_table, only_unprocessed,
+                                                              document_ids, after=last_document)
+                        else:
+                            documents = None
+                        
+                        # Optional PDF extraction for documents missing content
+                        if documents and extract_pdfs:
+                            documents = await self._enrich_documents_with_pdfs(documents)
+                        retrieval['documents'] = len(documents or [])
+                    if not documents:
+                        break
+                    documents = [PipelineDocument.wrap(doc) for doc in documents]
+                    last_document = self._document_position(documents[-1])
+                    
+                    complete("Document Retrieval")
+                    start_index = self.stats['documents_processed']
+                    self.stats['documents_processed'] += len(documents)
+                    logger.info(f"✅ Retrieved {len(documents)} documents from {source_table}")
+                except Exception as e:
+                    raise DocumentRetrievalError(
+                        f"Failed to retrieve documents: {str(e)}",
+                        stage="Document Retrieval",
+                        details={'source_table': source_table, 'limit': limit}
+                    )
                 
-                # Optional PDF extraction for documents missing content
-                if extract_pdfs:
-                    documents = await self._enrich_documents_with_pdfs(documents)
+                valid_documents = self._validate_documents(documents, validate_strict)
+                del documents
+                self._detect_document_types(valid_documents)
                 
-                stages_completed.append("Document Retrieval")
-                self.stats['documents_processed'] = len(documents)
-                logger.info(f"✅ Retrieved {len(documents)} documents from {source_table}")
-            except Exception as e:
-                raise DocumentRetrievalError(
-                    f"Failed to retrieve documents: {str(e)}",
-                    stage="Document Retrieval",
-                    details={'source_table': source_table, 'limit': limit}
+                # Process each document through remaining stages; documents that
+                # fail a stage are recorded in the error collector and dropped
+                enhanced_documents = [
+                    doc for doc in await self._enhance_documents(
+                        valid_documents, workers=workers,
+                        start_index=start_index, total=max(limit, start_index + len(valid_documents)),
+                        reuse_stage_results=incremental and not force_reprocess,
+                        store_stage_results=incremental
+                    )
+                    if doc is not None
+                ]
+                del valid_documents
+                
+                # Complete remaining stages with enhanced documents
+                complete(
+                    "Court Resolution",
+                    "Citation Extraction",
+                    "Reporter Normalization",
+                    "Judge Enhancement",
+                    "Document Structure",
+                    "Keyword Extraction",
+                    "Metadata Assembly"
                 )
-            
-            if not documents:
+                
+                # ==========================================
+                # STAGE 9: Enhanced Storage with Validation
+                # ==========================================
+                if window_index == 0:
+                    logger.info("\n" + "=" * 60)
+                    logger.info("STAGE 9: Enhanced Storage to PostgreSQL")
+                    logger.info("=" * 60)
+                
+                # Docket enhancement during storage is disabled (module archived)
+                window_storage = await self._store_enhanced_documents_validated(
+                    enhanced_documents, force_reprocess
+                )
+                if stored_document_ids is not None:
+                    stored_document_ids.extend(window_storage['stored_document_ids'])
+                self._accumulate_counts(storage_results, window_storage)
+                complete("Enhanced Storage")
+                self.stats['documents_stored'] = storage_results.get('total_processed', 0)
+                
+                # ==========================================
+                # STAGE 10: Haystack Integration
+                # ==========================================
+                if window_index == 0:
+                    logger.info("\n" + "=" * 60)
+                    logger.info("STAGE 10: Haystack Integration")
+                    logger.info("=" * 60)
+                
+                window_haystack = await self._index_to_haystack_validated(enhanced_documents)
+                if haystack_results is None:
+                    haystack_results = {}
+                self._accumulate_counts(haystack_results, window_haystack)
+                complete("Haystack Integration")
+                self.stats['documents_indexed'] = haystack_results.get('indexed_count', 0)
+                
+                # Fold the window into Stage 11 aggregates, then release it
+                self._accumulate_verification(verification_table, enhanced_documents, export)
+                del enhanced_documents
+                # The window's documents are finished; stop tracking their ids
+                self.error_collector.end_window()
+                window_index += 1
+                
+                # Everything up to last_document is stored and indexed
+                if checkpointing:
+                    self._save_checkpoint(run_id, last_document, window_index, start_time, previous_seconds,
+                                          stages_completed, storage_results, haystack_results,
+                                          verification_table)
+            
+            if stored_document_ids is not None:
+                storage_results['stored_document_ids'] = stored_document_ids
+            if self.stats['documents_processed'] == 0:
+                if checkpointing:
+                    self._finish_checkpoint(run_id, 'completed')
                 return {
                     'success': True,
                     'message': 'No documents found to process',
@@ -344,119 +598,6 @@ class RobustElevenStagePipeline:
                     'error_report': self.error_collector.get_summary()
                 }
             
-            # Validate retrieved documents
-            valid_documents = []
-            for doc in documents:
-                validation_result = DocumentValidator.validate_document(doc)
-                if validation_result.is_valid:
-                    valid_documents.append(doc)
-                    self.stats['documents_validated'] += 1
-                else:
-                    self.stats['validation_failures'] += 1
-                    self.error_collector.add_validation_failure(
-                        validation_result.to_dict(),
-                        stage="Document Validation",
-                        document_id=doc.get('id')
-                    )
-                    if validate_strict:
-                        logger.warning(f"Skipping document {doc.get('id')} due to validation errors")
-                        continue
-                    else:
-                        valid_documents.append(doc)
-                        
-                # Log warnings
-                for warning in validation_result.warnings:
-                    self.error_collector.add_warning(
-                        warning,
-                        stage="Document Validation",
-                        document_id=doc.get('id')
-                    )
-            
-            # Detect document types
-            logger.info("\nDetecting document types...")
-            for doc in valid_documents:
-                doc_type = self._detect_document_type(doc)
-                doc['detected_type'] = doc_type
-                self.document_type_stats[doc_type] += 1
-            
-            # Log document type distribution
-            logger.info("Document type distribution:")
-            for doc_type, count in self.document_type_stats.items():
-                if count > 0:
-                    logger.info(f"  {doc_type}: {count} documents")
-            
-            # Process each document through remaining stages
-            enhanced_documents = []
-            
-            for idx, doc in enumerate(valid_documents):
-                doc_id = doc.get('id', f'unknown_{idx}')
-                doc_type = doc.get('detected_type', 'unknown')
-                logger.info(f"\nProcessing {doc_type} document {idx + 1}/{len(valid_documents)}: {doc_id}")
-                
-                try:
-                    # Process through each enhancement stage
-                    enhanced_doc = await self._process_single_document(doc, idx)
-                    enhanced_documents.append(enhanced_doc)
-                except PipelineError as e:
-                    # Pipeline errors are expected and handled
-                    self.error_collector.add_error(e, e.stage or "Unknown", doc_id)
-                    self.stats['total_errors'] += 1
-                    logger.error(f"Pipeline error for document {doc_id}: {e}")
-                    # Continue with next document
-                    continue
-                except Exception as e:
-                    # Unexpected errors
-                    self.error_collector.add_error(
-                        e, "Document Processing", doc_id,
-                        context={'unexpected': True}
-                    )
-                    self.stats['total_errors'] += 1
-                    logger.error(f"Unexpected error for document {doc_id}: {e}", exc_info=True)
-                    continue
-            
-            # Complete remaining stages with enhanced documents
-            stages_completed.extend([
-                "Court Resolution",
-                "Citation Extraction",
-                "Reporter Normalization",
-                "Judge Enhancement",
-                "Document Structure",
-                "Keyword Extraction",
-                "Metadata Assembly"
-            ])
-            
-            # ==========================================
-            # STAGE 9: Enhanced Storage with Validation
-            # ==========================================
-            logger.info("\n" + "=" * 60)
-            logger.info("STAGE 9: Enhanced Storage to PostgreSQL")
-            logger.info("=" * 60)
-            
-            # Enhanced storage with docket fetching - DISABLED (module archived)
-            # storage_processor = EnhancedStorageProcessor(self.db_conn)
-            # storage_results = await storage_processor.store_with_docket_enhancement(enhanced_documents, force_reprocess)
-            storage_results = {'stored': len(enhanced_documents), 'docket_stats': {}}  # Simple storage for now
-            
-            # Log docket stats
-            docket_stats = storage_results.get('docket_stats', {})
-            if docket_stats.get('dockets_fetched', 0) > 0:
-                logger.info(f"✅ Fetched {docket_stats['dockets_fetched']} dockets")
-                logger.info(f"✅ Found {docket_stats['judges_from_dockets']} judges from dockets")
-                logger.info(f"✅ Updated {docket_stats['judges_updated']} judge records")
-            stages_completed.append("Enhanced Storage")
-            self.stats['documents_stored'] = storage_results.get('total_processed', 0)
-            
-            # ==========================================
-            # STAGE 10: Haystack Integration
-            # ==========================================
-            logger.info("\n" + "=" * 60)
-            logger.info("STAGE 10: Haystack Integration")
-            logger.info("=" * 60)
-            
-            haystack_results = await self._index_to_haystack_validated(enhanced_documents)
-            stages_completed.append("Haystack Integration")
-            self.stats['documents_indexed'] = haystack_results.get('indexed_count', 0)
-            
             # ==========================================
             # STAGE 11: Pipeline Verification
             # ==========================================
@@ -464,26 +605,34 @@ class RobustElevenStagePipeline:
             logger.info("STAGE 11: Pipeline Verification")
             logger.info("=" * 60)
             
-            verification = self._verify_pipeline_results_validated(enhanced_documents)
-            stages_completed.append("Pipeline Verification")
+            verification = self._finalize_verification(verification_table)
+            if export is not None:
+                export.close()
+                logger.info(f"Verification table written to {verification_export}")
+            complete("Pipeline Verification")
             
             # Calculate final metrics
             end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds()
+            processing_time = previous_seconds + (end_time - start_time).total_seconds()
             
             # Log error summary
             self.error_collector.log_summary(logger)
+            if checkpointing:
+                self._finish_checkpoint(run_id, 'completed')
             
             return {
                 'success': True,
                 'run_id': run_id,
+                'resumed': checkpoint is not None,
                 'stages_completed': stages_completed,
                 'statistics': self.stats,
                 'document_type_statistics': self._get_type_statistics(),
                 'processing_time_seconds': processing_time,
+                'stage_timings': self.profiler.summary(),
                 'verification': verification,
+                'verification_export': verification_export,
                 'storage_results': storage_results,
-                'haystack_results': haystack_results,
+                'haystack_results': haystack_results or {},
                 'error_report': self.error_collector.get_detailed_report(),
                 'quality_metrics': self._calculate_quality_metrics()
             }
@@ -492,9 +641,12 @@ class RobustElevenStagePipeline:
             # Known pipeline errors
             self.error_collector.add_error(e, e.stage or "Pipeline", None)
             logger.error(f"Pipeline failed: {e}")
+            if checkpointing:
+                self._finish_checkpoint(run_id, 'failed', str(e))
             return {
                 'success': False,
                 'run_id': run_id,
+                'resumable': checkpointing,
                 'error': str(e),
                 'error_type': type(e).__name__,
                 'stages_completed': stages_completed,
@@ -505,9 +657,12 @@ class RobustElevenStagePipeline:
             # Unexpected errors
             self.error_collector.add_error(e, "Pipeline", None, {'unexpected': True})
             logger.error(f"Unexpected pipeline error: {e}", exc_info=True)
+            if checkpointing:
+                self._finish_checkpoint(run_id, 'failed', str(e))
             return {
                 'success': False,
                 'run_id': run_id,
+                'resumable': checkpointing,
                 'error': str(e),
                 'error_type': type(e).__name__,
                 'stages_completed': stages_completed,
@@ -515,175 +670,591 @@ class RobustElevenStagePipeline:
                 'error_report': self.error_collector.get_detailed_report()
             }
         finally:
-            if self.db_conn:
-                self.db_conn.close()
+            self.profiler.stop_trace()
+            self.error_collector.close()
+            if windows is not None:
+                windows.close()
+            if export is not None:
+                export.close()
+            if not self.persistent:
+                self.close()
+            elif self.db_conn and not self.db_conn.closed:
+                self.db_conn.rollback()  # Leave no failed transaction to the next run
     
-    async def _process_single_document(self, doc: Dict[str, Any], idx: int) -> Dict[str, Any]:
-        """Process a single document through enhancement stages"""
-        doc_id = doc.get('id')
+    def _validate_documents(self, documents: List[Dict[str, Any]],
+                            validate_strict: bool = True) -> List[Dict[str, Any]]:
+        """Validate retrieved documents, recording failures and warnings"""
+        valid_documents = []
+        for doc in documents:
+            validation_result = DocumentValidator.validate_document(doc)
+            if validation_result.is_valid:
+                valid_documents.append(doc)
+                self.stats['documents_validated'] += 1
+            else:
+                self.stats['validation_failures'] += 1
+                self.error_collector.add_validation_failure(
+                    validation_result.to_dict(),
+                    stage="Document Validation",
+                    document_id=doc.get('id')
+                )
+                if validate_strict:
+                    logger.warning(f"Skipping document {doc.get('id')} due to validation errors")
+                    continue
+                else:
+                    valid_documents.append(doc)
+                    
+            # Log warnings
+            for warning in validation_result.warnings:
+                self.error_collector.add_warning(
+                    warning,
+                    stage="Document Validation",
+                    document_id=doc.get('id')
+                )
+        return valid_documents
+    
+    def _detect_document_types(self, documents: List[Dict[str, Any]]):
+        """Tag each document with its detected type and update type statistics"""
+        logger.info("\nDetecting document types...")
+        for doc in documents:
+            doc_type = self._detect_document_type(doc)
+            doc['detected_type'] = doc_type
+            self.document_type_stats[doc_type] += 1
         
-        # ==========================================
-        # STAGE 2: Court Resolution Enhancement
-        # ==========================================
-        if idx == 0:
-            logger.info("\n" + "=" * 60)
-            logger.info("STAGE 2: Court Resolution Enhancement")
-            logger.info("=" * 60)
+        # Log document type distribution
+        logger.info("Document type distribution:")
+        for doc_type, count in self.document_type_stats.items():
+            if count > 0:
+                logger.info(f"  {doc_type}: {count} documents")
+    
+    @staticmethod
+    def _accumulate_counts(totals: Dict[str, Any], window_result: Dict[str, Any]):
+        """
+        Fold one window's Stage 9/10 result into the run totals
         
-        try:
-            court_info = self._enhance_court_info_validated(doc)
-            doc['court_enhancement'] = court_info
-            
-            if court_info.get('resolved'):
-                self.stats['courts_resolved'] += 1
+        Numbers are summed and other scalars replaced. Lists (stored ids,
+        error messages) are left out so the totals stay the same size
+        however many windows a run has; errors are in the error report.
+        """
+        for key, value in window_result.items():
+            if isinstance(value, list):
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float, dict)):
+                totals[key] = value
+            elif isinstance(value, dict):
+                RobustElevenStagePipeline._accumulate_counts(totals.setdefault(key, {}), value)
             else:
-                self.stats['courts_unresolved'] += 1
-                
-        except Exception as e:
-            raise CourtResolutionError(
-                f"Court resolution failed: {str(e)}",
-                stage="Court Resolution",
-                document_id=doc_id
-            )
-        
-        # ==========================================
-        # STAGE 3: Citation Extraction and Analysis
-        # ==========================================
-        if idx == 0:
-            logger.info("\n" + "=" * 60)
-            logger.info("STAGE 3: Citation Extraction and Analysis")
-            logger.info("=" * 60)
+                totals[key] = totals.get(key, 0) + value
+    
+    @staticmethod
+    def _document_position(doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Where a document sits in the Stage 1 ordering, for resuming after it"""
+        created_at = doc.get('created_at')
+        return {
+            'id': doc.get('id'),
+            'created_at': created_at.isoformat() if isinstance(created_at, datetime) else created_at
+        }
+    
+    def _checkpoint_state(self, start_time: datetime, previous_seconds: float,
+                          stages_completed: List[str], storage_results: Dict[str, Any],
+                          haystack_results: Optional[Dict[str, Any]],
+                          verification_table: VerificationTable) -> Dict[str, Any]:
+        """
+        Run totals stored with each checkpoint
         
+        Only counts and other aggregates, so a checkpoint stays the same
+        size however far the run has got.
+        """
+        return {
+            'statistics': self.stats,
+            'document_type_statistics': self.document_type_stats,
+            'stages_completed': stages_completed,
+            'storage_results': storage_results,
+            'haystack_results': haystack_results,
+            'verification_table': verification_table.to_state(),
+            'errors': self.error_collector.to_state(records=False),
+            'processing_time_seconds': previous_seconds + (datetime.now() - start_time).total_seconds()
+        }
+    
+    def _start_checkpoint(self, run_id: str, parameters: Dict[str, Any],
+                          start_time: datetime, previous_seconds: float, *results):
+        """Register the run (or another attempt at it) in the checkpoint table"""
         try:
-            citations_data = self._extract_citations_validated(doc)
-            doc['citations_extracted'] = citations_data
-            self.stats['citations_extracted'] += citations_data.get('count', 0)
-            self.stats['citations_validated'] += citations_data.get('valid_count', 0)
-        except Exception as e:
-            raise CitationExtractionError(
-                f"Citation extraction failed: {str(e)}",
-                stage="Citation Extraction",
-                document_id=doc_id
-            )
+            self.checkpoints.start(run_id, parameters,
+                                   self._checkpoint_state(start_time, previous_seconds, *results))
+        except psycopg2.Error as e:
+            # Checkpoints only make the run resumable; it can go ahead without them
+            self.db_conn.rollback()
+            logger.warning(f"Could not record checkpoint for run {run_id}: {e}")
+    
+    def _save_checkpoint(self, run_id: str, last_document: Dict[str, Any], windows_completed: int,
+                         start_time: datetime, previous_seconds: float, *results):
+        """Record that every document up to last_document is stored and indexed"""
+        try:
+            self.checkpoints.save(run_id, last_document, windows_completed,
+                                  self._checkpoint_state(start_time, previous_seconds, *results))
+        except psycopg2.Error as e:
+            self.db_conn.rollback()
+            logger.warning(f"Could not save checkpoint for run {run_id}: {e}")
+    
+    def _finish_checkpoint(self, run_id: str, status: str, error: Optional[str] = None):
+        if self.checkpoints is None or self.db_conn is None or self.db_conn.closed:
+            return
+        try:
+            self.db_conn.rollback()  # Leave any failed transaction behind
+            self.checkpoints.finish(run_id, status, error)
+            if status == 'completed':
+                self.checkpoints.purge()
+        except psycopg2.Error as e:
+            logger.warning(f"Could not mark run {run_id} {status}: {e}")
+    
+    def _enhance_document(self, doc: Dict[str, Any], idx: int, total: int,
+                          tolerate_stage_errors: bool = False,
+                          cached_outputs: Optional[Dict[int, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Run one document through stages 2-8, recording failures in the error collector
         
-        # ==========================================
-        # STAGE 4: Reporter Normalization
-        # ==========================================
-        if idx == 0:
-            logger.info("\n" + "=" * 60)
-            logger.info("STAGE 4: Reporter Normalization")
-            logger.info("=" * 60)
+        Returns the enhanced document, or None when a stage failed and
+        tolerate_stage_errors is False. Stages found in cached_outputs are
+        not recomputed.
+        """
+        doc_id = doc.get('id', f'unknown_{idx}')
+        doc_type = doc.get('detected_type', 'unknown')
+        logger.info(f"\nProcessing {doc_type} document {idx + 1}/{total}: {doc_id}")
         
         try:
-            if doc['citations_extracted']['count'] > 0:
-                reporters_data = self._normalize_reporters_validated(
-                    doc['citations_extracted']['citations']
-                )
-                doc['reporters_normalized'] = reporters_data
-                self.stats['reporters_normalized'] += reporters_data.get('normalized_count', 0)
-            else:
-                doc['reporters_normalized'] = {'count': 0, 'normalized_reporters': []}
+            return self._run_enhancement_stages(doc, idx, tolerate_stage_errors, cached_outputs)
+        except PipelineError as e:
+            # Pipeline errors are expected and handled
+            self.error_collector.add_error(e, e.stage or "Unknown", doc_id)
+            self.stats['total_errors'] += 1
+            logger.error(f"Pipeline error for document {doc_id}: {e}")
         except Exception as e:
-            raise ReporterNormalizationError(
-                f"Reporter normalization failed: {str(e)}",
-                stage="Reporter Normalization",
-                document_id=doc_id
+            # Unexpected errors
+            self.error_collector.add_error(
+                e, "Document Processing", doc_id,
+                context={'unexpected': True}
             )
+            self.stats['total_errors'] += 1
+            logger.error(f"Unexpected error for document {doc_id}: {e}", exc_info=True)
+        return None
+    
+    def _run_enhancement_stages(self, doc: Dict[str, Any], idx: int,
+                                tolerate_stage_errors: bool = False,
+                                cached_outputs: Optional[Dict[int, Any]] = None) -> Dict[str, Any]:
+        """
+        Process a single document through enhancement stages 2-8
+        
+        Stages run through the stage scheduler, which starts each stage once
+        the stages in STAGE_DEPENDENCIES have finished; with a thread or
+        process stage executor independent stages run concurrently. The
+        document ends up with the same keys, in the same order, as a serial
+        run.
+        
+        A failing stage raises its stage-specific PipelineError, unless
+        tolerate_stage_errors is set, in which case the failure is recorded
+        and the remaining stages still run. Outputs in cached_outputs (keyed
+        by stage number) are placed on the document instead of recomputed.
+        """
+        doc_id = doc.get('id')
+        cached_outputs = cached_outputs or {}
+        stages = {stage[0]: stage for stage in self.ENHANCEMENT_STAGES}
+        executor = self._get_stage_pool()
+        
+        for stage_number in self.stage_scheduler.order:
+            if stage_number in cached_outputs:
+                doc[self.STAGE_OUTPUT_KEYS[stage_number]] = cached_outputs[stage_number]
+                self._update_stage_stats(stage_number, cached_outputs[stage_number])
+        
+        def prepare(stage_number):
+            _, title, _, apply_method, _ = stages[stage_number]
+            if idx == 0:
+                logger.info("\n" + "=" * 60)
+                logger.info(f"STAGE {stage_number}: {title}")
+                logger.info("=" * 60)
+            output_key = self.STAGE_OUTPUT_KEYS[stage_number]
+            if self.stage_executor == 'process':
+                return _run_stage_in_worker, apply_method, output_key, doc, self.error_collector.run_id
+            if self.stage_executor == 'thread':
+                # Each thread writes its output to its own shallow copy;
+                # on_result puts it on the document from this thread
+                return self._run_stage, apply_method, output_key, doc.copy()
+            return self._run_stage, apply_method, output_key, doc
+        
+        def on_result(stage_number, result):
+            if self.stage_executor == 'process':
+                result, worker_stats, worker_errors, worker_timings = result
+                self._merge_stats(worker_stats)
+                self.error_collector.merge(worker_errors)
+                self.profiler.replay(worker_timings, document_id=doc_id)
+            doc[self.STAGE_OUTPUT_KEYS[stage_number]] = result
+            self._update_stage_stats(stage_number, result)
+        
+        errors = self.stage_scheduler.run(
+            [number for number in stages if number not in cached_outputs],
+            prepare, on_result,
+            executor=executor,
+            stop_on_error=not tolerate_stage_errors
+        )
         
-        # ==========================================
-        # STAGE 5: Judge Information Enhancement
-        # ==========================================
-        if idx == 0:
-            logger.info("\n" + "=" * 60)
-            logger.info("STAGE 5: Judge Information Enhancement")
-            logger.info("=" * 60)
-        
-        try:
-            judge_info = self._enhance_judge_info_validated(doc)
-            doc['judge_enhancement'] = judge_info
-            
-            if judge_info.get('enhanced'):
-                self.stats['judges_enhanced'] += 1
-            if judge_info.get('extracted_from_content'):
-                self.stats['judges_extracted_from_content'] += 1
-        except Exception as e:
-            raise JudgeEnhancementError(
-                f"Judge enhancement failed: {str(e)}",
-                stage="Judge Enhancement",
+        if executor is not None:
+            # Outputs arrive in completion order; restore stage order
+            for stage_number in self.stage_scheduler.order:
+                output_key = self.STAGE_OUTPUT_KEYS[stage_number]
+                if output_key in doc:
+                    doc[output_key] = doc.pop(output_key)
+        
+        for stage_number, e in errors.items():
+            _, _, stage_name, _, error_class = stages[stage_number]
+            if tolerate_stage_errors:
+                logger.error(f"{stage_name} failed for document {doc_id}: {str(e)}")
+                self.error_collector.add_error(e, stage_name, doc_id)
+                continue
+            if isinstance(e, PipelineError):
+                raise e
+            raise error_class(
+                f"{stage_name} failed: {str(e)}",
+                stage=stage_name,
                 document_id=doc_id
+            ) from e
+        
+        return doc
+    
+    def _run_stage(self, apply_method: str, output_key: str, doc: Dict[str, Any]) -> Any:
+        """Apply one enhancement stage to the document and return its output"""
+        getattr(self, apply_method)(doc)
+        return doc[output_key]
+    
+    def _apply_court_resolution(self, doc: Dict[str, Any]):
+        """Stage 2: store court resolution on the document"""
+        doc['court_enhancement'] = self._enhance_court_info_validated(doc)
+    
+    def _apply_citation_extraction(self, doc: Dict[str, Any]):
+        """Stage 3: store extracted citations on the document"""
+        doc['citations_extracted'] = self._extract_citations_validated(doc)
+    
+    def _apply_reporter_normalization(self, doc: Dict[str, Any]):
+        """Stage 4: store normalized reporters on the document"""
+        if doc.get('citations_extracted', {}).get('count', 0) > 0:
+            doc['reporters_normalized'] = self._normalize_reporters_validated(
+                doc['citations_extracted']['citations'], document_id=doc.get('id')
             )
+        else:
+            doc['reporters_normalized'] = {'count': 0, 'normalized_reporters': []}
+    
+    def _apply_judge_enhancement(self, doc: Dict[str, Any]):
+        """Stage 5: store judge information on the document"""
+        doc['judge_enhancement'] = self._enhance_judge_info_validated(doc)
+    
+    def _apply_structure_analysis(self, doc: Dict[str, Any]):
+        """Stage 6: store document structure on the document"""
+        doc['structure_analysis'] = self._analyze_structure(doc)
+    
+    def _apply_keyword_extraction(self, doc: Dict[str, Any]):
+        """Stage 7: store legal keywords on the document"""
+        doc['keyword_extraction'] = self._extract_legal_keywords(doc)
+    
+    def _apply_metadata_assembly(self, doc: Dict[str, Any]):
+        """Stage 8: store comprehensive metadata on the document"""
+        doc['comprehensive_metadata'] = self._assemble_metadata_validated(doc)
+    
+    def _update_stage_stats(self, stage_number: int, output: Dict[str, Any]):
+        """Count a stage's output, computed or reused, in the run statistics"""
+        with self._stats_lock:
+            if stage_number == 2:
+                if output.get('resolved'):
+                    self.stats['courts_resolved'] += 1
+                else:
+                    self.stats['courts_unresolved'] += 1
+            elif stage_number == 3:
+                self.stats['citations_extracted'] += output.get('count', 0)
+                self.stats['citations_validated'] += output.get('valid_count', 0)
+            elif stage_number == 4:
+                self.stats['reporters_normalized'] += output.get('normalized_count', 0)
+            elif stage_number == 5:
+                if output.get('enhanced'):
+                    self.stats['judges_enhanced'] += 1
+                if output.get('extracted_from_content'):
+                    self.stats['judges_extracted_from_content'] += 1
+            elif stage_number == 7:
+                self.stats['keywords_extracted'] += len(output.get('keywords', []))
+    
+    def _stage_input_hashes(self, doc: Dict[str, Any]) -> Dict[int, str]:
+        """
+        Input hash for each enhancement stage of a document
+        
+        Covers the document fields the stages read, the versions of the stage
+        and everything upstream of it, and fingerprints of the data those
+        stages read: the judges indexed for Stage 5 (roster, judge-pics and
+        stored names) and the keyword dictionary for Stage 7. Editing one
+        stage or its data only invalidates that stage and the stages that
+        consume its output.
+        """
+        document_hash = hashlib.sha256(json.dumps({
+            'content': doc.get('content'),
+            'metadata': doc.get('metadata'),
+            'case_number': doc.get('case_number'),
+            'document_type': doc.get('document_type'),
+            'detected_type': doc.get('detected_type'),
+        }, sort_keys=True, default=str).encode()).hexdigest()
+        
+        data = {
+            5: self.judge_index.fingerprint,
+            7: get_keyword_engine().fingerprint,
+        }
         
-        # ==========================================
-        # STAGE 6: Document Structure Analysis
-        # ==========================================
-        if idx == 0:
-            logger.info("\n" + "=" * 60)
-            logger.info("STAGE 6: Document Structure Analysis")
-            logger.info("=" * 60)
+        hashes = {}
+        for stage_number, *_ in self.ENHANCEMENT_STAGES:
+            lineage = {stage_number}
+            pending = list(self.STAGE_DEPENDENCIES[stage_number])
+            while pending:
+                upstream = pending.pop()
+                if upstream not in lineage:
+                    lineage.add(upstream)
+                    pending.extend(self.STAGE_DEPENDENCIES[upstream])
+            versions = ','.join(
+                f"{stage}:{self.STAGE_VERSIONS[stage]}" + (f":{data[stage]}" if stage in data else '')
+                for stage in sorted(lineage)
+            )
+            hashes[stage_number] = hashlib.sha256(f"{document_hash}|{versions}".encode()).hexdigest()
+        return hashes
+    
+    def _load_stage_results(self, documents: List[Dict[str, Any]],
+                            input_hashes: List[Dict[int, str]]) -> List[Dict[int, Any]]:
+        """Stored stage outputs still valid for each document, keyed by stage number"""
+        try:
+            stored = self.stage_results.load([str(doc.get('id')) for doc in documents])
+        except psycopg2.Error as e:
+            self.db_conn.rollback()
+            self.error_collector.add_warning(
+                f"Stored stage results unavailable, recomputing all stages: {e}",
+                stage="Stage Results"
+            )
+            return [{} for _ in documents]
+        
+        cached = []
+        for doc, hashes in zip(documents, input_hashes):
+            outputs = {}
+            for stage_number, row in stored.get(str(doc.get('id')), {}).items():
+                if (row['stage_version'] == self.STAGE_VERSIONS.get(stage_number)
+                        and row['input_hash'] == hashes.get(stage_number)):
+                    outputs[stage_number] = row['output']
+            self.stats['stage_results_reused'] += len(outputs)
+            cached.append(outputs)
+        return cached
+    
+    def _save_stage_results(self, enhanced_documents: List[Optional[Dict[str, Any]]],
+                            input_hashes: List[Dict[int, str]],
+                            cached: List[Dict[int, Any]]):
+        """Store the stage outputs computed in this run for later reuse"""
+        rows = []
+        for doc, hashes, reused in zip(enhanced_documents, input_hashes, cached):
+            if doc is None:
+                continue
+            for stage_number, output_key in self.STAGE_OUTPUT_KEYS.items():
+                if stage_number in reused or output_key not in doc:
+                    continue
+                # An output built on a failed upstream stage is not worth keeping
+                if any(self.STAGE_OUTPUT_KEYS[upstream] not in doc
+                       for upstream in self.STAGE_DEPENDENCIES[stage_number]):
+                    continue
+                rows.append((
+                    str(doc.get('id')),
+                    stage_number,
+                    self.STAGE_VERSIONS[stage_number],
+                    hashes[stage_number],
+                    json.dumps(_make_serializable(doc[output_key]))
+                ))
         
-        structure = self._analyze_structure(doc)
-        doc['structure_analysis'] = structure
+        try:
+            self.stats['stage_results_computed'] += self.stage_results.save(rows)
+        except psycopg2.Error as e:
+            self.db_conn.rollback()
+            self.error_collector.add_warning(
+                f"Failed to store stage results: {e}",
+                stage="Stage Results"
+            )
+    
+    async def _enhance_documents(self, documents: List[Dict[str, Any]],
+                                 workers: int = 1,
+                                 tolerate_stage_errors: bool = False,
+                                 start_index: int = 0,
+                                 total: Optional[int] = None,
+                                 reuse_stage_results: bool = False,
+                                 store_stage_results: bool = False) -> List[Optional[Dict[str, Any]]]:
+        """
+        Run documents through stages 2-8, optionally on a process pool
         
-        # ==========================================
-        # STAGE 7: Legal Keyword Extraction
-        # ==========================================
-        if idx == 0:
-            logger.info("\n" + "=" * 60)
-            logger.info("STAGE 7: Legal Keyword Extraction")
-            logger.info("=" * 60)
+        Results keep the input order. With workers > 1 each document is sent to
+        a pool worker, and the worker's stats and error records are merged back
+        into this pipeline as results arrive. start_index and total position
+        the documents within a larger streamed run for progress logging.
         
-        keyword_extraction = self._extract_legal_keywords(doc)
-        doc['keyword_extraction'] = keyword_extraction
-        self.stats['keywords_extracted'] += len(keyword_extraction.get('keywords', []))
+        With reuse_stage_results, stage outputs stored by an earlier run are
+        reused where their stage version and input hash still match; with
+        store_stage_results, outputs computed here are stored. Both need a
+        database connection.
+        """
+        if total is None:
+            total = start_index + len(documents)
+        
+        if self.stage_results is None:
+            reuse_stage_results = store_stage_results = False
+        input_hashes = None
+        if reuse_stage_results or store_stage_results:
+            input_hashes = [self._stage_input_hashes(doc) for doc in documents]
+        if reuse_stage_results:
+            cached = self._load_stage_results(documents, input_hashes)
+        else:
+            cached = [{} for _ in documents]
         
-        # ==========================================
-        # STAGE 8: Comprehensive Metadata Assembly
-        # ==========================================
-        if idx == 0:
-            logger.info("\n" + "=" * 60)
-            logger.info("STAGE 8: Comprehensive Metadata Assembly")
-            logger.info("=" * 60)
+        if workers <= 1 or len(documents) <= 1:
+            enhanced_documents = [
+                self._enhance_document(doc, start_index + idx, total, tolerate_stage_errors, cached_outputs)
+                for idx, (doc, cached_outputs) in enumerate(zip(documents, cached))
+            ]
+        else:
+            pool = self._get_worker_pool(workers)
+            loop = asyncio.get_running_loop()
+            logger.info(f"Enhancing {len(documents)} documents on {workers} worker processes")
+            
+            results = await asyncio.gather(*[
+                loop.run_in_executor(
+                    pool, _enhance_document_in_worker,
+                    doc, start_index + idx, total, tolerate_stage_errors,
+                    self.error_collector.run_id, cached_outputs
+                )
+                for idx, (doc, cached_outputs) in enumerate(zip(documents, cached))
+            ])
+            
+            enhanced_documents = []
+            for doc, (enhanced_doc, worker_stats, worker_errors, worker_timings) in zip(documents, results):
+                self._merge_stats(worker_stats)
+                self.error_collector.merge(worker_errors)
+                self.profiler.replay(worker_timings, document_id=doc.get('id'))
+                enhanced_documents.append(enhanced_doc)
         
-        metadata = self._assemble_metadata_validated(doc)
-        doc['comprehensive_metadata'] = metadata
+        if store_stage_results:
+            self._save_stage_results(enhanced_documents, input_hashes, cached)
         
-        return doc
+        return enhanced_documents
+    
+    def _merge_stats(self, stats: Dict[str, int]):
+        """Add counters collected by a pool worker into this run's stats"""
+        with self._stats_lock:
+            for key, value in stats.items():
+                self.stats[key] = self.stats.get(key, 0) + value
+    
+    def _get_worker_pool(self, workers: int) -> ProcessPoolExecutor:
+        """Get the run's process pool, creating it on first use"""
+        if self._worker_pool is None or self._worker_pool_size != workers:
+            self._shutdown_worker_pool()
+            self._worker_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_pipeline_worker,
+                initargs=(self.citation_tokenizer, self.judge_index)
+            )
+            self._worker_pool_size = workers
+        return self._worker_pool
+    
+    def _shutdown_worker_pool(self):
+        """Shut down the document and stage pools, if they were started"""
+        if self._worker_pool is not None:
+            self._worker_pool.shutdown()
+            self._worker_pool = None
+            self._worker_pool_size = 0
+        if self._stage_pool is not None:
+            self._stage_pool.shutdown()
+            self._stage_pool = None
+    
+    def _get_stage_pool(self) -> Optional[Executor]:
+        """Executor for concurrent stages of one document (None when serial)"""
+        if self.stage_executor == 'serial':
+            return None
+        if self._stage_pool is None:
+            if self.stage_executor == 'thread':
+                self._stage_pool = ThreadPoolExecutor(
+                    max_workers=STAGE_EXECUTOR_WORKERS, thread_name_prefix='pipeline-stage'
+                )
+            else:
+                self._stage_pool = ProcessPoolExecutor(
+                    max_workers=STAGE_EXECUTOR_WORKERS,
+                    initializer=_init_pipeline_worker,
+                    initargs=(self.citation_tokenizer, self.judge_index)
+                )
+        return self._stage_pool
 
-    def _fetch_documents(self, limit: int, source_table: str, only_unprocessed: bool = False) -> List[Dict[str, Any]]:
+    def _build_fetch_query(self, limit: int, source_table: str,
+                           only_unprocessed: bool = False,
+                           document_ids: Optional[List[Any]] = None,
+                           after: Optional[Dict[str, Any]] = None) -> Tuple[str, tuple]:
+        """
+        Build the Stage 1 retrieval query and its parameters
+        
+        Rows come in a fixed order (newest first for court_documents, by id
+        otherwise), so after, the position of the last document a run
+        fetched, selects exactly the rows that run had not reached yet.
+        """
+        # Validate table name to prevent SQL injection
+        if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*\.[a-zA-Z_][a-zA-Z0-9_]*$', source_table):
+            raise ValidationError(f"Invalid table name: {source_table}")
+        
+        schema, table = source_table.split('.')
+        if document_ids is not None:
+            position, position_params = ("AND id > %s", (after['id'],)) if after else ("", ())
+            if source_table == 'public.court_documents':
+                return f"""
+                    SELECT id, case_number, document_type, content, metadata, created_at
+                    FROM public.court_documents
+                    WHERE id = ANY(%s) {position}
+                    ORDER BY id
+                """, (list(document_ids),) + position_params
+            return f"""
+                SELECT * FROM %s.%s
+                WHERE id = ANY(%s) AND content IS NOT NULL {position}
+                ORDER BY id
+            """, (AsIs(schema), AsIs(table), list(document_ids)) + position_params
+        
+        if source_table == 'public.court_documents':
+            conditions, params = [], ()
+            join = ""
+            if only_unprocessed:
+                # For unprocessed, check if document exists in opinions_unified
+                join = "LEFT JOIN court_data.opinions_unified ou ON cd.metadata->>'cl_opinion_id' = ou.cl_id::text"
+                conditions.append("ou.cl_id IS NULL")
+            if after and after.get('created_at'):
+                conditions.append("(cd.created_at, cd.id) < (%s, %s)")
+                params = (datetime.fromisoformat(after['created_at']), after['id'])
+            elif after:
+                # NULL created_at sorts first under DESC
+                conditions.append("((cd.created_at IS NULL AND cd.id < %s) OR cd.created_at IS NOT NULL)")
+                params = (after['id'],)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            return f"""
+                SELECT cd.id, cd.case_number, cd.document_type, cd.content, cd.metadata, cd.created_at
+                FROM public.court_documents cd
+                {join}
+                {where}
+                ORDER BY cd.created_at DESC, cd.id DESC
+                LIMIT %s
+            """, params + (limit,)
+        
+        # For other tables, use parameterized query
+        position, position_params = ("AND id > %s", (after['id'],)) if after else ("", ())
+        return f"""
+            SELECT * FROM %s.%s
+            WHERE content IS NOT NULL {position}
+            ORDER BY id
+            LIMIT %s
+        """, (AsIs(schema), AsIs(table)) + position_params + (limit,)
+    
+    def _fetch_documents(self, limit: int, source_table: str, only_unprocessed: bool = False,
+                         document_ids: Optional[List[Any]] = None,
+                         after: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Stage 1: Fetch documents from database with validation"""
+        query, params = self._build_fetch_query(limit, source_table, only_unprocessed, document_ids, after)
         try:
             with self.db_conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                # Validate table name to prevent SQL injection
-                if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*\.[a-zA-Z_][a-zA-Z0-9_]*$', source_table):
-                    raise ValidationError(f"Invalid table name: {source_table}")
-                
-                if source_table == 'public.court_documents':
-                    if only_unprocessed:
-                        # For unprocessed, check if document exists in opinions_unified
-                        cursor.execute("""
-                            SELECT cd.id, cd.case_number, cd.document_type, cd.content, cd.metadata, cd.created_at
-                            FROM public.court_documents cd
-                            LEFT JOIN court_data.opinions_unified ou ON cd.metadata->>'cl_opinion_id' = ou.cl_id::text
-                            WHERE ou.cl_id IS NULL
-                            ORDER BY cd.created_at DESC
-                            LIMIT %s
-                        """, (limit,))
-                    else:
-                        cursor.execute("""
-                            SELECT id, case_number, document_type, content, metadata, created_at
-                            FROM public.court_documents
-                            ORDER BY created_at DESC
-                            LIMIT %s
-                        """, (limit,))
-                else:
-                    # For other tables, use parameterized query
-                    schema, table = source_table.split('.')
-                    cursor.execute("""
-                        SELECT * FROM %s.%s
-                        WHERE content IS NOT NULL
-                        LIMIT %s
-                    """, (AsIs(schema), AsIs(table), limit))
-                
+                cursor.execute(query, params)
                 return [dict(row) for row in cursor.fetchall()]
         except psycopg2.Error as e:
             raise DatabaseConnectionError(
@@ -691,92 +1262,112 @@ class RobustElevenStagePipeline:
                 stage="Document Retrieval"
             )
     
+    def _iter_document_windows(self, limit: int, source_table: str,
+                               only_unprocessed: bool = False,
+                               window_size: int = 1000,
+                               document_ids: Optional[List[Any]] = None,
+                               after: Optional[Dict[str, Any]] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stage 1 (streaming): yield documents in windows from a server-side cursor
+        
+        Rows are pulled window_size at a time, so only one window is held in
+        memory. The cursor is declared WITH HOLD so it survives the commits
+        made while earlier windows are being stored.
+        """
+        query, params = self._build_fetch_query(limit, source_table, only_unprocessed, document_ids, after)
+        cursor_name = f"pipeline_fetch_{os.getpid()}_{id(self)}"
+        try:
+            with self.db_conn.cursor(name=cursor_name, cursor_factory=RealDictCursor,
+                                     withhold=True) as cursor:
+                cursor.itersize = window_size
+                cursor.execute(query, params)
+                # Commit the DECLARE so a rolled-back storage chunk cannot
+                # take the held cursor down with it
+                self.db_conn.commit()
+                while True:
+                    rows = cursor.fetchmany(window_size)
+                    if not rows:
+                        break
+                    yield [dict(row) for row in rows]
+        except psycopg2.Error as e:
+            raise DatabaseConnectionError(
+                f"Database query failed: {str(e)}",
+                stage="Document Retrieval"
+            )
+    
     def _enhance_court_info_validated(self, document: Dict[str, Any]) -> Dict[str, Any]:
         """Stage 2: Court resolution with validation"""
-        metadata = document.get('metadata', {})
+        document = PipelineDocument.wrap(document)
+        metadata = document.metadata
         
-        # Handle metadata that might be a string (JSON) or other type
-        if isinstance(metadata, str):
-            try:
-                metadata = json.loads(metadata)
-            except json.JSONDecodeError:
-                self.error_collector.add_warning(
-                    "Failed to parse metadata JSON",
-                    stage="Court Resolution",
-                    document_id=document.get('id')
-                )
-                metadata = {}
-        elif not isinstance(metadata, dict):
+        # Report metadata that was not a dict or JSON object
+        metadata_error = document.metadata_error
+        if metadata_error == 'invalid_json':
             self.error_collector.add_warning(
-                f"Unexpected metadata type: {type(metadata).__name__}",
+                "Failed to parse metadata JSON",
+                stage="Court Resolution",
+                document_id=document.get('id')
+            )
+        elif metadata_error:
+            self.error_collector.add_warning(
+                f"Unexpected metadata type: {metadata_error.split(':', 1)[1]}",
                 stage="Court Resolution",
                 document_id=document.get('id')
             )
-            metadata = {}
         
         # Try to find court information
         court_hint = None
         extracted_from_content = False
         extraction_method = 'metadata'
+        content_match = None
         
         # Get document type for type-specific extraction
         doc_type = document.get('detected_type', 'unknown')
         
-        # Type-specific court extraction
+        # 1. Opinions: check download URL for patterns
         if doc_type == 'opinion':
-            # For opinions, try multiple strategies
-            # 1. Check download URL for patterns
             download_url = metadata.get('download_url') or ''
             if download_url and 'supremecourt.ohio.gov' in download_url:
                 court_hint = 'ohioctapp'  # Ohio Court of Appeals
                 extraction_method = 'opinion_url'
-            
-            # 2. Check content for court identification
-            if not court_hint:
-                content = document.get('content', '')[:1000]
-                content_upper = content.upper()
-                if 'COURT OF APPEALS OF OHIO' in content_upper and 'TENTH APPELLATE DISTRICT' in content_upper:
-                    court_hint = 'ohioctapp'
-                    extraction_method = 'opinion_content'
-                    extracted_from_content = True
-            
-            # 3. Check for generic court_id field (works for CourtListener data)
-            if not court_hint:
-                court_hint = metadata.get('court_id') or metadata.get('court')
+        
+        # 2. Metadata: prefer court_id over court (which might be a URL or a name)
+        metadata_hint = metadata.get('court_id') or metadata.get('court')
+        if not court_hint and metadata_hint:
+            court_hint = self.court_resolver.resolve_hint(metadata_hint)
+            if court_hint:
+                extraction_method = 'opinion_metadata' if doc_type == 'opinion' else 'metadata'
+        
+        # For RECAP documents, also check court_standardized
+        if not court_hint and doc_type != 'opinion' and 'court_standardized' in metadata:
+            court_std = metadata.get('court_standardized', {})
+            if isinstance(court_std, dict):
+                court_hint = self.court_resolver.resolve_hint(court_std.get('id'))
                 if court_hint:
-                    extraction_method = 'opinion_metadata'
-            
-            # 4. Note: In production, would check cluster API here
-            # cluster_url = metadata.get('cluster', '')
-            
-        else:
-            # For dockets and other types, prefer court_id over court (which might be URL)
-            court_hint = metadata.get('court_id') or metadata.get('court')
-            
-            # For RECAP documents, also check court_standardized
-            if not court_hint and 'court_standardized' in metadata:
-                court_std = metadata.get('court_standardized', {})
-                if isinstance(court_std, dict):
-                    court_hint = court_std.get('id')
-                    if court_hint:
-                        extraction_method = 'recap_standardized'
+                    extraction_method = 'recap_standardized'
         
         # Debug logging
         if court_hint:
             logger.info(f"Found court hint in metadata: {court_hint}")
         
-        # Try to extract from case number
+        # 3. Court id prefixed to the case number (txed:2:21-cv-00316)
+        if not court_hint:
+            court_hint = self.court_resolver.resolve_case_number(document.get('case_number'))
+            if court_hint:
+                extraction_method = 'case_number'
+                extracted_from_content = True
+        
+        # 4. courts_db regexes over the start of the text (captions)
         if not court_hint:
-            case_number = document.get('case_number', '')
-            if case_number:
-                # Extract court from case number patterns
-                if ':' in case_number:
-                    parts = case_number.split(':')
-                    if len(parts[0]) <= 10:  # Reasonable court ID length
-                        potential_court = parts[0].split('-')[0].lower()
-                        if len(potential_court) >= 2:
-                            court_hint = potential_court
-                            extracted_from_content = True
+            content_match = self.court_resolver.resolve_content(document.head(COURT_SCAN_CHARS))
+            if content_match:
+                court_hint = content_match['court_id']
+                extraction_method = 'content_scan'
+                extracted_from_content = True
+        
+        # Nothing resolved: validate the metadata value as given, so it is reported
+        if not court_hint and isinstance(metadata_hint, str):
+            court_hint = metadata_hint
         
         if not court_hint:
             # No court found - return unresolved status
@@ -785,7 +1376,7 @@ class RobustElevenStagePipeline:
                 'resolved': False,
                 'reason': 'No court information found in metadata or content',
                 'attempted_extraction': True,
-                'search_locations': ['metadata.court', 'metadata.court_id', 'case_number pattern']
+                'search_locations': ['metadata.court', 'metadata.court_id', 'case_number pattern', 'content']
             }
         
         # Validate and resolve court
@@ -802,6 +1393,8 @@ class RobustElevenStagePipeline:
                 'court_level': court_data.get('level', ''),
                 'extracted_from_content': extracted_from_content,
                 'extraction_method': extraction_method,
+                **({'matched_text': content_match['matched_text'],
+                    'candidate_courts': content_match['candidates']} if content_match else {}),
                 'document_type': doc_type,
                 'validation': court_validation.to_dict()
             }
@@ -834,15 +1427,55 @@ class RobustElevenStagePipeline:
                 'validation_summary': {'errors': 0, 'warnings': 0}
             }
         
-        # Extract citations using eyecite
-        citations = get_citations(content)
+        citations = self._get_citation_dicts(content)
         
         citation_data = []
         valid_count = 0
         total_errors = 0
         total_warnings = 0
         
-        for cite in citations:
+        for citation_dict in citations:
+            # Validate citation
+            validation_result = CitationValidator.validate_citation(citation_dict)
+            citation_dict['validation'] = validation_result.to_dict()
+            
+            if validation_result.is_valid:
+                valid_count += 1
+            
+            total_errors += len(validation_result.errors)
+            total_warnings += len(validation_result.warnings)
+            
+            citation_data.append(citation_dict)
+        
+        logger.info(f"Extracted {len(citations)} citations, {valid_count} valid")
+        
+        return {
+            'count': len(citations),
+            'valid_count': valid_count,
+            'citations': citation_data,
+            'validation_summary': {
+                'errors': total_errors,
+                'warnings': total_warnings
+            }
+        }
+    
+    def _get_citation_dicts(self, content: str) -> List[Dict[str, Any]]:
+        """
+        Citations found in content, before validation
+        
+        Served from the citation cache when this exact text was seen before
+        with the same eyecite version; otherwise extracted with eyecite and
+        added to the cache.
+        """
+        if self.citation_cache is not None:
+            cached = self.citation_cache.get(content)
+            with self._stats_lock:
+                self.stats['citation_cache_hits' if cached is not None else 'citation_cache_misses'] += 1
+            if cached is not None:
+                return cached
+        
+        citation_dicts = []
+        for cite in get_citations(content, tokenizer=get_citation_tokenizer(self.citation_tokenizer)):
             citation_dict = {
                 'text': str(cite),
                 'type': type(cite).__name__,
@@ -866,32 +1499,20 @@ class RobustElevenStagePipeline:
                     'page': cite.groups.get('page')
                 })
             
-            # Validate citation
-            validation_result = CitationValidator.validate_citation(citation_dict)
-            citation_dict['validation'] = validation_result.to_dict()
-            
-            if validation_result.is_valid:
-                valid_count += 1
-            
-            total_errors += len(validation_result.errors)
-            total_warnings += len(validation_result.warnings)
-            
-            citation_data.append(citation_dict)
-        
-        logger.info(f"Extracted {len(citations)} citations, {valid_count} valid")
+            citation_dicts.append(citation_dict)
         
-        return {
-            'count': len(citations),
-            'valid_count': valid_count,
-            'citations': citation_data,
-            'validation_summary': {
-                'errors': total_errors,
-                'warnings': total_warnings
-            }
-        }
+        if self.citation_cache is not None:
+            self.citation_cache.put(content, citation_dicts)
+        return citation_dicts
     
-    def _normalize_reporters_validated(self, citations: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Stage 4: Reporter normalization with validation"""
+    def _normalize_reporters_validated(self, citations: List[Dict[str, Any]],
+                                       document_id: Any = None) -> Dict[str, Any]:
+        """
+        Stage 4: Reporter normalization with validation
+        
+        document_id only attributes the stage's timing to its document; the
+        stage itself receives the citations, not the document.
+        """
         normalized_reporters = []
         unique_reporters = set()
         normalized_count = 0
@@ -933,105 +1554,13 @@ class RobustElevenStagePipeline:
         }
     
     def _get_reporter_info(self, reporter: str) -> Dict[str, Any]:
-        """Get reporter information with proper handling of editions"""
-        # This is the fixed version from our earlier work
-        reporter_clean = reporter.strip()
-        
-        # Handle Federal Reporter series (F., F.2d, F.3d, etc.)
-        if reporter_clean.lower().startswith('f.'):
-            base_key = 'F.'
-            if base_key in REPORTERS:
-                reporter_data = REPORTERS[base_key]
-                if isinstance(reporter_data, list) and reporter_data:
-                    base_info = reporter_data[0]
-                    
-                    # Determine edition
-                    if '3d' in reporter_clean:
-                        edition = 'F.3d'
-                    elif '2d' in reporter_clean:
-                        edition = 'F.2d'
-                    elif '4th' in reporter_clean:
-                        edition = 'F.4th'
-                    else:
-                        edition = 'F.'
-                    
-                    return {
-                        'found': True,
-                        'base_reporter': base_key,
-                        'edition': edition,
-                        'name': base_info.get('name', 'Federal Reporter'),
-                        'cite_type': base_info.get('cite_type', 'federal')
-                    }
-        
-        # Handle Federal Supplement
-        if 'supp' in reporter_clean.lower():
-            base_key = 'F. Supp.'
-            if '3d' in reporter_clean.lower():
-                edition = 'F. Supp. 3d'
-            elif '2d' in reporter_clean.lower():
-                edition = 'F. Supp. 2d'
-            else:
-                edition = 'F. Supp.'
-            
-            if base_key in REPORTERS:
-                reporter_data = REPORTERS[base_key]
-                if isinstance(reporter_data, list) and reporter_data:
-                    base_info = reporter_data[0]
-                    return {
-                        'found': True,
-                        'base_reporter': base_key,
-                        'edition': edition,
-                        'name': base_info.get('name', 'Federal Supplement'),
-                        'cite_type': base_info.get('cite_type', 'federal')
-                    }
-        
-        # Direct lookup for other reporters
-        if reporter_clean in REPORTERS:
-            reporter_data = REPORTERS[reporter_clean]
-            if isinstance(reporter_data, list) and reporter_data:
-                base_info = reporter_data[0]
-                return {
-                    'found': True,
-                    'base_reporter': reporter_clean,
-                    'edition': reporter_clean,
-                    'name': base_info.get('name', ''),
-                    'cite_type': base_info.get('cite_type', '')
-                }
-        
-        # Case-insensitive lookup
-        for key in REPORTERS.keys():
-            if reporter_clean.lower() == key.lower():
-                reporter_data = REPORTERS[key]
-                if isinstance(reporter_data, list) and reporter_data:
-                    base_info = reporter_data[0]
-                    return {
-                        'found': True,
-                        'base_reporter': key,
-                        'edition': key,
-                        'name': base_info.get('name', ''),
-                        'cite_type': base_info.get('cite_type', '')
-                    }
-        
-        return {
-            'found': False,
-            'base_reporter': reporter_clean,
-            'edition': reporter_clean,
-            'name': '',
-            'cite_type': ''
-        }
+        """Get reporter information with proper handling of editions and variations"""
+        return lookup_reporter(reporter)
 
     def _enhance_judge_info_validated(self, document: Dict[str, Any]) -> Dict[str, Any]:
         """Stage 5: Judge enhancement with validation"""
-        metadata = document.get('metadata', {})
-        
-        # Handle metadata safely
-        if isinstance(metadata, str):
-            try:
-                metadata = json.loads(metadata)
-            except:
-                metadata = {}
-        elif not isinstance(metadata, dict):
-            metadata = {}
+        document = PipelineDocument.wrap(document)
+        metadata = document.metadata
         
         # Get document type for type-specific extraction
         doc_type = document.get('detected_type', 'unknown')
@@ -1039,6 +1568,7 @@ class RobustElevenStagePipeline:
         # Type-specific judge extraction
         judge_name = ''
         judge_initials = metadata.get('federal_dn_judge_initials_assigned', '')
+        court_id = metadata.get('court_id') if isinstance(metadata.get('court_id'), str) else None
         extracted_from_content = False
         extraction_source = 'metadata'
         
@@ -1048,11 +1578,20 @@ class RobustElevenStagePipeline:
             if judge_name:
                 extraction_source = 'opinion_author'
                 logger.info(f"Found judge in opinion author field: {judge_name}")
+                if isinstance(judge_name, str):
+                    # Usually just the last name
+                    judge_name = EnhancedJudgeExtractor.expand_author_name(judge_name, court_id)
         
         if not judge_name:
             # Standard metadata fields for dockets and fallback
             judge_name = metadata.get('judge_name', '') or metadata.get('judge', '') or metadata.get('assigned_to', '')
         
+        if not judge_name and judge_initials:
+            # Docket initials of a judge in the judge index
+            judge_name = self.judge_index.lookup_initials(judge_initials, court_id) or ''
+            if judge_name:
+                extraction_source = 'judge_initials'
+        
         # If no judge name but we have initials
         if not judge_name and judge_initials:
             return {
@@ -1067,8 +1606,9 @@ class RobustElevenStagePipeline:
         if not judge_name:
             # Use enhanced extraction with OCR tolerance
             extraction_result = EnhancedJudgeExtractor.extract_judge_from_content(
-                document.get('content', ''),
-                doc_type
+                document.content,
+                doc_type,
+                court_id
             )
             
             if extraction_result.get('found'):
@@ -1160,15 +1700,19 @@ class RobustElevenStagePipeline:
     
     def _extract_legal_keywords(self, document: Dict[str, Any]) -> Dict[str, Any]:
         """Stage 7: Extract legal keywords (honest about limitations)"""
-        content = document.get('content', '')
+        document = PipelineDocument.wrap(document)
+        content = document.content
         doc_type = document.get('document_type', 'unknown')
+        engine = get_keyword_engine()
         
         extraction_result = {
-            'method': 'simple_keyword_matching',
+            'method': f'dictionary_keyword_matching ({engine.matcher.engine})',
             'document_type': doc_type,
             'keywords': [],
             'legal_terms': [],
             'procedural_terms': [],
+            'dictionary_terms': [],
+            'matches': {},
             'disclaimer': 'This is basic keyword extraction, not legal analysis'
         }
         
@@ -1176,54 +1720,8 @@ class RobustElevenStagePipeline:
             logger.debug("No content for keyword extraction")
             return extraction_result
         
-        content_lower = content.lower()
-        
-        # Legal keywords
-        legal_keywords = [
-            'summary judgment', 'motion to dismiss', 'claim construction',
-            'patent infringement', 'preliminary injunction', 'class action',
-            'jurisdiction', 'standing', 'damages', 'liability', 'negligence',
-            'breach of contract', 'due process', 'equal protection'
-        ]
-        
-        for keyword in legal_keywords:
-            if keyword in content_lower:
-                extraction_result['keywords'].append(keyword)
-        
-        # Legal standards
-        legal_standards = {
-            'de novo': 'de novo review',
-            'abuse of discretion': 'abuse of discretion',
-            'clear error': 'clear error',
-            'arbitrary and capricious': 'arbitrary and capricious',
-            'rational basis': 'rational basis review',
-            'strict scrutiny': 'strict scrutiny'
-        }
-        
-        for search_term, standard_name in legal_standards.items():
-            if search_term in content_lower:
-                extraction_result['legal_terms'].append(standard_name)
-        
-        # Procedural terms
-        procedural_patterns = {
-            'granted': 'motion granted',
-            'denied': 'motion denied',
-            'reversed': 'reversed',
-            'affirmed': 'affirmed',
-            'remanded': 'remanded',
-            'dismissed': 'dismissed',
-            'sustained': 'objection sustained',
-            'overruled': 'objection overruled'
-        }
-        
-        for term, description in procedural_patterns.items():
-            if term in content_lower:
-                extraction_result['procedural_terms'].append(description)
-        
-        # Remove duplicates
-        extraction_result['keywords'] = list(set(extraction_result['keywords']))
-        extraction_result['legal_terms'] = list(set(extraction_result['legal_terms']))
-        extraction_result['procedural_terms'] = list(set(extraction_result['procedural_terms']))
+        # One pass over the text for the built-in lists and the dictionary
+        extraction_result.update(engine.extract(document.content_lower))
         
         total_keywords = (
             len(extraction_result['keywords']) + 
@@ -1231,7 +1729,8 @@ class RobustElevenStagePipeline:
             len(extraction_result['procedural_terms'])
         )
         
-        logger.info(f"Extracted {total_keywords} keywords from document")
+        logger.info(f"Extracted {total_keywords} keywords and "
+                    f"{len(extraction_result['dictionary_terms'])} dictionary terms from document")
         
         return extraction_result
     
@@ -1250,12 +1749,8 @@ class RobustElevenStagePipeline:
                 return obj
         
         # Start with original metadata
-        original_metadata = document.get('metadata', {})
-        if isinstance(original_metadata, str):
-            try:
-                original_metadata = json.loads(original_metadata)
-            except:
-                original_metadata = {}
+        document = PipelineDocument.wrap(document)
+        original_metadata = document.metadata
         
         # Assemble all enhancements
         comprehensive = {
@@ -1291,184 +1786,134 @@ class RobustElevenStagePipeline:
     
     async def _store_enhanced_documents_validated(self, documents: List[Dict[str, Any]], force_reprocess: bool = False) -> Dict[str, Any]:
         """Stage 9: Enhanced storage with validation and comprehensive error handling"""
-        stored_count = 0
-        updated_count = 0
-        skipped_count = 0
         validation_failures = 0
         errors = []
+        rows = []
         
-        try:
-            with self.db_conn.cursor() as cursor:
-                for doc in documents:
-                    doc_id = doc.get('id')
-                    
-                    try:
-                        # Validate document before storage
-                        validation_result = PipelineValidator.validate_processing_result(doc)
-                        
-                        if not validation_result.is_valid and len(validation_result.errors) > 0:
-                            validation_failures += 1
-                            self.error_collector.add_validation_failure(
-                                validation_result.to_dict(),
-                                stage="Storage Validation",
-                                document_id=doc_id
-                            )
-                            logger.warning(f"Document {doc_id} has validation errors, storing anyway")
-                        
-                        # Generate hash based on content
-                        content_sample = str(doc.get('content', ''))[:1000]
-                        doc_hash = hashlib.sha256(
-                            f"{doc_id}_{doc.get('case_number', '')}_{content_sample}".encode()
-                        ).hexdigest()
-                        
-                        # Make data JSON serializable
-                        def make_serializable(obj):
-                            if isinstance(obj, dict):
-                                return {k: make_serializable(v) for k, v in obj.items()}
-                            elif isinstance(obj, list):
-                                return [make_serializable(item) for item in obj]
-                            elif hasattr(obj, '__dict__'):
-                                return str(obj)
-                            elif callable(obj):
-                                return None
-                            else:
-                                return obj
-                        
-                        # Extract values with validation
-                        metadata = doc.get('metadata', {})
-                        if not isinstance(metadata, dict):
-                            metadata = {}
-                        
-                        court_enhancement = doc.get('court_enhancement', {})
-                        court_id = court_enhancement.get('court_id') if court_enhancement.get('resolved') else None
-                        case_name = metadata.get('case_name', doc.get('case_number', f'Document-{doc_id}'))
-                        
-                        # Check if document exists
-                        cursor.execute("""
-                            SELECT id, document_hash FROM court_data.opinions_unified 
-                            WHERE cl_id = %s
-                        """, (doc_id,))
-                        existing = cursor.fetchone()
-                        
-                        if existing:
-                            existing_id, existing_hash = existing
-                            
-                            if force_reprocess or existing_hash != doc_hash:
-                                # Update existing record
-                                cursor.execute("""
-                                    UPDATE court_data.opinions_unified SET
-                                        court_id = %s,
-                                        case_name = %s,
-                                        plain_text = %s,
-                                        citations = %s,
-                                        judge_info = %s,
-                                        court_info = %s,
-                                        structured_elements = %s,
-                                        document_hash = %s,
-                                        flp_processing_timestamp = %s,
-                                        updated_at = %s
-                                    WHERE cl_id = %s
-                                """, (
-                                    court_id,
-                                    case_name,
-                                    doc.get('content'),
-                                    json.dumps(make_serializable(doc.get('citations_extracted', {}))),
-                                    json.dumps(make_serializable(doc.get('judge_enhancement', {}))),
-                                    json.dumps(make_serializable(doc.get('court_enhancement', {}))),
-                                    json.dumps(make_serializable(doc.get('comprehensive_metadata', {}))),
-                                    doc_hash,
-                                    datetime.now(),
-                                    datetime.now(),
-                                    doc_id
-                                ))
-                                updated_count += 1
-                                logger.info(f"Updated existing record for cl_id: {doc_id}")
-                            else:
-                                skipped_count += 1
-                                logger.debug(f"Skipped unchanged document cl_id: {doc_id}")
-                        else:
-                            # Insert new record
-                            cursor.execute("""
-                                INSERT INTO court_data.opinions_unified (
-                                    cl_id, court_id, case_name, plain_text,
-                                    citations, judge_info, court_info,
-                                    structured_elements, document_hash,
-                                    flp_processing_timestamp, created_at
-                                ) VALUES (
-                                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                                )
-                            """, (
-                                doc_id,
-                                court_id,
-                                case_name,
-                                doc.get('content'),
-                                json.dumps(make_serializable(doc.get('citations_extracted', {}))),
-                                json.dumps(make_serializable(doc.get('judge_enhancement', {}))),
-                                json.dumps(make_serializable(doc.get('court_enhancement', {}))),
-                                json.dumps(make_serializable(doc.get('comprehensive_metadata', {}))),
-                                doc_hash,
-                                datetime.now(),
-                                datetime.now()
-                            ))
-                            stored_count += 1
-                            logger.info(f"Stored new document cl_id: {doc_id}")
-                            
-                    except psycopg2.IntegrityError as e:
-                        if 'duplicate key value violates unique constraint' in str(e):
-                            self.error_collector.add_error(
-                                DuplicateDocumentError(
-                                    f"Document {doc_id} already exists",
-                                    document_id=doc_id
-                                ),
-                                stage="Storage",
-                                document_id=doc_id
-                            )
-                            skipped_count += 1
-                        else:
-                            raise
-                    except ValidationError as e:
-                        self.error_collector.add_error(e, "Storage", doc_id)
-                        errors.append(f"Validation error for {doc_id}: {str(e)}")
-                    except Exception as e:
-                        error_msg = f"Error storing document {doc_id}: {str(e)}"
-                        logger.error(error_msg)
-                        self.error_collector.add_error(
-                            StorageError(error_msg, document_id=doc_id),
-                            stage="Storage",
-                            document_id=doc_id
-                        )
-                        errors.append(error_msg)
-                        continue
-                
-                self.db_conn.commit()
-                
-                total_processed = stored_count + updated_count + skipped_count
-                logger.info(f"✅ Storage complete: {stored_count} new, {updated_count} updated, {skipped_count} unchanged")
+        for doc in documents:
+            doc_id = doc.get('id')
+            
+            try:
+                # Validate document before storage
+                validation_result = PipelineValidator.validate_processing_result(doc)
                 
-                if validation_failures > 0:
-                    logger.warning(f"⚠️  {validation_failures} documents had validation issues")
+                if not validation_result.is_valid and len(validation_result.errors) > 0:
+                    validation_failures += 1
+                    self.error_collector.add_validation_failure(
+                        validation_result.to_dict(),
+                        stage="Storage Validation",
+                        document_id=doc_id
+                    )
+                    logger.warning(f"Document {doc_id} has validation errors, storing anyway")
                 
-                if errors:
-                    logger.warning(f"⚠️  {len(errors)} documents failed to store")
-                    
+                rows.append(self._build_storage_row(doc))
+            except ValidationError as e:
+                self.error_collector.add_error(e, "Storage", doc_id)
+                errors.append(f"Validation error for {doc_id}: {str(e)}")
+            except Exception as e:
+                error_msg = f"Error storing document {doc_id}: {str(e)}"
+                logger.error(error_msg)
+                self.error_collector.add_error(
+                    StorageError(error_msg, document_id=doc_id),
+                    stage="Storage",
+                    document_id=doc_id
+                )
+                errors.append(error_msg)
+        
+        try:
+            results = self.storage.upsert_opinions(rows, force_reprocess=force_reprocess)
         except Exception as e:
-            self.db_conn.rollback()
             logger.error(f"Storage transaction failed: {e}")
             raise StorageError(
                 f"Storage transaction failed: {str(e)}",
                 stage="Storage"
             )
         
+        failed_ids = set()
+        for failed_chunk in results['failed_chunks']:
+            failed_ids.update(failed_chunk['cl_ids'])
+            error_msg = f"Failed to store {failed_chunk['size']} documents: {failed_chunk['error']}"
+            self.error_collector.add_error(
+                StorageError(error_msg, details={'cl_ids': failed_chunk['cl_ids']}),
+                stage="Storage",
+                document_id=None
+            )
+            errors.append(error_msg)
+        
+        stored_count = results['stored_count']
+        updated_count = results['updated_count']
+        skipped_count = results['skipped_count']
+        logger.info(f"✅ Storage complete: {stored_count} new, {updated_count} updated, {skipped_count} unchanged")
+        
+        if validation_failures > 0:
+            logger.warning(f"⚠️  {validation_failures} documents had validation issues")
+        
+        if errors:
+            logger.warning(f"⚠️  {len(errors)} storage errors")
+        
         return {
             'success': True,
             'stored_count': stored_count,
             'updated_count': updated_count,
             'skipped_count': skipped_count,
+            'failed_count': results['failed_count'],
             'validation_failures': validation_failures,
             'total_processed': stored_count + updated_count + skipped_count,
+            'stored_document_ids': [row['cl_id'] for row in rows if row['cl_id'] not in failed_ids],
             'errors': errors
         }
     
+    def _build_storage_row(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Map an enhanced document onto court_data.opinions_unified columns"""
+        doc_id = doc.get('id')
+        
+        # Extract values with validation
+        metadata = doc.get('metadata', {})
+        if not isinstance(metadata, dict):
+            metadata = {}
+        
+        court_enhancement = doc.get('court_enhancement', {})
+        court_id = court_enhancement.get('court_id') if court_enhancement.get('resolved') else None
+        case_name = metadata.get('case_name', doc.get('case_number', f'Document-{doc_id}'))
+        citations = json.dumps(_make_serializable(doc.get('citations_extracted', {})))
+        judge_info = json.dumps(_make_serializable(doc.get('judge_enhancement', {})))
+        court_info = json.dumps(_make_serializable(doc.get('court_enhancement', {})))
+        comprehensive = _make_serializable(doc.get('comprehensive_metadata', {}))
+        structured_elements = json.dumps(comprehensive)
+        
+        # Hash of everything written except timestamps, so a row is rewritten
+        # when its content or any enhancement changes (new stage versions,
+        # judge index or keyword dictionary) and skipped otherwise
+        if isinstance(comprehensive, dict):
+            comprehensive = {key: value for key, value in comprehensive.items() if key != 'processing_timestamp'}
+        doc_hash = hashlib.sha256(json.dumps({
+            'cl_id': doc_id,
+            'case_number': doc.get('case_number', ''),
+            'content': str(doc.get('content') or ''),
+            'court_id': court_id,
+            'case_name': case_name,
+            'citations': citations,
+            'judge_info': judge_info,
+            'court_info': court_info,
+            'structured_elements': comprehensive,
+            'stage_versions': self.STAGE_VERSIONS,
+        }, sort_keys=True, default=str).encode()).hexdigest()
+        now = datetime.now()
+        
+        return {
+            'cl_id': doc_id,
+            'court_id': court_id,
+            'case_name': case_name,
+            'plain_text': doc.get('content'),
+            'citations': citations,
+            'judge_info': judge_info,
+            'court_info': court_info,
+            'structured_elements': structured_elements,
+            'document_hash': doc_hash,
+            'flp_processing_timestamp': now,
+            'created_at': now
+        }
+    
     async def _index_to_haystack_validated(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Stage 10: Index to Haystack with validation"""
         try:
@@ -1560,171 +2005,19 @@ class RobustElevenStagePipeline:
     
     def _verify_pipeline_results_validated(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Stage 11: Comprehensive pipeline verification with type-specific metrics"""
-        verification = {
-            'documents_with_court_resolution': 0,
-            'documents_with_valid_court': 0,
-            'documents_with_citations': 0,
-            'documents_with_valid_citations': 0,
-            'documents_with_normalized_reporters': 0,
-            'documents_with_judge_info': 0,
-            'documents_with_valid_judge': 0,
-            'documents_with_structure': 0,
-            'documents_with_keywords': 0,
-            'documents_fully_valid': 0,
-            'average_enhancements_per_doc': 0,
-            'completeness_score': 0,
-            'quality_score': 0,
-            'extraction_improvements': {
-                'courts_from_content': 0,
-                'judges_from_content': 0
-            },
-            'by_document_type': {}
-        }
-        
-        total_enhancements = 0
-        total_quality_points = 0
-        
-        # Initialize type tracking
-        type_stats = {}
-        
-        for doc in documents:
-            # Get document type
-            doc_type = doc.get('detected_type', 'unknown')
-            
-            # Initialize type stats if needed
-            if doc_type not in type_stats:
-                type_stats[doc_type] = {
-                    'total': 0,
-                    'courts_resolved': 0,
-                    'judges_found': 0,
-                    'citations_found': 0,
-                    'fully_valid': 0,
-                    'total_enhancements': 0,
-                    'total_quality_points': 0
-                }
-            
-            type_stats[doc_type]['total'] += 1
-            doc_enhancements = 0
-            doc_quality_points = 0
-            
-            # Court resolution
-            court_data = doc.get('court_enhancement', {})
-            if court_data.get('resolved'):
-                verification['documents_with_court_resolution'] += 1
-                type_stats[doc_type]['courts_resolved'] += 1
-                doc_enhancements += 1
-                
-                # Check if court is valid
-                if not court_data.get('validation', {}).get('errors'):
-                    verification['documents_with_valid_court'] += 1
-                    doc_quality_points += 2  # Higher points for valid data
-                else:
-                    doc_quality_points += 1
-                
-                if court_data.get('extracted_from_content'):
-                    verification['extraction_improvements']['courts_from_content'] += 1
-            
-            # Citations
-            citations_data = doc.get('citations_extracted', {})
-            if citations_data.get('count', 0) > 0:
-                verification['documents_with_citations'] += 1
-                type_stats[doc_type]['citations_found'] += 1
-                doc_enhancements += 1
-                
-                # Check citation validity
-                if citations_data.get('valid_count', 0) > 0:
-                    verification['documents_with_valid_citations'] += 1
-                    valid_ratio = citations_data['valid_count'] / citations_data['count']
-                    doc_quality_points += 2 * valid_ratio
-                else:
-                    doc_quality_points += 0.5
-            
-            # Normalized reporters
-            if doc.get('reporters_normalized', {}).get('normalized_count', 0) > 0:
-                verification['documents_with_normalized_reporters'] += 1
-                doc_enhancements += 1
-                doc_quality_points += 1
-            
-            # Judge info
-            judge_data = doc.get('judge_enhancement', {})
-            if judge_data.get('enhanced') or judge_data.get('judge_name_found'):
-                verification['documents_with_judge_info'] += 1
-                type_stats[doc_type]['judges_found'] += 1
-                doc_enhancements += 1
-                
-                # Check if judge name is valid
-                if not judge_data.get('validation', {}).get('errors'):
-                    verification['documents_with_valid_judge'] += 1
-                    doc_quality_points += 2
-                else:
-                    doc_quality_points += 1
-                
-                if judge_data.get('extracted_from_content'):
-                    verification['extraction_improvements']['judges_from_content'] += 1
-            
-            # Structure
-            if len(doc.get('structure_analysis', {}).get('elements', [])) > 0:
-                verification['documents_with_structure'] += 1
-                doc_enhancements += 1
-                doc_quality_points += 1
-            
-            # Keywords
-            if len(doc.get('keyword_extraction', {}).get('keywords', [])) > 0:
-                verification['documents_with_keywords'] += 1
-                doc_enhancements += 1
-                doc_quality_points += 1
-            
-            # Check if document is fully valid
-            validation_summary = doc.get('comprehensive_metadata', {}).get('validation_summary', {})
-            if validation_summary.get('is_valid', False):
-                verification['documents_fully_valid'] += 1
-                type_stats[doc_type]['fully_valid'] += 1
-            
-            # Track type-specific totals
-            type_stats[doc_type]['total_enhancements'] += doc_enhancements
-            type_stats[doc_type]['total_quality_points'] += doc_quality_points
-            
-            total_enhancements += doc_enhancements
-            total_quality_points += doc_quality_points
-        
-        # Calculate metrics
-        num_docs = len(documents)
-        if num_docs > 0:
-            verification['average_enhancements_per_doc'] = total_enhancements / num_docs
-            
-            # Completeness: how many enhancements were applied
-            max_enhancements = 6  # court, citations, reporters, judge, structure, keywords
-            verification['completeness_score'] = (
-                (verification['documents_with_court_resolution'] +
-                 verification['documents_with_citations'] +
-                 verification['documents_with_normalized_reporters'] +
-                 verification['documents_with_judge_info'] +
-                 verification['documents_with_structure'] +
-                 verification['documents_with_keywords']) / 
-                (num_docs * max_enhancements) * 100
-            )
-            
-            # Quality: how good are the enhancements
-            max_quality_points = 10  # Maximum quality points per document
-            verification['quality_score'] = (total_quality_points / (num_docs * max_quality_points)) * 100
-            
-            # Calculate type-specific metrics
-            for doc_type, stats in type_stats.items():
-                if stats['total'] > 0:
-                    type_metrics = {
-                        'total': stats['total'],
-                        'court_resolution_rate': (stats['courts_resolved'] / stats['total']) * 100,
-                        'judge_identification_rate': (stats['judges_found'] / stats['total']) * 100,
-                        'citation_extraction_rate': (stats['citations_found'] / stats['total']) * 100,
-                        'validity_rate': (stats['fully_valid'] / stats['total']) * 100,
-                        'average_enhancements': stats['total_enhancements'] / stats['total'],
-                        'completeness_score': (
-                            (stats['courts_resolved'] + stats['judges_found'] + stats['citations_found']) /
-                            (stats['total'] * 3)  # 3 key metrics
-                        ) * 100,
-                        'quality_score': (stats['total_quality_points'] / (stats['total'] * max_quality_points)) * 100
-                    }
-                    verification['by_document_type'][doc_type] = type_metrics
+        table = VerificationTable()
+        self._accumulate_verification(table, documents)
+        return self._finalize_verification(table)
+    
+    def _accumulate_verification(self, table: VerificationTable, documents: List[Dict[str, Any]],
+                                 export: Optional[VerificationExport] = None):
+        """Fold a window of enhanced documents into the Stage 11 totals, and export its rows"""
+        table.append_documents(documents, export)
+    
+    def _finalize_verification(self, table: VerificationTable) -> Dict[str, Any]:
+        """Compute Stage 11 scores and insights from the running totals"""
+        verification = table.verification()
+        num_docs = len(table)
         
         # Generate insights based on type analysis
         insights = []
@@ -1827,4 +2120,85 @@ class RobustElevenStagePipeline:
                 logger.info(f"PDF Extraction: Found {stats['pdfs_found']} PDFs, extracted {stats['pdfs_extracted']}")
                 logger.info(f"Total characters extracted from PDFs: {stats['total_chars_extracted']:,}")
         
-        return enriched_docs
\ No newline at end of file
+        return enriched_docs
+
+
+def _make_serializable(obj):
+    """Make enhancement data JSON serializable for storage"""
+    if isinstance(obj, dict):
+        return {k: _make_serializable(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_make_serializable(item) for item in obj]
+    elif hasattr(obj, '__dict__'):
+        return str(obj)
+    elif callable(obj):
+        return None
+    else:
+        return obj
+
+
+# Pipeline instance owned by each process pool worker (see _enhance_documents)
+_worker_pipeline: Optional[RobustElevenStagePipeline] = None
+
+
+def _init_pipeline_worker(citation_tokenizer: Optional[str] = None,
+                          judge_index: Optional[JudgeIndex] = None):
+    """
+    Process pool initializer: build a pipeline without a database connection
+    
+    The parent's judge index is installed as this process's shared index, so
+    Stage 5 gives the same result whatever the number of workers.
+    """
+    global _worker_pipeline
+    if judge_index is not None:
+        set_judge_index(judge_index)
+    # Workers run their stages serially; concurrency comes from the pool itself
+    _worker_pipeline = RobustElevenStagePipeline(connect_db=False, citation_tokenizer=citation_tokenizer,
+                                                 stage_executor='serial', judge_index=judge_index)
+    # Each task's calls go back to the parent, which aggregates and traces them
+    _worker_pipeline.profiler.buffer_calls = True
+
+
+def _worker_error_collector(run_id: str) -> ErrorCollector:
+    """Collector for one pool task, spilling (if it must) to a file of its own"""
+    return ErrorCollector(run_id, spill_name=f"{run_id}.{os.getpid()}.{uuid.uuid4().hex[:12]}")
+
+
+def _run_stage_in_worker(apply_method: str, output_key: str, doc: Dict[str, Any],
+                         run_id: str) -> Tuple[Any, Dict[str, int], ErrorCollector, List[tuple]]:
+    """
+    Run one enhancement stage for one document inside a stage pool worker
+    
+    Returns the stage output with the stats, recorded errors and warnings,
+    and timings it produced; an exception that fails the stage propagates
+    to the parent, which records it.
+    """
+    pipeline = _worker_pipeline
+    pipeline.stats = pipeline._new_stats()
+    pipeline.error_collector = _worker_error_collector(run_id)
+    pipeline.profiler.reset(run_id)
+    
+    output = pipeline._run_stage(apply_method, output_key, doc)
+    stats = {key: value for key, value in pipeline.stats.items() if value}
+    return output, stats, pipeline.error_collector, pipeline.profiler.drain()
+
+
+def _enhance_document_in_worker(doc: Dict[str, Any], idx: int, total: int,
+                                tolerate_stage_errors: bool,
+                                run_id: str,
+                                cached_outputs: Optional[Dict[int, Any]] = None
+                                ) -> Tuple[Optional[Dict[str, Any]], Dict[str, int], ErrorCollector, List[tuple]]:
+    """
+    Run stages 2-8 for one document inside a pool worker
+    
+    Stats, errors and stage timings are collected fresh for every task and
+    returned with the document so the parent pipeline can merge them.
+    """
+    pipeline = _worker_pipeline
+    pipeline.stats = pipeline._new_stats()
+    pipeline.error_collector = _worker_error_collector(run_id)
+    
+    pipeline.profiler.reset(run_id)
+    
+    enhanced_doc = pipeline._enhance_document(doc, idx, total, tolerate_stage_errors, cached_outputs)
+    return enhanced_doc, pipeline.stats, pipeline.error_collector, pipeline.profiler.drain()
@@ -62,4 +62,138 @@ CREATE TRIGGER update_court_documents_updated_at
 -- Total documents: 485
 -- Document types: opinion (273), 020lead (210), opinion_doctor (2)
 -- Top courts: txed (72), ded (44), mdd (16)
--- Date range: 1996-05-02 to 2025-07-22
\ No newline at end of file
+-- Date range: 1996-05-02 to 2025-07-22
+
+-- Pipeline stage results (incremental reprocessing)
+-- One row per document and enhancement stage (2-8). A stored output is reused
+-- while its stage_version and input_hash match the current code and document.
+CREATE SCHEMA IF NOT EXISTS court_data;
+
+CREATE TABLE IF NOT EXISTS court_data.pipeline_stage_results (
+    document_id TEXT NOT NULL,           -- Source document id (court_documents.id)
+    stage SMALLINT NOT NULL,             -- Pipeline stage number
+    stage_version INTEGER NOT NULL,      -- RobustElevenStagePipeline.STAGE_VERSIONS entry
+    input_hash CHAR(64) NOT NULL,        -- sha256 of document inputs + upstream stage versions
+    output JSONB NOT NULL,               -- Stage output as stored on the document
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (document_id, stage)
+);
+
+-- Pipeline work queue (`pipeline work`)
+-- One row per court_documents row that needs processing. Workers on any node
+-- claim pending rows with FOR UPDATE SKIP LOCKED and hold a lease they renew
+-- while processing; a lease that expires (crashed worker) makes the row
+-- claimable again, until max attempts are used up.
+CREATE TABLE IF NOT EXISTS court_data.pipeline_jobs (
+    document_id INTEGER PRIMARY KEY,     -- court_documents.id
+    state VARCHAR(10) NOT NULL DEFAULT 'pending'
+        CHECK (state IN ('pending', 'leased', 'done', 'failed')),
+    lease_owner TEXT,                    -- host:pid:nonce of the claiming worker
+    lease_expires_at TIMESTAMPTZ,
+    attempts INTEGER NOT NULL DEFAULT 0, -- Claims so far
+    last_error TEXT,
+    enqueued_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_jobs_claimable
+    ON court_data.pipeline_jobs (enqueued_at)
+    WHERE state IN ('pending', 'leased');
+
+-- Done rows are purged after PIPELINE_JOB_RETENTION_DAYS
+CREATE INDEX IF NOT EXISTS idx_pipeline_jobs_done
+    ON court_data.pipeline_jobs (updated_at)
+    WHERE state = 'done';
+
+-- New and changed documents are (re)queued as pending
+CREATE OR REPLACE FUNCTION enqueue_court_document_job()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO court_data.pipeline_jobs (document_id)
+    VALUES (NEW.id)
+    ON CONFLICT (document_id) DO UPDATE SET
+        state = 'pending',
+        lease_owner = NULL,
+        lease_expires_at = NULL,
+        attempts = 0,
+        last_error = NULL,
+        enqueued_at = NOW(),
+        updated_at = NOW();
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE TRIGGER court_documents_enqueue_insert
+    AFTER INSERT ON public.court_documents
+    FOR EACH ROW
+    EXECUTE FUNCTION enqueue_court_document_job();
+
+CREATE OR REPLACE TRIGGER court_documents_enqueue_update
+    AFTER UPDATE OF content, metadata ON public.court_documents
+    FOR EACH ROW
+    WHEN (OLD.content IS DISTINCT FROM NEW.content OR OLD.metadata IS DISTINCT FROM NEW.metadata)
+    EXECUTE FUNCTION enqueue_court_document_job();
+
+-- Jobs that become pending are announced on the court_documents_changed
+-- channel with the document id as payload. The `pipeline serve` daemon
+-- LISTENs on it, leases the ids in micro-batches and processes them.
+CREATE OR REPLACE FUNCTION notify_pipeline_job_pending()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('court_documents_changed', NEW.document_id::text);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE TRIGGER pipeline_jobs_notify_pending
+    AFTER INSERT OR UPDATE OF state, enqueued_at ON court_data.pipeline_jobs
+    FOR EACH ROW
+    WHEN (NEW.state = 'pending')
+    EXECUTE FUNCTION notify_pipeline_job_pending();
+
+-- Pipeline run checkpoints (`pipeline run --resume`)
+-- Written after every committed window of a windowed run: the run's
+-- parameters, the last document it fetched and its running totals, so a
+-- run that died can continue after that document and report as one run.
+-- Completed runs are purged after PIPELINE_CHECKPOINT_RETENTION_DAYS.
+CREATE TABLE IF NOT EXISTS court_data.pipeline_run_checkpoints (
+    run_id TEXT PRIMARY KEY,
+    status VARCHAR(10) NOT NULL DEFAULT 'running'
+        CHECK (status IN ('running', 'failed', 'completed')),
+    parameters JSONB NOT NULL,           -- process_batch arguments that select documents
+    last_document JSONB,                 -- {id, created_at} of the last document fetched
+    windows_completed INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 1, -- Times the run was started or resumed
+    state JSONB NOT NULL,                -- Running totals: stats, storage/Haystack/error counts
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- CourtListener sync watermarks (`collect sync`)
+-- One row per court and endpoint: the latest date_modified applied and the
+-- ids applied at exactly that instant, so the next sync asks only for
+-- records modified since and skips the ones it already has. Advanced in the
+-- same transaction that stores each batch of records.
+CREATE TABLE IF NOT EXISTS court_data.courtlistener_sync_state (
+    court_id TEXT NOT NULL,
+    endpoint TEXT NOT NULL,              -- 'opinions' or 'dockets'
+    date_modified TIMESTAMPTZ NOT NULL,  -- High-water mark
+    boundary_ids BIGINT[] NOT NULL DEFAULT '{}', -- Record ids applied at date_modified
+    records_applied BIGINT NOT NULL DEFAULT 0,
+    last_synced_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (court_id, endpoint)
+);
+
+-- Documents from CourtListener are upserted with ON CONFLICT on their
+-- CourtListener id, by `collect` and `collect sync` alike: one partial unique
+-- index per SYNC_ENDPOINTS document type. A database that already holds the
+-- same record twice must run migrations/001_dedupe_courtlistener_ids.sql
+-- first, or creating the indexes fails.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_court_documents_opinion_id
+    ON public.court_documents ((metadata->>'opinion_id'))
+    WHERE document_type = 'opinion';
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_court_documents_docket_id
+    ON public.court_documents ((metadata->>'docket_id'))
+    WHERE document_type = 'recap_docket';
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark eyecite citation tokenizers on the test_data/ opinion fixtures
+
+Runs get_citations over every opinion text found in test_data/ (and over
+longer texts made by repeating them, to approximate long appellate
+opinions) with the default tokenizer and, when installed, the Hyperscan
+tokenizer. Reports time per text, throughput, the speedup and whether both
+tokenizers found the same citations.
+
+Usage:
+    python scripts/benchmark_citation_tokenizers.py
+    python scripts/benchmark_citation_tokenizers.py --repeat 5 --scale 1 4 16
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eyecite import get_citations
+
+from extractors.citation_tokenizer import get_citation_tokenizer, HYPERSCAN_AVAILABLE
+from services.config import HYPERSCAN_CACHE_DIR
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test_data')
+
+# Fields that hold opinion text in CourtListener payloads and pipeline documents
+TEXT_FIELDS = ('plain_text', 'html_with_citations', 'html', 'xml_harvard', 'html_lawbox',
+               'html_columbia', 'content', 'text')
+
+MIN_TEXT_LENGTH = 1000
+
+
+def load_opinion_texts(data_dir: str = TEST_DATA_DIR) -> List[Tuple[str, str]]:
+    """(label, text) for every opinion text in the JSON fixtures"""
+    texts = []
+
+    def walk(node, source):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in TEXT_FIELDS and isinstance(value, str) and len(value) >= MIN_TEXT_LENGTH:
+                    texts.append((f"{source}:{key}#{len(texts)}", value))
+                else:
+                    walk(value, source)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, source)
+
+    for path in sorted(glob.glob(os.path.join(data_dir, '**', '*.json'), recursive=True)):
+        with open(path, encoding='utf-8') as fixture:
+            walk(json.load(fixture), os.path.relpath(path, data_dir))
+    return texts
+
+
+def citation_signature(text: str, tokenizer) -> List[Tuple[str, str]]:
+    return [(type(cite).__name__, str(cite)) for cite in get_citations(text, tokenizer=tokenizer)]
+
+
+def time_tokenizer(text: str, tokenizer, repeat: int) -> float:
+    """Best of repeat runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        get_citations(text, tokenizer=tokenizer)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per text; the best time is reported')
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 4, 16],
+                        help='Also benchmark each text repeated this many times')
+    args = parser.parse_args()
+
+    texts = load_opinion_texts()
+    if not texts:
+        print(f"No opinion texts of at least {MIN_TEXT_LENGTH} characters found in {TEST_DATA_DIR}")
+        return 1
+
+    tokenizers = {'default': get_citation_tokenizer('default')}
+    if HYPERSCAN_AVAILABLE:
+        start = time.perf_counter()
+        tokenizers['hyperscan'] = get_citation_tokenizer('hyperscan')
+        print(f"Hyperscan database ready in {time.perf_counter() - start:.2f}s "
+              f"(cached in {HYPERSCAN_CACHE_DIR}; rerun to see the cached load time)")
+    else:
+        print("hyperscan is not installed (pip install hyperscan); benchmarking the default tokenizer only")
+
+    # Warm up eyecite's lazily built structures so the first text is not penalised
+    for tokenizer in tokenizers.values():
+        get_citations(texts[0][1][:MIN_TEXT_LENGTH], tokenizer=tokenizer)
+
+    header = f"{'text':<48} {'chars':>9} {'cites':>6}" + ''.join(
+        f" {name + ' ms':>13} {name + ' MB/s':>14}" for name in tokenizers
+    )
+    if len(tokenizers) > 1:
+        header += f" {'speedup':>8} {'same':>5}"
+    print(header)
+    print('-' * len(header))
+
+    totals = {name: 0.0 for name in tokenizers}
+    for label, text in texts:
+        for scale in args.scale:
+            sample = '\n\n'.join([text] * scale)
+            signature = citation_signature(sample, tokenizers['default'])
+            name_column = label[:43] + ('' if scale == 1 else f" x{scale}")
+            row = f"{name_column:<48} {len(sample):>9} {len(signature):>6}"
+            timings = {}
+            for name, tokenizer in tokenizers.items():
+                timings[name] = time_tokenizer(sample, tokenizer, args.repeat)
+                totals[name] += timings[name]
+                megabytes_per_second = len(sample.encode('utf-8')) / 1e6 / timings[name] if timings[name] else 0.0
+                row += f" {timings[name] * 1000:>13.1f} {megabytes_per_second:>14.2f}"
+            if len(tokenizers) > 1:
+                same = citation_signature(sample, tokenizers['hyperscan']) == signature
+                row += f" {timings['default'] / timings['hyperscan']:>7.1f}x {'yes' if same else 'NO':>5}"
+            print(row)
+
+    print()
+    for name, total in totals.items():
+        print(f"Total {name}: {total:.3f}s")
+    if len(tokenizers) > 1 and totals['hyperscan']:
+        print(f"Overall speedup: {totals['default'] / totals['hyperscan']:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Persistent cache of eyecite citation extraction results
+
+Pipeline Stage 3 runs eyecite over the full text of every document it sees,
+even when the same opinion comes back through the in-memory pipeline and
+again through `pipeline run`. This cache stores the extracted citations in a
+local SQLite file keyed by a SHA-256 of the content and the eyecite version,
+so a repeated text skips tokenization entirely. Least recently used entries
+are evicted once the cache grows past its size limit (see
+services.sqlite_cache); on any SQLite error extraction carries on uncached.
+"""
+
+import hashlib
+import json
+import logging
+import zlib
+from typing import Dict, Any, List, Optional
+
+from services.config import CITATION_CACHE_PATH, CITATION_CACHE_MAX_BYTES
+from services.sqlite_cache import SQLiteLRUCache
+
+try:
+    from importlib.metadata import version as _package_version
+    EYECITE_VERSION = _package_version('eyecite')
+except Exception:
+    EYECITE_VERSION = 'unknown'
+
+logger = logging.getLogger(__name__)
+
+
+class CitationCache(SQLiteLRUCache):
+    """SQLite-backed cache of citation lists keyed by content hash"""
+
+    TABLE = 'citation_cache'
+    KEY_COLUMNS = ('content_hash TEXT NOT NULL', 'extractor_version TEXT NOT NULL')
+    VALUE_COLUMNS = ('payload BLOB NOT NULL',)
+    LABEL = 'Citation cache'
+
+    # Bump when the layout of the cached citation dicts changes
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: str, max_bytes: int = CITATION_CACHE_MAX_BYTES):
+        """
+        Args:
+            path: SQLite file; its directory is created on first use
+            max_bytes: Total size of cached payloads before eviction
+        """
+        super().__init__(path, max_bytes)
+        self.extractor_version = f"eyecite-{EYECITE_VERSION}/v{self.FORMAT_VERSION}"
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls) -> Optional['CitationCache']:
+        """Cache configured by CITATION_CACHE_PATH, or None when it is set empty"""
+        if not CITATION_CACHE_PATH:
+            return None
+        return cls(CITATION_CACHE_PATH, CITATION_CACHE_MAX_BYTES)
+
+    @staticmethod
+    def content_key(content: str) -> str:
+        """SHA-256 hex digest of the document text"""
+        return hashlib.sha256(content.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def get(self, content: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached citations for this text, or None on a miss"""
+        row = self._lookup((self.content_key(content), self.extractor_version), ('payload',))
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            citations = json.loads(zlib.decompress(row[0]))
+        except (zlib.error, ValueError) as e:
+            with self._lock:
+                self._disable(e)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return citations
+
+    def put(self, content: str, citations: List[Dict[str, Any]]):
+        """Store the citations extracted from this text"""
+        payload = zlib.compress(json.dumps(citations, default=str).encode('utf-8'))
+        self._store((self.content_key(content), self.extractor_version), {'payload': payload}, len(payload))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of this instance and the cache size on disk"""
+        stats = self._size_stats()
+        stats.update(extractor_version=self.extractor_version, hits=self.hits, misses=self.misses)
+        return stats
@@ -16,6 +16,84 @@ DATABASE_URL = os.getenv('DATABASE_URL', f'postgresql://aletheia:aletheia123@{DA
 COURTLISTENER_API_TOKEN = os.getenv('COURTLISTENER_API_TOKEN', '')
 FLP_API_KEY = os.getenv('FLP_API_KEY', '')
 
+# Rows per upsert statement/transaction in pipeline Stage 9
+STORAGE_CHUNK_SIZE = int(os.getenv('STORAGE_CHUNK_SIZE', '500'))
+
+# Local cache of eyecite results for pipeline Stage 3 (set empty to disable)
+CITATION_CACHE_PATH = os.getenv(
+    'CITATION_CACHE_PATH',
+    os.path.join(os.path.expanduser('~'), '.cache', 'court-processor', 'citation_cache.sqlite3')
+)
+CITATION_CACHE_MAX_BYTES = int(os.getenv('CITATION_CACHE_MAX_MB', '512')) * 1024 * 1024
+
+# How independent enhancement stages of one document run: 'serial', 'thread' or 'process'
+STAGE_EXECUTOR = os.getenv('STAGE_EXECUTOR', 'serial')
+# Stages that can run at once (stages 2, 3, 5, 6 and 7 are independent)
+STAGE_EXECUTOR_WORKERS = int(os.getenv('STAGE_EXECUTOR_WORKERS', '5'))
+
+# `pipeline serve`: LISTEN channel fed by the pipeline_jobs trigger in
+# schema.sql, micro-batch size, longest wait (seconds) before a partial batch
+# runs, and the port of its /health endpoint
+PIPELINE_NOTIFY_CHANNEL = os.getenv('PIPELINE_NOTIFY_CHANNEL', 'court_documents_changed')
+PIPELINE_SERVE_BATCH_SIZE = int(os.getenv('PIPELINE_SERVE_BATCH_SIZE', '50'))
+PIPELINE_SERVE_MAX_LATENCY = float(os.getenv('PIPELINE_SERVE_MAX_LATENCY', '2.0'))
+PIPELINE_HEALTH_PORT = int(os.getenv('PIPELINE_HEALTH_PORT', '8105'))
+
+# Pipeline error collection: records kept in memory before the rest are
+# written to a JSONL spill file in ERROR_SPILL_DIR, and the number of example
+# records then kept per stage for each of errors, warnings and validation failures
+ERROR_COLLECTOR_MAX_RECORDS = int(os.getenv('ERROR_COLLECTOR_MAX_RECORDS', '10000'))
+ERROR_SAMPLE_SIZE = int(os.getenv('ERROR_SAMPLE_SIZE', '20'))
+ERROR_SPILL_DIR = os.getenv(
+    'ERROR_SPILL_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'court-processor', 'errors')
+)
+
+# `pipeline work`: lease length (seconds) on claimed court_data.pipeline_jobs
+# rows, claims before a job is marked failed, and idle polling interval
+PIPELINE_JOB_LEASE_SECONDS = int(os.getenv('PIPELINE_JOB_LEASE_SECONDS', '300'))
+PIPELINE_JOB_MAX_ATTEMPTS = int(os.getenv('PIPELINE_JOB_MAX_ATTEMPTS', '5'))
+PIPELINE_WORK_POLL_INTERVAL = float(os.getenv('PIPELINE_WORK_POLL_INTERVAL', '2.0'))
+# Days done pipeline_jobs rows are kept before idle workers delete them (0 keeps them)
+PIPELINE_JOB_RETENTION_DAYS = float(os.getenv('PIPELINE_JOB_RETENTION_DAYS', '7'))
+# Days checkpoints of completed `pipeline run`s are kept (0 keeps them)
+PIPELINE_CHECKPOINT_RETENTION_DAYS = float(os.getenv('PIPELINE_CHECKPOINT_RETENTION_DAYS', '30'))
+
+# eyecite tokenizer for pipeline Stage 3: 'default' or 'hyperscan'
+CITATION_TOKENIZER = os.getenv('CITATION_TOKENIZER', 'default')
+# Where the compiled Hyperscan database is kept between runs
+HYPERSCAN_CACHE_DIR = os.getenv(
+    'HYPERSCAN_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'court-processor', 'hyperscan')
+)
+
+# Judge index for pipeline Stage 5: roster file, and whether judge names
+# already stored in court_documents.metadata are added when it is built
+JUDGE_ROSTER_PATH = os.getenv(
+    'JUDGE_ROSTER_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'judge_roster.txt')
+)
+JUDGE_INDEX_FROM_DATABASE = os.getenv('JUDGE_INDEX_FROM_DATABASE', 'true').lower() == 'true'
+
+# Local cache of CourtListener API responses: off unless set to a file path,
+# e.g. ~/.cache/court-processor/http_cache.sqlite3
+HTTP_CACHE_PATH = os.getenv('HTTP_CACHE_PATH', '')
+HTTP_CACHE_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_MB', '1024')) * 1024 * 1024
+
+# CourtListener records fetched by id (clusters, dockets, people): ids per
+# id__in request, how long (milliseconds) loads are collected into one, and
+# records each loader keeps in memory (least recently used are dropped)
+CL_BATCH_SIZE = int(os.getenv('CL_BATCH_SIZE', '100'))
+CL_BATCH_WINDOW = int(os.getenv('CL_BATCH_WINDOW_MS', '10')) / 1000
+CL_LOADER_MEMO_SIZE = int(os.getenv('CL_LOADER_MEMO_SIZE', '10000'))
+
+# `collect sync`: how far back the first sync of a court reaches (days),
+# and records stored per transaction before the watermark advances
+SYNC_INITIAL_LOOKBACK_DAYS = int(os.getenv('SYNC_INITIAL_LOOKBACK_DAYS', '30'))
+SYNC_BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE', '100'))
+# `collect` ingestion: processed documents stored per batch as they stream in
+INGEST_STORE_BATCH_SIZE = int(os.getenv('INGEST_STORE_BATCH_SIZE', '100'))
+
 # Service endpoints
 SERVICES = {
     'haystack': {
@@ -9,11 +9,20 @@ Implements bulk data retrieval from CourtListener including:
 """
 import aiohttp
 import asyncio
+import json
 import logging
-from typing import Dict, List, Optional, AsyncIterator, Any
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, AsyncIterator, Any, Tuple
 from datetime import datetime, date, timedelta
 from urllib.parse import urlencode, urlparse, parse_qs
 import os
+import re
+
+from utils.configuration import get_settings
+from utils.rate_limiter import TokenBucket
+from utils.batch_loader import BatchLoader
+from services.config import CL_BATCH_SIZE, CL_BATCH_WINDOW, CL_LOADER_MEMO_SIZE
+from services.http_cache import HttpResponseCache
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +35,7 @@ class CourtListenerService:
     # API Endpoints
     BASE_URL = "https://www.courtlistener.com"
     OPINIONS_ENDPOINT = "/api/rest/v4/opinions/"
+    CLUSTERS_ENDPOINT = "/api/rest/v4/clusters/"
     SEARCH_ENDPOINT = "/api/rest/v4/search/"
     DOCKETS_ENDPOINT = "/api/rest/v4/dockets/"
     RECAP_DOCS_ENDPOINT = "/api/rest/v4/recap-documents/"
@@ -35,6 +45,9 @@ class CourtListenerService:
     CITATION_LOOKUP_ENDPOINT = "/api/rest/v4/citation-lookup/"
     BULK_DATA_ENDPOINT = "/api/bulk-data/"
     
+    # Last page number requested from page-numbered search results
+    MAX_SEARCH_PAGES = 100
+    
     # Court IDs for IP-heavy venues
     IP_COURTS = {
         'federal_circuit': ['cafc', 'uscfc', 'cit'],
@@ -50,11 +63,33 @@ class CourtListenerService:
         '840': 'Trademark'
     }
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, requests_per_second: Optional[float] = None,
+                 response_cache: Optional[HttpResponseCache] = None, use_cache: bool = True):
+        """
+        Args:
+            api_key: CourtListener API token (defaults to COURTLISTENER_API_KEY)
+            requests_per_second: Request rate shared by all concurrent callers
+                (defaults to the api_rate_limit processing setting)
+            response_cache: Cache of GET responses (defaults to the one
+                configured by HTTP_CACHE_PATH)
+            use_cache: False to send every request to the API
+        """
         self.api_key = api_key or os.getenv('COURTLISTENER_API_KEY')
         self.session = None
         self.rate_limit_remaining = 5000
         self.rate_limit_reset = None
+        self.rate_limiter = TokenBucket(requests_per_second or get_settings().processing.api_rate_limit)
+        self.response_cache = (response_cache or HttpResponseCache.from_config()) if use_cache else None
+        
+        # Records by id, batched into id__in requests; the most recently
+        # used CL_LOADER_MEMO_SIZE of each kind are memoized
+        self.cluster_loader = self._id_loader(self.CLUSTERS_ENDPOINT, 'clusters')
+        self.docket_loader = self._id_loader(self.DOCKETS_ENDPOINT, 'dockets')
+        self.person_loader = self._id_loader(self.PEOPLE_ENDPOINT, 'people')
+        self.recap_documents_loader = BatchLoader(
+            self._fetch_recap_documents_batch, CL_BATCH_SIZE, CL_BATCH_WINDOW, 'RECAP documents',
+            CL_LOADER_MEMO_SIZE
+        )
     
     @property
     def headers(self) -> Dict[str, str]:
@@ -70,6 +105,16 @@ class CourtListenerService:
             self.session = aiohttp.ClientSession()
         return self.session
     
+    @asynccontextmanager
+    async def _request(self, method: str, url: str, **kwargs):
+        """Send a request once the rate limiter allows it"""
+        session = await self._get_session()
+        await self.rate_limiter.acquire()
+        headers = {**self.headers, **kwargs.pop('headers', {})}
+        async with session.request(method, url, headers=headers, **kwargs) as response:
+            await self._handle_rate_limit(response)
+            yield response
+    
     async def _handle_rate_limit(self, response: aiohttp.ClientResponse):
         """Handle rate limit headers"""
         if 'X-RateLimit-Remaining' in response.headers:
@@ -79,10 +124,14 @@ class CourtListenerService:
                 int(response.headers['X-RateLimit-Reset'])
             )
         
-        # If we're close to limit, slow down
+        # Slow down as the quota runs low, spreading what is left until reset
+        if 'X-RateLimit-Remaining' in response.headers:
+            self.rate_limiter.observe_quota(
+                self.rate_limit_remaining,
+                self.rate_limit_reset.timestamp() if self.rate_limit_reset else None
+            )
         if self.rate_limit_remaining < 100:
             logger.warning(f"Rate limit low: {self.rate_limit_remaining} remaining")
-            await asyncio.sleep(1)
     
     def _extract_cursor_from_url(self, url: str) -> Optional[str]:
         """Extract cursor parameter from next URL"""
@@ -90,6 +139,192 @@ class CourtListenerService:
         params = parse_qs(parsed.query)
         return params.get('cursor', [None])[0]
     
+    async def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                        use_cache: bool = True) -> Tuple[int, Any]:
+        """
+        GET a JSON resource: (status, JSON body), or (status, error text) on failure
+        
+        A fresh cached response (a detail URL within its TTL) is returned
+        without a request. Any other cached one is revalidated, and a 304
+        answer returns it as a 200. use_cache=False always asks the server
+        and leaves the cache untouched. Cache reads and writes run in a
+        thread, off the event loop.
+        """
+        cache = self.response_cache if use_cache else None
+        cached = await asyncio.to_thread(cache.get, url, params) if cache else None
+        if cached is not None and cached.fresh:
+            cache.hits += 1
+            return 200, cached.json()
+        
+        headers = cached.conditional_headers() if cached is not None else {}
+        async with self._request('GET', url, params=params, headers=headers) as response:
+            if response.status == 304 and cached is not None:
+                cache.revalidated += 1
+                await asyncio.to_thread(cache.renew, url, params)
+                return 200, cached.json()
+            if cache:
+                cache.misses += 1
+            body = await response.text()
+            if response.status != 200:
+                return response.status, body
+            if cache:
+                await asyncio.to_thread(cache.put, url, params, body,
+                                        response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return response.status, json.loads(body)
+    
+    @staticmethod
+    def id_from_url(value: Any) -> Optional[int]:
+        """Record id of an API URL (.../clusters/123/ -> 123), or of an id itself"""
+        if isinstance(value, int):
+            return value
+        match = re.search(r'/(\d+)/?$', value) if isinstance(value, str) else None
+        return int(match.group(1)) if match else None
+    
+    def _id_loader(self, endpoint: str, name: str) -> BatchLoader:
+        async def fetch(ids: List[int]) -> Dict[int, Dict]:
+            return await self.fetch_by_ids(endpoint, ids)
+        return BatchLoader(fetch, CL_BATCH_SIZE, CL_BATCH_WINDOW, name, CL_LOADER_MEMO_SIZE)
+    
+    async def fetch_by_ids(self, endpoint: str, ids: List[int]) -> Dict[int, Dict]:
+        """
+        Fetch the records of an endpoint with the given ids in id__in requests
+        
+        The id__in responses themselves are not cached: each record is
+        cached under its detail URL instead, so a fresh one is served without
+        a request and one changed record does not invalidate a whole batch.
+        
+        Args:
+            endpoint: Endpoint path (e.g., CLUSTERS_ENDPOINT)
+            ids: Record ids; duplicates are requested once
+            
+        Returns:
+            {id: record} for the ids found
+        """
+        ids = sorted(set(ids))
+        url = f"{self.BASE_URL}{endpoint}"
+        cache = self.response_cache
+        records = await asyncio.to_thread(self._cached_records, cache, url, ids) if cache else {}
+        ids = [record_id for record_id in ids if record_id not in records]
+        
+        fetched = {}
+        for start in range(0, len(ids), CL_BATCH_SIZE):
+            chunk = ids[start:start + CL_BATCH_SIZE]
+            params = {'id__in': ','.join(str(record_id) for record_id in chunk), 'page_size': len(chunk)}
+            async for record in self._iter_pages(url, params, label=endpoint.strip('/').rsplit('/', 1)[-1],
+                                                 use_cache=False):
+                if record.get('id') is not None:
+                    fetched[record['id']] = record
+        if cache:
+            cache.misses += len(ids)
+            await asyncio.to_thread(self._cache_records, cache, url, fetched)
+        records.update(fetched)
+        return records
+    
+    @staticmethod
+    def _cached_records(cache: HttpResponseCache, url: str, ids: List[int]) -> Dict[int, Dict]:
+        """Fresh cached records of the ids, by the detail URLs under url"""
+        records = {}
+        for record_id in ids:
+            cached = cache.get(f"{url}{record_id}/")
+            if cached is not None and cached.fresh:
+                cache.hits += 1
+                records[record_id] = cached.json()
+        return records
+    
+    @staticmethod
+    def _cache_records(cache: HttpResponseCache, url: str, records: Dict[int, Dict]):
+        """Store records fetched in a batch under their detail URLs"""
+        for record_id, record in records.items():
+            cache.put(f"{url}{record_id}/", None, json.dumps(record))
+    
+    async def _fetch_recap_documents_batch(self, docket_ids: List[int]) -> Dict[int, List[Dict]]:
+        """RECAP documents of several dockets, fetched concurrently"""
+        documents = await asyncio.gather(*(self.fetch_recap_documents(docket_id) for docket_id in docket_ids))
+        return dict(zip(docket_ids, documents))
+    
+    async def get_cluster(self, cluster: Any) -> Optional[Dict]:
+        """Opinion cluster by id or URL, batched and memoized"""
+        cluster_id = self.id_from_url(cluster)
+        return await self.cluster_loader.load(cluster_id) if cluster_id is not None else None
+    
+    async def get_docket(self, docket: Any) -> Optional[Dict]:
+        """Docket by id or URL, batched and memoized"""
+        docket_id = self.id_from_url(docket)
+        return await self.docket_loader.load(docket_id) if docket_id is not None else None
+    
+    async def get_person(self, person: Any) -> Optional[Dict]:
+        """Person (judge) by id or URL, batched and memoized"""
+        person_id = self.id_from_url(person)
+        return await self.person_loader.load(person_id) if person_id is not None else None
+    
+    async def get_recap_documents(self, docket_id: int) -> List[Dict]:
+        """RECAP documents of a docket, memoized (see fetch_recap_documents)"""
+        return await self.recap_documents_loader.load(docket_id) or []
+    
+    def loader_stats(self) -> List[Dict[str, Any]]:
+        """Requests, memo hits and batches of the by-id loaders"""
+        return [loader.stats() for loader in (self.cluster_loader, self.docket_loader,
+                                              self.person_loader, self.recap_documents_loader)]
+    
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Response cache counters and size, or None without a cache"""
+        return self.response_cache.stats() if self.response_cache else None
+    
+    async def _iter_pages(self,
+                          url: str,
+                          params: Dict[str, Any],
+                          max_results: Optional[int] = None,
+                          pagination: str = 'cursor',
+                          label: str = 'results',
+                          use_cache: bool = True) -> AsyncIterator[Dict]:
+        """
+        Yield results as each page arrives, requesting the next page while
+        the caller works through the current one
+        
+        Args:
+            url: Endpoint URL
+            params: Query parameters of the first page
+            max_results: Stop after this many results (None for all pages)
+            pagination: 'cursor' follows the cursor of each page's next URL,
+                'page' requests page numbers 2, 3, ... up to MAX_SEARCH_PAGES
+            label: What is fetched, for log messages
+            use_cache: Serve pages from the response cache when fresh
+        """
+        params = dict(params)
+        page = 1
+        yielded = 0
+        pending = asyncio.ensure_future(self._get_json(url, dict(params), use_cache))
+        try:
+            while pending is not None:
+                status, data = await pending
+                pending = None
+                if status != 200:
+                    logger.error(f"Failed to fetch {label}: {status} - {data}")
+                    return
+                
+                results = data.get('results', [])
+                if max_results is not None:
+                    results = results[:max_results - yielded]
+                yielded += len(results)
+                
+                # Prefetch the next page before handing out this one
+                if data.get('next') and (max_results is None or yielded < max_results):
+                    page += 1
+                    if pagination == 'cursor':
+                        params['cursor'] = self._extract_cursor_from_url(data['next'])
+                    else:
+                        params['page'] = page
+                    if pagination == 'cursor' or page <= self.MAX_SEARCH_PAGES:
+                        pending = asyncio.ensure_future(self._get_json(url, dict(params), use_cache))
+                
+                logger.debug(f"Fetched {yielded} {label}...")
+                for result in results:
+                    yield result
+        finally:
+            # The caller stopped early: drop the page in flight
+            if pending is not None:
+                pending.cancel()
+    
     async def fetch_opinions(self, 
                            court_id: Optional[str] = None,
                            date_filed_after: Optional[str] = None,
@@ -105,11 +340,25 @@ class CourtListenerService:
         Returns:
             List of opinion documents
         """
-        session = await self._get_session()
-        results = []
+        return [opinion async for opinion in self.iter_opinions(court_id, date_filed_after, max_results)]
+    
+    async def iter_opinions(self,
+                            court_id: Optional[str] = None,
+                            date_filed_after: Optional[str] = None,
+                            max_results: Optional[int] = 100) -> AsyncIterator[Dict]:
+        """
+        Stream traditional opinion data (non-RECAP) page by page
         
+        Args:
+            court_id: Court identifier (e.g., 'ca9')
+            date_filed_after: ISO date string for filtering
+            max_results: Maximum number of results to yield (None for all)
+            
+        Yields:
+            Opinion documents
+        """
         params = {
-            'page_size': min(100, max_results)
+            'page_size': min(100, max_results or 100)
         }
         
         if court_id:
@@ -120,26 +369,46 @@ class CourtListenerService:
         
         url = f"{self.BASE_URL}{self.OPINIONS_ENDPOINT}"
         
-        async with session.get(url, params=params, headers=self.headers) as response:
-            await self._handle_rate_limit(response)
-            
-            if response.status == 200:
-                data = await response.json()
-                results.extend(data.get('results', []))
-                
-                # Handle pagination with cursor
-                while data.get('next') and len(results) < max_results:
-                    cursor = self._extract_cursor_from_url(data['next'])
-                    params['cursor'] = cursor
-                    
-                    async with session.get(url, params=params, headers=self.headers) as resp:
-                        await self._handle_rate_limit(resp)
-                        data = await resp.json()
-                        results.extend(data.get('results', []))
-            else:
-                logger.error(f"Failed to fetch opinions: {response.status}")
+        async for opinion in self._iter_pages(url, params, max_results, label='opinions'):
+            yield opinion
+    
+    async def iter_modified(self,
+                            endpoint: str,
+                            court_id: str,
+                            modified_since: str,
+                            max_results: Optional[int] = None) -> AsyncIterator[Dict]:
+        """
+        Stream the opinions or dockets of a court modified at or after a
+        time, oldest modification first (for incremental syncs)
+        
+        Pages bypass the response cache: a sync must see the latest changes.
         
-        return results[:max_results]
+        Args:
+            endpoint: 'opinions' or 'dockets'
+            court_id: Court identifier (e.g., 'txed')
+            modified_since: ISO timestamp; records with date_modified >= it
+            max_results: Maximum number of records to yield (None for all)
+            
+        Yields:
+            Opinion or docket records in date_modified order
+        """
+        if endpoint == 'opinions':
+            url = f"{self.BASE_URL}{self.OPINIONS_ENDPOINT}"
+            params = {'cluster__docket__court': court_id}
+        elif endpoint == 'dockets':
+            url = f"{self.BASE_URL}{self.DOCKETS_ENDPOINT}"
+            params = {'court': court_id}
+        else:
+            raise ValueError(f"Cannot sync endpoint {endpoint!r}; expected 'opinions' or 'dockets'")
+        params.update({
+            'date_modified__gte': modified_since,
+            'order_by': 'date_modified',
+            'page_size': min(100, max_results or 100)
+        })
+        
+        async for record in self._iter_pages(url, params, max_results,
+                                             label=f"modified {endpoint}", use_cache=False):
+            yield record
     
     async def fetch_recap_dockets(self,
                                 court_ids: Optional[List[str]] = None,
@@ -158,11 +427,31 @@ class CourtListenerService:
         Returns:
             List of docket metadata
         """
-        session = await self._get_session()
-        results = []
+        return [
+            docket async for docket in self.iter_recap_dockets(
+                court_ids, date_filed_after, nature_of_suit, max_results
+            )
+        ]
+    
+    async def iter_recap_dockets(self,
+                                 court_ids: Optional[List[str]] = None,
+                                 date_filed_after: Optional[str] = None,
+                                 nature_of_suit: Optional[List[str]] = None,
+                                 max_results: Optional[int] = 100) -> AsyncIterator[Dict]:
+        """
+        Stream RECAP docket data with IP filtering page by page
         
+        Args:
+            court_ids: List of court IDs to filter
+            date_filed_after: ISO date string
+            nature_of_suit: List of nature of suit codes (e.g., ['830', '840'])
+            max_results: Maximum results to yield (None for all)
+            
+        Yields:
+            Docket metadata
+        """
         params = {
-            'page_size': min(100, max_results)
+            'page_size': min(100, max_results or 100)
         }
         
         if court_ids:
@@ -176,31 +465,8 @@ class CourtListenerService:
         
         logger.info(f"Fetching RECAP dockets with params: {params}")
         
-        async with session.get(url, params=params, headers=self.headers) as response:
-            await self._handle_rate_limit(response)
-            
-            if response.status == 200:
-                data = await response.json()
-                results.extend(data.get('results', []))
-                
-                # Cursor pagination for large datasets
-                while data.get('next') and len(results) < max_results:
-                    cursor = self._extract_cursor_from_url(data['next'])
-                    params['cursor'] = cursor
-                    
-                    async with session.get(url, params=params, headers=self.headers) as resp:
-                        await self._handle_rate_limit(resp)
-                        data = await resp.json()
-                        results.extend(data.get('results', []))
-                        
-                        # Log progress
-                        logger.info(f"Fetched {len(results)} dockets...")
-            else:
-                logger.error(f"Failed to fetch dockets: {response.status}")
-                error_text = await response.text()
-                logger.error(f"Error response: {error_text}")
-        
-        return results[:max_results]
+        async for docket in self._iter_pages(url, params, max_results, label='dockets'):
+            yield docket
     
     async def fetch_recap_documents(self,
                                   docket_id: int,
@@ -215,8 +481,21 @@ class CourtListenerService:
         Returns:
             List of document metadata
         """
-        session = await self._get_session()
+        return [document async for document in self.iter_recap_documents(docket_id, document_type)]
+    
+    async def iter_recap_documents(self,
+                                   docket_id: int,
+                                   document_type: Optional[str] = None) -> AsyncIterator[Dict]:
+        """
+        Stream all RECAP documents of a specific docket page by page
         
+        Args:
+            docket_id: The docket ID
+            document_type: Filter by document type
+            
+        Yields:
+            Document metadata
+        """
         params = {
             'docket_entry__docket__id': docket_id,
             'page_size': 100
@@ -226,26 +505,9 @@ class CourtListenerService:
             params['document_type'] = document_type
         
         url = f"{self.BASE_URL}{self.RECAP_DOCS_ENDPOINT}"
-        results = []
-        
-        async with session.get(url, params=params, headers=self.headers) as response:
-            await self._handle_rate_limit(response)
-            
-            if response.status == 200:
-                data = await response.json()
-                results.extend(data.get('results', []))
-                
-                # Get all documents for this docket
-                while data.get('next'):
-                    cursor = self._extract_cursor_from_url(data['next'])
-                    params['cursor'] = cursor
-                    
-                    async with session.get(url, params=params, headers=self.headers) as resp:
-                        await self._handle_rate_limit(resp)
-                        data = await resp.json()
-                        results.extend(data.get('results', []))
         
-        return results
+        async for document in self._iter_pages(url, params, label='RECAP documents'):
+            yield document
     
     async def search_recap_documents(self,
                                    params: Dict[str, Any],
@@ -260,7 +522,6 @@ class CourtListenerService:
         Returns:
             List of RECAP documents
         """
-        session = await self._get_session()
         url = f"{self.BASE_URL}{self.SEARCH_ENDPOINT}"
         
         # Set default params and page size
@@ -275,14 +536,12 @@ class CourtListenerService:
             logger.debug(f"RECAP search URL: {url}")
             logger.debug(f"RECAP search params: {search_params}")
             
-            async with session.get(url, params=search_params, headers=self.headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    results = data.get('results', [])[:max_results]
-                    logger.info(f"Found {len(results)} RECAP documents")
-                else:
-                    error_text = await response.text()
-                    logger.error(f"RECAP search failed: {response.status} - {error_text}")
+            status, data = await self._get_json(url, search_params)
+            if status == 200:
+                results = data.get('results', [])[:max_results]
+                logger.info(f"Found {len(results)} RECAP documents")
+            else:
+                logger.error(f"RECAP search failed: {status} - {data}")
         except Exception as e:
             logger.error(f"RECAP search error: {e}")
         
@@ -305,12 +564,29 @@ class CourtListenerService:
         Returns:
             List of search results
         """
-        session = await self._get_session()
+        return [result async for result in self.iter_search_recap(query, court_ids, date_range, max_results)]
+    
+    async def iter_search_recap(self,
+                                query: str,
+                                court_ids: Optional[List[str]] = None,
+                                date_range: Optional[tuple] = None,
+                                max_results: Optional[int] = 100) -> AsyncIterator[Dict]:
+        """
+        Stream full-text search results of RECAP documents page by page
         
+        Args:
+            query: Search query
+            court_ids: List of courts to search
+            date_range: Tuple of (start_date, end_date)
+            max_results: Maximum results (None for up to MAX_SEARCH_PAGES pages)
+            
+        Yields:
+            Search results
+        """
         params = {
             'q': query,
             'type': 'r',  # RECAP documents
-            'page_size': min(100, max_results)
+            'page_size': min(100, max_results or 100)
         }
         
         if court_ids:
@@ -321,27 +597,10 @@ class CourtListenerService:
             params['filed_before'] = date_range[1]
         
         url = f"{self.BASE_URL}{self.SEARCH_ENDPOINT}"
-        results = []
-        
-        async with session.get(url, params=params, headers=self.headers) as response:
-            await self._handle_rate_limit(response)
-            
-            if response.status == 200:
-                data = await response.json()
-                results.extend(data.get('results', []))
-                
-                # Pagination
-                page = 2
-                while data.get('next') and len(results) < max_results and page <= 100:
-                    params['page'] = page
-                    
-                    async with session.get(url, params=params, headers=self.headers) as resp:
-                        await self._handle_rate_limit(resp)
-                        data = await resp.json()
-                        results.extend(data.get('results', []))
-                        page += 1
         
-        return results[:max_results]
+        async for result in self._iter_pages(url, params, max_results, pagination='page',
+                                             label='RECAP search results'):
+            yield result
     
     async def fetch_ip_cases_bulk(self,
                                 start_date: str,
@@ -350,6 +609,10 @@ class CourtListenerService:
         """
         Bulk fetch IP-related cases from RECAP
         
+        Dockets are yielded as their page arrives, while the next page is
+        being fetched. With include_documents, the documents of up to
+        CL_BATCH_SIZE dockets are fetched together before they are yielded.
+        
         Args:
             start_date: Start date for filtering
             end_date: End date (defaults to today)
@@ -364,31 +627,48 @@ class CourtListenerService:
         
         # Stage 1: Federal Circuit courts
         logger.info("Fetching Federal Circuit IP cases...")
-        federal_dockets = await self.fetch_recap_dockets(
+        dockets = self.iter_recap_dockets(
             court_ids=self.IP_COURTS['federal_circuit'],
             date_filed_after=start_date,
             max_results=1000
         )
-        
-        for docket in federal_dockets:
-            if include_documents:
-                docket['documents'] = await self.fetch_recap_documents(docket['id'])
+        async for docket in self._with_documents(dockets, include_documents):
             yield docket
         
         # Stage 2: District courts with IP nature of suit
         logger.info("Fetching District Court IP cases...")
-        district_dockets = await self.fetch_recap_dockets(
+        dockets = self.iter_recap_dockets(
             court_ids=self.IP_COURTS['district_heavy_ip'],
             date_filed_after=start_date,
             nature_of_suit=list(self.IP_NATURE_OF_SUIT.keys()),
             max_results=5000
         )
-        
-        for docket in district_dockets:
-            if include_documents:
-                docket['documents'] = await self.fetch_recap_documents(docket['id'])
+        async for docket in self._with_documents(dockets, include_documents):
             yield docket
     
+    async def _with_documents(self, dockets: AsyncIterator[Dict], include_documents: bool) -> AsyncIterator[Dict]:
+        """Pass dockets through, attaching their RECAP documents in batches if asked to"""
+        if not include_documents:
+            async for docket in dockets:
+                yield docket
+            return
+        
+        batch = []
+        async for docket in dockets:
+            batch.append(docket)
+            if len(batch) >= CL_BATCH_SIZE:
+                for item in await self._attach_documents(batch):
+                    yield item
+                batch = []
+        for item in await self._attach_documents(batch):
+            yield item
+    
+    async def _attach_documents(self, dockets: List[Dict]) -> List[Dict]:
+        documents = await self.recap_documents_loader.load_many(docket['id'] for docket in dockets)
+        for docket, docket_documents in zip(dockets, documents):
+            docket['documents'] = docket_documents or []
+        return dockets
+    
     async def check_document_availability(self, filepath_local: str) -> bool:
         """
         Check if a RECAP document PDF is available
@@ -420,17 +700,13 @@ class CourtListenerService:
         Returns:
             Dictionary with docket info and entries with documents
         """
-        session = await self._get_session()
         
-        # Get docket metadata
-        docket_url = f"{self.BASE_URL}{self.DOCKETS_ENDPOINT}{docket_id}/"
-        async with session.get(docket_url, headers=self.headers) as response:
-            if response.status != 200:
-                return {}
-            docket_data = await response.json()
-        
-        # Get all documents for this docket
-        documents = await self.fetch_recap_documents(docket_id)
+        # Docket metadata and all documents of the docket, both memoized
+        docket, documents = await asyncio.gather(self.get_docket(docket_id),
+                                                 self.get_recap_documents(docket_id))
+        if not docket:
+            return {}
+        docket_data = dict(docket)
         
         # Group documents by docket entry
         entries_dict = {}
@@ -465,7 +741,6 @@ class CourtListenerService:
         if not pacer_doc_ids:
             return []
             
-        session = await self._get_session()
         url = f"{self.BASE_URL}{self.RECAP_QUERY_ENDPOINT}"
         
         params = {
@@ -475,15 +750,12 @@ class CourtListenerService:
         }
         
         results = []
-        async with session.get(url, params=params, headers=self.headers) as response:
-            await self._handle_rate_limit(response)
-            
-            if response.status == 200:
-                data = await response.json()
-                results = data.get('results', [])
-                logger.info(f"RECAP availability check: {len(results)}/{len(pacer_doc_ids)} documents available")
-            else:
-                logger.warning(f"RECAP query failed: {response.status}")
+        status, data = await self._get_json(url, params)
+        if status == 200:
+            results = data.get('results', [])
+            logger.info(f"RECAP availability check: {len(results)}/{len(pacer_doc_ids)} documents available")
+        else:
+            logger.warning(f"RECAP query failed: {status}")
                 
         return results
     
@@ -500,7 +772,6 @@ class CourtListenerService:
         Returns:
             List of matching judge records
         """
-        session = await self._get_session()
         url = f"{self.BASE_URL}{self.PEOPLE_ENDPOINT}"
         
         params = {'page_size': 50}
@@ -518,21 +789,18 @@ class CourtListenerService:
             params['court'] = court
             
         results = []
-        async with session.get(url, params=params, headers=self.headers) as response:
-            await self._handle_rate_limit(response)
+        status, data = await self._get_json(url, params)
+        if status == 200:
+            results = data.get('results', [])
             
-            if response.status == 200:
-                data = await response.json()
-                results = data.get('results', [])
-                
-                # Filter for exact matches if full name provided
-                if judge_name and len(name_parts) > 1:
-                    results = [
-                        r for r in results 
-                        if judge_name.lower() in f"{r.get('name_first', '')} {r.get('name_last', '')}".lower()
-                    ]
-            else:
-                logger.warning(f"Judge search failed: {response.status}")
+            # Filter for exact matches if full name provided
+            if judge_name and len(name_parts) > 1:
+                results = [
+                    r for r in results 
+                    if judge_name.lower() in f"{r.get('name_first', '')} {r.get('name_last', '')}".lower()
+                ]
+        else:
+            logger.warning(f"Judge search failed: {status}")
                 
         return results
     
@@ -546,15 +814,12 @@ class CourtListenerService:
         Returns:
             Dictionary with extracted citations and validation results
         """
-        session = await self._get_session()
         url = f"{self.BASE_URL}{self.CITATION_LOOKUP_ENDPOINT}"
         
         # This is a POST endpoint
         data = {'text': text[:50000]}  # API has a text length limit
         
-        async with session.post(url, json=data, headers=self.headers) as response:
-            await self._handle_rate_limit(response)
-            
+        async with self._request('POST', url, json=data) as response:
             if response.status == 200:
                 result = await response.json()
                 return result
@@ -583,12 +848,38 @@ class CourtListenerService:
         Returns:
             List of search results
         """
-        session = await self._get_session()
+        return [
+            result async for result in self.iter_search_with_filters(
+                query, search_type, court_ids, nature_of_suit, date_range, max_results
+            )
+        ]
+    
+    async def iter_search_with_filters(self,
+                                       query: str = None,
+                                       search_type: str = 'o',
+                                       court_ids: Optional[List[str]] = None,
+                                       nature_of_suit: Optional[List[str]] = None,
+                                       date_range: Optional[tuple] = None,
+                                       max_results: Optional[int] = 100) -> AsyncIterator[Dict]:
+        """
+        Stream results of search_with_filters page by page
+        
+        Args:
+            query: Search query (optional)
+            search_type: 'o' (opinions), 'r' (RECAP), 'rd' (RECAP docs), 'd' (dockets), 'p' (people)
+            court_ids: List of court IDs
+            nature_of_suit: List of nature of suit codes (for IP: 820, 830, 840)
+            date_range: Tuple of (start_date, end_date)
+            max_results: Maximum results (None for up to MAX_SEARCH_PAGES pages)
+            
+        Yields:
+            Search results
+        """
         url = f"{self.BASE_URL}{self.SEARCH_ENDPOINT}"
         
         params = {
             'type': search_type,
-            'page_size': min(100, max_results)
+            'page_size': min(100, max_results or 100)
         }
         
         if query:
@@ -603,30 +894,10 @@ class CourtListenerService:
         if date_range:
             params['filed_after'] = date_range[0]
             params['filed_before'] = date_range[1]
-            
-        results = []
-        async with session.get(url, params=params, headers=self.headers) as response:
-            await self._handle_rate_limit(response)
-            
-            if response.status == 200:
-                data = await response.json()
-                results = data.get('results', [])
-                
-                # Handle pagination
-                page = 2
-                while data.get('next') and len(results) < max_results and page <= 100:
-                    params['page'] = page
-                    
-                    async with session.get(url, params=params, headers=self.headers) as resp:
-                        await self._handle_rate_limit(resp)
-                        if resp.status == 200:
-                            data = await resp.json()
-                            results.extend(data.get('results', []))
-                        page += 1
-            else:
-                logger.error(f"Search failed: {response.status}")
-                
-        return results[:max_results]
+        
+        async for result in self._iter_pages(url, params, max_results, pagination='page',
+                                             label='search results'):
+            yield result
     
     def extract_all_text_fields(self, opinion: Dict) -> str:
         """
@@ -664,9 +935,22 @@ class CourtListenerService:
         return '\n\n'.join(content_parts)
 
     async def close(self):
-        """Close the aiohttp session"""
+        """Close the aiohttp session and the response cache"""
         if self.session:
             await self.session.close()
+        if self.response_cache:
+            stats = self.response_cache.stats()
+            logger.info(
+                f"Response cache: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+                f"{stats['misses']} misses"
+            )
+            self.response_cache.close()
+        for stats in self.loader_stats():
+            if stats['requested']:
+                logger.info(
+                    f"Loaded {stats['name']} by id: {stats['requested']} requested, "
+                    f"{stats['memo_hits']} memoized, {stats['batches']} batches"
+                )
 
 
 # Convenience functions for common use cases
@@ -0,0 +1,168 @@
+"""
+Persistent cache of CourtListener API responses
+
+Repeated collections request the same search pages, opinions, clusters and
+dockets again. This cache stores GET response bodies in a local SQLite file
+keyed by a SHA-256 of the URL and its normalized query parameters. A
+detail response (/<endpoint>/<id>/) younger than its endpoint's TTL is
+served without a request. Everything else, and older detail responses, is
+revalidated with If-None-Match / If-Modified-Since, and a 304 answer renews
+it without downloading the body again; list and search responses without
+validators are not cached, since they could never be reused safely.
+
+The cache is opt-in (HTTP_CACHE_PATH). Like the citation cache it evicts
+least recently used entries past its size limit and, on any SQLite error,
+disables itself so requests carry on uncached (see services.sqlite_cache).
+"""
+
+import hashlib
+import json
+import logging
+import re
+import time
+import zlib
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+from services.config import HTTP_CACHE_PATH, HTTP_CACHE_MAX_BYTES
+from services.sqlite_cache import SQLiteLRUCache
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# /api/rest/v4/<endpoint>/<id>/
+_DETAIL_PATH_PATTERN = re.compile(r'^/api/rest/v\d+/([\w-]+)/(\d+)/?$')
+
+
+class CachedResponse:
+    """A stored response body with its validators"""
+
+    __slots__ = ('body', 'etag', 'last_modified', 'expires_at')
+
+    def __init__(self, body: str, etag: Optional[str], last_modified: Optional[str], expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers asking the server to answer 304 if the body is unchanged"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpResponseCache(SQLiteLRUCache):
+    """SQLite-backed cache of GET response bodies keyed by URL and parameters"""
+
+    TABLE = 'http_cache'
+    KEY_COLUMNS = ('request_key TEXT NOT NULL',)
+    VALUE_COLUMNS = ('url TEXT NOT NULL', 'body BLOB NOT NULL', 'etag TEXT', 'last_modified TEXT',
+                     'expires_at REAL NOT NULL')
+    LABEL = 'HTTP response cache'
+
+    # Seconds a detail response is served without revalidation, by
+    # endpoint. Dockets gain entries as cases are filed; opinions, clusters
+    # and people rarely change. Lists and searches always revalidate.
+    ENDPOINT_TTLS = {
+        'dockets': 6 * HOUR,
+        'recap-documents': 6 * HOUR,
+        'opinions': 7 * DAY,
+        'clusters': 7 * DAY,
+        'people': 30 * DAY,
+    }
+    DEFAULT_TTL = DAY
+
+    def __init__(self, path: str, max_bytes: int = HTTP_CACHE_MAX_BYTES,
+                 ttls: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            path: SQLite file; its directory is created on first use
+            max_bytes: Total size of cached bodies before eviction
+            ttls: Detail TTLs (seconds) by endpoint name, added to ENDPOINT_TTLS
+        """
+        super().__init__(path, max_bytes)
+        self.ttls = {**self.ENDPOINT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls) -> Optional['HttpResponseCache']:
+        """Cache configured by HTTP_CACHE_PATH, or None when it is not set"""
+        if not HTTP_CACHE_PATH:
+            return None
+        return cls(HTTP_CACHE_PATH, HTTP_CACHE_MAX_BYTES)
+
+    @staticmethod
+    def request_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """SHA-256 hex digest of the URL with query parameters merged and sorted"""
+        parsed = urlparse(url)
+        query = parse_qsl(parsed.query, keep_blank_values=True)
+        query.extend((str(name), str(value)) for name, value in (params or {}).items() if value is not None)
+        normalized = parsed._replace(query=urlencode(sorted(query)), fragment='').geturl()
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, url: str) -> float:
+        """Seconds a response is served without revalidation: 0 except for detail URLs"""
+        match = _DETAIL_PATH_PATTERN.match(urlparse(url).path)
+        if match is None:
+            return 0
+        return self.ttls.get(match.group(1), self.DEFAULT_TTL)
+
+    # Cache operations; they block on SQLite, so async callers run them in a thread
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[CachedResponse]:
+        """Stored response for this request, fresh or not, or None"""
+        row = self._lookup((self.request_key(url, params),), ('body', 'etag', 'last_modified', 'expires_at'))
+        if row is None:
+            return None
+        try:
+            return CachedResponse(zlib.decompress(row[0]).decode('utf-8'), row[1], row[2], row[3])
+        except (zlib.error, UnicodeDecodeError) as e:
+            with self._lock:
+                self._disable(e)
+            return None
+
+    def put(self, url: str, params: Optional[Dict[str, Any]], body: str,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store a 200 response body with its validators"""
+        ttl = self.ttl_for(url)
+        if not ttl and not (etag or last_modified):
+            return  # Could only ever be served stale
+        payload = zlib.compress(body.encode('utf-8'))
+        self._store((self.request_key(url, params),), {
+            'url': url,
+            'body': payload,
+            'etag': etag,
+            'last_modified': last_modified,
+            'expires_at': time.time() + ttl
+        }, len(payload))
+
+    def renew(self, url: str, params: Optional[Dict[str, Any]] = None):
+        """Restart the TTL of a stored response the server confirmed unchanged (304)"""
+        self._update((self.request_key(url, params),), {'expires_at': time.time() + self.ttl_for(url)})
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/revalidation/miss/eviction counters of this instance and the cache size on disk"""
+        lookups = self.hits + self.revalidated + self.misses
+        stats = self._size_stats()
+        stats.update(
+            hits=self.hits,
+            revalidated=self.revalidated,
+            misses=self.misses,
+            hit_rate=(self.hits + self.revalidated) / lookups if lookups else 0.0
+        )
+        return stats
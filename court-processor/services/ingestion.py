@@ -9,19 +9,44 @@ providing a clean separation between data ingestion and processing.
 import asyncio
 import aiohttp
 import logging
-from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable, AsyncIterable, AsyncIterator, Iterable, Union
+from datetime import datetime, timedelta, timezone
 import json
 import tempfile
+from collections import deque
 import os
 
-from services.courtlistener_service import CourtListenerService
+from services.courtlistener import CourtListenerService
 from services.database import get_db_connection
+from services.sync_state import SyncStateStore
+from services.config import SYNC_INITIAL_LOOKBACK_DAYS, SYNC_BATCH_SIZE, INGEST_STORE_BATCH_SIZE
+from utils.configuration import get_settings
 from services.recap.authenticated_client import AuthenticatedRECAPClient
 from pdf_processor import PDFProcessor
 
 logger = logging.getLogger(__name__)
 
+# Endpoints `collect sync` follows: stored document type and the metadata
+# key identifying a record across syncs
+SYNC_ENDPOINTS = {
+    'opinions': ('opinion', 'opinion_id'),
+    'dockets': ('recap_docket', 'docket_id')
+}
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """Timezone-aware datetime of an ISO timestamp (UTC when it has no offset)"""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
 
 class DocumentIngestionService:
     """
@@ -31,8 +56,17 @@ class DocumentIngestionService:
     
     def __init__(self, api_key: Optional[str] = None, 
                  pacer_username: Optional[str] = None,
-                 pacer_password: Optional[str] = None):
+                 pacer_password: Optional[str] = None,
+                 max_concurrency: Optional[int] = None):
+        """
+        Args:
+            max_concurrency: Documents processed at once (defaults to the
+                concurrent_workers processing setting); API requests of all
+                courts are paced by the CourtListener rate limiter
+        """
         self.cl_service = CourtListenerService(api_key)
+        self.max_concurrency = max_concurrency or get_settings().processing.concurrent_workers
+        self._slots = asyncio.Semaphore(self.max_concurrency)
         self.pdf_processor = PDFProcessor(ocr_enabled=True)
         self.session = None
         self.pacer_username = pacer_username
@@ -99,25 +133,23 @@ class DocumentIngestionService:
             'errors': []
         }
         
+        # Documents are stored in batches as they are processed
+        storage_results = {'stored': 0, 'updated': 0, 'failed': 0, 'errors': []}
         try:
-            all_documents = []
-            
             # Use enhanced search if nature_of_suit provided for IP cases
             if nature_of_suit and search_type:
                 logger.info(f"Using enhanced search for IP cases with nature_of_suit: {nature_of_suit}")
-                ip_documents = await self._fetch_ip_focused_documents(
+                ip_documents = self._fetch_ip_focused_documents(
                     court_ids, date_after, nature_of_suit, search_type, max_per_court
                 )
-                all_documents.extend(ip_documents)
-                self.stats['sources']['courtlistener_opinions'] += len(ip_documents)
+                await self._store_stream(ip_documents, 'courtlistener_opinions', storage_results)
             # Otherwise use standard opinions endpoint
             elif 'opinions' in document_types:
                 logger.info("Fetching opinions from CourtListener...")
-                opinions = await self._fetch_and_process_opinions(
+                opinions = self._fetch_and_process_opinions(
                     court_ids, date_after, max_per_court
                 )
-                all_documents.extend(opinions)
-                self.stats['sources']['courtlistener_opinions'] += len(opinions)
+                await self._store_stream(opinions, 'courtlistener_opinions', storage_results)
             
             # Fetch RECAP documents if requested
             if 'recap' in document_types:
@@ -128,62 +160,157 @@ class DocumentIngestionService:
                     check_recap_first=check_recap_first,
                     max_pacer_cost=max_pacer_cost
                 )
-                all_documents.extend(recap_docs)
-                self.stats['sources']['courtlistener_recap'] += len(recap_docs)
-            
-            # Store all documents in database
-            if all_documents:
-                storage_results = await self._store_documents(all_documents)
-                results['documents_ingested'] = storage_results['stored']
-                results['storage_details'] = storage_results
+                await self._store_stream(recap_docs, 'courtlistener_recap', storage_results)
             
-            logger.info(f"\nIngestion complete: {results['documents_ingested']} documents")
+            logger.info(f"\nIngestion complete: {storage_results['stored']} documents")
             
         except Exception as e:
             logger.error(f"Ingestion error: {e}")
             results['success'] = False
             results['errors'].append(str(e))
         
+        # Batches stored before a failure stay stored
+        results['documents_ingested'] = storage_results['stored']
+        if storage_results['stored'] or storage_results['updated'] or storage_results['failed']:
+            results['storage_details'] = storage_results
+        
         results['statistics'] = self.get_statistics()
         return results
     
+    async def _store_stream(self, documents: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+                            source: str, storage_results: Dict[str, Any]):
+        """Store documents INGEST_STORE_BATCH_SIZE at a time as they arrive, adding to storage_results"""
+        async def store(batch: List[Dict[str, Any]]):
+            stored = await self._store_documents(batch)
+            for key in ('stored', 'updated', 'failed'):
+                storage_results[key] += stored[key]
+            storage_results['errors'].extend(stored['errors'])
+            self.stats['sources'][source] += len(batch)
+        
+        batch = []
+        if isinstance(documents, AsyncIterable):
+            async for doc in documents:
+                batch.append(doc)
+                if len(batch) >= INGEST_STORE_BATCH_SIZE:
+                    await store(batch)
+                    batch = []
+        else:
+            batch = list(documents)
+        if batch:
+            await store(batch)
+    
     async def _fetch_and_process_opinions(self,
                                         court_ids: List[str],
                                         date_after: str,
-                                        max_per_court: int) -> List[Dict[str, Any]]:
-        """Fetch opinions and ensure they have text content"""
-        processed_documents = []
-        
-        for court_id in court_ids:
+                                        max_per_court: int) -> AsyncIterator[Dict[str, Any]]:
+        """Fetch opinions of all courts concurrently, yielding each once it has text content"""
+        async def fetch_court(court_id: str) -> AsyncIterator[Dict[str, Any]]:
             logger.info(f"\nFetching opinions from {court_id}...")
             
-            opinions = await self.cl_service.fetch_opinions(
+            # Opinions are processed as their page arrives
+            opinions = self.cl_service.iter_opinions(
                 court_id=court_id,
                 date_filed_after=date_after,
                 max_results=max_per_court
             )
-            
-            for opinion in opinions:
-                self.stats['processing']['total_documents'] += 1
-                
-                # Process each opinion
-                doc = await self._process_opinion(opinion, court_id)
+            async for doc in self._process_concurrently(
+                    opinions, lambda opinion: self._process_opinion(opinion, court_id)):
+                yield doc
+        
+        # Each court's opinions keep their order; courts interleave
+        async for doc in self._merge_streams([fetch_court(court_id) for court_id in court_ids]):
+            yield doc
+    
+    async def _process_concurrently(self,
+                                    items: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+                                    process: Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+                                    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process items with at most max_concurrency running at once (across
+        all callers), yielding the results in item order
+        
+        A slot is taken before the next item is pulled, and at most
+        max_concurrency items are in flight or waiting to be yielded, so a
+        fast source or a slow consumer does not pile items up in memory.
+        """
+        async def run(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            try:
+                return await process(item)
+            finally:
+                self._slots.release()
+        
+        is_async = isinstance(items, AsyncIterable)
+        source = items.__aiter__() if is_async else iter(items)
+        pending: deque = deque()
+        try:
+            while True:
+                if len(pending) >= self.max_concurrency:
+                    doc = await pending.popleft()
+                    if doc:
+                        yield doc
+                    continue
+                await self._slots.acquire()
+                try:
+                    item = await source.__anext__() if is_async else next(source)
+                except (StopAsyncIteration, StopIteration):
+                    self._slots.release()
+                    break
+                except BaseException:
+                    self._slots.release()
+                    raise
+                if is_async:
+                    self.stats['processing']['total_documents'] += 1
+                pending.append(asyncio.ensure_future(run(item)))
+            while pending:
+                doc = await pending.popleft()
                 if doc:
-                    processed_documents.append(doc)
+                    yield doc
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _merge_streams(self, streams: List[AsyncIterable[Dict[str, Any]]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the items of several async iterables as they arrive; at most
+        max_concurrency items wait in the merge queue
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency)
+        done = object()
         
-        return processed_documents
+        async def drain(stream: AsyncIterable[Dict[str, Any]]):
+            try:
+                async for item in stream:
+                    await queue.put(item)
+            except Exception as e:
+                await queue.put(e)
+            finally:
+                await queue.put(done)
+        
+        producers = [asyncio.ensure_future(drain(stream)) for stream in streams]
+        try:
+            running = len(producers)
+            while running:
+                item = await queue.get()
+                if item is done:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for producer in producers:
+                producer.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
     
     async def _fetch_ip_focused_documents(self,
                                         court_ids: List[str],
                                         date_after: str,
                                         nature_of_suit: List[str],
                                         search_type: str,
-                                        max_per_court: int) -> List[Dict[str, Any]]:
-        """Fetch IP-focused documents using enhanced search"""
-        processed_documents = []
-        
+                                        max_per_court: int) -> AsyncIterator[Dict[str, Any]]:
+        """Fetch IP-focused documents using enhanced search, processing each page as it arrives"""
         # Use enhanced search to find IP cases
-        results = await self.cl_service.search_with_filters(
+        results = self.cl_service.iter_search_with_filters(
             search_type=search_type,
             court_ids=court_ids,
             nature_of_suit=nature_of_suit,
@@ -191,31 +318,23 @@ class DocumentIngestionService:
             max_results=max_per_court * len(court_ids)
         )
         
-        logger.info(f"Found {len(results)} IP-focused documents")
-        
-        # Process each result
-        for result in results:
-            self.stats['processing']['total_documents'] += 1
-            
+        async def process_result(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
             # Extract court ID from result
             court_id = result.get('court_id', '')
             if not court_id and 'court' in result:
                 court_id = result['court']
             
-            # Store current court for RECAP availability check
-            self._current_court_id = court_id
-            
             # Process based on result type
             if search_type == 'o' or result.get('type') == 'opinion':
-                doc = await self._process_opinion(result, court_id)
-            else:
-                # For RECAP results, adapt to opinion format
-                doc = await self._process_recap_result(result, court_id)
-            
-            if doc:
-                processed_documents.append(doc)
-                
-        return processed_documents
+                return await self._process_opinion(result, court_id)
+            # For RECAP results, adapt to opinion format
+            return await self._process_recap_result(result, court_id)
+        
+        processed = 0
+        async for doc in self._process_concurrently(results, process_result):
+            processed += 1
+            yield doc
+        logger.info(f"Processed {processed} IP-focused documents")
     
     async def _process_recap_document(self, recap_doc: Dict[str, Any], 
                                      docket_info: Dict[str, Any], 
@@ -254,7 +373,7 @@ class DocumentIngestionService:
         elif recap_doc.get('filepath_local'):
             # Download and extract from PDF
             pdf_url = f"https://www.courtlistener.com/{recap_doc['filepath_local']}"
-            text_content = await self._download_and_extract_pdf(pdf_url, check_recap=False)
+            text_content = await self._download_and_extract_pdf(pdf_url, court_id, check_recap=False)
             if text_content:
                 document['content'] = text_content
             else:
@@ -367,7 +486,7 @@ class DocumentIngestionService:
             document['metadata']['snippet'] = first_opinion.get('snippet', '')
             
             # Try to get text content
-            text_content, extraction_method = await self._get_text_content(first_opinion)
+            text_content, extraction_method = await self._get_text_content(first_opinion, court_id)
             
             if text_content:
                 document['content'] = text_content
@@ -382,7 +501,7 @@ class DocumentIngestionService:
         # Return document even without content - metadata is valuable
         return document
     
-    async def _get_text_content(self, document: Dict[str, Any]) -> Tuple[str, str]:
+    async def _get_text_content(self, document: Dict[str, Any], court_id: str = '') -> Tuple[str, str]:
         """
         Get text content from document, extracting from PDF if needed
         
@@ -406,7 +525,7 @@ class DocumentIngestionService:
         pdf_url = document.get('download_url')
         if pdf_url:
             logger.info(f"  No text fields found, downloading PDF from: {pdf_url}")
-            text_content = await self._download_and_extract_pdf(pdf_url)
+            text_content = await self._download_and_extract_pdf(pdf_url, court_id)
             
             if text_content:
                 self.stats['processing']['pdfs_extracted'] += 1
@@ -416,11 +535,12 @@ class DocumentIngestionService:
         
         return '', 'none'
     
-    async def _download_and_extract_pdf(self, pdf_url: str, check_recap: bool = True) -> Optional[str]:
+    async def _download_and_extract_pdf(self, pdf_url: str, court_id: str = '',
+                                        check_recap: bool = True) -> Optional[str]:
         """Download PDF and extract text with optional RECAP availability check"""
         try:
             # For RECAP documents, check availability first
-            if check_recap and 'recap' in pdf_url and hasattr(self, '_current_court_id'):
+            if check_recap and 'recap' in pdf_url and court_id:
                 # Extract PACER doc ID from URL if available
                 # URL pattern: /download/recap/12345.pdf
                 import re
@@ -428,7 +548,7 @@ class DocumentIngestionService:
                 if match:
                     pacer_doc_id = match.group(1)
                     available_docs = await self.cl_service.check_recap_availability(
-                        self._current_court_id, [pacer_doc_id]
+                        court_id, [pacer_doc_id]
                     )
                     if not available_docs:
                         logger.warning(f"RECAP document {pacer_doc_id} not available")
@@ -476,19 +596,39 @@ class DocumentIngestionService:
             return None
     
     async def _store_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Store processed documents in database"""
+        """
+        Store processed documents in database
+        
+        Opinions and dockets that carry their CourtListener id are upserted on
+        it like `collect sync` does (_upsert_document), so both writers keep
+        one row per record. Other documents are matched by case_number.
+        """
         results = {
             'stored': 0,
             'updated': 0,
+            'unchanged': 0,
             'failed': 0,
             'errors': []
         }
+        # Document type -> metadata key of its CourtListener id
+        id_keys = dict(SYNC_ENDPOINTS.values())
         
         conn = get_db_connection()
         cursor = conn.cursor()
         
         for doc in documents:
             try:
+                key = id_keys.get(doc['document_type'])
+                if key and doc['metadata'].get(key) is not None:
+                    outcome = self._upsert_document(cursor, doc, doc['document_type'], key)
+                    results[outcome] += 1
+                    if outcome == 'stored':
+                        self.stats['storage']['documents_stored'] += 1
+                    elif outcome == 'updated':
+                        self.stats['storage']['documents_updated'] += 1
+                    conn.commit()
+                    continue
+                
                 # Check if document exists
                 cursor.execute("""
                     SELECT id FROM public.court_documents 
@@ -546,17 +686,295 @@ class DocumentIngestionService:
         
         return results
     
+    async def sync_courts(self,
+                          court_ids: List[str],
+                          endpoints: List[str] = ['opinions'],
+                          since: Optional[str] = None,
+                          max_records: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Incrementally sync every court and endpoint concurrently (see sync_court)
+        
+        Returns:
+            {'success', 'results': one sync_court result per court and endpoint, 'errors'}
+        """
+        results = await asyncio.gather(*(
+            self.sync_court(court_id, endpoint, since, max_records)
+            for court_id in court_ids for endpoint in endpoints
+        ))
+        errors = [f"{result['court_id']}/{result['endpoint']}: {result['error']}"
+                  for result in results if result.get('error')]
+        return {
+            'success': not errors,
+            'results': results,
+            'errors': errors,
+            'statistics': self.get_statistics()
+        }
+    
+    async def sync_court(self,
+                         court_id: str,
+                         endpoint: str = 'opinions',
+                         since: Optional[str] = None,
+                         max_records: Optional[int] = None,
+                         batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Fetch the records of a court modified since its watermark and store them
+        
+        Records come oldest modification first. Each batch is stored and the
+        watermark advanced past it in one transaction, so an interrupted sync
+        resumes after the last committed batch; records are matched on their
+        CourtListener id, so applying one twice updates the same row.
+        
+        Args:
+            court_id: Court identifier (e.g., 'txed')
+            endpoint: 'opinions' or 'dockets'
+            since: ISO date or timestamp to sync from instead of the
+                watermark (the watermark never moves backwards)
+            max_records: Stop after this many records (None for all)
+            batch_size: Records per transaction (defaults to SYNC_BATCH_SIZE)
+            
+        Returns:
+            Counts of fetched, stored, updated, unchanged and skipped records,
+            the watermark before and after, and 'error' if the sync failed
+        """
+        if endpoint not in SYNC_ENDPOINTS:
+            raise ValueError(f"Cannot sync endpoint {endpoint!r}; expected one of {sorted(SYNC_ENDPOINTS)}")
+        batch_size = max(1, batch_size or SYNC_BATCH_SIZE)
+        result = {
+            'court_id': court_id,
+            'endpoint': endpoint,
+            'since': None,
+            'fetched': 0,
+            'stored': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'skipped': 0,
+            'watermark': None
+        }
+        
+        conn = get_db_connection()
+        store = SyncStateStore(conn)
+        try:
+            state = store.load(court_id, endpoint)
+            mark = state['date_modified'] if state else None
+            boundary = set(state['boundary_ids']) if state else set()
+            result['watermark'] = mark
+            
+            # Records at exactly the watermark are requested again, and the
+            # ones already applied are skipped by id
+            if since:
+                start, skip_ids = _parse_timestamp(since), set()
+                if start is None:
+                    raise ValueError(f"Invalid --since timestamp: {since}")
+            elif mark is not None:
+                start, skip_ids = mark, boundary
+            else:
+                start = datetime.now(timezone.utc) - timedelta(days=SYNC_INITIAL_LOOKBACK_DAYS)
+                skip_ids = set()
+            result['since'] = start
+            logger.info(f"Syncing {endpoint} of {court_id} modified since {start.isoformat()}")
+            
+            batch = []
+            records = self.cl_service.iter_modified(endpoint, court_id, start.isoformat(), max_records)
+            async for record in records:
+                result['fetched'] += 1
+                self.stats['processing']['total_documents'] += 1
+                modified = _parse_timestamp(record.get('date_modified'))
+                if modified is None or (modified == start and record.get('id') in skip_ids):
+                    result['skipped'] += 1
+                    continue
+                batch.append((modified, record))
+                if len(batch) >= batch_size:
+                    mark, boundary = await self._apply_sync_batch(store, court_id, endpoint, batch,
+                                                                  mark, boundary, result)
+                    batch = []
+            if batch:
+                mark, boundary = await self._apply_sync_batch(store, court_id, endpoint, batch,
+                                                              mark, boundary, result)
+        except Exception as e:
+            logger.error(f"Sync of {endpoint} for {court_id} failed: {e}")
+            result['error'] = str(e)
+        finally:
+            conn.close()
+        
+        logger.info(f"Synced {endpoint} of {court_id}: {result['stored']} new, {result['updated']} updated, "
+                    f"{result['unchanged']} unchanged, watermark {result['watermark']}")
+        return result
+    
+    async def _apply_sync_batch(self,
+                                store: SyncStateStore,
+                                court_id: str,
+                                endpoint: str,
+                                batch: List[Tuple[datetime, Dict[str, Any]]],
+                                mark: Optional[datetime],
+                                boundary: set,
+                                result: Dict[str, Any]) -> Tuple[Optional[datetime], set]:
+        """
+        Store a batch of modified records and advance the watermark in one
+        transaction; returns the new (watermark, ids at the watermark)
+        """
+        document_type, key = SYNC_ENDPOINTS[endpoint]
+        process = self._process_opinion_record if endpoint == 'opinions' else self._process_docket_record
+        documents = [doc async for doc in self._process_concurrently(
+            [record for _, record in batch], lambda record: process(record, court_id)
+        )]
+        
+        # Records are in date_modified order; older ones (--since) leave the mark alone
+        for modified, record in batch:
+            if mark is None or modified > mark:
+                mark, boundary = modified, {record['id']}
+            elif modified == mark:
+                boundary = boundary | {record['id']}
+        
+        conn = store.db_conn
+        counts = {'stored': 0, 'updated': 0, 'unchanged': 0}
+        try:
+            with conn.cursor() as cursor:
+                for doc in documents:
+                    counts[self._upsert_document(cursor, doc, document_type, key)] += 1
+                store.advance(cursor, court_id, endpoint, mark, boundary, len(documents))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        for outcome, count in counts.items():
+            result[outcome] += count
+        result['watermark'] = mark
+        self.stats['storage']['documents_stored'] += counts['stored']
+        self.stats['storage']['documents_updated'] += counts['updated']
+        return mark, boundary
+    
+    @staticmethod
+    def _upsert_document(cursor, doc: Dict[str, Any], document_type: str, key: str) -> str:
+        """
+        Insert or update the court_documents row of a CourtListener record,
+        found by document type and its CourtListener id under metadata[key]
+        
+        document_type and key come from SYNC_ENDPOINTS, never from input. The
+        record is written with one INSERT ... ON CONFLICT statement against
+        the partial unique index of its document type (schema.sql), so
+        concurrent writers of the same record cannot both insert it. A stored
+        row is only rewritten when the record's date_modified changed, or when
+        the record has none (search results stored by `collect`).
+        
+        Returns:
+            'stored', 'updated' or 'unchanged' (same date_modified as stored)
+        """
+        # The conflict target names the index expression and predicate
+        cursor.execute(f"""
+            INSERT INTO public.court_documents
+            (case_number, case_name, document_type, content, metadata)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT ((metadata->>'{key}')) WHERE document_type = '{document_type}'
+            DO UPDATE SET
+                case_number = EXCLUDED.case_number,
+                case_name = EXCLUDED.case_name,
+                content = EXCLUDED.content,
+                metadata = EXCLUDED.metadata,
+                updated_at = NOW()
+            WHERE EXCLUDED.metadata->>'date_modified' IS NULL
+                OR court_documents.metadata->>'date_modified'
+                    IS DISTINCT FROM EXCLUDED.metadata->>'date_modified'
+            RETURNING (xmax = 0) AS inserted
+        """, (
+            doc['case_number'],
+            doc['case_name'],
+            document_type,
+            doc['content'],
+            json.dumps(doc['metadata'])
+        ))
+        row = cursor.fetchone()
+        if row is None:
+            return 'unchanged'
+        return 'stored' if row[0] else 'updated'
+    
+    async def _process_opinion_record(self, opinion: Dict[str, Any], court_id: str) -> Optional[Dict[str, Any]]:
+        """Process a record of the opinions endpoint (as returned by iter_modified)"""
+        cluster_id = opinion.get('cluster_id') or self.cl_service.id_from_url(opinion.get('cluster'))
+        
+        # Case name, docket number and author come from the cluster, its docket
+        # and the author's person record, loaded in batches across opinions
+        cluster = await self._fetch_cluster_data(cluster_id) if cluster_id else {}
+        docket, author = await asyncio.gather(
+            self.cl_service.get_docket(cluster.get('docket_id') or cluster.get('docket')),
+            self.cl_service.get_person(opinion.get('author_id') or opinion.get('author'))
+        )
+        docket = docket or {}
+        author_name = opinion.get('author_str') or ' '.join(
+            filter(None, [(author or {}).get('name_first'), (author or {}).get('name_last')])
+        )
+        
+        document = {
+            'case_number': docket.get('docket_number') or f"OPINION-{court_id}-{cluster_id}",
+            'case_name': cluster.get('case_name') or self._extract_case_name(opinion),
+            'document_type': 'opinion',
+            'content': '',
+            'metadata': {
+                'source': 'courtlistener',
+                'opinion_id': opinion.get('id'),
+                'cluster_id': cluster_id,
+                'cl_id': str(cluster_id),  # Add cl_id for pipeline compatibility
+                'court_id': court_id,
+                'docket_id': docket.get('id'),
+                'docket_number': docket.get('docket_number', ''),
+                'date_filed': cluster.get('date_filed', ''),
+                'judges': cluster.get('judges', ''),
+                'opinion_type': opinion.get('type', ''),
+                'author': author_name,
+                'download_url': opinion.get('download_url', ''),
+                'absolute_url': opinion.get('absolute_url', ''),
+                'date_created': opinion.get('date_created', ''),
+                'date_modified': opinion.get('date_modified', ''),
+                'processed_at': datetime.now().isoformat()
+            }
+        }
+        
+        text_content, extraction_method = await self._get_text_content(opinion, court_id)
+        if text_content:
+            document['content'] = text_content
+            document['metadata']['extraction_method'] = extraction_method
+            self.stats['content']['total_characters'] += len(text_content)
+        elif opinion.get('download_url'):
+            document['metadata']['pdf_available'] = True
+            document['metadata']['requires_pdf_extraction'] = True
+        return document
+    
+    async def _process_docket_record(self, docket: Dict[str, Any], court_id: str) -> Optional[Dict[str, Any]]:
+        """Process a record of the dockets endpoint (as returned by iter_modified)"""
+        docket_id = docket.get('id')
+        return {
+            'case_number': docket.get('docket_number') or f"RECAP-{court_id}-{docket_id}",
+            'case_name': docket.get('case_name', ''),
+            'document_type': 'recap_docket',
+            'content': '',  # Docket records have no text content
+            'metadata': {
+                'source': 'courtlistener_recap',
+                'docket_id': docket_id,
+                'court_id': docket.get('court_id', court_id),
+                'nature_of_suit': docket.get('nature_of_suit', ''),
+                'date_filed': docket.get('date_filed', ''),
+                'date_terminated': docket.get('date_terminated'),
+                'cause': docket.get('cause', ''),
+                'jury_demand': docket.get('jury_demand', ''),
+                'jurisdiction_type': docket.get('jurisdiction_type', ''),
+                'assigned_to': docket.get('assigned_to_str', ''),
+                'referred_to': docket.get('referred_to_str'),
+                'docket_absolute_url': docket.get('absolute_url', ''),
+                'pacer_case_id': docket.get('pacer_case_id'),
+                'date_modified': docket.get('date_modified', ''),
+                'processed_at': datetime.now().isoformat()
+            }
+        }
+    
     async def _fetch_cluster_data(self, cluster_url: str) -> Dict[str, Any]:
-        """Fetch additional metadata from cluster endpoint"""
+        """
+        Fetch additional metadata from cluster endpoint
+        
+        Clusters are loaded in batches and memoized, so opinions of the same
+        cluster share one fetch.
+        """
         try:
-            async with self.session.get(
-                cluster_url,
-                headers={'Authorization': f'Token {self.cl_service.api_key}'}
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    return {}
+            return await self.cl_service.get_cluster(cluster_url) or {}
         except Exception as e:
             logger.error(f"Error fetching cluster data: {e}")
             return {}
@@ -631,11 +1049,9 @@ class DocumentIngestionService:
                 }
             
             # Process results (search_with_filters returns a list)
-            documents = []
-            for result in results:
-                doc = await self._process_opinion(result, result.get('court', ''))
-                if doc:
-                    documents.append(doc)
+            documents = [doc async for doc in self._process_concurrently(
+                results, lambda result: self._process_opinion(result, result.get('court', ''))
+            )]
             
             return {
                 'success': True,
@@ -0,0 +1,404 @@
+"""
+Pipeline work queue for running several pipeline nodes against one database
+
+court_data.pipeline_jobs holds one row per document to process (filled by
+the court_documents triggers in schema.sql, or by enqueue()/backfill()).
+Workers claim batches with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent
+claims never return the same row, and hold a lease on what they claimed.
+The `pipeline serve` daemon leases the rows it is notified about the same
+way, so serve and work nodes never process a document twice.
+The lease is renewed by heartbeats while the batch runs; if a worker dies
+its lease expires and the rows become claimable again. Rows that keep
+failing are parked as 'failed' after max_attempts claims. Done rows are
+deleted once they are older than the retention period.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Callable
+
+from services.database import get_db_connection
+from services.config import (
+    PIPELINE_JOB_LEASE_SECONDS, PIPELINE_JOB_MAX_ATTEMPTS,
+    PIPELINE_WORK_POLL_INTERVAL, PIPELINE_SERVE_BATCH_SIZE,
+    PIPELINE_JOB_RETENTION_DAYS
+)
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    """host:pid:nonce, unique per worker process"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class PipelineJobQueue:
+    """Claim, renew and settle rows of court_data.pipeline_jobs"""
+
+    def __init__(self, db_conn, owner: Optional[str] = None,
+                 lease_seconds: int = PIPELINE_JOB_LEASE_SECONDS,
+                 max_attempts: int = PIPELINE_JOB_MAX_ATTEMPTS):
+        """
+        Args:
+            db_conn: Connection used only by this queue; every call commits
+            owner: Lease owner recorded on claimed rows
+            lease_seconds: How long a claim or heartbeat holds the rows
+            max_attempts: Claims before a row is marked failed
+        """
+        self.db_conn = db_conn
+        self.owner = owner or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def _execute(self, query: str, params: tuple = ()) -> List[tuple]:
+        try:
+            with self.db_conn.cursor() as cursor:
+                cursor.execute(query, params)
+                rows = cursor.fetchall() if cursor.description else []
+            self.db_conn.commit()
+            return rows
+        except Exception:
+            self.db_conn.rollback()
+            raise
+
+    def enqueue(self, document_ids: List[int]) -> int:
+        """Queue documents as pending (requeues them if already present)"""
+        if not document_ids:
+            return 0
+        rows = self._execute("""
+            INSERT INTO court_data.pipeline_jobs (document_id)
+            SELECT unnest(%s::integer[])
+            ON CONFLICT (document_id) DO UPDATE SET
+                state = 'pending',
+                lease_owner = NULL,
+                lease_expires_at = NULL,
+                attempts = 0,
+                last_error = NULL,
+                enqueued_at = NOW(),
+                updated_at = NOW()
+            RETURNING document_id
+        """, (list(document_ids),))
+        return len(rows)
+
+    def backfill(self) -> int:
+        """Queue court_documents that are not in opinions_unified and not queued yet"""
+        rows = self._execute("""
+            INSERT INTO court_data.pipeline_jobs (document_id)
+            SELECT cd.id
+            FROM public.court_documents cd
+            LEFT JOIN court_data.opinions_unified ou ON cd.metadata->>'cl_opinion_id' = ou.cl_id::text
+            WHERE ou.cl_id IS NULL
+            ON CONFLICT (document_id) DO NOTHING
+            RETURNING document_id
+        """)
+        return len(rows)
+
+    def claim(self, limit: int) -> List[int]:
+        """
+        Lease up to limit claimable documents to this worker
+
+        Pending rows and rows whose lease expired are claimable. Expired
+        rows that already used all their attempts are marked failed instead.
+        """
+        self._execute("""
+            UPDATE court_data.pipeline_jobs
+            SET state = 'failed', lease_owner = NULL, lease_expires_at = NULL,
+                last_error = COALESCE(last_error, 'lease expired'), updated_at = NOW()
+            WHERE state = 'leased' AND lease_expires_at < NOW() AND attempts >= %s
+        """, (self.max_attempts,))
+
+        rows = self._execute("""
+            WITH claimable AS (
+                SELECT document_id
+                FROM court_data.pipeline_jobs
+                WHERE (state = 'pending' OR (state = 'leased' AND lease_expires_at < NOW()))
+                  AND attempts < %s
+                ORDER BY enqueued_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE court_data.pipeline_jobs jobs
+            SET state = 'leased',
+                lease_owner = %s,
+                lease_expires_at = NOW() + make_interval(secs => %s),
+                attempts = jobs.attempts + 1,
+                updated_at = NOW()
+            FROM claimable
+            WHERE jobs.document_id = claimable.document_id
+            RETURNING jobs.document_id
+        """, (self.max_attempts, limit, self.owner, self.lease_seconds))
+        return sorted(row[0] for row in rows)
+
+    def claim_ids(self, document_ids: List[int]) -> List[int]:
+        """Lease the given documents that are claimable; returns the ids leased"""
+        if not document_ids:
+            return []
+        rows = self._execute("""
+            WITH claimable AS (
+                SELECT document_id
+                FROM court_data.pipeline_jobs
+                WHERE document_id = ANY(%s)
+                  AND (state = 'pending' OR (state = 'leased' AND lease_expires_at < NOW()))
+                  AND attempts < %s
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE court_data.pipeline_jobs jobs
+            SET state = 'leased',
+                lease_owner = %s,
+                lease_expires_at = NOW() + make_interval(secs => %s),
+                attempts = jobs.attempts + 1,
+                updated_at = NOW()
+            FROM claimable
+            WHERE jobs.document_id = claimable.document_id
+            RETURNING jobs.document_id
+        """, (list(document_ids), self.max_attempts, self.owner, self.lease_seconds))
+        return sorted(row[0] for row in rows)
+
+    def claimable_ids(self) -> List[int]:
+        """Ids of pending and lease-expired documents, oldest first"""
+        rows = self._execute("""
+            SELECT document_id
+            FROM court_data.pipeline_jobs
+            WHERE (state = 'pending' OR (state = 'leased' AND lease_expires_at < NOW()))
+              AND attempts < %s
+            ORDER BY enqueued_at
+        """, (self.max_attempts,))
+        return [row[0] for row in rows]
+
+    def heartbeat(self, document_ids: List[int]) -> List[int]:
+        """Extend this worker's leases; returns the ids still held"""
+        if not document_ids:
+            return []
+        rows = self._execute("""
+            UPDATE court_data.pipeline_jobs
+            SET lease_expires_at = NOW() + make_interval(secs => %s), updated_at = NOW()
+            WHERE document_id = ANY(%s) AND state = 'leased' AND lease_owner = %s
+            RETURNING document_id
+        """, (self.lease_seconds, list(document_ids), self.owner))
+        return sorted(row[0] for row in rows)
+
+    def complete(self, document_ids: List[int]) -> int:
+        """Mark documents leased by this worker as done"""
+        if not document_ids:
+            return 0
+        rows = self._execute("""
+            UPDATE court_data.pipeline_jobs
+            SET state = 'done', lease_owner = NULL, lease_expires_at = NULL,
+                last_error = NULL, updated_at = NOW()
+            WHERE document_id = ANY(%s) AND state = 'leased' AND lease_owner = %s
+            RETURNING document_id
+        """, (list(document_ids), self.owner))
+        return len(rows)
+
+    def fail(self, document_ids: List[int], error: str) -> int:
+        """Release documents for another attempt, or park them once attempts run out"""
+        if not document_ids:
+            return 0
+        rows = self._execute("""
+            UPDATE court_data.pipeline_jobs
+            SET state = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                lease_owner = NULL, lease_expires_at = NULL,
+                last_error = %s, updated_at = NOW()
+            WHERE document_id = ANY(%s) AND state = 'leased' AND lease_owner = %s
+            RETURNING document_id
+        """, (self.max_attempts, error[:2000], list(document_ids), self.owner))
+        return len(rows)
+
+    def purge(self, older_than_days: float = PIPELINE_JOB_RETENTION_DAYS) -> int:
+        """Delete done rows settled more than older_than_days ago"""
+        rows = self._execute("""
+            DELETE FROM court_data.pipeline_jobs
+            WHERE state = 'done' AND updated_at < NOW() - make_interval(secs => %s)
+            RETURNING document_id
+        """, (older_than_days * 86400,))
+        return len(rows)
+
+    def counts(self) -> Dict[str, int]:
+        """Rows per state, plus leases that have expired"""
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0, 'expired_leases': 0}
+        for state, expired, count in self._execute("""
+            SELECT state, (state = 'leased' AND lease_expires_at < NOW()) AS expired, COUNT(*)
+            FROM court_data.pipeline_jobs
+            GROUP BY 1, 2
+        """):
+            counts[state] = counts.get(state, 0) + count
+            if expired:
+                counts['expired_leases'] += count
+        return counts
+
+
+class PipelineQueueWorker:
+    """Claims batches from the job queue and runs them through the pipeline"""
+
+    # Seconds between purges of old done rows, made while the queue is idle
+    PURGE_INTERVAL = 3600
+
+    def __init__(self,
+                 batch_size: int = PIPELINE_SERVE_BATCH_SIZE,
+                 lease_seconds: int = PIPELINE_JOB_LEASE_SECONDS,
+                 max_attempts: int = PIPELINE_JOB_MAX_ATTEMPTS,
+                 poll_interval: float = PIPELINE_WORK_POLL_INTERVAL,
+                 pipeline_options: Optional[Dict[str, Any]] = None,
+                 batch_options: Optional[Dict[str, Any]] = None,
+                 pipeline_factory: Optional[Callable[..., Any]] = None,
+                 queue: Optional[PipelineJobQueue] = None):
+        """
+        Args:
+            batch_size: Most documents claimed per pipeline run
+            lease_seconds: Lease length; heartbeats renew it every third of it
+            max_attempts: Claims before a document is marked failed
+            poll_interval: Seconds to wait when the queue is empty
+            pipeline_options: Keyword arguments for each pipeline instance
+            batch_options: Extra keyword arguments for process_batch
+            pipeline_factory: Builds the pipeline, once, on the first batch
+                (defaults to RobustElevenStagePipeline); it is given
+                persistent=True and reused for every batch
+            queue: Job queue to use (defaults to one on a new connection)
+        """
+        if pipeline_factory is None:
+            from processor import RobustElevenStagePipeline
+            pipeline_factory = RobustElevenStagePipeline
+
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+        self.pipeline_options = pipeline_options or {}
+        self.batch_options = batch_options or {}
+        self.pipeline_factory = pipeline_factory
+        self.queue = queue or PipelineJobQueue(
+            get_db_connection(), lease_seconds=lease_seconds, max_attempts=max_attempts
+        )
+        self._pipeline = None
+        self._last_purge = None
+        self._stopping = False
+        self.stats = {'batches': 0, 'completed': 0, 'failed': 0, 'lost_leases': 0, 'purged': 0}
+
+    def stop(self):
+        """Finish the running batch, then return from run()"""
+        self._stopping = True
+
+    async def run(self, drain: bool = False) -> Dict[str, int]:
+        """
+        Process claimed batches until stopped
+
+        Args:
+            drain: Return once the queue has nothing claimable instead of
+                polling for more work
+        """
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not supported on this platform/thread
+
+        logger.info(f"Pipeline worker {self.queue.owner} started (batch size {self.batch_size})")
+        try:
+            while not self._stopping:
+                document_ids = await asyncio.to_thread(self.queue.claim, self.batch_size)
+                if not document_ids:
+                    await self._purge_if_due()
+                    if drain:
+                        break
+                    await self._sleep(self.poll_interval)
+                    continue
+                await self.process(document_ids)
+        finally:
+            self.close()
+        logger.info(f"Pipeline worker {self.queue.owner} stopped: {self.stats}")
+        return self.stats
+
+    def close(self):
+        """Release the pipeline's connection and worker pools"""
+        if self._pipeline is not None:
+            self._pipeline.close()
+            self._pipeline = None
+
+    async def _purge_if_due(self):
+        """Delete old done rows, at most once per PURGE_INTERVAL"""
+        now = time.monotonic()
+        if PIPELINE_JOB_RETENTION_DAYS <= 0 or (
+                self._last_purge is not None and now - self._last_purge < self.PURGE_INTERVAL):
+            return
+        self._last_purge = now
+        try:
+            purged = await asyncio.to_thread(self.queue.purge, PIPELINE_JOB_RETENTION_DAYS)
+        except Exception as e:
+            logger.warning(f"Purging done jobs failed: {e}")
+            return
+        self.stats['purged'] += purged
+        if purged:
+            logger.info(f"Purged {purged} done jobs older than {PIPELINE_JOB_RETENTION_DAYS} days")
+
+    async def _sleep(self, seconds: float):
+        """Sleep, waking early once stop() was called"""
+        deadline = time.monotonic() + seconds
+        while not self._stopping and time.monotonic() < deadline:
+            await asyncio.sleep(min(0.2, deadline - time.monotonic()))
+
+    async def process(self, document_ids: List[int]) -> Dict[str, Any]:
+        """
+        Run documents this worker has leased through the pipeline
+
+        Leases are renewed while the batch runs; afterwards stored documents
+        are marked done and the rest released for retry. Returns the
+        pipeline results.
+        """
+        logger.info(f"Claimed {len(document_ids)} documents")
+        self.stats['batches'] += 1
+        held = list(document_ids)
+        finished = asyncio.Event()
+
+        async def keep_leases():
+            nonlocal held
+            while True:
+                try:
+                    await asyncio.wait_for(finished.wait(), max(1.0, self.queue.lease_seconds / 3))
+                    return
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    renewed = await asyncio.to_thread(self.queue.heartbeat, held)
+                except Exception as e:
+                    logger.warning(f"Lease heartbeat failed, retrying: {e}")
+                    continue
+                lost = set(held) - set(renewed)
+                if lost:
+                    # Reclaimed by another worker after our lease lapsed
+                    self.stats['lost_leases'] += len(lost)
+                    logger.warning(f"Lost leases on {len(lost)} documents")
+                held = renewed
+
+        def run_batch():
+            if self._pipeline is None:
+                self._pipeline = self.pipeline_factory(persistent=True, **self.pipeline_options)
+            return asyncio.run(self._pipeline.process_batch(document_ids=document_ids, **self.batch_options))
+
+        heartbeat = asyncio.create_task(keep_leases())
+        try:
+            results = await asyncio.to_thread(run_batch)
+        except Exception as e:
+            results = {'success': False, 'error': str(e)}
+        finally:
+            # Not cancelled: a renewal already running in its thread must
+            # finish before complete()/fail() use the queue's connection
+            finished.set()
+            await heartbeat
+
+        if results.get('success'):
+            stored = set(results.get('storage_results', {}).get('stored_document_ids', []))
+            done = [document_id for document_id in held if document_id in stored]
+            failed = [document_id for document_id in held if document_id not in stored]
+            error = 'not stored (see pipeline error report)'
+        else:
+            done, failed = [], held
+            error = results.get('error') or 'pipeline run failed'
+
+        self.stats['completed'] += await asyncio.to_thread(self.queue.complete, done)
+        self.stats['failed'] += await asyncio.to_thread(self.queue.fail, failed, error)
+        logger.info(f"Batch finished: {len(done)} done, {len(failed)} released for retry or failed")
+        return results
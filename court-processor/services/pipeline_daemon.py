@@ -0,0 +1,345 @@
+"""
+Continuous pipeline daemon (`pipeline serve`)
+
+New and changed court_documents are queued in court_data.pipeline_jobs by
+the triggers in schema.sql, and every row that becomes pending is announced
+on a Postgres channel with its document id. The daemon listens on that
+channel, collects the ids into micro-batches and runs each batch through a
+RobustElevenStagePipeline it keeps open. A batch runs as soon as it is full
+or when its oldest id has waited max_latency seconds, so new opinions reach
+storage and Haystack within seconds instead of at the next cron run.
+
+Batches are leased through the job queue (services/job_queue.py) before
+they run, exactly like `pipeline work` claims, so serve and work nodes can
+run side by side without processing a document twice.
+
+Notifications sent while the daemon is down are lost, so on startup and
+after every reconnect it queues unprocessed documents (the queue's
+backfill) and picks up every claimable row. A small HTTP server answers
+GET /health with the daemon's state.
+"""
+
+import asyncio
+import logging
+import re
+import signal
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable
+
+import psycopg2
+import psycopg2.extensions
+from aiohttp import web
+
+from services.database import get_db_connection
+from services.job_queue import PipelineJobQueue, PipelineQueueWorker
+from services.config import (
+    PIPELINE_NOTIFY_CHANNEL, PIPELINE_SERVE_BATCH_SIZE,
+    PIPELINE_SERVE_MAX_LATENCY, PIPELINE_HEALTH_PORT
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineDaemon:
+    """LISTEN/NOTIFY driven micro-batch runner for the enhancement pipeline"""
+
+    # Seconds between reconnect attempts after the listen connection drops
+    RECONNECT_DELAYS = (1, 2, 5, 10, 30)
+
+    def __init__(self,
+                 batch_size: int = PIPELINE_SERVE_BATCH_SIZE,
+                 max_latency: float = PIPELINE_SERVE_MAX_LATENCY,
+                 health_host: str = '0.0.0.0',
+                 health_port: Optional[int] = PIPELINE_HEALTH_PORT,
+                 channel: str = PIPELINE_NOTIFY_CHANNEL,
+                 catch_up: bool = True,
+                 pipeline_options: Optional[Dict[str, Any]] = None,
+                 batch_options: Optional[Dict[str, Any]] = None,
+                 pipeline_factory: Optional[Callable[..., Any]] = None,
+                 queue: Optional[PipelineJobQueue] = None):
+        """
+        Args:
+            batch_size: Most documents per pipeline run
+            max_latency: Longest a queued id waits for its batch to fill
+            health_host: Interface for the health endpoint
+            health_port: Port for the health endpoint (None disables it)
+            channel: Postgres channel to LISTEN on
+            catch_up: Queue unprocessed documents on startup and reconnect
+            pipeline_options: Keyword arguments for the pipeline
+            batch_options: Extra keyword arguments for process_batch
+            pipeline_factory: Builds the pipeline, once, for the first batch
+                (defaults to RobustElevenStagePipeline)
+            queue: Job queue batches are leased from (defaults to one on a
+                new connection)
+        """
+        if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', channel):
+            raise ValueError(f"Invalid channel name: {channel}")
+
+        self.batch_size = max(1, batch_size)
+        self.max_latency = max(0.0, max_latency)
+        self.health_host = health_host
+        self.health_port = health_port
+        self.channel = channel
+        self.catch_up = catch_up
+        # Runs leased batches through one reused pipeline, renewing the leases
+        self.worker = PipelineQueueWorker(
+            batch_size=self.batch_size,
+            pipeline_options=pipeline_options,
+            batch_options=batch_options,
+            pipeline_factory=pipeline_factory,
+            queue=queue
+        )
+        self.queue = self.worker.queue
+
+        # Queued document id -> monotonic time it was first queued
+        self._pending: Dict[int, float] = {}
+        self._listen_conn = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._disconnected: Optional[asyncio.Event] = None
+
+        self.status: Dict[str, Any] = {
+            'started_at': None,
+            'listening': False,
+            'batches': 0,
+            'batches_failed': 0,
+            'documents_processed': 0,
+            'leased_elsewhere': 0,
+            'notifications': 0,
+            'caught_up': 0,
+            'last_batch': None,
+            'last_error': None
+        }
+
+    # Lifecycle
+
+    async def run(self):
+        """Serve until stop() is called or SIGINT/SIGTERM arrives"""
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._disconnected = asyncio.Event()
+        self.status['started_at'] = datetime.now().isoformat()
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not supported on this platform/thread
+
+        runner = await self._start_health_server()
+        listener = asyncio.create_task(self._listen_forever())
+        logger.info(f"Pipeline daemon listening on '{self.channel}' "
+                    f"(batch size {self.batch_size}, max latency {self.max_latency}s)")
+        try:
+            await self._batch_loop()
+        finally:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+            self._close_listener()
+            await asyncio.to_thread(self.worker.close)
+            if runner is not None:
+                await runner.cleanup()
+            logger.info("Pipeline daemon stopped")
+
+    def stop(self):
+        """Finish the running batch, then exit run()"""
+        if self._stopping is not None and not self._stopping.is_set():
+            logger.info("Pipeline daemon stopping")
+            self._stopping.set()
+            self._wakeup.set()
+
+    # Listening
+
+    async def _listen_forever(self):
+        """Keep a LISTEN connection open, reconnecting with backoff"""
+        attempt = 0
+        while not self._stopping.is_set():
+            try:
+                await asyncio.to_thread(self._open_listener)
+            except Exception as e:
+                delay = self.RECONNECT_DELAYS[min(attempt, len(self.RECONNECT_DELAYS) - 1)]
+                attempt += 1
+                self.status['last_error'] = f"listen connection failed: {e}"
+                logger.warning(f"Could not LISTEN on '{self.channel}' ({e}); retrying in {delay}s")
+                await self._sleep(delay)
+                continue
+
+            attempt = 0
+            self._disconnected.clear()
+            asyncio.get_running_loop().add_reader(self._listen_conn.fileno(), self._on_readable)
+            self.status['listening'] = True
+
+            # Anything committed while we were not listening
+            if self.catch_up:
+                await self._catch_up()
+
+            await self._disconnected.wait()
+            self.status['listening'] = False
+            self._close_listener()
+
+    def _open_listener(self):
+        conn = get_db_connection()
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        self._listen_conn = conn
+
+    def _close_listener(self):
+        if self._listen_conn is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(self._listen_conn.fileno())
+        except (RuntimeError, ValueError, psycopg2.InterfaceError):
+            pass
+        try:
+            self._listen_conn.close()
+        except psycopg2.Error:
+            pass
+        self._listen_conn = None
+
+    def _on_readable(self):
+        """Event loop callback: drain notifications from the listen connection"""
+        conn = self._listen_conn
+        try:
+            conn.poll()
+        except psycopg2.Error as e:
+            logger.warning(f"Listen connection lost: {e}")
+            self.status['last_error'] = f"listen connection lost: {e}"
+            asyncio.get_running_loop().remove_reader(conn.fileno())
+            self._disconnected.set()
+            return
+
+        ids = []
+        for notify in conn.notifies:
+            try:
+                ids.append(int(notify.payload))
+            except ValueError:
+                logger.warning(f"Ignoring notification with non-integer payload: {notify.payload!r}")
+        conn.notifies.clear()
+        self.status['notifications'] += len(ids)
+        self._enqueue(ids)
+
+    async def _catch_up(self):
+        """Queue documents that were never processed, and every claimable job"""
+        def fetch_ids():
+            # Own connection: a batch may be using the queue's meanwhile
+            conn = get_db_connection()
+            try:
+                queue = PipelineJobQueue(conn, max_attempts=self.queue.max_attempts)
+                queue.backfill()
+                return queue.claimable_ids()
+            finally:
+                conn.close()
+
+        try:
+            ids = await asyncio.to_thread(fetch_ids)
+        except Exception as e:
+            self.status['last_error'] = f"catch-up failed: {e}"
+            logger.error(f"Catch-up query failed: {e}")
+            return
+        self.status['caught_up'] += len(ids)
+        if ids:
+            logger.info(f"Catch-up queued {len(ids)} unprocessed documents")
+        self._enqueue(ids)
+
+    def _enqueue(self, ids: List[int]):
+        now = time.monotonic()
+        for document_id in ids:
+            self._pending.setdefault(document_id, now)
+        if ids:
+            self._wakeup.set()
+
+    # Batching
+
+    async def _batch_loop(self):
+        while not self._stopping.is_set():
+            if not self._pending:
+                await self._wait_for_wakeup(None)
+                continue
+
+            oldest = next(iter(self._pending.values()))
+            wait = oldest + self.max_latency - time.monotonic()
+            if len(self._pending) < self.batch_size and wait > 0:
+                await self._wait_for_wakeup(wait)
+                continue
+
+            batch = list(self._pending)[:self.batch_size]
+            queued_at = [self._pending.pop(document_id) for document_id in batch]
+            await self._process(batch, min(queued_at))
+
+    async def _wait_for_wakeup(self, timeout: Optional[float]):
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _process(self, document_ids: List[int], queued_at: float):
+        """Lease one micro-batch and run it in a worker thread so the loop keeps listening"""
+        started = time.monotonic()
+        try:
+            leased = await asyncio.to_thread(self.queue.claim_ids, document_ids)
+            # The rest are being processed by another node, or already were
+            self.status['leased_elsewhere'] += len(document_ids) - len(leased)
+            if not leased:
+                return
+            document_ids = leased
+            logger.info(f"Processing batch of {len(document_ids)} documents")
+            results = await self.worker.process(document_ids)
+        except Exception as e:
+            results = {'success': False, 'error': str(e)}
+
+        finished = time.monotonic()
+        self.status['batches'] += 1
+        self.status['last_batch'] = {
+            'finished_at': datetime.now().isoformat(),
+            'documents': len(document_ids),
+            'success': results.get('success', False),
+            'processing_seconds': round(finished - started, 3),
+            'latency_seconds': round(finished - queued_at, 3)
+        }
+        if results.get('success'):
+            self.status['documents_processed'] += results.get('statistics', {}).get('documents_processed', 0)
+        else:
+            # Released rows are announced again as they return to pending
+            self.status['batches_failed'] += 1
+            self.status['last_error'] = results.get('error')
+            logger.error(f"Batch of {len(document_ids)} documents failed: {results.get('error')}")
+
+    # Health endpoint
+
+    def health(self) -> Dict[str, Any]:
+        """Current daemon state, as served by GET /health"""
+        pending = len(self._pending)
+        oldest = next(iter(self._pending.values()), None)
+        return {
+            'status': 'ok' if self.status['listening'] else 'degraded',
+            'channel': self.channel,
+            'pending': pending,
+            'oldest_pending_seconds': round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+            **self.status
+        }
+
+    async def _start_health_server(self) -> Optional[web.AppRunner]:
+        if self.health_port is None:
+            return None
+
+        async def handle_health(request):
+            health = self.health()
+            return web.json_response(health, status=200 if health['status'] == 'ok' else 503)
+
+        app = web.Application()
+        app.router.add_get('/health', handle_health)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, self.health_host, self.health_port).start()
+        logger.info(f"Health endpoint on http://{self.health_host}:{self.health_port}/health")
+        return runner
@@ -0,0 +1,100 @@
+"""
+Checkpoints of pipeline runs
+
+A windowed `pipeline run` records its progress in
+court_data.pipeline_run_checkpoints after every window that has been stored
+and indexed: the arguments that select its documents, the last document it
+fetched and its running totals. `pipeline run --resume <run_id>` loads the
+checkpoint and continues after that document instead of starting over.
+Completed runs are deleted after PIPELINE_CHECKPOINT_RETENTION_DAYS.
+"""
+
+import json
+import logging
+from typing import Dict, Any, Optional
+
+from psycopg2.extras import RealDictCursor
+
+from services.config import PIPELINE_CHECKPOINT_RETENTION_DAYS
+
+logger = logging.getLogger(__name__)
+
+
+class RunCheckpointStore:
+    """Read and write rows of court_data.pipeline_run_checkpoints"""
+
+    def __init__(self, db_conn):
+        self.db_conn = db_conn
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Checkpoint row of a run, or None if the run never checkpointed"""
+        with self.db_conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute("""
+                SELECT run_id, status, parameters, last_document, windows_completed,
+                       attempts, state, last_error, created_at, updated_at
+                FROM court_data.pipeline_run_checkpoints
+                WHERE run_id = %s
+            """, (run_id,))
+            row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def start(self, run_id: str, parameters: Dict[str, Any], state: Dict[str, Any]):
+        """Record a new run, or count another attempt of a resumed one, and commit"""
+        with self.db_conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO court_data.pipeline_run_checkpoints (run_id, parameters, state)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (run_id) DO UPDATE SET
+                    status = 'running',
+                    attempts = court_data.pipeline_run_checkpoints.attempts + 1,
+                    last_error = NULL,
+                    updated_at = NOW()
+            """, (run_id, json.dumps(parameters, default=str), json.dumps(state, default=str)))
+        self.db_conn.commit()
+
+    def save(self, run_id: str, last_document: Optional[Dict[str, Any]],
+             windows_completed: int, state: Dict[str, Any]):
+        """Record progress after a committed window and commit"""
+        with self.db_conn.cursor() as cursor:
+            cursor.execute("""
+                UPDATE court_data.pipeline_run_checkpoints
+                SET last_document = %s,
+                    windows_completed = %s,
+                    state = %s,
+                    updated_at = NOW()
+                WHERE run_id = %s
+            """, (json.dumps(last_document, default=str), windows_completed,
+                  json.dumps(state, default=str), run_id))
+        self.db_conn.commit()
+
+    def purge(self, older_than_days: float = PIPELINE_CHECKPOINT_RETENTION_DAYS,
+              include_failed: bool = False) -> int:
+        """
+        Delete completed runs last updated more than older_than_days ago
+        and commit; 0 or less keeps them all
+        
+        Args:
+            include_failed: Also delete failed runs, which can no longer
+                be resumed
+        """
+        if older_than_days <= 0:
+            return 0
+        statuses = ['completed', 'failed'] if include_failed else ['completed']
+        with self.db_conn.cursor() as cursor:
+            cursor.execute("""
+                DELETE FROM court_data.pipeline_run_checkpoints
+                WHERE status = ANY(%s) AND updated_at < NOW() - make_interval(secs => %s)
+            """, (statuses, older_than_days * 86400))
+            deleted = cursor.rowcount
+        self.db_conn.commit()
+        return deleted
+
+    def finish(self, run_id: str, status: str, error: Optional[str] = None):
+        """Mark a run completed or failed and commit"""
+        with self.db_conn.cursor() as cursor:
+            cursor.execute("""
+                UPDATE court_data.pipeline_run_checkpoints
+                SET status = %s, last_error = %s, updated_at = NOW()
+                WHERE run_id = %s
+            """, (status, error, run_id))
+        self.db_conn.commit()
@@ -0,0 +1,223 @@
+"""
+Size-bounded SQLite cache shared by the citation and HTTP response caches
+
+Each cache is one table in a local SQLite file (WAL mode, so pipeline
+processes can share it) with its key columns, its value columns, the size
+of the stored payload and when the entry was last used. Least recently
+used entries are evicted once the payloads grow past max_bytes.
+
+A cache is an optimization only: any SQLite error is logged, the cache
+disables itself and callers carry on uncached.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteLRUCache:
+    """
+    Base of the SQLite-backed caches
+
+    Subclasses name their TABLE, KEY_COLUMNS and VALUE_COLUMNS (column
+    definitions) and a LABEL for log messages, and read and write entries
+    with _lookup, _store and _update.
+    """
+
+    TABLE = ''
+    KEY_COLUMNS: Tuple[str, ...] = ()
+    VALUE_COLUMNS: Tuple[str, ...] = ()
+    LABEL = 'cache'
+
+    # Evicting trims the cache to this fraction of max_bytes, so a full
+    # cache does not evict on every insert
+    EVICTION_TARGET = 0.9
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Args:
+            path: SQLite file; its directory is created on first use
+            max_bytes: Total size of cached payloads before eviction
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._conn = None
+        self._lock = threading.Lock()
+        self._disabled = False
+        self._approx_bytes = None
+        self._key_names = [column.split()[0] for column in self.KEY_COLUMNS]
+        self._where = ' AND '.join(f"{name} = ?" for name in self._key_names)
+
+    # Connection handling. The connection is opened lazily so a cache built
+    # in the parent process is never shared with pool workers.
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._disabled:
+            return None
+        if self._conn is None:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # Threads take turns on one connection, guarded by _lock
+                conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                       check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                        {', '.join((*self.KEY_COLUMNS, *self.VALUE_COLUMNS))},
+                        size INTEGER NOT NULL,
+                        last_used REAL NOT NULL,
+                        PRIMARY KEY ({', '.join(self._key_names)})
+                    )
+                """)
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{self.TABLE}_last_used ON {self.TABLE} (last_used)"
+                )
+                self._conn = conn
+            except sqlite3.Error as e:
+                self._disable(e)
+        return self._conn
+
+    def _disable(self, error: Exception):
+        logger.warning(f"{self.LABEL} at {self.path} disabled: {error}")
+        self._disabled = True
+        self.close()
+
+    def close(self):
+        """Close the SQLite connection; the next lookup reopens it"""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    # Entries
+
+    def _lookup(self, key: Sequence[Any], columns: Sequence[str]) -> Optional[tuple]:
+        """Value columns of an entry, marking it used, or None"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    f"SELECT {', '.join(columns)} FROM {self.TABLE} WHERE {self._where}", tuple(key)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(f"UPDATE {self.TABLE} SET last_used = ? WHERE {self._where}",
+                                 (time.time(), *key))
+                return row
+            except sqlite3.Error as e:
+                self._disable(e)
+                return None
+
+    def _store(self, key: Sequence[Any], values: Dict[str, Any], size: int):
+        """Insert or replace an entry whose payload takes size bytes, evicting if over max_bytes"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            names = [*self._key_names, *values, 'size', 'last_used']
+            try:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.TABLE} ({', '.join(names)}) "
+                    f"VALUES ({', '.join('?' for _ in names)})",
+                    (*key, *values.values(), size, time.time())
+                )
+                if self._approx_bytes is None:
+                    self._approx_bytes = self._total_bytes(conn)
+                else:
+                    self._approx_bytes += size
+                if self._approx_bytes > self.max_bytes:
+                    self._evict(conn)
+            except sqlite3.Error as e:
+                self._disable(e)
+
+    def _update(self, key: Sequence[Any], values: Dict[str, Any]):
+        """Set value columns of an existing entry"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    f"UPDATE {self.TABLE} SET {', '.join(f'{name} = ?' for name in values)} WHERE {self._where}",
+                    (*values.values(), *key)
+                )
+            except sqlite3.Error as e:
+                self._disable(e)
+
+    def _total_bytes(self, conn: sqlite3.Connection) -> int:
+        return conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE}").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until under the eviction target"""
+        # Other processes write to the same file, so recount before evicting
+        total = self._total_bytes(conn)
+        target = int(self.max_bytes * self.EVICTION_TARGET)
+        if total > self.max_bytes:
+            excess = total - target
+            doomed = []
+            for rowid, size in conn.execute(f"SELECT rowid, size FROM {self.TABLE} ORDER BY last_used"):
+                if excess <= 0:
+                    break
+                doomed.append((rowid,))
+                excess -= size
+            conn.executemany(f"DELETE FROM {self.TABLE} WHERE rowid = ?", doomed)
+            self.evictions += len(doomed)
+            total = excess + target
+            logger.debug(f"{self.LABEL} evicted {len(doomed)} entries")
+        self._approx_bytes = total
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(f"DELETE FROM {self.TABLE}")
+                self._approx_bytes = 0
+            except sqlite3.Error as e:
+                self._disable(e)
+
+    def _size_stats(self) -> Dict[str, Any]:
+        """Path, state, eviction count and the cache size on disk"""
+        with self._lock:
+            stats = {
+                'path': self.path,
+                'enabled': not self._disabled,
+                'evictions': self.evictions,
+                'entries': 0,
+                'bytes': 0,
+                'max_bytes': self.max_bytes
+            }
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    stats['entries'], stats['bytes'] = conn.execute(
+                        f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.TABLE}"
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    self._disable(e)
+                    stats['enabled'] = False
+            return stats
@@ -0,0 +1,77 @@
+"""
+Persisted outputs of the pipeline enhancement stages
+
+Each row in court_data.pipeline_stage_results holds one stage's output for
+one document, together with the stage version and the input hash that
+produced it. The pipeline reuses a stored output when both still match,
+so a rerun only recomputes the stages whose code or inputs changed.
+"""
+
+import logging
+from typing import Dict, Any, List, Tuple
+
+from psycopg2.extras import execute_values, RealDictCursor
+
+logger = logging.getLogger(__name__)
+
+
+class StageResultStore:
+    """Read and write rows of court_data.pipeline_stage_results"""
+
+    def __init__(self, db_conn):
+        self.db_conn = db_conn
+
+    def load(self, document_ids: List[str]) -> Dict[str, Dict[int, Dict[str, Any]]]:
+        """
+        Fetch stored stage results for the given documents
+
+        Returns:
+            {document_id: {stage: {'stage_version', 'input_hash', 'output'}}}
+        """
+        results: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        if not document_ids:
+            return results
+
+        with self.db_conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute("""
+                SELECT document_id, stage, stage_version, input_hash, output
+                FROM court_data.pipeline_stage_results
+                WHERE document_id = ANY(%s)
+            """, (list(document_ids),))
+            for row in cursor.fetchall():
+                results.setdefault(row['document_id'], {})[row['stage']] = {
+                    'stage_version': row['stage_version'],
+                    'input_hash': row['input_hash'],
+                    'output': row['output']
+                }
+        return results
+
+    def save(self, rows: List[Tuple[str, int, int, str, str]]) -> int:
+        """
+        Upsert stage results and commit
+
+        Args:
+            rows: (document_id, stage, stage_version, input_hash, output JSON) tuples
+
+        Returns:
+            Number of rows written
+        """
+        if not rows:
+            return 0
+
+        # A document listed twice in a batch would hit the same row twice
+        rows = list({(row[0], row[1]): row for row in rows}.values())
+
+        with self.db_conn.cursor() as cursor:
+            execute_values(cursor, """
+                INSERT INTO court_data.pipeline_stage_results
+                    (document_id, stage, stage_version, input_hash, output)
+                VALUES %s
+                ON CONFLICT (document_id, stage) DO UPDATE SET
+                    stage_version = EXCLUDED.stage_version,
+                    input_hash = EXCLUDED.input_hash,
+                    output = EXCLUDED.output,
+                    updated_at = NOW()
+            """, rows, page_size=1000)
+        self.db_conn.commit()
+        return len(rows)
@@ -0,0 +1,124 @@
+"""
+Bulk storage of enhanced documents into court_data.opinions_unified
+
+Rows are written with multi-row INSERT ... ON CONFLICT (cl_id) DO UPDATE
+statements, so each chunk of documents costs one round-trip instead of a
+SELECT plus an INSERT/UPDATE per document. Unchanged rows are left alone
+by the conflict clause and counted as skipped.
+"""
+
+import logging
+from typing import Dict, Any, List, Optional
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from services.config import STORAGE_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class OpinionStorageService:
+    """Chunked upserts into court_data.opinions_unified"""
+
+    COLUMNS = [
+        'cl_id', 'court_id', 'case_name', 'plain_text',
+        'citations', 'judge_info', 'court_info',
+        'structured_elements', 'document_hash',
+        'flp_processing_timestamp', 'created_at'
+    ]
+
+    # Columns refreshed when an existing cl_id is stored again
+    UPDATE_COLUMNS = [
+        'court_id', 'case_name', 'plain_text',
+        'citations', 'judge_info', 'court_info',
+        'structured_elements', 'document_hash',
+        'flp_processing_timestamp'
+    ]
+
+    def __init__(self, db_conn, chunk_size: Optional[int] = None):
+        """
+        Args:
+            db_conn: Open psycopg2 connection; each chunk is committed on it
+            chunk_size: Rows per INSERT statement and transaction
+        """
+        self.db_conn = db_conn
+        self.chunk_size = max(1, chunk_size or STORAGE_CHUNK_SIZE)
+
+    def _upsert_sql(self, force_reprocess: bool) -> str:
+        """Build the upsert statement; xmax = 0 marks freshly inserted rows"""
+        updates = ',\n                '.join(
+            f"{column} = EXCLUDED.{column}" for column in self.UPDATE_COLUMNS
+        )
+        sql = f"""
+            INSERT INTO court_data.opinions_unified ({', '.join(self.COLUMNS)})
+            VALUES %s
+            ON CONFLICT (cl_id) DO UPDATE SET
+                {updates},
+                updated_at = NOW()
+        """
+        if not force_reprocess:
+            sql += """
+            WHERE court_data.opinions_unified.document_hash IS DISTINCT FROM EXCLUDED.document_hash
+            """
+        return sql + "RETURNING cl_id, (xmax = 0) AS inserted"
+
+    def upsert_opinions(self, rows: List[Dict[str, Any]],
+                        force_reprocess: bool = False) -> Dict[str, Any]:
+        """
+        Store rows in chunks, committing after each chunk
+
+        Args:
+            rows: Dicts keyed by COLUMNS
+            force_reprocess: Rewrite existing rows even when their hash is unchanged
+
+        Returns:
+            Counts of stored (new), updated, skipped and failed rows, plus
+            one entry per failed chunk in 'failed_chunks'
+        """
+        results = {
+            'stored_count': 0,
+            'updated_count': 0,
+            'skipped_count': 0,
+            'failed_count': 0,
+            'failed_chunks': []
+        }
+        sql = self._upsert_sql(force_reprocess)
+
+        for start in range(0, len(rows), self.chunk_size):
+            chunk = rows[start:start + self.chunk_size]
+
+            # One statement may not touch the same row twice; keep the last
+            # occurrence of each cl_id and count the others as skipped
+            unique_rows = {row['cl_id']: row for row in chunk}
+            results['skipped_count'] += len(chunk) - len(unique_rows)
+            values = [
+                tuple(row[column] for column in self.COLUMNS)
+                for row in unique_rows.values()
+            ]
+
+            try:
+                with self.db_conn.cursor() as cursor:
+                    returned = execute_values(
+                        cursor, sql, values,
+                        page_size=len(values), fetch=True
+                    )
+                self.db_conn.commit()
+            except psycopg2.Error as e:
+                self.db_conn.rollback()
+                logger.error(f"Storage chunk at offset {start} failed: {e}")
+                results['failed_count'] += len(values)
+                results['failed_chunks'].append({
+                    'offset': start,
+                    'size': len(values),
+                    'cl_ids': list(unique_rows.keys()),
+                    'error': str(e)
+                })
+                continue
+
+            inserted = sum(1 for _, is_new in returned if is_new)
+            results['stored_count'] += inserted
+            results['updated_count'] += len(returned) - inserted
+            results['skipped_count'] += len(values) - len(returned)
+
+        return results
@@ -0,0 +1,61 @@
+"""
+Watermarks of incremental CourtListener syncs
+
+`collect sync` asks CourtListener only for the records of a court modified
+since the last sync. court_data.courtlistener_sync_state keeps, per court
+and endpoint, the latest date_modified applied and the ids applied at
+exactly that instant (records sharing the watermark's timestamp are
+requested again and skipped by id). The mark is advanced with the cursor
+that stores a batch of records, so it moves only when that batch commits.
+"""
+
+from datetime import datetime
+from typing import Dict, Any, Iterable, Optional
+
+from psycopg2.extras import RealDictCursor
+
+
+class SyncStateStore:
+    """Read and write rows of court_data.courtlistener_sync_state"""
+
+    def __init__(self, db_conn):
+        self.db_conn = db_conn
+
+    def load(self, court_id: str, endpoint: str) -> Optional[Dict[str, Any]]:
+        """Watermark of a court and endpoint, or None if it was never synced"""
+        with self.db_conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute("""
+                SELECT court_id, endpoint, date_modified, boundary_ids, records_applied, last_synced_at
+                FROM court_data.courtlistener_sync_state
+                WHERE court_id = %s AND endpoint = %s
+            """, (court_id, endpoint))
+            row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def load_all(self) -> list:
+        """Every watermark, by court and endpoint"""
+        with self.db_conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute("""
+                SELECT court_id, endpoint, date_modified, boundary_ids, records_applied, last_synced_at
+                FROM court_data.courtlistener_sync_state
+                ORDER BY court_id, endpoint
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def advance(cursor, court_id: str, endpoint: str, date_modified: datetime,
+                boundary_ids: Iterable[int], records: int):
+        """
+        Move the watermark on the caller's cursor; it takes effect when the
+        caller commits the records it applied in the same transaction
+        """
+        cursor.execute("""
+            INSERT INTO court_data.courtlistener_sync_state
+                (court_id, endpoint, date_modified, boundary_ids, records_applied)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (court_id, endpoint) DO UPDATE SET
+                date_modified = EXCLUDED.date_modified,
+                boundary_ids = EXCLUDED.boundary_ids,
+                records_applied = court_data.courtlistener_sync_state.records_applied + EXCLUDED.records_applied,
+                last_synced_at = NOW()
+        """, (court_id, endpoint, date_modified, sorted(set(boundary_ids)), records))
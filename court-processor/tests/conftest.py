@@ -0,0 +1,38 @@
+"""
+Shared setup for the unit tests
+
+Settings are read from the environment when services.config is imported, so
+they are set here first: no database, and caches and spill files under a
+temporary directory instead of the user's cache.
+"""
+
+import importlib
+import os
+import sys
+import tempfile
+import types
+
+import pytest
+
+_TEST_DIR = tempfile.mkdtemp(prefix='court-processor-tests-')
+
+os.environ.setdefault('JUDGE_INDEX_FROM_DATABASE', 'false')
+os.environ['CITATION_CACHE_PATH'] = ''
+os.environ['HTTP_CACHE_PATH'] = ''
+os.environ.setdefault('ERROR_SPILL_DIR', os.path.join(_TEST_DIR, 'errors'))
+os.environ.setdefault('HYPERSCAN_CACHE_DIR', os.path.join(_TEST_DIR, 'hyperscan'))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def ingestion(monkeypatch):
+    # The RECAP client and PDF processor are not needed to process ingestion in tests
+    recap = types.ModuleType('services.recap.authenticated_client')
+    recap.AuthenticatedRECAPClient = object
+    pdf = types.ModuleType('pdf_processor')
+    pdf.PDFProcessor = lambda **options: None
+    monkeypatch.setitem(sys.modules, 'services.recap', types.ModuleType('services.recap'))
+    monkeypatch.setitem(sys.modules, 'services.recap.authenticated_client', recap)
+    monkeypatch.setitem(sys.modules, 'pdf_processor', pdf)
+    return importlib.import_module('services.ingestion')
@@ -0,0 +1,143 @@
+"""
+BatchLoader batching and memoization, and CourtListener lookups by id
+
+Loads within the batch window share one fetch, the memo keeps only the most
+recently used keys, every waiting caller is answered even when its key was
+forgotten meanwhile, and records fetched with id__in are cached one by one
+under their detail URLs.
+"""
+
+import asyncio
+import contextlib
+import json
+
+import pytest
+
+from services.courtlistener import CourtListenerService
+from services.http_cache import HttpResponseCache
+from utils.batch_loader import BatchLoader
+
+
+class Fetcher:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, keys):
+        self.calls.append(list(keys))
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError('backend down')
+        return {key: f"record {key}" for key in keys if key != 404}
+
+
+def test_loads_are_batched_deduplicated_and_memoized():
+    fetch = Fetcher()
+    loader = BatchLoader(fetch, max_batch_size=3, batch_window=0.001)
+
+    async def run():
+        first = await loader.load_many([1, 2, 1, 3, 4, 404])
+        again = await loader.load(2)
+        return first, again
+
+    first, again = asyncio.run(run())
+
+    assert first == ['record 1', 'record 2', 'record 1', 'record 3', 'record 4', None]
+    assert again == 'record 2'
+    assert fetch.calls == [[1, 2, 3], [4, 404]]
+    stats = loader.stats()
+    assert (stats['requested'], stats['memo_hits'], stats['batches']) == (7, 2, 2)
+
+
+def test_memo_keeps_the_most_recently_used_keys():
+    fetch = Fetcher()
+    loader = BatchLoader(fetch, batch_window=0.001, max_memo_size=2)
+
+    async def run():
+        await loader.load_many([1, 2])
+        await loader.load(1)  # 1 is now more recently used than 2
+        await loader.load(3)
+        await loader.load(1)
+        await loader.load(2)
+
+    asyncio.run(run())
+
+    assert fetch.calls == [[1, 2], [3], [2]]
+    assert loader.stats()['loaded'] == 2
+    assert loader.stats()['evicted'] == 2
+
+
+def test_waiting_callers_are_answered_after_clear():
+    fetch = Fetcher()
+    loader = BatchLoader(fetch, batch_window=0.001)
+
+    async def run():
+        waiting = asyncio.ensure_future(loader.load_many([1, 2]))
+        await asyncio.sleep(0)
+        loader.clear()  # Before the batch is dispatched
+        return await asyncio.wait_for(waiting, 1)
+
+    assert asyncio.run(run()) == ['record 1', 'record 2']
+
+
+def test_failed_batches_fail_every_caller_and_are_forgotten():
+    fetch = Fetcher(fail=True)
+    loader = BatchLoader(fetch, batch_window=0.001)
+
+    async def run():
+        results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+        fetch.fail = False
+        return results, await loader.load(1)
+
+    results, retried = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == 'record 1'
+    assert fetch.calls == [[1, 2], [1]]
+
+
+@pytest.fixture
+def service(tmp_path):
+    cache = HttpResponseCache(str(tmp_path / 'http.sqlite3'))
+    service = CourtListenerService(api_key='test', response_cache=cache)
+    sent = []
+
+    class Response:
+        status = 200
+        headers = {}
+
+        def __init__(self, body):
+            self.body = body
+
+        async def text(self):
+            return self.body
+
+    @contextlib.asynccontextmanager
+    async def request(method, url, params=None, headers=None):
+        sent.append(dict(params or {}))
+        ids = [int(record_id) for record_id in params['id__in'].split(',')]
+        yield Response(json.dumps({'results': [{'id': record_id} for record_id in ids], 'next': None}))
+
+    service._request = request
+    service.sent = sent
+    return service
+
+
+def test_records_by_id_are_cached_per_record(service):
+    clusters = service.CLUSTERS_ENDPOINT
+
+    async def run():
+        first = await service.fetch_by_ids(clusters, [3, 1, 2, 1])
+        second = await service.fetch_by_ids(clusters, [2, 3, 4])
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert sorted(first) == [1, 2, 3] and sorted(second) == [2, 3, 4]
+    # Only the id not seen before is requested again
+    assert [params['id__in'] for params in service.sent] == ['1,2,3', '4']
+    cache = service.response_cache
+    assert cache.get(f"{service.BASE_URL}{clusters}2/").json() == {'id': 2}
+    # The id__in response itself is not stored
+    assert cache.get(f"{service.BASE_URL}{clusters}", {'id__in': '1,2,3', 'page_size': 3}) is None
+    assert (cache.hits, cache.misses) == (2, 4)
@@ -0,0 +1,77 @@
+"""
+Stage 3 citation cache
+
+A text seen before skips eyecite and gives the same Stage 3 output as
+extracting it; entries are keyed by content and eyecite version, and an
+unreadable entry turns the cache off instead of failing the stage.
+"""
+
+import sqlite3
+
+import pytest
+
+import processor
+from processor import RobustElevenStagePipeline
+from services.citation_cache import CitationCache
+
+CONTENT = (
+    "See Bell Atlantic Corp. v. Twombly, 550 U.S. 544, 570 (2007); Id. at 556. "
+    "Phillips v. AWH Corp., 415 F.3d 1303, 1312 (Fed. Cir. 2005) (en banc)."
+)
+
+
+def _pipeline(cache):
+    pipeline = RobustElevenStagePipeline(connect_db=False)
+    pipeline.citation_cache = cache
+    return pipeline
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CitationCache(str(tmp_path / 'citations.sqlite3'))
+
+
+def test_cached_texts_skip_eyecite_and_give_the_same_output(cache, monkeypatch):
+    uncached = _pipeline(None)._extract_citations_validated({'content': CONTENT})
+    assert uncached['count'] > 0
+
+    first = _pipeline(cache)
+    assert first._extract_citations_validated({'content': CONTENT}) == uncached
+    assert (first.stats['citation_cache_hits'], first.stats['citation_cache_misses']) == (0, 1)
+
+    def no_eyecite(*args, **kwargs):
+        raise AssertionError('eyecite ran on a cached text')
+
+    monkeypatch.setattr(processor, 'get_citations', no_eyecite)
+    second = _pipeline(cache)
+    assert second._extract_citations_validated({'content': CONTENT}) == uncached
+    assert (second.stats['citation_cache_hits'], second.stats['citation_cache_misses']) == (1, 0)
+
+
+def test_entries_are_keyed_by_text_and_eyecite_version(cache, tmp_path):
+    cache.put(CONTENT, [{'text': '550 U.S. 544'}])
+    assert cache.get(CONTENT + ' ') is None
+
+    upgraded = CitationCache(str(tmp_path / 'citations.sqlite3'))
+    upgraded.extractor_version = 'eyecite-99.0/v1'
+    assert upgraded.get(CONTENT) is None
+    assert cache.get(CONTENT) == [{'text': '550 U.S. 544'}]
+    # Lone surrogates from bad extractions still hash
+    assert len(CitationCache.content_key('\ud800')) == 64
+
+
+def test_unreadable_entries_disable_the_cache(cache, tmp_path):
+    cache.put(CONTENT, [{'text': '550 U.S. 544'}])
+    with sqlite3.connect(str(tmp_path / 'citations.sqlite3')) as connection:
+        connection.execute("UPDATE citation_cache SET payload = ?", (b'not zlib',))
+
+    pipeline = _pipeline(cache)
+    result = pipeline._extract_citations_validated({'content': CONTENT})
+    assert result['count'] > 0  # Extracted with eyecite instead
+    assert pipeline.stats['citation_cache_misses'] == 1
+    assert cache.stats()['enabled'] is False and cache.get(CONTENT) is None
+
+
+def test_empty_path_turns_the_cache_off(monkeypatch):
+    monkeypatch.setattr('services.citation_cache.CITATION_CACHE_PATH', '')
+    assert CitationCache.from_config() is None
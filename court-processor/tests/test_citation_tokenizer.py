@@ -0,0 +1,55 @@
+"""
+Citation tokenizer selection and Hyperscan/default equivalence
+
+The Hyperscan tokenizer is only a faster way to find the same candidates,
+so eyecite must return the same citations with either one. Building the
+Hyperscan database takes a while the first time.
+"""
+
+import pytest
+from eyecite import get_citations
+
+from exceptions import ConfigurationError
+from extractors import citation_tokenizer
+from extractors.citation_tokenizer import get_citation_tokenizer, resolve_tokenizer_name
+
+TEXTS = [
+    "See Bell Atlantic Corp. v. Twombly, 550 U.S. 544, 570 (2007); Id. at 556.",
+    "Phillips v. AWH Corp., 415 F.3d 1303, 1312-13 (Fed. Cir. 2005) (en banc); supra, 415 F.3d at 1315.",
+    "Under 35 U.S.C. § 101 and 28 U.S.C. §§ 1331, 1338(a), see also Fed. R. Civ. P. 12(b)(6).",
+    "Smith v. Jones, 2019 WL 1234567, at *3 (E.D. Tex. Mar. 1, 2019); 123 F. Supp. 3d 45 (D. Del. 2015).",
+    "No citations here, only 12 apples and 3 oranges.",
+]
+
+
+def _signature(citations):
+    return [(type(citation).__name__, citation.matched_text(), citation.span(), citation.groups)
+            for citation in citations]
+
+
+@pytest.mark.skipif(not citation_tokenizer.HYPERSCAN_AVAILABLE, reason='hyperscan is not installed')
+def test_hyperscan_finds_the_default_citations():
+    default = get_citation_tokenizer('default')
+    hyperscan = get_citation_tokenizer('hyperscan')
+    assert hyperscan is not default
+    assert get_citation_tokenizer('HYPERSCAN') is hyperscan  # Built once per process
+
+    # And one long opinion-like text, where offsets run past the first sentences
+    texts = TEXTS + ['\n\n'.join(TEXTS * 40)]
+    for text in texts:
+        expected = _signature(get_citations(text, tokenizer=default))
+        assert _signature(get_citations(text, tokenizer=hyperscan)) == expected, text[:80]
+
+
+def test_hyperscan_falls_back_to_default_when_missing(monkeypatch):
+    monkeypatch.setattr(citation_tokenizer, 'HYPERSCAN_AVAILABLE', False)
+    monkeypatch.setattr(citation_tokenizer, '_tokenizers', {})
+    assert resolve_tokenizer_name('hyperscan') == 'default'
+    assert get_citation_tokenizer('hyperscan') is get_citation_tokenizer('default')
+    assert citation_tokenizer.tokenizer_info('hyperscan')['effective'] == 'default'
+
+
+def test_unknown_tokenizer_is_a_configuration_error():
+    assert resolve_tokenizer_name(None) == 'default'
+    with pytest.raises(ConfigurationError):
+        resolve_tokenizer_name('regex')
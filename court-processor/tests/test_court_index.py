@@ -0,0 +1,112 @@
+"""
+Court id index against scans over courts_db
+
+Bisected prefix lookups and length-bucketed nearest-id lookups must find
+what a scan over every id finds, with or without rapidfuzz, and
+CourtValidator must accept and reject the same ids as before the index.
+"""
+
+import random
+from functools import lru_cache
+
+import pytest
+from courts_db import courts
+
+from utils import court_index
+from utils.court_index import (
+    VALID_COURT_IDS, normalize_court_key, nearest_court_ids, prefix_court_ids,
+    resolve_court_alias, suggest_court_ids
+)
+from validators import CourtValidator
+
+COURT_IDS = sorted({court['id'] for court in courts if isinstance(court, dict)})
+
+
+def _levenshtein(first, second):
+    previous = list(range(len(second) + 1))
+    for row, first_char in enumerate(first, 1):
+        current = [row]
+        for column, second_char in enumerate(second, 1):
+            current.append(min(previous[column] + 1, current[column - 1] + 1,
+                               previous[column - 1] + (first_char != second_char)))
+        previous = current
+    return previous[-1]
+
+
+@lru_cache(maxsize=None)
+def _scan_nearest(value):
+    """Up to three ids within two edits of value, closest first, from every id"""
+    scored = sorted((_levenshtein(value, court_id), court_id) for court_id in COURT_IDS)
+    return [court_id for distance, court_id in scored if distance <= 2][:3]
+
+
+def _misspellings(count=40):
+    rng = random.Random(20)
+    values = []
+    for court_id in rng.sample(COURT_IDS, count):
+        position = rng.randrange(len(court_id))
+        values.append(rng.choice([
+            court_id[:position] + court_id[position + 1:],
+            court_id[:position] + rng.choice('abcdxyz') + court_id[position:],
+            court_id[:position] + rng.choice('abcdxyz') + court_id[position + 1:],
+            court_id + 'zz',
+        ]))
+    return values
+
+
+def test_valid_ids_are_the_courts_db_ids():
+    assert VALID_COURT_IDS == frozenset(COURT_IDS)
+
+
+def test_prefix_lookup_matches_a_scan():
+    keys = sorted(court_index._ALIASES)
+    for prefix in ['t', 'tx', 'ca', 'cal', 'nyapp', 'edt', 'q', 'zzz']:
+        expected = []
+        for key in keys:
+            if key.startswith(prefix) and court_index._ALIASES[key] not in expected:
+                expected.append(court_index._ALIASES[key])
+        assert prefix_court_ids(prefix, limit=1000) == expected, prefix
+        assert prefix_court_ids(prefix) == expected[:3]
+
+
+@pytest.mark.parametrize('rapidfuzz', [True, False])
+def test_nearest_ids_match_a_scan(monkeypatch, rapidfuzz):
+    if rapidfuzz and not court_index.RAPIDFUZZ_AVAILABLE:
+        pytest.skip('rapidfuzz is not installed')
+    monkeypatch.setattr(court_index, 'RAPIDFUZZ_AVAILABLE', rapidfuzz)
+    for value in _misspellings():
+        assert nearest_court_ids(value) == _scan_nearest(value), value
+
+
+def test_aliases_and_suggestions():
+    assert normalize_court_key('E.D. Tex.') == 'edtex'
+    assert resolve_court_alias('E.D. Tex.') == 'txed'
+    assert resolve_court_alias('TXED') == 'txed'
+    assert resolve_court_alias('') is None
+    assert suggest_court_ids('E.D. Tex.')[0] == 'txed'
+    assert 'txed' in suggest_court_ids('txedd')
+    assert suggest_court_ids('   ') == [] and suggest_court_ids(None) == []
+
+
+def _baseline_validity(court_id):
+    """Errors and whether a suggestion was made, as the former scan produced them"""
+    if court_id in COURT_IDS:
+        return [], False
+    similar = [cid for cid in COURT_IDS if cid.startswith(court_id[:2])]
+    return [f"Court ID '{court_id}' not found in courts database"], bool(similar)
+
+
+def test_validator_accepts_and_rejects_the_same_ids():
+    for court_id in COURT_IDS[::7] + _misspellings():
+        result = CourtValidator.validate_court_id(court_id)
+        errors, suggested = _baseline_validity(court_id)
+        assert result.errors == errors
+        assert result.is_valid == (not errors)
+        # Whenever the old scan suggested ids, the index does too
+        if suggested:
+            assert result.warnings and result.warnings[0].startswith('Similar court IDs: ')
+    # Messages are cached per id; results are not shared between calls
+    first = CourtValidator.validate_court_id('txedd')
+    first.add_warning('extra')
+    assert CourtValidator.validate_court_id('txedd').warnings == ['Similar court IDs: ' + ', '.join(
+        suggest_court_ids('txedd'))]
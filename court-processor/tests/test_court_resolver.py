@@ -0,0 +1,104 @@
+"""
+CourtResolver's literal prefilter, generic-match rejection and hint lookups
+
+The prefilter must find exactly the matches of running every courts_db
+regex over the text, and a caption that names only a kind of court must
+resolve to nothing.
+"""
+
+import random
+
+import courts_db
+import pytest
+
+from extractors.court_resolver import CourtResolver, mine_literals
+
+CAPTIONS = [
+    "IN THE UNITED STATES DISTRICT COURT FOR THE EASTERN DISTRICT OF TEXAS\nMARSHALL DIVISION",
+    "UNITED STATES DISTRICT COURT\nNORTHERN DISTRICT OF CALIFORNIA\nSan Francisco Division",
+    "United States Court of Appeals for the Federal Circuit",
+    "SUPREME COURT OF THE UNITED STATES",
+    "In the Supreme Court of Alabama",
+    "UNITED STATES BANKRUPTCY COURT FOR THE DISTRICT OF DELAWARE",
+    "Surrogate's Court, Kings County",
+    "NOT A COURT AT ALL, just a letter about the weather",
+]
+
+
+@pytest.fixture(scope='module')
+def resolver():
+    return CourtResolver()
+
+
+def _texts():
+    rng = random.Random(19)
+    courts = rng.sample(courts_db.courts, 150)
+    texts = list(CAPTIONS)
+    for court in courts:
+        texts.append(f"IN THE {court['name'].upper()}\nCase No. 1:23-cv-00001")
+        texts.extend(court.get('examples', [])[:2])
+    return texts
+
+
+def _brute_force(text):
+    text = ' '.join(text.split())
+    matches = []
+    for regex, court_id, *_ in courts_db.regexes:
+        match = regex.search(text)
+        if match and match.end() > match.start():
+            matches.append({'court_id': court_id, 'text': match.group(0),
+                            'start': match.start(), 'end': match.end()})
+    return matches
+
+
+def test_prefilter_finds_every_regex_match(resolver):
+    for text in _texts():
+        assert resolver.find_matches(text) == _brute_force(text), text
+
+
+def test_mined_literals_occur_in_every_match():
+    examples = [example for court in courts_db.courts for example in court.get('examples', [])]
+    for regex, *_ in courts_db.regexes:
+        sets, _ = mine_literals(regex.pattern)
+        for example in examples:
+            match = regex.search(example)
+            if match:
+                lowered = example.lower()
+                assert all(any(literal in lowered for literal in found) for found in sets), regex.pattern
+
+
+def test_literal_miner_reads_courts_db_syntax():
+    sets, width = mine_literals(r"Dist(s)?(rict)? ?Court ?(for|of)? Te?x(as)?(\b|$)")
+    assert frozenset(['dist']) in sets and frozenset(['court']) in sets
+    # Longest match "Distsrict Court for Texas" plus one character for \b or $
+    assert width == 26
+    assert mine_literals(r"(Monroe|Munroe) County.*")[0] == [frozenset(['monroe', 'munroe']),
+                                                            frozenset(['county'])]
+    assert mine_literals(r"(\w+) v\. \1") == ([], None)  # Backreferences run unfiltered
+    assert CourtResolver().get_stats()['unfiltered_regexes'] < 50
+
+
+def test_generic_captions_resolve_to_nothing(resolver):
+    assert resolver.resolve_content("UNITED STATES DISTRICT COURT\nJohn Doe v. Acme Corp.") is None
+    assert resolver.resolve_hint("United States District Court") is None
+    resolved = resolver.resolve_content(CAPTIONS[0])
+    assert resolved['court_id'] == 'txed'
+    # An umbrella court that names its state is not generic
+    assert resolver.resolve_hint("New York Supreme Court") == 'nysupct'
+
+
+@pytest.mark.parametrize('hint', [
+    'txed', 'TXED', 'https://www.courtlistener.com/api/rest/v4/courts/txed/',
+    'E.D. Tex.', 'District Court, E.D. Texas', 'Eastern District of Texas',
+    'United States District Court for the Eastern District of Texas'
+])
+def test_hints_resolve_to_the_court(resolver, hint):
+    assert resolver.resolve_hint(hint) == 'txed'
+
+
+def test_unknown_hints_resolve_to_nothing(resolver):
+    assert resolver.resolve_hint('Eastern District') is None
+    assert resolver.resolve_hint('') is None
+    assert resolver.resolve_hint(42) is None
+    assert resolver.resolve_case_number('txed:2:21-cv-00316') == 'txed'
+    assert resolver.resolve_case_number('2:21-cv-00316') is None
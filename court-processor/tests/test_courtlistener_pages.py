@@ -0,0 +1,144 @@
+"""
+CourtListener page streaming
+
+_iter_pages yields each page's results as it arrives and asks for the next
+page while the caller is still working through the current one. It stops
+at max_results, at MAX_SEARCH_PAGES for numbered pages, and at the first
+failed page, and a caller that stops early cancels the page in flight.
+"""
+
+import asyncio
+import contextlib
+import json
+
+from services.courtlistener import CourtListenerService
+
+URL = 'https://www.courtlistener.com/api/rest/v4/opinions/'
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+        self.headers = {}
+
+    async def text(self):
+        return self.body
+
+
+def _page(first, size, next_url=None):
+    return json.dumps({'results': [{'id': number} for number in range(first, first + size)],
+                       'next': next_url})
+
+
+def _service(pages, key='cursor', hold=None):
+    """Service answering from pages[params[key]]; hold maps a page key to an Event to wait on"""
+    service = CourtListenerService(api_key='test', response_cache=None)
+    events = []
+
+    @contextlib.asynccontextmanager
+    async def request(method, url, params=None, headers=None):
+        page_key = params.get(key)
+        events.append(('request', page_key))
+        try:
+            if hold and page_key in hold:
+                await hold[page_key].wait()
+        except asyncio.CancelledError:
+            events.append(('cancelled', page_key))
+            raise
+        status, body = pages[page_key]
+        yield FakeResponse(status, body)
+
+    service._request = request
+    return service, events
+
+
+def _cursor_pages():
+    return {
+        None: (200, _page(0, 3, f'{URL}?cursor=b&page_size=3')),
+        'b': (200, _page(3, 3, f'{URL}?cursor=c&page_size=3')),
+        'c': (200, _page(6, 2)),
+    }
+
+
+def test_cursor_pages_stream_in_order_with_the_next_page_prefetched():
+    service, events = _service(_cursor_pages())
+
+    async def run():
+        seen = []
+        async for record in service._iter_pages(URL, {'page_size': 3}):
+            if record['id'] in (0, 3):
+                # Let the prefetch run while the current page is being handled
+                await asyncio.sleep(0)
+                await asyncio.sleep(0)
+                assert ('request', 'bc'[record['id'] // 3]) in events
+            events.append(('yield', record['id']))
+            seen.append(record['id'])
+        return seen
+
+    assert asyncio.run(run()) == list(range(8))
+    requests = [page for kind, page in events if kind == 'request']
+    assert requests == [None, 'b', 'c']
+    # Page 'c' was asked for before the last record of page 'b' was handled
+    assert events.index(('request', 'c')) < events.index(('yield', 5))
+
+
+def test_max_results_stops_requesting_pages():
+    service, events = _service(_cursor_pages())
+
+    async def run():
+        return [record['id'] async for record in service._iter_pages(URL, {}, max_results=5)]
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+    assert [page for _, page in events] == [None, 'b']
+
+    service, events = _service(_cursor_pages())
+
+    async def exact():
+        return [record['id'] async for record in service._iter_pages(URL, {}, max_results=3)]
+
+    # A full first page is enough: no second request
+    assert asyncio.run(exact()) == [0, 1, 2]
+    assert events == [('request', None)]
+
+
+def test_numbered_pages_stop_at_the_search_page_limit(monkeypatch):
+    monkeypatch.setattr(CourtListenerService, 'MAX_SEARCH_PAGES', 3)
+    pages = {None: (200, _page(0, 2, f'{URL}?page=2'))}
+    for page in range(2, 6):
+        pages[page] = (200, _page(page * 10, 2, f'{URL}?page={page + 1}'))
+    service, events = _service(pages, key='page')
+
+    async def run():
+        return [record['id'] async for record in
+                service._iter_pages(URL, {'q': 'patent'}, pagination='page')]
+
+    assert asyncio.run(run()) == [0, 1, 20, 21, 30, 31]
+    assert [page for _, page in events] == [None, 2, 3]
+
+
+def test_a_failed_page_ends_the_stream():
+    pages = _cursor_pages()
+    pages['b'] = (500, 'server error')
+    service, events = _service(pages)
+
+    async def run():
+        return [record['id'] async for record in service._iter_pages(URL, {})]
+
+    assert asyncio.run(run()) == [0, 1, 2]
+    assert [page for _, page in events] == [None, 'b']
+
+
+def test_stopping_early_cancels_the_page_in_flight():
+    async def run():
+        hold = {'b': asyncio.Event()}
+        service, events = _service(_cursor_pages(), hold=hold)
+        stream = service._iter_pages(URL, {})
+        assert (await stream.__anext__())['id'] == 0
+        await asyncio.sleep(0)
+        assert events == [('request', None), ('request', 'b')]
+        await stream.aclose()
+        await asyncio.sleep(0)
+        return events
+
+    assert asyncio.run(run())[-1] == ('cancelled', 'b')
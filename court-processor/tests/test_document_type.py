@@ -0,0 +1,252 @@
+"""
+Document type detection against the implementation it replaced
+
+BaselineDocumentTypeDetector and baseline_pipeline_type are copies of the
+detector and the pipeline heuristic before patterns were compiled once and
+shared between types; both must give the same results on every document.
+"""
+
+import json
+import random
+import re
+from typing import Dict, Any, Tuple
+
+import pytest
+
+from extractors.document_type import DocumentTypeDetector, get_document_type_detector
+from pipeline_document import PipelineDocument
+
+
+class BaselineDocumentTypeDetector:
+    """Detect actual document type based on content and structure"""
+
+    def __init__(self):
+        # Define characteristics of each document type
+        self.patterns = {
+            'opinion': {
+                'min_length': 5000,
+                'required_patterns': [
+                    r'(opinion|judgment|decision)',
+                    r'(court|district|circuit)',
+                    r'(judge|justice)'
+                ],
+                'section_markers': [
+                    r'I+\.\s+[A-Z]',  # I. BACKGROUND
+                    r'CONCLUSION',
+                    r'DISCUSSION',
+                    r'ANALYSIS'
+                ],
+                'citation_threshold': 5  # Expect at least 5 citations
+            },
+            'order': {
+                'min_length': 1000,
+                'required_patterns': [
+                    r'(ORDER|ORDERED)',
+                    r'(IT IS HEREBY|IT IS SO)'
+                ],
+                'section_markers': [],
+                'citation_threshold': 1
+            },
+            'docket': {
+                'min_length': 0,
+                'required_patterns': [
+                    r'(docket|case number)',
+                    r'(filed|entered)'
+                ],
+                'metadata_fields': ['docket_id', 'recap_documents', 'assigned_to'],
+                'citation_threshold': 0
+            },
+            'brief': {
+                'min_length': 3000,
+                'required_patterns': [
+                    r'(plaintiff|defendant|appellant|appellee)',
+                    r'(motion|brief|memorandum)'
+                ],
+                'section_markers': [
+                    r'ARGUMENT',
+                    r'STATEMENT OF THE CASE'
+                ],
+                'citation_threshold': 10
+            }
+        }
+
+    def detect_type(self, document: Dict[str, Any]) -> Tuple[str, float, Dict[str, Any]]:
+        """
+        Detect document type based on content analysis
+
+        Returns:
+            - detected_type: Best guess at document type
+            - confidence: 0-1 confidence score
+            - characteristics: What was found
+        """
+        content = document.get('content', '')
+        metadata = document.get('metadata', {})
+
+        # Parse metadata if string
+        if isinstance(metadata, str):
+            try:
+                metadata = json.loads(metadata)
+            except:
+                metadata = {}
+
+        # Track scores for each type
+        scores = {}
+        characteristics = {
+            'content_length': len(content),
+            'has_citations': False,
+            'citation_count': 0,
+            'has_structure': False,
+            'metadata_type': document.get('document_type', 'unknown')
+        }
+
+        # Check each document type
+        for doc_type, criteria in self.patterns.items():
+            score = 0.0
+            max_score = 0.0
+
+            # Length check
+            max_score += 1
+            if len(content) >= criteria['min_length']:
+                score += 1
+            elif criteria['min_length'] > 0:
+                # Partial credit based on how close
+                score += len(content) / criteria['min_length']
+
+            # Pattern matching
+            if 'required_patterns' in criteria:
+                for pattern in criteria['required_patterns']:
+                    max_score += 1
+                    if re.search(pattern, content, re.IGNORECASE):
+                        score += 1
+
+            # Section markers (indicates structured document)
+            if 'section_markers' in criteria and criteria['section_markers']:
+                max_score += 1
+                sections_found = sum(1 for marker in criteria['section_markers']
+                                   if re.search(marker, content))
+                if sections_found > 0:
+                    score += min(1.0, sections_found / len(criteria['section_markers']))
+                    characteristics['has_structure'] = True
+
+            # Citation check
+            if criteria['citation_threshold'] > 0:
+                max_score += 1
+                # Simple citation pattern
+                citations = re.findall(r'\d+\s+[A-Z][a-z]+\.?\s*\d+d?\s+\d+', content)
+                characteristics['citation_count'] = len(citations)
+                characteristics['has_citations'] = len(citations) > 0
+
+                if len(citations) >= criteria['citation_threshold']:
+                    score += 1
+                elif criteria['citation_threshold'] > 0:
+                    score += len(citations) / criteria['citation_threshold']
+
+            # Metadata field check (for dockets)
+            if 'metadata_fields' in criteria:
+                max_score += 1
+                fields_present = sum(1 for field in criteria['metadata_fields']
+                                   if metadata.get(field))
+                if fields_present > 0:
+                    score += fields_present / len(criteria['metadata_fields'])
+
+            # Calculate confidence
+            confidence = score / max_score if max_score > 0 else 0
+            scores[doc_type] = confidence
+
+        # Find best match
+        best_type = max(scores, key=scores.get)
+        best_confidence = scores[best_type]
+
+        # If confidence is too low, check metadata hint
+        if best_confidence < 0.3 and document.get('document_type'):
+            best_type = document['document_type']
+            best_confidence = 0.3  # Low confidence fallback
+
+        return best_type, best_confidence, characteristics
+
+
+def baseline_pipeline_type(document):
+    """Detect document type based on metadata and case number patterns"""
+    document = PipelineDocument.wrap(document)
+    metadata = document.metadata
+
+    # Check case number pattern for opinions
+    case_number = document.get('case_number', '')
+    if case_number.startswith('OPINION-'):
+        return 'opinion'
+
+    # Check metadata type field
+    metadata_type = metadata.get('type', '')
+    if metadata_type:
+        # Common CourtListener opinion types
+        if any(op_type in str(metadata_type) for op_type in ['010combined', '020lead', '030concurrence', '040dissent']):
+            return 'opinion'
+
+    # Check for opinion-specific fields
+    if any(key in metadata for key in ['cluster', 'author', 'author_str', 'opinions_cited', 'per_curiam']):
+        return 'opinion'
+
+    # Check for docket-specific fields
+    if any(key in metadata for key in ['docket_id', 'cause', 'nature_of_suit']):
+        return 'docket'
+
+    # Check for order patterns in content
+    if 'IT IS HEREBY ORDERED' in document.head_upper(500):
+        return 'order'
+
+    return 'unknown'
+
+
+FRAGMENTS = [
+    'UNITED STATES DISTRICT COURT', 'MEMORANDUM OPINION AND ORDER', 'Judge Gilstrap', 'Justice Alito',
+    'I. BACKGROUND', 'II. DISCUSSION', 'ANALYSIS', 'CONCLUSION', 'ARGUMENT', 'STATEMENT OF THE CASE',
+    'IT IS HEREBY ORDERED', 'IT IS SO ORDERED.', 'Docket No. 2:24-cv-123', 'case number', 'Filed 01/02/2024',
+    'entered', 'Plaintiff', 'defendant', 'appellee', 'motion to dismiss', 'brief', 'memorandum',
+    'See 550 U.S. 544', '123 Fed. 3d 456', '12 Cal 4 99', '7 So. 2d 11', 'the court of appeals', 'circuit',
+    'DECİSİON', 'JUſTICE', 'Kelvin \u212a', 'résumé', 'lorem ipsum dolor sit amet ' * 20,
+]
+
+
+def _documents(count=300):
+    rng = random.Random(17)
+    metadata_choices = [
+        {}, {'docket_id': 5}, {'assigned_to': 'Judge Smith', 'recap_documents': [1]}, {'type': '020lead'},
+        {'author_str': 'Moore'}, {'cause': '35:271'}, json.dumps({'docket_id': 9, 'assigned_to': ''}),
+        {'recap_documents': []},
+    ]
+    documents = []
+    for number in range(count):
+        parts = [rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 60))]
+        documents.append({
+            'id': number,
+            'content': rng.choice(['\n', ' ', '. ']).join(parts),
+            'document_type': rng.choice(['opinion', 'order', 'docket', 'brief', None, '']),
+            'case_number': rng.choice(['OPINION-txed-1', '2:24-cv-00123', '']),
+            'metadata': rng.choice(metadata_choices),
+        })
+    return documents
+
+
+@pytest.mark.parametrize('document', _documents(), ids=lambda document: str(document['id']))
+def test_detect_type_matches_the_baseline(document):
+    expected = BaselineDocumentTypeDetector().detect_type(dict(document))
+    assert get_document_type_detector().detect_type(dict(document)) == expected
+
+
+def test_non_ascii_text_is_matched_like_ignorecase():
+    detector = DocumentTypeDetector()
+    features = detector.scan({'content': 'DECİSİON of the CIRCUIT, JUſTICE Roe', 'metadata': {}})
+    assert features['required'] == {
+        pattern: re.search(pattern, 'DECİSİON of the CIRCUIT, JUſTICE Roe', re.IGNORECASE) is not None
+        for pattern in features['required']
+    }
+    assert features['required']['(opinion|judgment|decision)']
+
+
+def test_pipeline_type_matches_the_baseline():
+    detector = get_document_type_detector()
+    for document in _documents():
+        detected, confidence, characteristics = detector.detect_pipeline_type(dict(document))
+        assert detected == baseline_pipeline_type(dict(document))
+        assert (confidence > 0) == (detected != 'unknown')
+        assert (characteristics['signal'] is None) == (detected == 'unknown')
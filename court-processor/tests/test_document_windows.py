@@ -0,0 +1,167 @@
+"""
+Windowed Stage 1 retrieval from a server-side cursor
+
+The held cursor is declared once and drained window_size rows at a time,
+only as the run asks for the next window, and a windowed run reports the
+same totals as fetching the whole batch at once.
+"""
+
+import asyncio
+import copy
+
+import psycopg2
+import pytest
+
+from exceptions import DatabaseConnectionError, ValidationError
+from processor import RobustElevenStagePipeline
+
+CONTENT = (
+    "IN THE UNITED STATES DISTRICT COURT FOR THE EASTERN DISTRICT OF TEXAS\n"
+    "See Bell Atlantic Corp. v. Twombly, 550 U.S. 544 (2007).\n"
+)
+DOCUMENTS = [
+    {'id': number, 'case_number': f'2:22-cv-{number:05d}', 'document_type': 'opinion',
+     'content': CONTENT, 'created_at': f'2024-02-{number:02d}T00:00:00',
+     'metadata': {'court_id': 'txed'}}
+    for number in range(1, 11)
+]
+
+
+class FakeCursor:
+    def __init__(self, connection, rows, error=None):
+        self.connection = connection
+        self.rows = list(rows)
+        self.error = error
+        self.itersize = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.connection.events.append('close')
+        return False
+
+    def execute(self, query, params):
+        if self.error:
+            raise self.error
+        self.connection.events.append('execute')
+
+    def fetchmany(self, size):
+        self.connection.events.append(('fetch', size))
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self, rows=(), error=None):
+        self.rows = rows
+        self.error = error
+        self.events = []
+        self.cursor_options = None
+
+    def cursor(self, **options):
+        self.cursor_options = options
+        return FakeCursor(self, self.rows, self.error)
+
+    def commit(self):
+        self.events.append('commit')
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _pipeline(connection):
+    pipeline = RobustElevenStagePipeline(connect_db=False)
+    pipeline.db_conn = connection
+    pipeline.checkpoints = None
+    return pipeline
+
+
+def test_windows_are_pulled_from_a_held_cursor_as_needed():
+    connection = FakeConnection(DOCUMENTS)
+    windows = _pipeline(connection)._iter_document_windows(10, 'public.court_documents', window_size=4)
+
+    assert connection.events == []  # Nothing runs before the first window is asked for
+    first = next(windows)
+    assert [doc['id'] for doc in first] == [1, 2, 3, 4]
+    assert connection.cursor_options['withhold'] is True
+    assert connection.cursor_options['name'].startswith('pipeline_fetch_')
+    # The DECLARE is committed before any row is fetched
+    assert connection.events == ['execute', 'commit', ('fetch', 4)]
+
+    rest = [[doc['id'] for doc in window] for window in windows]
+    assert rest == [[5, 6, 7, 8], [9, 10]]
+    assert connection.events[-2:] == [('fetch', 4), 'close']
+
+
+def test_cursor_errors_are_database_errors():
+    connection = FakeConnection(error=psycopg2.OperationalError('server closed the connection'))
+    with pytest.raises(DatabaseConnectionError):
+        next(_pipeline(connection)._iter_document_windows(10, 'public.court_documents'))
+
+
+def test_fetch_query_resumes_after_a_position():
+    pipeline = _pipeline(FakeConnection())
+    query, params = pipeline._build_fetch_query(
+        50, 'public.court_documents', after={'id': 7, 'created_at': '2024-02-07T00:00:00'})
+    assert '(cd.created_at, cd.id) < (%s, %s)' in query
+    assert 'ORDER BY cd.created_at DESC, cd.id DESC' in query
+    assert params[1:] == (7, 50)
+
+    query, params = pipeline._build_fetch_query(50, 'court_data.opinions', after={'id': 7})
+    assert 'AND id > %s' in query and 'ORDER BY id' in query
+    assert params[2:] == (7, 50)
+
+    with pytest.raises(ValidationError):
+        pipeline._build_fetch_query(50, 'court_documents; DROP TABLE x')
+
+
+def _stubbed_pipeline():
+    pipeline = _pipeline(FakeConnection())
+    stored_windows = []
+
+    def iter_windows(limit, source_table, only_unprocessed, window_size, document_ids, after=None):
+        for start in range(0, limit, window_size):
+            yield copy.deepcopy(DOCUMENTS[start:min(limit, start + window_size)])
+
+    def fetch(limit, source_table, only_unprocessed, document_ids, after=None):
+        return copy.deepcopy(DOCUMENTS[:limit])
+
+    async def store(documents, force_reprocess=False):
+        stored_windows.append(len(documents))
+        return {'success': True, 'stored_count': len(documents), 'updated_count': 0, 'skipped_count': 0,
+                'failed_count': 0, 'validation_failures': 0, 'total_processed': len(documents),
+                'stored_document_ids': [doc['id'] for doc in documents], 'errors': []}
+
+    async def index(documents):
+        return {'success': True, 'indexed_count': len(documents)}
+
+    pipeline._iter_document_windows = iter_windows
+    pipeline._fetch_documents = fetch
+    pipeline._store_enhanced_documents_validated = store
+    pipeline._index_to_haystack_validated = index
+    return pipeline, stored_windows
+
+
+def test_windowed_runs_report_like_whole_batches():
+    def run(window_size):
+        pipeline, stored_windows = _stubbed_pipeline()
+        results = asyncio.run(pipeline.process_batch(limit=10, window_size=window_size,
+                                                     extract_pdfs=False, incremental=False))
+        return results, stored_windows
+
+    whole, whole_windows = run(None)
+    windowed, windows = run(3)
+
+    assert whole_windows == [10]
+    assert windows == [3, 3, 3, 1]
+    assert windowed['success'] is whole['success'] is True
+    for key in ('documents_processed', 'documents_stored', 'documents_indexed',
+                'courts_resolved', 'citations_extracted'):
+        assert windowed['statistics'][key] == whole['statistics'][key], key
+    assert windowed['storage_results']['stored_count'] == whole['storage_results']['stored_count'] == 10
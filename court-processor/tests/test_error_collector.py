@@ -0,0 +1,157 @@
+"""
+ErrorCollector memory bound, spill file, merging and saved state
+
+Counts stay exact however many records arrive; past max_records every
+record goes to the spill file and memory keeps sample_size examples per
+stage. Merging a worker's collector, or restoring one from to_state(),
+must give the same counts as collecting everything in one place.
+"""
+
+import json
+
+import pytest
+
+from exceptions import ValidationError
+from utils.reporter import ErrorCollector, RECORD_KINDS
+
+
+def _collect(collector, documents, stages=('stage_3', 'stage_5')):
+    for number in range(documents):
+        stage = stages[number % len(stages)]
+        error = ValidationError('bad citation') if number % 3 else ValueError('no content')
+        collector.add_error(error, stage, document_id=f"doc-{number % 7}")
+        collector.add_warning('low confidence', stage, document_id=f"doc-{number}")
+        if number % 3 == 0:
+            collector.add_validation_failure({'errors': ['x'], 'warnings': []}, stage, f"doc-{number}")
+    return collector
+
+
+def _counts(collector):
+    summary = collector.get_summary()
+    return {key: summary[key] for key in (
+        'total_errors', 'total_warnings', 'total_validation_failures', 'failed_documents',
+        'error_types', 'stage_statistics', 'warnings_by_stage', 'validation_failures_by_stage',
+        'most_problematic_documents'
+    )}
+
+
+def test_below_the_cap_every_record_is_held(tmp_path):
+    collector = _collect(ErrorCollector('small', max_records=1000, spill_dir=str(tmp_path)), 20)
+    assert not collector.sampled and collector.spill_path is None
+    assert len(collector.errors) == 20 and len(collector.warnings) == 20
+    assert len(collector.validation_failures) == 7
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_past_the_cap_records_spill_and_samples_stay_bounded(tmp_path):
+    unbounded = _collect(ErrorCollector('reference', max_records=10 ** 6, spill_dir=None), 500)
+    collector = _collect(ErrorCollector('run/1', max_records=50, sample_size=5, spill_dir=str(tmp_path)), 500)
+    collector.close()
+
+    assert collector.sampled
+    assert _counts(collector) == _counts(unbounded)
+    # At most sample_size examples per kind and stage
+    assert len(collector.errors) == len(collector.warnings) == 10
+    assert len(collector.validation_failures) == 10
+
+    # The spill file has every record, under a file-safe run id
+    assert collector.spill_path == str(tmp_path / 'run_1.errors.jsonl')
+    with open(collector.spill_path, encoding='utf-8') as spill:
+        kinds = [json.loads(line)['kind'] for line in spill]
+    assert len(kinds) == 500 + 500 + 167
+    assert sorted(set(kinds)) == sorted(RECORD_KINDS)
+    assert sum(1 for _ in collector.iter_records()) == len(kinds)
+
+
+def test_merging_a_workers_collector_keeps_exact_counts(tmp_path):
+    everything = ErrorCollector('reference', max_records=10 ** 6, spill_dir=None)
+    _collect(everything, 300)
+    _collect(everything, 200, stages=('stage_8',))
+
+    parent = _collect(ErrorCollector('parent', max_records=100, spill_dir=str(tmp_path)), 300)
+    worker = _collect(ErrorCollector('worker', max_records=100, spill_dir=str(tmp_path)), 200, stages=('stage_8',))
+    parent.merge(worker)
+
+    assert _counts(parent) == _counts(everything)
+    assert sum(1 for _ in parent.iter_records()) == sum(1 for _ in everything.iter_records())
+
+
+def test_workers_of_the_same_run_spill_to_their_own_files(tmp_path):
+    import processor
+
+    everything = ErrorCollector('reference', max_records=10 ** 6, spill_dir=None)
+    _collect(everything, 300)
+    _collect(everything, 200, stages=('stage_8',))
+
+    parent = _collect(ErrorCollector('run-1', max_records=100, spill_dir=str(tmp_path)), 300)
+    worker = processor._worker_error_collector('run-1')
+    worker.max_records, worker.spill_dir = 100, str(tmp_path)
+    _collect(worker, 200, stages=('stage_8',))
+    assert worker.spill_path != parent.spill_path
+
+    parent.merge(worker)
+    assert _counts(parent) == _counts(everything)
+    assert sum(1 for _ in parent.iter_records()) == sum(1 for _ in everything.iter_records())
+    # The worker's file is gone once merged; only the run's own remains
+    assert [path.name for path in tmp_path.iterdir()] == ['run-1.errors.jsonl']
+
+    with pytest.raises(ValueError):
+        parent.merge(_collect(ErrorCollector('run-1', max_records=10, spill_dir=str(tmp_path)), 50))
+
+
+def test_sampled_collectors_without_spill_file_cannot_be_merged():
+    worker = _collect(ErrorCollector('worker', max_records=10, spill_dir=None), 50)
+    with pytest.raises(ValueError):
+        ErrorCollector('parent').merge(worker)
+
+
+@pytest.mark.parametrize('max_records', [10 ** 6, 40])
+def test_state_round_trip_restores_counts(tmp_path, max_records):
+    collector = _collect(ErrorCollector('saved', max_records=max_records, spill_dir=str(tmp_path)), 100)
+
+    full = ErrorCollector.from_state(json.loads(json.dumps(collector.to_state())))
+    assert _counts(full) == _counts(collector)
+    assert len(full.errors) == len(collector.errors)
+
+    # Checkpoints keep counts only: exact totals, top documents
+    light_state = collector.to_state(records=False)
+    assert 'errors' not in light_state
+    light = ErrorCollector.from_state(json.loads(json.dumps(light_state)))
+    assert light.counts == collector.counts
+    assert light.get_summary()['most_problematic_documents'] == collector.get_summary()['most_problematic_documents']
+    assert light.spill_path == collector.spill_path
+
+
+def test_document_table_is_bounded_and_failed_documents_exact():
+    collector = ErrorCollector('many', max_records=10, spill_dir=None)
+    for number in range(1000):
+        collector.add_error(ValueError('no content'), 'stage_3', document_id=f"doc-{number}")
+        if number < 100:
+            # One document erring in every stage of the first window
+            for _ in range(3):
+                collector.add_error(ValueError('no content'), 'stage_3', document_id='doc-hot')
+        if number % 100 == 99:
+            collector.end_window()
+
+    assert len(collector.document_error_counts) <= 10
+    summary = collector.get_summary()
+    assert summary['failed_documents'] == 1001
+    assert summary['most_problematic_documents'][0][0] == 'doc-hot'
+    # Misra-Gries counts are lower bounds within errors / (max_records + 1)
+    hot_errors = 300
+    assert hot_errors - summary['total_errors'] / 11 <= collector.document_error_counts['doc-hot'] <= hot_errors
+
+
+def test_failed_documents_survive_a_checkpoint_round_trip():
+    collector = ErrorCollector('resumed', sample_size=5, spill_dir=None)
+    for number in range(50):
+        collector.add_error(ValueError('no content'), 'stage_5', document_id=f"doc-{number}")
+    collector.end_window()
+
+    resumed = ErrorCollector.from_state(json.loads(json.dumps(collector.to_state(records=False))))
+    assert len(resumed.document_error_counts) == 5
+    assert resumed.get_summary()['failed_documents'] == 50
+
+    for number in range(50, 60):
+        resumed.add_error(ValueError('no content'), 'stage_5', document_id=f"doc-{number}")
+    assert resumed.get_summary()['failed_documents'] == 60
@@ -0,0 +1,135 @@
+"""
+CourtListener response cache and the SQLite LRU cache it shares with the
+citation cache
+
+Only detail responses are served without asking the server; list and
+search pages are revalidated every time, and the cache evicts least
+recently used entries and disables itself on SQLite errors.
+"""
+
+import asyncio
+import contextlib
+import json
+import random
+
+from services.citation_cache import CitationCache
+from services.courtlistener import CourtListenerService
+from services.http_cache import HttpResponseCache, DAY
+
+BASE = 'https://www.courtlistener.com/api/rest/v4'
+
+
+def test_only_detail_urls_stay_fresh(tmp_path):
+    cache = HttpResponseCache(str(tmp_path / 'http.sqlite3'))
+    assert cache.ttl_for(f'{BASE}/opinions/123/') == 7 * DAY
+    assert cache.ttl_for(f'{BASE}/people/9/') == 30 * DAY
+    assert cache.ttl_for(f'{BASE}/courts/42/') == HttpResponseCache.DEFAULT_TTL
+    assert cache.ttl_for(f'{BASE}/opinions/') == 0
+    assert cache.ttl_for(f'{BASE}/search/') == 0
+    assert cache.ttl_for(f'{BASE}/dockets/?id__in=1,2') == 0
+
+
+def test_list_pages_are_kept_only_with_validators(tmp_path):
+    cache = HttpResponseCache(str(tmp_path / 'http.sqlite3'))
+    cache.put(f'{BASE}/search/', {'q': 'patent'}, '{"results": []}')
+    assert cache.get(f'{BASE}/search/', {'q': 'patent'}) is None
+
+    cache.put(f'{BASE}/search/', {'q': 'patent'}, '{"results": [1]}', etag='"v1"')
+    cached = cache.get(f'{BASE}/search/', {'q': 'patent'})
+    assert cached.json() == {'results': [1]}
+    assert not cached.fresh
+    assert cached.conditional_headers() == {'If-None-Match': '"v1"'}
+
+
+def test_detail_round_trip_and_renew(tmp_path):
+    cache = HttpResponseCache(str(tmp_path / 'http.sqlite3'), ttls={'opinions': -1})
+    url = f'{BASE}/opinions/7/'
+    cache.put(url, None, '{"id": 7}', last_modified='Mon, 01 Jan 2024 00:00:00 GMT')
+    assert not cache.get(url).fresh
+
+    cache.ttls['opinions'] = DAY
+    cache.renew(url)
+    cached = cache.get(url)
+    assert cached.fresh and cached.json() == {'id': 7}
+    # Parameters are part of the key, in any order
+    assert cache.request_key(url, {'a': 1, 'b': 2}) == cache.request_key(f'{url}?b=2', {'a': 1})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = HttpResponseCache(str(tmp_path / 'http.sqlite3'), max_bytes=3000)
+    for number in range(10):
+        # Random text, so each body compresses to about 1 KB
+        body = json.dumps({'text': random.Random(number).randbytes(1000).hex()})
+        cache.put(f'{BASE}/opinions/{number}/', None, body)
+        cache.get(f'{BASE}/opinions/0/')  # Keep the first one in use
+
+    stats = cache.stats()
+    assert stats['bytes'] <= 3000
+    assert stats['evictions'] > 0
+    assert cache.get(f'{BASE}/opinions/0/') is not None
+    assert cache.get(f'{BASE}/opinions/1/') is None
+
+
+def test_sqlite_errors_disable_the_cache(tmp_path):
+    cache = HttpResponseCache(str(tmp_path))  # A directory, not a database file
+    cache.put(f'{BASE}/opinions/1/', None, '{}')
+    assert cache.get(f'{BASE}/opinions/1/') is None
+    assert cache.stats()['enabled'] is False
+
+
+def test_citation_cache_shares_the_store(tmp_path):
+    cache = CitationCache(str(tmp_path / 'citations.sqlite3'))
+    assert cache.get('text') is None
+    cache.put('text', [{'cite': '550 U.S. 544'}])
+    assert cache.get('text') == [{'cite': '550 U.S. 544'}]
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+class FakeResponse:
+    def __init__(self, status, body='', headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def text(self):
+        return self.body
+
+
+def _service(cache, responses):
+    service = CourtListenerService(api_key='test', response_cache=cache)
+    sent = []
+
+    @contextlib.asynccontextmanager
+    async def request(method, url, params=None, headers=None):
+        sent.append((url, dict(headers or {})))
+        yield responses.pop(0)
+
+    service._request = request
+    return service, sent
+
+
+def test_get_json_serves_fresh_details_and_revalidates_searches(tmp_path):
+    cache = HttpResponseCache(str(tmp_path / 'http.sqlite3'))
+    service, sent = _service(cache, [
+        FakeResponse(200, '{"id": 5}', {'ETag': '"d"'}),
+        FakeResponse(200, '{"count": 1}', {'ETag': '"s1"'}),
+        FakeResponse(304),
+    ])
+    detail, search = f'{BASE}/clusters/5/', f'{BASE}/search/'
+
+    async def run():
+        first = await service._get_json(detail)
+        again = await service._get_json(detail)
+        page = await service._get_json(search, {'q': 'patent'})
+        revalidated = await service._get_json(search, {'q': 'patent'})
+        return first, again, page, revalidated
+
+    first, again, page, revalidated = asyncio.run(run())
+
+    assert first == again == (200, {'id': 5})
+    assert page == revalidated == (200, {'count': 1})
+    # The detail was served from the cache; the search page was asked again
+    assert [url for url, _ in sent] == [detail, search, search]
+    assert sent[2][1]['If-None-Match'] == '"s1"'
+    assert (cache.hits, cache.revalidated, cache.misses) == (1, 1, 2)
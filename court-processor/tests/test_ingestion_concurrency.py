@@ -0,0 +1,148 @@
+"""
+Bounded, streaming document processing in DocumentIngestionService
+
+Items are pulled from their source only once a processing slot is free, at
+most max_concurrency items are in flight or waiting to be yielded, results
+keep the source order, and ingestion stores documents in batches as they
+arrive instead of after the whole stream.
+"""
+
+import asyncio
+
+import pytest
+
+MAX_CONCURRENCY = 3
+
+
+@pytest.fixture
+def service(ingestion):
+    return ingestion.DocumentIngestionService(api_key='test', max_concurrency=MAX_CONCURRENCY)
+
+
+class Source:
+    """Async source recording how far it was pulled ahead of the consumer"""
+
+    def __init__(self, count):
+        self.count = count
+        self.pulled = 0
+        self.consumed = 0
+        self.most_ahead = 0
+
+    async def __aiter__(self):
+        for number in range(self.count):
+            self.pulled += 1
+            self.most_ahead = max(self.most_ahead, self.pulled - self.consumed)
+            yield {'id': number}
+
+
+def test_results_stream_in_order_within_the_bound(service):
+    source = Source(20)
+    running = 0
+    most_running = 0
+
+    async def process(item):
+        nonlocal running, most_running
+        running += 1
+        most_running = max(most_running, running)
+        # Later items finish first
+        await asyncio.sleep(0.001 * (20 - item['id']))
+        running -= 1
+        return None if item['id'] % 5 == 0 else {'id': item['id']}
+
+    async def consume():
+        ids = []
+        async for doc in service._process_concurrently(source, process):
+            source.consumed = doc['id'] + 1
+            ids.append(doc['id'])
+            await asyncio.sleep(0.002)  # A slow consumer
+        return ids
+
+    ids = asyncio.run(consume())
+
+    assert ids == [number for number in range(20) if number % 5]
+    assert most_running <= MAX_CONCURRENCY
+    # Never more than the in-flight bound (plus the one being pulled) ahead
+    assert source.most_ahead <= MAX_CONCURRENCY + 1
+    assert service.stats['processing']['total_documents'] == 20
+
+
+def test_closing_early_stops_pulling_and_cancels_work(service):
+    source = Source(1000)
+    cancelled = []
+
+    async def process(item):
+        try:
+            await asyncio.sleep(0.01 if item['id'] == 0 else 10)
+        except asyncio.CancelledError:
+            cancelled.append(item['id'])
+            raise
+        return item
+
+    async def first():
+        stream = service._process_concurrently(source, process)
+        doc = await stream.__anext__()
+        await stream.aclose()
+        return doc
+
+    assert asyncio.run(first()) == {'id': 0}
+    assert source.pulled <= MAX_CONCURRENCY + 1
+    assert cancelled and service._slots._value == MAX_CONCURRENCY
+
+
+def test_lists_are_processed_the_same_way(service):
+    async def process(item):
+        return item
+
+    async def collect():
+        return [doc async for doc in service._process_concurrently([{'id': n} for n in range(7)], process)]
+
+    assert [doc['id'] for doc in asyncio.run(collect())] == list(range(7))
+
+
+def test_merged_streams_yield_everything_and_raise_failures(service):
+    async def stream(prefix, count, fail=False):
+        for number in range(count):
+            await asyncio.sleep(0)
+            yield f"{prefix}{number}"
+        if fail:
+            raise RuntimeError(f"{prefix} failed")
+
+    async def collect(streams):
+        return [item async for item in service._merge_streams(streams)]
+
+    items = asyncio.run(collect([stream('a', 5), stream('b', 3), stream('c', 0)]))
+    assert sorted(items) == sorted(['a0', 'a1', 'a2', 'a3', 'a4', 'b0', 'b1', 'b2'])
+    assert [item for item in items if item.startswith('a')] == ['a0', 'a1', 'a2', 'a3', 'a4']
+
+    with pytest.raises(RuntimeError, match='b failed'):
+        asyncio.run(collect([stream('a', 5), stream('b', 2, fail=True)]))
+
+
+def test_ingestion_stores_batches_as_documents_arrive(service, ingestion, monkeypatch):
+    monkeypatch.setattr(ingestion, 'INGEST_STORE_BATCH_SIZE', 4)
+    batches = []
+
+    async def iter_opinions(court_id, date_filed_after, max_results):
+        for number in range(max_results):
+            yield {'id': f"{court_id}-{number}"}
+
+    async def process_opinion(opinion, court_id):
+        return {'case_number': opinion['id'], 'court_id': court_id}
+
+    async def store_documents(documents):
+        # Storing starts before the courts' streams are exhausted
+        batches.append([doc['case_number'] for doc in documents])
+        return {'stored': len(documents), 'updated': 0, 'failed': 0, 'errors': []}
+
+    monkeypatch.setattr(service.cl_service, 'iter_opinions', iter_opinions)
+    monkeypatch.setattr(service, '_process_opinion', process_opinion)
+    monkeypatch.setattr(service, '_store_documents', store_documents)
+
+    results = asyncio.run(service.ingest_from_courtlistener(['txed', 'cafc'], '2024-01-01', max_per_court=5))
+
+    assert results['success'] is True
+    assert results['documents_ingested'] == 10
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    stored = [case_number for batch in batches for case_number in batch]
+    assert sorted(stored) == sorted(f"{court}-{n}" for court in ('txed', 'cafc') for n in range(5))
+    assert service.stats['sources']['courtlistener_opinions'] == 10
@@ -0,0 +1,94 @@
+"""
+Stage timing aggregates of StageProfiler
+
+Totals, minimum and maximum are exact however many calls are recorded, the
+percentile sample stays at a fixed size, and every call still reaches the
+trace file.
+"""
+
+import json
+
+from utils import instrumentation
+from utils.instrumentation import StageProfiler
+
+
+def test_aggregates_are_exact_and_sample_is_bounded():
+    profiler = StageProfiler()
+    calls = instrumentation.RESERVOIR_SIZE * 5
+    for n in range(1, calls + 1):
+        profiler.record('stage_2', n / 1000, n / 2000, 0.0, documents=2)
+
+    samples = profiler.samples['stage_2']
+    assert all(len(values) == instrumentation.RESERVOIR_SIZE for values in samples.reservoir.values())
+
+    summary = profiler.summary()['stage_2']
+    assert summary['calls'] == calls
+    assert summary['documents'] == 2 * calls
+    wall = summary['wall_seconds']
+    assert abs(wall['total'] - sum(n / 1000 for n in range(1, calls + 1))) < 1e-6
+    assert wall['min'] == 0.001
+    assert wall['max'] == calls / 1000
+    assert wall['min'] <= wall['p50'] <= wall['p99'] <= wall['max']
+    # A uniform sample of a uniform range puts the median near the middle
+    assert abs(wall['p50'] - calls / 2000) < calls / 10000
+
+
+def test_small_runs_keep_exact_percentiles():
+    profiler = StageProfiler()
+    for wall in (0.3, 0.1, 0.2):
+        profiler.record('stage_3', wall, 0.0, 0.0)
+
+    wall = profiler.summary()['stage_3']['wall_seconds']
+    assert (wall['min'], wall['p50'], wall['max']) == (0.1, 0.2, 0.3)
+
+
+def test_drain_returns_only_buffered_calls():
+    assert StageProfiler().drain() == []
+
+    worker = StageProfiler(buffer_calls=True)
+    worker.record('stage_4', 0.5, 0.25, 8.0, documents=1, pid=42)
+    calls = worker.drain()
+    assert calls == [('stage_4', 0.5, 0.25, 8.0, 1, 42)]
+    assert worker.drain() == []
+
+    parent = StageProfiler()
+    parent.replay(calls, document_id=7)
+    assert parent.summary()['stage_4']['wall_seconds']['total'] == 0.5
+    assert parent._calls == []
+
+
+def test_trace_gets_one_line_per_call(tmp_path):
+    trace_path = tmp_path / 'trace.jsonl'
+    profiler = StageProfiler()
+    profiler.reset('run-1')
+    profiler.start_trace(str(trace_path))
+    for document_id in range(3):
+        profiler.record('stage_5', 0.01, 0.01, 0.0, document_id=document_id)
+    profiler.stop_trace()
+
+    records = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert [record['document_id'] for record in records] == [0, 1, 2]
+    assert all(record['run_id'] == 'run-1' for record in records)
+
+
+def test_stage_calls_on_pipeline_documents_carry_the_document_id(tmp_path):
+    import asyncio
+
+    from pipeline_document import PipelineDocument
+    from processor import RobustElevenStagePipeline
+
+    trace_path = tmp_path / 'trace.jsonl'
+    pipeline = RobustElevenStagePipeline(connect_db=False)
+    pipeline.profiler.reset('run-2')
+    pipeline.profiler.start_trace(str(trace_path))
+    document = {'id': 17, 'case_number': '2:23-cv-00017', 'document_type': 'opinion',
+                'content': 'Signed by Judge Rodney Gilstrap. See 550 U.S. 544 (2007).',
+                'metadata': {'court_id': 'txed'}}
+    pipeline._extract_legal_keywords(PipelineDocument(dict(document)))
+    asyncio.run(pipeline._enhance_documents([document]))
+    pipeline.profiler.stop_trace()
+
+    records = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert records[0]['stage'] == 'Keyword Extraction'
+    assert {record['stage'] for record in records} >= {'Keyword Extraction', 'Citation Extraction'}
+    assert all(record['document_id'] == 17 for record in records)
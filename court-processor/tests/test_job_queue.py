@@ -0,0 +1,166 @@
+"""
+Job queue worker and the `pipeline serve` daemon, against an in-memory queue
+
+Batches are leased before they run, one pipeline is reused for every batch,
+and documents leased by another node are left alone.
+"""
+
+import asyncio
+import time
+
+from services.job_queue import PipelineQueueWorker
+from services.pipeline_daemon import PipelineDaemon
+
+
+class FakeQueue:
+    """PipelineJobQueue lookalike keeping rows in a dict"""
+
+    owner = 'test-worker'
+    lease_seconds = 60
+    max_attempts = 3
+
+    def __init__(self, pending=(), leased_elsewhere=()):
+        self.rows = {document_id: 'pending' for document_id in pending}
+        self.rows.update({document_id: 'leased:other' for document_id in leased_elsewhere})
+        self.attempts = dict.fromkeys(self.rows, 0)
+        self.heartbeats = 0
+
+    def claim(self, limit):
+        ids = sorted(document_id for document_id, state in self.rows.items() if state == 'pending')[:limit]
+        return self.claim_ids(ids)
+
+    def claim_ids(self, document_ids):
+        leased = [document_id for document_id in document_ids if self.rows.get(document_id) == 'pending']
+        for document_id in leased:
+            self.rows[document_id] = 'leased'
+            self.attempts[document_id] += 1
+        return sorted(leased)
+
+    def heartbeat(self, document_ids):
+        self.heartbeats += 1
+        return [document_id for document_id in document_ids if self.rows.get(document_id) == 'leased']
+
+    def complete(self, document_ids):
+        for document_id in document_ids:
+            self.rows[document_id] = 'done'
+        return len(document_ids)
+
+    def fail(self, document_ids, error):
+        for document_id in document_ids:
+            self.rows[document_id] = 'failed' if self.attempts[document_id] >= self.max_attempts else 'pending'
+        return len(document_ids)
+
+
+class FakePipeline:
+    instances = []
+
+    def __init__(self, persistent=False, **options):
+        self.persistent = persistent
+        self.batches = []
+        self.closed = False
+        FakePipeline.instances.append(self)
+
+    async def process_batch(self, document_ids, **options):
+        self.batches.append(list(document_ids))
+        stored = [document_id for document_id in document_ids if document_id != 13]
+        return {
+            'success': True,
+            'statistics': {'documents_processed': len(document_ids)},
+            'storage_results': {'stored_document_ids': stored}
+        }
+
+    def close(self):
+        self.closed = True
+
+
+def test_worker_reuses_one_pipeline_and_settles_leases():
+    FakePipeline.instances = []
+    queue = FakeQueue(pending=[11, 12, 13, 14, 15])
+    worker = PipelineQueueWorker(batch_size=2, pipeline_factory=FakePipeline, queue=queue)
+
+    stats = asyncio.run(worker.run(drain=True))
+
+    assert len(FakePipeline.instances) == 1
+    pipeline = FakePipeline.instances[0]
+    assert pipeline.persistent and pipeline.closed
+    assert pipeline.batches[0] == [11, 12]
+    assert queue.rows[11] == 'done'
+    # Not stored: released for retry, then parked
+    assert queue.rows[13] == 'failed'
+    assert stats['completed'] == 4 and stats['failed'] == queue.max_attempts
+
+
+def test_daemon_leases_batches_through_the_queue():
+    FakePipeline.instances = []
+    queue = FakeQueue(pending=[1, 2, 3], leased_elsewhere=[4])
+    daemon = PipelineDaemon(batch_size=10, health_port=None, pipeline_factory=FakePipeline, queue=queue)
+
+    async def run():
+        await daemon._process([1, 2, 4], queued_at=0.0)
+        await daemon._process([3], queued_at=0.0)
+        await daemon._process([4], queued_at=0.0)
+
+    asyncio.run(run())
+
+    assert len(FakePipeline.instances) == 1
+    assert FakePipeline.instances[0].batches == [[1, 2], [3]]
+    assert daemon.status['batches'] == 2
+    assert daemon.status['leased_elsewhere'] == 2
+    assert daemon.status['documents_processed'] == 3
+    assert [queue.rows[document_id] for document_id in (1, 2, 3, 4)] == ['done', 'done', 'done', 'leased:other']
+
+
+class SlowHeartbeatQueue(FakeQueue):
+    """Records whether two queue calls ever overlapped on the connection"""
+
+    lease_seconds = 3  # Heartbeat every second
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.active = 0
+        self.overlapped = False
+        self.purged_with = []
+
+    def _call(self, method, *args):
+        self.active += 1
+        self.overlapped |= self.active > 1
+        try:
+            return method(*args)
+        finally:
+            self.active -= 1
+
+    def heartbeat(self, document_ids):
+        def slow():
+            time.sleep(0.5)
+            return FakeQueue.heartbeat(self, document_ids)
+        return self._call(slow)
+
+    def complete(self, document_ids):
+        return self._call(FakeQueue.complete, self, document_ids)
+
+    def fail(self, document_ids, error):
+        return self._call(FakeQueue.fail, self, document_ids, error)
+
+    def purge(self, older_than_days):
+        self.purged_with.append(older_than_days)
+        return 0
+
+
+class SlowPipeline(FakePipeline):
+    async def process_batch(self, document_ids, **options):
+        await asyncio.sleep(1.2)  # Ends while a heartbeat is in flight
+        return await super().process_batch(document_ids, **options)
+
+
+def test_batch_settles_after_the_running_heartbeat():
+    queue = SlowHeartbeatQueue(pending=[21])
+    worker = PipelineQueueWorker(batch_size=5, pipeline_factory=SlowPipeline, queue=queue)
+
+    stats = asyncio.run(worker.run(drain=True))
+
+    assert queue.heartbeats == 1
+    assert not queue.overlapped
+    assert queue.rows[21] == 'done'
+    assert stats['completed'] == 1
+    # The idle queue was purged once
+    assert len(queue.purged_with) == 1
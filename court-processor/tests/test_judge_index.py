@@ -0,0 +1,137 @@
+"""
+Judge index lookups by court, name, initials, last name and fuzzy match
+
+Lookups search the court's roster first and every court's names after,
+ambiguous initials or last names resolve to nothing, and the rapidfuzz and
+difflib matchers accept the same misspellings.
+"""
+
+import pytest
+
+from extractors import judge_index as judge_index_module
+from extractors.judge_index import JudgeIndex, ANY_COURT, normalize_judge_name, display_judge_name
+
+
+@pytest.fixture
+def index():
+    index = JudgeIndex()
+    index.load_roster()
+    return index
+
+
+@pytest.mark.parametrize('name, normalized', [
+    ('Hon. Roy S. Payne', 'roy s payne'),
+    ('Chief Judge Rodney Gilstrap', 'rodney gilstrap'),
+    ('ROBERT W. SCHROEDER III', 'robert w schroeder'),
+    ("U.S. Magistrate Judge Kandis O'Hare, Jr.", 'kandis ohare'),
+])
+def test_names_are_normalized(name, normalized):
+    assert normalize_judge_name(name) == normalized
+
+
+def test_display_names_drop_titles():
+    assert display_judge_name('HONORABLE RODNEY GILSTRAP,') == 'Rodney Gilstrap'
+    assert display_judge_name('Judge  J. Campbell   Barker') == 'J. Campbell Barker'
+
+
+def test_roster_lookups(index):
+    assert len(index) > 0 and 'txed' in index.courts
+    assert index.get('Hon. Rodney Gilstrap', 'txed') == 'Rodney Gilstrap'
+    assert index.get('rodney gilstrap', 'cafc') == 'Rodney Gilstrap'  # Found through ANY_COURT
+    assert index.lookup_initials('jrg', 'txed') == 'Rodney Gilstrap'
+    assert index.lookup_last_name('Payne', 'txed') == 'Roy S. Payne'
+    assert index.get('Nobody Here') is None
+
+
+def test_ambiguous_initials_and_last_names_resolve_to_nothing():
+    index = JudgeIndex()
+    index.add('Ann Smith', 'ded', ['AS'])
+    index.add('Alan Smith', 'ded', ['AS'])
+    index.add('Ann Smith', 'txed')
+    assert index.lookup_initials('AS', 'ded') is None
+    assert index.lookup_last_name('Smith', 'ded') is None
+    assert index.lookup_last_name('Smith', 'txed') == 'Ann Smith'
+
+
+def test_invalid_names_are_rejected():
+    index = JudgeIndex()
+    assert not index.add('Gilstrap', 'txed')
+    assert not index.add('https://example.com/judge', 'txed')
+    assert not index.add('Judge 42 Smith')
+    assert index.add('Roy Payne', 'TXED')
+    assert index.courts == ['txed']
+    assert len(index) == 1
+
+
+@pytest.mark.parametrize('rapidfuzz', [True, False])
+def test_fuzzy_matches_prefer_the_court(index, monkeypatch, rapidfuzz):
+    if rapidfuzz and not judge_index_module.RAPIDFUZZ_AVAILABLE:
+        pytest.skip('rapidfuzz is not installed')
+    monkeypatch.setattr(judge_index_module, 'RAPIDFUZZ_AVAILABLE', rapidfuzz)
+    index.add('Rodney Gillstrap', 'ded')
+
+    (name, score), = index.match('Rodny Gilstrap', 'txed')
+    assert name == 'Rodney Gilstrap' and 85 <= score < 100
+    # Word order does not matter
+    assert index.match('Gilstrap Rodney', 'txed')[0][0] == 'Rodney Gilstrap'
+    assert index.match('Rodney Gillstrap', 'ded') == [('Rodney Gillstrap', 100.0)]
+    assert index.match('Completely Different', 'txed') == []
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.committed = False
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql):
+                assert 'court_documents' in sql
+
+            def fetchall(self):
+                return connection.rows
+
+        return Cursor()
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+
+def test_stored_names_keep_only_fitting_initials():
+    index = JudgeIndex()
+    connection = FakeConnection([
+        ('txed', 'Rodney Gilstrap', 'JRG', 12),
+        ('txed', 'Roy S. Payne', 'ABC', 3),  # Does not end with P
+        ('ded', 'Colm F. Connolly', None, 2),
+        (None, 'Gilstrap', 'JRG', 1),  # Not a full name
+    ])
+    assert index.load_database(connection) == 3
+    assert connection.committed
+    assert index.lookup_initials('JRG', 'txed') == 'Rodney Gilstrap'
+    assert index.lookup_initials('ABC', 'txed') is None
+    assert index.get('Colm Connolly', 'ded') is None and index.get('Colm F. Connolly', 'ded')
+    assert index._names[ANY_COURT]['rodney gilstrap'] == 'Rodney Gilstrap'
+
+
+def test_fingerprint_covers_every_source_in_any_order():
+    rows = [('txed', 'Rodney Gilstrap', 'JRG', 12), ('ded', 'Colm F. Connolly', None, 2)]
+    stored = JudgeIndex()
+    stored.load_database(FakeConnection(rows))
+    reordered = JudgeIndex()
+    reordered.load_database(FakeConnection(rows[::-1]))
+    assert stored.fingerprint == reordered.fingerprint != JudgeIndex().fingerprint
+
+    # A newly stored name, as load_database or judge-pics would add it
+    reordered.add('Roy S. Payne', 'txed')
+    assert reordered.fingerprint != stored.fingerprint
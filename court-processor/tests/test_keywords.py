@@ -0,0 +1,117 @@
+"""
+Stage 7 keyword engine against the substring checks it replaced
+
+The automaton and the pure-Python word dispatch must find the same matches
+as a regex reference, and the built-in lists must report what the former
+Stage 7 loops reported whenever a match is a whole word or phrase.
+"""
+
+import random
+import re
+
+import pytest
+
+from extractors import keywords
+from extractors.keywords import KeywordMatcher, LegalKeywordEngine, load_dictionary
+
+
+def _baseline_keywords(content_lower):
+    """The former Stage 7 extraction: plain substring tests"""
+    extraction_result = {'keywords': [], 'legal_terms': [], 'procedural_terms': []}
+    for keyword in LegalKeywordEngine.LEGAL_KEYWORDS:
+        if keyword in content_lower:
+            extraction_result['keywords'].append(keyword)
+    for search_term, standard_name in LegalKeywordEngine.LEGAL_STANDARDS.items():
+        if search_term in content_lower:
+            extraction_result['legal_terms'].append(standard_name)
+    for term, description in LegalKeywordEngine.PROCEDURAL_TERMS.items():
+        if term in content_lower:
+            extraction_result['procedural_terms'].append(description)
+    return {name: set(values) for name, values in extraction_result.items()}
+
+
+def _reference_patterns(terms):
+    """Lookahead regex per term finding whole-word occurrences, overlapping ones included"""
+    patterns = {}
+    for term in terms:
+        pattern = re.escape(term)
+        if re.match(r'\w', term):
+            pattern = r'(?<!\w)' + pattern
+        if re.search(r'\w$', term):
+            pattern += r'(?!\w)'
+        patterns[term] = re.compile(f"(?={pattern})")
+    return patterns
+
+
+def _reference_find(patterns, text):
+    matches = {}
+    for term, pattern in patterns.items():
+        starts = [match.start() for match in pattern.finditer(text)]
+        if starts:
+            matches[term] = {'count': len(starts), 'first_offset': starts[0]}
+    return matches
+
+
+def _texts(terms, count=200):
+    rng = random.Random(8)
+    fillers = ['the', 'court', 'un', 'ed', 'motion', '.', ',', '\n', 'x1', '(', ')']
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(terms) if rng.random() < 0.4 else rng.choice(fillers) for _ in range(40)]
+        # Glue some neighbours together so word boundaries are exercised
+        texts.append(''.join(word + rng.choice([' ', ' ', '', '-']) for word in words))
+    return texts
+
+
+@pytest.fixture(scope='module')
+def terms():
+    engine = LegalKeywordEngine()
+    return engine.matcher.terms
+
+
+@pytest.fixture
+def dispatch_matcher(monkeypatch, terms):
+    monkeypatch.setattr(keywords, 'AHOCORASICK_AVAILABLE', False)
+    return KeywordMatcher(terms)
+
+
+def test_engines_find_the_reference_matches(terms, dispatch_matcher):
+    automaton = KeywordMatcher(terms)
+    assert automaton.engine == ('aho_corasick' if keywords.AHOCORASICK_AVAILABLE else 'word_dispatch')
+    assert dispatch_matcher.engine == 'word_dispatch'
+    patterns = _reference_patterns(terms)
+    for text in _texts(terms):
+        expected = _reference_find(patterns, text)
+        assert automaton.find(text) == expected
+        assert dispatch_matcher.find(text) == expected
+
+
+def test_whole_word_matches_agree_with_the_baseline():
+    engine = LegalKeywordEngine(dictionary_terms=[])
+    phrases = (LegalKeywordEngine.LEGAL_KEYWORDS + list(LegalKeywordEngine.LEGAL_STANDARDS) +
+               list(LegalKeywordEngine.PROCEDURAL_TERMS))
+    rng = random.Random(80)
+    for _ in range(200):
+        text = '. '.join(rng.sample(phrases, 6)) + '; the court ruled.'
+        result = engine.extract(text)
+        baseline = _baseline_keywords(text)
+        for name, expected in baseline.items():
+            assert set(result[name]) == expected, text
+
+
+def test_terms_inside_other_words_no_longer_match():
+    engine = LegalKeywordEngine(dictionary_terms=[])
+    text = 'the undenied claim of outstanding damages was reaffirmed'
+    assert _baseline_keywords(text)['procedural_terms'] == {'motion denied', 'affirmed'}
+    result = engine.extract(text)
+    assert result['procedural_terms'] == []
+    # 'standing' inside 'outstanding' is not a keyword either
+    assert result['keywords'] == ['damages']
+    assert result['matches']['damages'] == {'count': 1, 'first_offset': text.index('damages')}
+
+
+def test_dictionary_terms_are_ranked_by_count():
+    engine = LegalKeywordEngine(dictionary_terms=['Affidavit', 'abeyance', '  '])
+    result = engine.extract('affidavit. abeyance pending; second affidavit')
+    assert result['dictionary_terms'] == ['affidavit', 'abeyance']
+    assert 'abeyance' in load_dictionary()
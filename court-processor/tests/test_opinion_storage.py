@@ -0,0 +1,167 @@
+"""
+Chunked opinion upserts
+
+Each chunk is one INSERT ... ON CONFLICT statement and one commit. New
+rows count as stored, changed ones as updated, and unchanged ones (same
+document_hash) or repeated cl_ids as skipped; a failed chunk is rolled
+back and reported without stopping the others.
+"""
+
+import psycopg2
+import pytest
+
+from services import storage
+from services.storage import OpinionStorageService
+
+
+class FakeConnection:
+    """opinions_unified as a dict of cl_id -> document_hash"""
+
+    def __init__(self, fail_on_statement=None):
+        self.table = {}
+        self.statements = 0
+        self.fail_on_statement = fail_on_statement
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+        cursor = Cursor()
+        cursor.connection = connection
+        return cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def fake_execute_values(cursor, sql, values, page_size=None, fetch=False):
+    """Apply the upsert to the fake table, as the conflict clause would"""
+    connection = cursor.connection
+    connection.statements += 1
+    assert page_size == len(values) and fetch
+    if connection.statements == connection.fail_on_statement:
+        raise psycopg2.OperationalError('connection reset')
+    only_changed = 'IS DISTINCT FROM EXCLUDED.document_hash' in sql
+    cl_ids = [row[0] for row in values]
+    assert len(set(cl_ids)) == len(cl_ids), 'a statement may not touch a row twice'
+
+    hash_index = OpinionStorageService.COLUMNS.index('document_hash')
+    returned = []
+    for row in values:
+        cl_id, document_hash = row[0], row[hash_index]
+        if cl_id not in connection.table:
+            connection.table[cl_id] = document_hash
+            returned.append((cl_id, True))
+        elif not only_changed or connection.table[cl_id] != document_hash:
+            connection.table[cl_id] = document_hash
+            returned.append((cl_id, False))
+    return returned
+
+
+@pytest.fixture(autouse=True)
+def execute_values(monkeypatch):
+    monkeypatch.setattr(storage, 'execute_values', fake_execute_values)
+
+
+def _rows(cl_ids, version='a'):
+    return [{column: None for column in OpinionStorageService.COLUMNS} |
+            {'cl_id': cl_id, 'document_hash': f'{cl_id}-{version}'} for cl_id in cl_ids]
+
+
+def test_chunks_are_one_statement_and_commit_each():
+    connection = FakeConnection()
+    service = OpinionStorageService(connection, chunk_size=4)
+    results = service.upsert_opinions(_rows(range(10)))
+
+    assert (results['stored_count'], results['updated_count'], results['skipped_count']) == (10, 0, 0)
+    assert connection.statements == connection.commits == 3
+    assert results['failed_chunks'] == []
+
+
+def test_unchanged_rows_are_skipped_unless_forced():
+    connection = FakeConnection()
+    service = OpinionStorageService(connection, chunk_size=4)
+    service.upsert_opinions(_rows(range(6)))
+
+    again = service.upsert_opinions(_rows(range(3)) + _rows(range(3, 6), version='b'))
+    assert (again['stored_count'], again['updated_count'], again['skipped_count']) == (0, 3, 3)
+
+    forced = service.upsert_opinions(_rows(range(6), version='b'), force_reprocess=True)
+    assert (forced['stored_count'], forced['updated_count'], forced['skipped_count']) == (0, 6, 0)
+
+
+def test_repeated_ids_in_a_chunk_keep_the_last_row():
+    connection = FakeConnection()
+    service = OpinionStorageService(connection, chunk_size=10)
+    results = service.upsert_opinions(_rows([1, 2]) + _rows([1], version='b'))
+
+    assert (results['stored_count'], results['skipped_count']) == (2, 1)
+    assert connection.table[1] == '1-b'
+
+
+def test_a_failed_chunk_is_rolled_back_and_reported():
+    connection = FakeConnection(fail_on_statement=2)
+    service = OpinionStorageService(connection, chunk_size=3)
+    results = service.upsert_opinions(_rows(range(8)))
+
+    assert results['stored_count'] == 5 and results['failed_count'] == 3
+    assert connection.rollbacks == 1 and connection.commits == 2
+    (failed,) = results['failed_chunks']
+    assert (failed['offset'], failed['size'], failed['cl_ids']) == (3, 3, [3, 4, 5])
+    assert 'connection reset' in failed['error']
+    assert sorted(connection.table) == [0, 1, 2, 6, 7]
+
+
+def test_conflict_clause_only_rewrites_changed_rows():
+    service = OpinionStorageService(FakeConnection())
+    sql = service._upsert_sql(force_reprocess=False)
+    assert 'ON CONFLICT (cl_id) DO UPDATE' in sql
+    assert 'IS DISTINCT FROM EXCLUDED.document_hash' in sql
+    assert sql.rstrip().endswith('RETURNING cl_id, (xmax = 0) AS inserted')
+    assert 'IS DISTINCT FROM' not in service._upsert_sql(force_reprocess=True)
+
+
+def test_changed_enhancements_are_rewritten_and_reruns_skipped():
+    import asyncio
+    import copy
+
+    from processor import RobustElevenStagePipeline
+
+    content = ("IN THE UNITED STATES DISTRICT COURT FOR THE EASTERN DISTRICT OF TEXAS\n"
+               "Before the Court is Defendant's Motion to Dismiss. See Bell Atlantic Corp. v. Twombly, "
+               "550 U.S. 544, 570 (2007).\n" + "The motion is DENIED.\n" * 80)
+    document = {'id': 1, 'case_number': '2:23-cv-00001', 'document_type': 'opinion',
+                'content': content, 'metadata': {'court_id': 'txed'}}
+
+    def stored_rows(pipeline, doc):
+        (enhanced,) = asyncio.run(pipeline._enhance_documents([copy.deepcopy(doc)]))
+        return [pipeline._build_storage_row(enhanced)]
+
+    pipeline = RobustElevenStagePipeline(connect_db=False)
+    service = OpinionStorageService(FakeConnection())
+    assert service.upsert_opinions(stored_rows(pipeline, document))['stored_count'] == 1
+
+    # Enhancing the same document again gives the same row
+    assert service.upsert_opinions(stored_rows(pipeline, document))['skipped_count'] == 1
+
+    # A new stage version, or content changed past its first 1000 characters
+    pipeline.STAGE_VERSIONS = {**RobustElevenStagePipeline.STAGE_VERSIONS, 5: 99}
+    assert service.upsert_opinions(stored_rows(pipeline, document))['updated_count'] == 1
+    edited = {**document, 'content': content + "Signed by Judge Rodney Gilstrap.\n"}
+    assert service.upsert_opinions(stored_rows(pipeline, edited))['updated_count'] == 1
+
+    # A different stage output for unchanged content
+    (enhanced,) = asyncio.run(pipeline._enhance_documents([copy.deepcopy(edited)]))
+    enhanced['judge_enhancement'] = {**enhanced['judge_enhancement'], 'full_name': 'Rodney Gilstrap'}
+    assert service.upsert_opinions([pipeline._build_storage_row(enhanced)])['updated_count'] == 1
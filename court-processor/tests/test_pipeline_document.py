@@ -0,0 +1,127 @@
+"""
+Parse-once pipeline document
+
+The wrapper must read and write through to the raw dict, compute each
+derived view once, and rebuild the views when content or metadata is
+replaced, including after a trip through a process pool. Stages must give
+the same output on a wrapped document as on the raw dict.
+"""
+
+import copy
+import json
+import pickle
+
+import pytest
+
+from pipeline_document import PipelineDocument
+from processor import RobustElevenStagePipeline
+from utils.reporter import ErrorCollector
+
+CONTENT = "<p>IN THE UNITED STATES DISTRICT COURT</p>\nSmith &amp; Jones v. Doe"
+
+
+def _document(**fields):
+    return {'id': 7, 'content': CONTENT, 'metadata': {'court_id': 'txed'}, **fields}
+
+
+def test_wrapping_shares_the_underlying_dict():
+    raw = _document()
+    doc = PipelineDocument.wrap(raw)
+    assert PipelineDocument.wrap(doc) is doc
+    assert doc.to_dict() is raw
+
+    doc['court_enhancement'] = {'resolved': True}
+    doc.setdefault('citations_extracted', [])
+    assert raw['court_enhancement'] == {'resolved': True} and 'citations_extracted' in raw
+    assert doc == raw and list(doc) == list(raw) and len(doc) == len(raw)
+    assert doc.get('missing', 'default') == 'default'
+    assert doc.pop('citations_extracted') == [] and 'citations_extracted' not in raw
+
+
+def test_text_views_are_computed_once():
+    doc = PipelineDocument(_document())
+    lower = doc.content_lower
+    assert lower == CONTENT.lower()
+    assert doc.content_lower is lower
+    assert doc.head(4) == '<p>I'
+    head = doc.head_upper(20)
+    assert head == CONTENT[:20].upper() and doc.head_upper(20) is head
+    assert PipelineDocument({'content': None}).content_lower == ''
+
+
+def test_replacing_content_or_metadata_rebuilds_the_views():
+    doc = PipelineDocument(_document())
+    assert doc.content_lower.startswith('<p>in the')
+    assert doc.metadata == {'court_id': 'txed'}
+
+    doc['content'] = 'MEMORANDUM OPINION'
+    assert doc.content_lower == 'memorandum opinion'
+    assert doc.head_upper(4) == 'MEMO'
+
+    doc['metadata'] = '{"court_id": "ded"}'
+    assert doc.metadata == {'court_id': 'ded'}
+    doc.update(metadata={'court_id': 'cafc'})
+    assert doc.metadata == {'court_id': 'cafc'}
+    # Other fields leave the views alone
+    metadata = doc.metadata
+    doc['judge_enhancement'] = {}
+    assert doc.metadata is metadata
+
+
+@pytest.mark.parametrize('raw, metadata, error', [
+    ({'court_id': 'txed'}, {'court_id': 'txed'}, None),
+    ('{"court_id": "txed"}', {'court_id': 'txed'}, None),
+    ('{not json', {}, 'invalid_json'),
+    ('[1, 2]', {}, 'unexpected_type:list'),
+    (42, {}, 'unexpected_type:int'),
+])
+def test_metadata_is_parsed_once(raw, metadata, error):
+    doc = PipelineDocument({'metadata': raw})
+    assert doc.metadata == metadata
+    assert doc.metadata_error == error
+    assert doc.metadata is doc.metadata
+    assert PipelineDocument({}).metadata == {}
+
+
+def test_pickled_documents_keep_fields_and_parsed_metadata():
+    doc = PipelineDocument(_document(metadata=json.dumps({'court_id': 'txed'})))
+    doc.metadata
+    doc.content_lower
+    restored = pickle.loads(pickle.dumps(doc))
+    assert restored == doc
+    assert restored._metadata == {'court_id': 'txed'}
+    assert restored._content_lower is None  # Rebuilt on demand
+    assert restored.content_lower == CONTENT.lower()
+
+
+def test_copies_do_not_share_fields():
+    doc = PipelineDocument(_document())
+    doc.head_upper(10)
+    duplicate = doc.copy()
+    duplicate['content'] = 'other'
+    assert doc['content'] == CONTENT
+    assert doc.head_upper(10) == CONTENT[:10].upper()
+    assert duplicate.head_upper(10) == 'OTHER'
+
+
+def test_stages_give_the_same_output_on_wrapped_documents():
+    raw = {
+        'id': 1, 'case_number': '2:21-cv-00001', 'document_type': 'opinion',
+        'metadata': json.dumps({'court_id': 'txed', 'judge_name': 'Rodney Gilstrap'}),
+        'content': "IN THE UNITED STATES DISTRICT COURT FOR THE EASTERN DISTRICT OF TEXAS\n"
+                   "MEMORANDUM OPINION AND ORDER\nSee Bell Atlantic Corp. v. Twombly, "
+                   "550 U.S. 544 (2007). The motion to dismiss is DENIED.\n",
+    }
+    pipeline = RobustElevenStagePipeline(connect_db=False)
+    pipeline.error_collector = ErrorCollector('wrapped')
+    plain = pipeline._enhance_document(copy.deepcopy(raw), 0, 1)
+    wrapped = pipeline._enhance_document(PipelineDocument.wrap(copy.deepcopy(raw)), 0, 1)
+    assert isinstance(wrapped, PipelineDocument)
+
+    def comparable(doc):
+        fields = dict(doc.items())
+        fields['comprehensive_metadata'] = {key: value for key, value in fields['comprehensive_metadata'].items()
+                                            if 'timestamp' not in key}
+        return json.loads(json.dumps(fields, default=str))
+
+    assert comparable(wrapped) == comparable(plain)
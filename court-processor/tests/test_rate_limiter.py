@@ -0,0 +1,125 @@
+"""
+Token-bucket rate limiter on a simulated clock
+
+After a burst of `capacity` requests, requests are spaced 1/rate apart,
+concurrent waiters are served in arrival order, and the rate follows the
+server's remaining quota.
+"""
+
+import asyncio
+import types
+
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import TokenBucket, EXHAUSTED_PAUSE, LOW_QUOTA, MIN_RATE
+
+WALL_START = 1_000_000.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return WALL_START + self.now
+
+    async def sleep(self, delay):
+        self.now += max(0.0, delay)
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    monkeypatch.setattr(rate_limiter, 'asyncio', types.SimpleNamespace(Lock=asyncio.Lock, sleep=clock.sleep))
+    return clock
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+    assert TokenBucket(0.5).capacity == 1.0
+    assert TokenBucket(5).capacity == 5
+
+
+def test_requests_after_the_burst_are_spaced_by_the_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+
+    async def run():
+        times = []
+        for _ in range(6):
+            await bucket.acquire()
+            times.append(clock.now)
+        return times
+
+    assert asyncio.run(run()) == pytest.approx([0, 0, 0.5, 1.0, 1.5, 2.0])
+    assert bucket.waited == pytest.approx(2.0)
+
+
+def test_concurrent_waiters_share_the_rate_in_arrival_order(clock):
+    bucket = TokenBucket(rate=4, capacity=1)
+
+    async def run():
+        served = []
+
+        async def worker(number):
+            await bucket.acquire()
+            served.append((number, clock.now))
+
+        await asyncio.gather(*(worker(number) for number in range(5)))
+        return served
+
+    served = asyncio.run(run())
+    assert [number for number, _ in served] == list(range(5))
+    assert [at for _, at in served] == pytest.approx([0, 0.25, 0.5, 0.75, 1.0])
+
+
+def test_idle_time_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=3)
+
+    async def run():
+        for _ in range(3):
+            await bucket.acquire()
+        clock.now += 100
+        started = clock.now
+        for _ in range(4):
+            await bucket.acquire()
+        return clock.now - started
+
+    # Three tokens after idling, not a hundred: the fourth request waits
+    assert asyncio.run(run()) == pytest.approx(1.0)
+
+
+def test_low_quota_spreads_the_remaining_requests_until_reset(clock):
+    bucket = TokenBucket(rate=5)
+    bucket.observe_quota(None)
+    assert bucket.rate == 5
+
+    bucket.observe_quota(LOW_QUOTA - 50, reset_at=clock.time() + 100)
+    assert bucket.rate == pytest.approx((LOW_QUOTA - 50) / 100)
+    # Without a reset time the rate shrinks with the quota
+    bucket.observe_quota(LOW_QUOTA // 2)
+    assert bucket.rate == pytest.approx(5 / 2)
+    # Never slower than MIN_RATE, and back to the configured rate once the quota recovers
+    bucket.observe_quota(1, reset_at=clock.time() + 10 ** 6)
+    assert bucket.rate == MIN_RATE
+    bucket.observe_quota(LOW_QUOTA)
+    assert bucket.rate == 5
+
+
+@pytest.mark.parametrize('reset_in, pause', [(30.0, 30.0), (None, EXHAUSTED_PAUSE)])
+def test_exhausted_quota_pauses_until_reset(clock, reset_in, pause):
+    bucket = TokenBucket(rate=10)
+    reset_at = clock.time() + reset_in if reset_in is not None else None
+    bucket.observe_quota(0, reset_at=reset_at)
+
+    async def run():
+        await bucket.acquire()
+        return clock.now
+
+    assert asyncio.run(run()) == pytest.approx(pause)
@@ -0,0 +1,141 @@
+"""
+Reporter normalization index against the lookup it replaced
+
+_baseline_reporter_info is the pipeline's former _get_reporter_info. The
+index must agree with it on every reporters_db key, whatever its case or
+surrounding whitespace, except where the old code guessed: its F. and
+F. Supp. heuristics, and inputs that reporters_db lists as a variation of
+another edition.
+"""
+
+import pytest
+from reporters_db import REPORTERS
+
+from utils.reporter_index import lookup_reporter, is_known_reporter, normalize_reporter_key
+
+
+def _baseline_reporter_info(reporter):
+    """Get reporter information with proper handling of editions"""
+    # This is the fixed version from our earlier work
+    reporter_clean = reporter.strip()
+
+    # Handle Federal Reporter series (F., F.2d, F.3d, etc.)
+    if reporter_clean.lower().startswith('f.'):
+        base_key = 'F.'
+        if base_key in REPORTERS:
+            reporter_data = REPORTERS[base_key]
+            if isinstance(reporter_data, list) and reporter_data:
+                base_info = reporter_data[0]
+
+                # Determine edition
+                if '3d' in reporter_clean:
+                    edition = 'F.3d'
+                elif '2d' in reporter_clean:
+                    edition = 'F.2d'
+                elif '4th' in reporter_clean:
+                    edition = 'F.4th'
+                else:
+                    edition = 'F.'
+
+                return {
+                    'found': True,
+                    'base_reporter': base_key,
+                    'edition': edition,
+                    'name': base_info.get('name', 'Federal Reporter'),
+                    'cite_type': base_info.get('cite_type', 'federal')
+                }
+
+    # Handle Federal Supplement
+    if 'supp' in reporter_clean.lower():
+        base_key = 'F. Supp.'
+        if '3d' in reporter_clean.lower():
+            edition = 'F. Supp. 3d'
+        elif '2d' in reporter_clean.lower():
+            edition = 'F. Supp. 2d'
+        else:
+            edition = 'F. Supp.'
+
+        if base_key in REPORTERS:
+            reporter_data = REPORTERS[base_key]
+            if isinstance(reporter_data, list) and reporter_data:
+                base_info = reporter_data[0]
+                return {
+                    'found': True,
+                    'base_reporter': base_key,
+                    'edition': edition,
+                    'name': base_info.get('name', 'Federal Supplement'),
+                    'cite_type': base_info.get('cite_type', 'federal')
+                }
+
+    # Direct lookup for other reporters
+    if reporter_clean in REPORTERS:
+        reporter_data = REPORTERS[reporter_clean]
+        if isinstance(reporter_data, list) and reporter_data:
+            base_info = reporter_data[0]
+            return {
+                'found': True,
+                'base_reporter': reporter_clean,
+                'edition': reporter_clean,
+                'name': base_info.get('name', ''),
+                'cite_type': base_info.get('cite_type', '')
+            }
+
+    # Case-insensitive lookup
+    for key in REPORTERS.keys():
+        if reporter_clean.lower() == key.lower():
+            reporter_data = REPORTERS[key]
+            if isinstance(reporter_data, list) and reporter_data:
+                base_info = reporter_data[0]
+                return {
+                    'found': True,
+                    'base_reporter': key,
+                    'edition': key,
+                    'name': base_info.get('name', ''),
+                    'cite_type': base_info.get('cite_type', '')
+                }
+
+    return {
+        'found': False,
+        'base_reporter': reporter_clean,
+        'edition': reporter_clean,
+        'name': '',
+        'cite_type': ''
+    }
+
+
+def _variations():
+    return {variation for entries in REPORTERS.values() for entry in entries
+            for variation in entry.get('variations', {})}
+
+
+def test_index_matches_the_baseline_for_every_reporter():
+    variations = _variations()
+    compared = 0
+    for key in REPORTERS:
+        for text in (key, key.lower(), key.upper(), f"  {key} "):
+            stripped = text.strip()
+            if stripped.lower().startswith('f.') or 'supp' in stripped.lower() or stripped in variations:
+                continue
+            assert lookup_reporter(text) == _baseline_reporter_info(text), text
+            compared += 1
+    assert compared > 3000
+
+
+@pytest.mark.parametrize('reporter, edition', [
+    ('F.3d', 'F.3d'),
+    ('F. 3d', 'F.3d'),
+    ('F. Supp. 2d', 'F. Supp. 2d'),
+    ('f supp 3d', 'F. Supp. 3d'),
+    ('S.Ct.', 'S. Ct.'),
+    ('la.', 'La.'),  # Not the neutral 'LA'
+])
+def test_editions_and_variations_resolve(reporter, edition):
+    info = lookup_reporter(reporter)
+    assert info['found'] and info['edition'] == edition
+
+
+def test_unknown_reporters():
+    assert lookup_reporter(' Nope. ') == {'found': False, 'base_reporter': 'Nope.', 'edition': 'Nope.',
+                                          'name': '', 'cite_type': ''}
+    assert not is_known_reporter('')
+    assert normalize_reporter_key("F. Supp. 2d") == 'fsupp2d'
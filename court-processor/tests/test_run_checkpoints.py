@@ -0,0 +1,152 @@
+"""
+Checkpointed, resumable windowed pipeline runs
+
+A windowed run that dies after some windows and is resumed must report the
+same totals as an uninterrupted run, and its checkpoints must hold running
+totals only, so they do not grow with the run. Runs that are not windowed
+write no checkpoint at all.
+"""
+
+import asyncio
+import copy
+import json
+
+from processor import RobustElevenStagePipeline
+from exceptions import StorageError
+
+CONTENT = (
+    "IN THE UNITED STATES DISTRICT COURT FOR THE EASTERN DISTRICT OF TEXAS\n"
+    "See Bell Atlantic Corp. v. Twombly, 550 U.S. 544 (2007).\n"
+)
+DOCUMENTS = [
+    {'id': number, 'case_number': f'2:21-cv-{number:05d}', 'document_type': 'opinion',
+     'content': CONTENT, 'created_at': f'2024-01-{number:02d}T00:00:00',
+     'metadata': {'court_id': 'txed'}}
+    for number in range(1, 13)
+]
+
+
+class MemoryCheckpoints:
+    """RunCheckpointStore lookalike keeping rows in a dict"""
+
+    def __init__(self):
+        self.rows = {}
+        self.saved_states = []
+
+    def load(self, run_id):
+        row = self.rows.get(run_id)
+        return json.loads(json.dumps(row, default=str)) if row else None
+
+    def start(self, run_id, parameters, state):
+        row = self.rows.setdefault(run_id, {'run_id': run_id, 'parameters': parameters, 'state': state,
+                                            'last_document': None, 'windows_completed': 0, 'attempts': 0})
+        row['attempts'] += 1
+        row['status'] = 'running'
+
+    def save(self, run_id, last_document, windows_completed, state):
+        self.saved_states.append(json.dumps(state, default=str))
+        self.rows[run_id].update(last_document=last_document, windows_completed=windows_completed,
+                                 state=json.loads(self.saved_states[-1]))
+
+    def finish(self, run_id, status, error=None):
+        self.rows[run_id]['status'] = status
+
+    def purge(self, *args, **kwargs):
+        return 0
+
+
+class FakeConnection:
+    closed = False
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _pipeline(checkpoints, fail_on_window=None):
+    pipeline = RobustElevenStagePipeline(connect_db=False)
+    pipeline.db_conn = FakeConnection()
+    pipeline.checkpoints = checkpoints
+    windows_stored = []
+
+    def iter_windows(limit, source_table, only_unprocessed, window_size, document_ids, after=None):
+        remaining = [doc for doc in DOCUMENTS if after is None or doc['id'] > after['id']][:limit]
+        for start in range(0, len(remaining), window_size):
+            yield copy.deepcopy(remaining[start:start + window_size])
+
+    def fetch(limit, source_table, only_unprocessed, document_ids, after=None):
+        return copy.deepcopy(DOCUMENTS[:limit])
+
+    async def store(documents, force_reprocess=False):
+        windows_stored.append([doc['id'] for doc in documents])
+        if len(windows_stored) == fail_on_window:
+            raise StorageError("database went away", stage="Storage")
+        return {'success': True, 'stored_count': len(documents), 'updated_count': 0, 'skipped_count': 0,
+                'failed_count': 0, 'validation_failures': 0, 'total_processed': len(documents),
+                'stored_document_ids': [doc['id'] for doc in documents], 'errors': []}
+
+    async def index(documents):
+        return {'success': True, 'indexed_count': len(documents)}
+
+    pipeline._iter_document_windows = iter_windows
+    pipeline._fetch_documents = fetch
+    pipeline._store_enhanced_documents_validated = store
+    pipeline._index_to_haystack_validated = index
+    return pipeline
+
+
+def _run(pipeline, **options):
+    options.setdefault('extract_pdfs', False)
+    options.setdefault('incremental', False)
+    return asyncio.run(pipeline.process_batch(**options))
+
+
+def test_resumed_run_reports_like_an_uninterrupted_one():
+    whole = _run(_pipeline(MemoryCheckpoints()), limit=12, window_size=3)
+
+    checkpoints = MemoryCheckpoints()
+    failed = _run(_pipeline(checkpoints, fail_on_window=3), limit=12, window_size=3)
+    assert failed['success'] is False and failed['resumable'] is True
+    run_id = failed['run_id']
+    assert checkpoints.rows[run_id]['windows_completed'] == 2
+    assert checkpoints.rows[run_id]['last_document']['id'] == 6
+
+    resumed = _run(_pipeline(checkpoints), resume_run_id=run_id)
+
+    assert resumed['success'] is True
+    assert checkpoints.rows[run_id]['status'] == 'completed'
+    for key in ('documents_processed', 'documents_stored', 'documents_indexed',
+                'courts_resolved', 'citations_extracted'):
+        assert resumed['statistics'][key] == whole['statistics'][key], key
+    assert resumed['storage_results']['stored_count'] == whole['storage_results']['stored_count'] == 12
+    assert resumed['verification']['documents_with_court_resolution'] == \
+        whole['verification']['documents_with_court_resolution']
+
+
+def test_checkpoints_hold_running_totals_only():
+    checkpoints = MemoryCheckpoints()
+    _run(_pipeline(checkpoints), limit=12, window_size=1)
+
+    states = [json.loads(state) for state in checkpoints.saved_states]
+    assert len(states) == 12
+    assert 'stored_document_ids' not in states[-1]['storage_results']
+    assert 'errors' not in states[-1]['errors']
+    # No per-document lists: the state barely grows from the first window to the last
+    assert len(checkpoints.saved_states[-1]) < len(checkpoints.saved_states[0]) + 200
+
+
+def test_runs_without_windows_write_no_checkpoint():
+    checkpoints = MemoryCheckpoints()
+    results = _run(_pipeline(checkpoints), limit=4, document_ids=[1, 2, 3, 4])
+
+    assert results['success'] is True
+    assert checkpoints.rows == {}
+    assert sorted(results['storage_results']['stored_document_ids']) == [1, 2, 3, 4]
+
+
+def test_resume_needs_a_checkpoint():
+    results = _run(_pipeline(MemoryCheckpoints()), resume_run_id='run_missing')
+    assert results['success'] is False
+    assert results['error_type'] == 'ValidationError'
@@ -0,0 +1,194 @@
+"""
+Reuse of stored stage outputs
+
+A rerun over unchanged documents reuses every stored stage output and
+gives the same documents as computing them; bumping a stage's version
+recomputes that stage and the stages that read its output, and a changed
+document recomputes everything.
+"""
+
+import asyncio
+import contextlib
+import copy
+import json
+
+import psycopg2
+
+from processor import RobustElevenStagePipeline
+from services import stage_results
+from services.stage_results import StageResultStore
+from utils.reporter import ErrorCollector
+
+CONTENT = (
+    "IN THE UNITED STATES DISTRICT COURT FOR THE EASTERN DISTRICT OF TEXAS\n"
+    "MEMORANDUM OPINION AND ORDER\n"
+    "Before the Court is Defendant's Motion to Dismiss. See Bell Atlantic Corp. v. Twombly, "
+    "550 U.S. 544, 570 (2007); Phillips v. AWH Corp., 415 F.3d 1303 (Fed. Cir. 2005).\n"
+    "The motion is DENIED.\n"
+    "Signed by Judge Rodney Gilstrap.\n"
+)
+DOCUMENTS = [
+    {'id': number, 'case_number': f'2:23-cv-{number:05d}', 'document_type': 'opinion',
+     'content': CONTENT, 'metadata': {'court_id': 'txed'}}
+    for number in (1, 2)
+]
+
+
+class MemoryStageResults:
+    """StageResultStore lookalike; outputs go through JSON like the jsonb column"""
+
+    def __init__(self, fail_loads=False):
+        self.rows = {}
+        self.fail_loads = fail_loads
+
+    def load(self, document_ids):
+        if self.fail_loads:
+            raise psycopg2.OperationalError('relation does not exist')
+        results = {}
+        for (document_id, stage), (version, input_hash, output) in self.rows.items():
+            if document_id in document_ids:
+                results.setdefault(document_id, {})[stage] = {
+                    'stage_version': version, 'input_hash': input_hash, 'output': json.loads(output)}
+        return results
+
+    def save(self, rows):
+        for document_id, stage, version, input_hash, output in rows:
+            self.rows[(document_id, stage)] = (version, input_hash, output)
+        return len(rows)
+
+
+class FakeConnection:
+    closed = False
+
+    def rollback(self):
+        pass
+
+
+def _pipeline(store):
+    pipeline = RobustElevenStagePipeline(connect_db=False)
+    pipeline.db_conn = FakeConnection()
+    pipeline.stage_results = store
+    pipeline.error_collector = ErrorCollector('stage_results')
+    computed = []
+    run_stage = pipeline._run_stage
+
+    def counting_run_stage(apply_method, output_key, doc):
+        computed.append(output_key)
+        return run_stage(apply_method, output_key, doc)
+
+    pipeline._run_stage = counting_run_stage
+    return pipeline, computed
+
+
+def _enhance(pipeline, documents, reuse=True):
+    return asyncio.run(pipeline._enhance_documents(
+        copy.deepcopy(documents), reuse_stage_results=reuse, store_stage_results=True))
+
+
+def _outputs(documents):
+    keys = RobustElevenStagePipeline.STAGE_OUTPUT_KEYS.values()
+    return [json.loads(json.dumps({key: doc[key] for key in keys}, default=str)) for doc in documents]
+
+
+def test_unchanged_documents_reuse_every_stage():
+    store = MemoryStageResults()
+    first, computed = _pipeline(store)
+    fresh = _enhance(first, DOCUMENTS)
+    assert len(computed) == 7 * len(DOCUMENTS)
+    assert first.stats['stage_results_computed'] == 7 * len(DOCUMENTS)
+
+    second, computed = _pipeline(store)
+    reused = _enhance(second, DOCUMENTS)
+    assert computed == []
+    assert second.stats['stage_results_reused'] == 7 * len(DOCUMENTS)
+    assert second.stats['stage_results_computed'] == 0
+    assert _outputs(reused) == _outputs(fresh)
+    # Stage statistics count reused outputs too
+    assert second.stats['citations_extracted'] == first.stats['citations_extracted'] > 0
+
+
+def test_a_version_bump_recomputes_the_stage_and_its_consumers():
+    store = MemoryStageResults()
+    _enhance(_pipeline(store)[0], DOCUMENTS)
+
+    pipeline, computed = _pipeline(store)
+    pipeline.STAGE_VERSIONS = {**RobustElevenStagePipeline.STAGE_VERSIONS, 3: 99}
+    _enhance(pipeline, DOCUMENTS)
+    # Stage 4 reads stage 3, and stage 8 reads everything
+    assert sorted(set(computed)) == ['citations_extracted', 'comprehensive_metadata', 'reporters_normalized']
+    assert pipeline.stats['stage_results_reused'] == 4 * len(DOCUMENTS)
+    assert {version for (_, stage), (version, _, _) in store.rows.items() if stage == 3} == {99}
+
+
+def test_changed_content_recomputes_every_stage():
+    store = MemoryStageResults()
+    _enhance(_pipeline(store)[0], DOCUMENTS)
+
+    changed = copy.deepcopy(DOCUMENTS)
+    changed[0]['content'] += "\nSee also 35 U.S.C. § 101.\n"
+    pipeline, computed = _pipeline(store)
+    _enhance(pipeline, changed)
+    assert len(computed) == 7
+    assert pipeline.stats['stage_results_reused'] == 7
+
+
+def test_unreadable_results_are_recomputed_with_a_warning():
+    pipeline, computed = _pipeline(MemoryStageResults(fail_loads=True))
+    enhanced = _enhance(pipeline, DOCUMENTS)
+    assert all(doc is not None for doc in enhanced)
+    assert len(computed) == 7 * len(DOCUMENTS)
+    assert any(warning['stage'] == 'Stage Results' for warning in pipeline.error_collector.warnings)
+
+
+def test_input_hashes_follow_the_stage_lineage():
+    pipeline, _ = _pipeline(MemoryStageResults())
+    before = pipeline._stage_input_hashes(DOCUMENTS[0])
+    pipeline.STAGE_VERSIONS = {**RobustElevenStagePipeline.STAGE_VERSIONS, 5: 99}
+    after = pipeline._stage_input_hashes(DOCUMENTS[0])
+    assert {stage for stage in before if before[stage] != after[stage]} == {5, 8}
+
+
+def test_store_writes_each_document_stage_once(monkeypatch):
+    written = []
+    monkeypatch.setattr(stage_results, 'execute_values',
+                        lambda cursor, sql, rows, page_size: written.extend(rows))
+
+    class Connection:
+        committed = False
+
+        def cursor(self):
+            return contextlib.nullcontext()
+
+        def commit(self):
+            self.committed = True
+
+    connection = Connection()
+    store = StageResultStore(connection)
+    assert store.save([]) == 0 and not connection.committed
+    rows = [('1', 3, 3, 'a', '[]'), ('1', 4, 3, 'b', '[]'), ('1', 3, 3, 'c', '[1]')]
+    assert store.save(rows) == 2
+    assert connection.committed
+    assert written == [('1', 3, 3, 'c', '[1]'), ('1', 4, 3, 'b', '[]')]
+
+
+def test_input_hashes_cover_the_stage_data_files(monkeypatch, tmp_path):
+    from extractors import keywords
+    from extractors.judge_index import JudgeIndex
+
+    pipeline, _ = _pipeline(MemoryStageResults())
+    before = pipeline._stage_input_hashes(DOCUMENTS[0])
+    monkeypatch.setattr(keywords, '_default_engine', keywords.LegalKeywordEngine(['motion to dismiss']))
+    edited = pipeline._stage_input_hashes(DOCUMENTS[0])
+    assert {stage for stage in before if before[stage] != edited[stage]} == {7, 8}
+
+    roster = tmp_path / 'judge_roster.txt'
+    roster.write_text('txed | Rodney Gilstrap | JRG\n', encoding='utf-8')
+    pipeline.judge_index = JudgeIndex()
+    pipeline.judge_index.load_roster(str(roster))
+    reloaded = pipeline._stage_input_hashes(DOCUMENTS[0])
+    assert {stage for stage in edited if edited[stage] != reloaded[stage]} == {5, 8}
+
+    # Judge names stored in the database count as much as the roster
+    pipeline.judge_index.add('Roy S. Payne', 'txed')
+    stored = pipeline._stage_input_hashes(DOCUMENTS[0])
+    assert {stage for stage in reloaded if reloaded[stage] != stored[stage]} == {5, 8}
@@ -0,0 +1,162 @@
+"""
+Dependency-ordered stage scheduling and the thread and process stage executors
+
+The scheduler must honour STAGE_DEPENDENCIES on every executor, and a
+document enhanced with concurrent stages must match the serial run,
+including the warnings and errors its stages record.
+"""
+
+import asyncio
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from processor import RobustElevenStagePipeline
+from utils.reporter import ErrorCollector
+from utils.stage_scheduler import StageScheduler
+
+DEPENDENCIES = {2: [], 3: [], 4: [3], 5: [2], 6: [], 7: [], 8: [2, 3]}
+
+
+def test_order_follows_dependencies():
+    scheduler = StageScheduler(DEPENDENCIES)
+    order = scheduler.order
+    for stage, needs in DEPENDENCIES.items():
+        assert all(order.index(need) < order.index(stage) for need in needs)
+
+
+def test_rejects_cycles_and_unknown_stages():
+    with pytest.raises(ValueError):
+        StageScheduler({1: [2], 2: [1]})
+    with pytest.raises(ValueError):
+        StageScheduler({1: [9]})
+
+
+@pytest.mark.parametrize('threaded', [False, True])
+def test_run_prepares_stages_after_their_dependencies(threaded):
+    scheduler = StageScheduler(DEPENDENCIES)
+    finished = []
+    lock = threading.Lock()
+
+    def prepare(stage):
+        assert all(need in finished for need in DEPENDENCIES[stage])
+        return (lambda: stage * 10),
+
+    def on_result(stage, result):
+        with lock:
+            finished.append(stage)
+        assert result == stage * 10
+
+    executor = ThreadPoolExecutor(max_workers=4) if threaded else None
+    try:
+        errors = scheduler.run(DEPENDENCIES, prepare, on_result, executor=executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    assert errors == {}
+    assert sorted(finished) == sorted(DEPENDENCIES)
+
+
+def test_stop_on_error_skips_dependents():
+    scheduler = StageScheduler(DEPENDENCIES)
+    finished = []
+
+    def fail():
+        raise RuntimeError('stage 3 failed')
+
+    def prepare(stage):
+        return (fail,) if stage == 3 else ((lambda: stage),)
+
+    errors = scheduler.run(DEPENDENCIES, prepare, lambda stage, result: finished.append(stage))
+    assert list(errors) == [3]
+    assert finished == [2]
+
+    finished.clear()
+    errors = scheduler.run(DEPENDENCIES, prepare, lambda stage, result: finished.append(stage),
+                           stop_on_error=False)
+    assert list(errors) == [3]
+    assert 4 in finished and 8 in finished
+
+
+def _documents():
+    content = ("IN THE UNITED STATES DISTRICT COURT FOR THE EASTERN DISTRICT OF TEXAS\n"
+               "See Bell Atlantic Corp. v. Twombly, 550 U.S. 544 (2007).\n")
+    return [
+        {'id': 1, 'case_number': '2:21-cv-00316', 'document_type': 'opinion', 'detected_type': 'opinion',
+         'content': content, 'metadata': {'court_id': 'txed'}},
+        # Unparseable metadata makes Stage 2 record a warning
+        {'id': 2, 'case_number': '2:22-cv-00100', 'document_type': 'opinion', 'detected_type': 'opinion',
+         'content': content, 'metadata': '{not json'},
+    ]
+
+
+def _without_timestamps(value):
+    if isinstance(value, dict):
+        return {key: _without_timestamps(item) for key, item in value.items() if key != 'processing_timestamp'}
+    if isinstance(value, list):
+        return [_without_timestamps(item) for item in value]
+    return value
+
+
+def _enhance(stage_executor):
+    pipeline = RobustElevenStagePipeline(connect_db=False, stage_executor=stage_executor)
+    pipeline.error_collector = ErrorCollector('test_stage_scheduler')
+    try:
+        documents = asyncio.run(pipeline._enhance_documents(copy.deepcopy(_documents())))
+    finally:
+        pipeline._shutdown_worker_pool()
+    summary = pipeline.error_collector.get_summary()
+    return ([_without_timestamps(doc) for doc in documents], dict(pipeline.stats),
+            summary['total_errors'], summary['warnings_by_stage'])
+
+
+@pytest.mark.parametrize('stage_executor', ['thread', 'process'])
+def test_concurrent_stages_match_serial_run(stage_executor):
+    serial = _enhance('serial')
+    concurrent = _enhance(stage_executor)
+
+    assert serial[3], "expected the fixture to record a warning"
+    assert concurrent == serial
+
+
+def test_thread_executor_counts_match_serial_run_over_many_documents():
+    documents = [dict(_documents()[number % 2], id=number) for number in range(30)]
+
+    def counts(stage_executor):
+        pipeline = RobustElevenStagePipeline(connect_db=False, stage_executor=stage_executor)
+        pipeline.error_collector = ErrorCollector('test_stage_scheduler', max_records=5)
+        try:
+            enhanced = asyncio.run(pipeline._enhance_documents(copy.deepcopy(documents)))
+        finally:
+            pipeline._shutdown_worker_pool()
+        summary = pipeline.error_collector.get_summary()
+        profiled = {stage: timing['calls'] for stage, timing in pipeline.profiler.summary().items()}
+        return ([_without_timestamps(doc) for doc in enhanced], dict(pipeline.stats),
+                summary['total_errors'], summary['warnings_by_stage'], profiled)
+
+    serial = counts('serial')
+    assert serial[3]['Court Resolution'] == 15
+    assert counts('thread') == serial
+
+
+def test_concurrent_records_are_all_counted_and_spilled(tmp_path):
+    collector = ErrorCollector('threads', max_records=50, spill_dir=str(tmp_path))
+
+    def add(thread):
+        for number in range(500):
+            collector.add_warning('low confidence', f'stage_{thread}', document_id=f'doc-{number}')
+
+    threads = [threading.Thread(target=add, args=(thread,)) for thread in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    collector.close()
+
+    assert collector.get_summary()['total_warnings'] == 8 * 500
+    with open(collector.spill_path, encoding='utf-8') as spill:
+        lines = spill.read().splitlines()
+    assert len(lines) == 8 * 500
+    assert all(line.startswith('{') and line.endswith('}') for line in lines)
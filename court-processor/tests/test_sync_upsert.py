@@ -0,0 +1,154 @@
+"""
+Upserts of synced CourtListener records into court_documents
+
+Each record is written with one INSERT ... ON CONFLICT statement against the
+partial unique index of its document type, and is rewritten only when its
+date_modified changed. A fake cursor plays the database: it keeps one row
+per (document type, CourtListener id), as the unique indexes do.
+"""
+
+import asyncio
+import json
+import re
+from datetime import datetime, timezone
+
+
+class FakeCursor:
+    """Cursor applying the upsert statement to rows keyed like the unique indexes"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+        self.result = None
+
+    def execute(self, sql, params):
+        self.statements.append(sql)
+        if 'court_documents' not in sql:
+            return  # The watermark update
+        assert 'SELECT' not in sql
+        target = re.search(r"ON CONFLICT \(\(metadata->>'(\w+)'\)\) WHERE document_type = '(\w+)'", sql)
+        assert target, sql
+        key, document_type = target.groups()
+        case_number, case_name, stored_type, content, metadata = params
+        assert stored_type == document_type
+        metadata = json.loads(metadata)
+        row_key = (document_type, str(metadata[key]))
+        existing = self.rows.get(row_key)
+        if existing is None:
+            self.rows[row_key] = {'case_number': case_number, 'metadata': metadata, 'writes': 1}
+            self.result = (True,)
+        elif (metadata.get('date_modified') is None
+              or existing['metadata'].get('date_modified') != metadata.get('date_modified')):
+            existing.update(case_number=case_number, metadata=metadata, writes=existing['writes'] + 1)
+            self.result = (False,)
+        else:
+            self.result = None  # DO UPDATE ... WHERE excluded the row
+
+    def fetchone(self):
+        return self.result
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    def __init__(self):
+        self.rows = {}
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self.rows)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeStore:
+    def __init__(self):
+        self.db_conn = FakeConnection()
+        self.advanced = []
+
+    def advance(self, cursor, court_id, endpoint, mark, boundary, records):
+        self.advanced.append((court_id, endpoint, mark, sorted(boundary), records))
+
+
+def _docket(docket_id, modified):
+    return {'id': docket_id, 'docket_number': f"2:24-cv-{docket_id:05d}", 'case_name': f"Case {docket_id}",
+            'court_id': 'txed', 'date_modified': modified}
+
+
+def test_upsert_reports_stored_updated_and_unchanged(ingestion):
+    rows = {}
+    cursor = FakeCursor(rows)
+    upsert = ingestion.DocumentIngestionService._upsert_document
+    document_type, key = ingestion.SYNC_ENDPOINTS['opinions']
+    doc = {'case_number': '1:23-cv-1', 'case_name': 'A v. B', 'document_type': document_type,
+           'content': 'text', 'metadata': {'opinion_id': 7, 'date_modified': '2024-01-01T00:00:00Z'}}
+
+    assert upsert(cursor, doc, document_type, key) == 'stored'
+    assert upsert(cursor, doc, document_type, key) == 'unchanged'
+    doc['metadata'] = {**doc['metadata'], 'date_modified': '2024-02-01T00:00:00Z'}
+    assert upsert(cursor, doc, document_type, key) == 'updated'
+
+    assert rows[('opinion', '7')]['writes'] == 2
+    # One statement per record: nothing is looked up first
+    assert len(cursor.statements) == 3
+
+
+def test_sync_batch_upserts_and_advances_in_one_transaction(ingestion):
+    service = ingestion.DocumentIngestionService(api_key='test')
+    store = FakeStore()
+    first = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    later = datetime(2024, 3, 2, tzinfo=timezone.utc)
+    result = {'stored': 0, 'updated': 0, 'unchanged': 0, 'watermark': None}
+
+    async def apply(batch, mark, boundary):
+        return await service._apply_sync_batch(store, 'txed', 'dockets', batch, mark, boundary, result)
+
+    batch = [(first, _docket(1, first.isoformat())), (later, _docket(2, later.isoformat())),
+             (later, _docket(3, later.isoformat()))]
+    mark, boundary = asyncio.run(apply(batch, None, set()))
+    assert (mark, boundary) == (later, {2, 3})
+
+    # The same records again, one of them modified since
+    again = [(later, _docket(2, later.isoformat())), (later, _docket(3, '2024-03-02T12:00:00+00:00'))]
+    asyncio.run(apply(again, mark, boundary))
+
+    assert (result['stored'], result['updated'], result['unchanged']) == (3, 1, 1)
+    assert sorted(store.db_conn.rows) == [('recap_docket', '1'), ('recap_docket', '2'), ('recap_docket', '3')]
+    assert store.db_conn.commits == 2
+    assert store.advanced[0] == ('txed', 'dockets', later, [2, 3], 3)
+
+
+def test_collect_stores_records_on_the_same_key_as_sync(ingestion, monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(ingestion, 'get_db_connection', lambda: conn)
+    service = ingestion.DocumentIngestionService(api_key='test')
+    # Stored by `collect sync` under the docket number of the docket record
+    conn.rows[('opinion', '7')] = {'case_number': '1:23-cv-1', 'writes': 1,
+                                    'metadata': {'opinion_id': 7, 'date_modified': '2024-01-01T00:00:00Z'}}
+    # `collect` search results name the case differently and carry no date_modified
+    docs = [{'case_number': 'OPINION-txed-70', 'case_name': 'A v. B', 'document_type': 'opinion',
+             'content': 'text', 'metadata': {'opinion_id': 7, 'cluster_id': 70}},
+            {'case_number': 'RECAP-txed-9', 'case_name': 'C v. D', 'document_type': 'recap_docket',
+             'content': '', 'metadata': {'docket_id': 9}}]
+
+    results = asyncio.run(service._store_documents(docs))
+    again = asyncio.run(service._store_documents(docs))
+
+    assert (results['stored'], results['updated'], results['failed']) == (1, 1, 0)
+    assert (again['stored'], again['updated'], again['failed']) == (0, 2, 0)
+    assert sorted(conn.rows) == [('opinion', '7'), ('recap_docket', '9')]
+    assert conn.rows[('opinion', '7')]['case_number'] == 'OPINION-txed-70'
@@ -0,0 +1,237 @@
+"""
+Stage 11 running aggregates and the streamed verification export
+
+The aggregates must score documents exactly like the per-document loop the
+pipeline used before (copied below as the reference), however the run is
+split into windows, and must stay the same size as the run grows. The export
+is written window by window, and a resumed run keeps the rows of the windows
+its checkpoint counted.
+"""
+
+import json
+import math
+import random
+
+import pandas as pd
+import pytest
+
+from exceptions import ConfigurationError
+from utils.verification_table import VerificationTable, VerificationExport, EXPORT_COLUMNS
+
+
+def _documents(count, seed=7):
+    rng = random.Random(seed)
+    documents = []
+    for number in range(count):
+        citation_count = rng.choice([0, 0, 1, 3])
+        documents.append({
+            'id': number,
+            'detected_type': rng.choice(['opinion', 'order', 'docket']),
+            'court_enhancement': {
+                'resolved': rng.random() < 0.7,
+                'validation': {'errors': ['bad'] if rng.random() < 0.2 else []},
+                'extracted_from_content': rng.random() < 0.5
+            },
+            'citations_extracted': {'count': citation_count,
+                                    'valid_count': rng.randint(0, citation_count)},
+            'reporters_normalized': {'normalized_count': rng.choice([0, 2])},
+            'judge_enhancement': {
+                'enhanced': rng.random() < 0.4,
+                'judge_name_found': rng.random() < 0.2,
+                'validation': {'errors': ['bad'] if rng.random() < 0.3 else []},
+                'extracted_from_content': rng.random() < 0.5
+            },
+            'structure_analysis': {'elements': ['caption'] if rng.random() < 0.6 else []},
+            'keyword_extraction': {'keywords': ['patent'] if rng.random() < 0.5 else []},
+            'comprehensive_metadata': {'validation_summary': {'is_valid': rng.random() < 0.5}}
+        })
+    return documents
+
+
+def _reference_verification(documents):
+    """Stage 11 as the pipeline computed it per document before the table"""
+    verification = dict.fromkeys((
+        'documents_with_court_resolution', 'documents_with_valid_court', 'documents_with_citations',
+        'documents_with_valid_citations', 'documents_with_normalized_reporters', 'documents_with_judge_info',
+        'documents_with_valid_judge', 'documents_with_structure', 'documents_with_keywords',
+        'documents_fully_valid'), 0)
+    improvements = {'courts_from_content': 0, 'judges_from_content': 0}
+    type_stats = {}
+    total_quality_points = 0
+    for doc in documents:
+        stats = type_stats.setdefault(doc.get('detected_type', 'unknown'), {
+            'total': 0, 'courts_resolved': 0, 'judges_found': 0, 'citations_found': 0,
+            'fully_valid': 0, 'total_enhancements': 0, 'total_quality_points': 0})
+        stats['total'] += 1
+        enhancements = 0
+        quality_points = 0
+        court_data = doc.get('court_enhancement', {})
+        if court_data.get('resolved'):
+            verification['documents_with_court_resolution'] += 1
+            stats['courts_resolved'] += 1
+            enhancements += 1
+            if not court_data.get('validation', {}).get('errors'):
+                verification['documents_with_valid_court'] += 1
+                quality_points += 2
+            else:
+                quality_points += 1
+            if court_data.get('extracted_from_content'):
+                improvements['courts_from_content'] += 1
+        citations_data = doc.get('citations_extracted', {})
+        if citations_data.get('count', 0) > 0:
+            verification['documents_with_citations'] += 1
+            stats['citations_found'] += 1
+            enhancements += 1
+            if citations_data.get('valid_count', 0) > 0:
+                verification['documents_with_valid_citations'] += 1
+                quality_points += 2 * citations_data['valid_count'] / citations_data['count']
+            else:
+                quality_points += 0.5
+        if doc.get('reporters_normalized', {}).get('normalized_count', 0) > 0:
+            verification['documents_with_normalized_reporters'] += 1
+            enhancements += 1
+            quality_points += 1
+        judge_data = doc.get('judge_enhancement', {})
+        if judge_data.get('enhanced') or judge_data.get('judge_name_found'):
+            verification['documents_with_judge_info'] += 1
+            stats['judges_found'] += 1
+            enhancements += 1
+            if not judge_data.get('validation', {}).get('errors'):
+                verification['documents_with_valid_judge'] += 1
+                quality_points += 2
+            else:
+                quality_points += 1
+            if judge_data.get('extracted_from_content'):
+                improvements['judges_from_content'] += 1
+        if len(doc.get('structure_analysis', {}).get('elements', [])) > 0:
+            verification['documents_with_structure'] += 1
+            enhancements += 1
+            quality_points += 1
+        if len(doc.get('keyword_extraction', {}).get('keywords', [])) > 0:
+            verification['documents_with_keywords'] += 1
+            enhancements += 1
+            quality_points += 1
+        if doc.get('comprehensive_metadata', {}).get('validation_summary', {}).get('is_valid', False):
+            verification['documents_fully_valid'] += 1
+            stats['fully_valid'] += 1
+        stats['total_enhancements'] += enhancements
+        stats['total_quality_points'] += quality_points
+        total_quality_points += quality_points
+
+    num_docs = len(documents)
+    verification['extraction_improvements'] = improvements
+    verification['average_enhancements_per_doc'] = sum(s['total_enhancements'] for s in type_stats.values()) / num_docs
+    verification['completeness_score'] = sum(
+        verification[key] for key in (
+            'documents_with_court_resolution', 'documents_with_citations', 'documents_with_normalized_reporters',
+            'documents_with_judge_info', 'documents_with_structure', 'documents_with_keywords')
+    ) / (num_docs * 6) * 100
+    verification['quality_score'] = total_quality_points / (num_docs * 10) * 100
+    verification['by_document_type'] = {
+        doc_type: {
+            'total': stats['total'],
+            'court_resolution_rate': stats['courts_resolved'] / stats['total'] * 100,
+            'judge_identification_rate': stats['judges_found'] / stats['total'] * 100,
+            'citation_extraction_rate': stats['citations_found'] / stats['total'] * 100,
+            'validity_rate': stats['fully_valid'] / stats['total'] * 100,
+            'average_enhancements': stats['total_enhancements'] / stats['total'],
+            'completeness_score': (stats['courts_resolved'] + stats['judges_found'] + stats['citations_found'])
+                                  / (stats['total'] * 3) * 100,
+            'quality_score': stats['total_quality_points'] / (stats['total'] * 10) * 100
+        }
+        for doc_type, stats in type_stats.items()
+    }
+    return verification
+
+
+def _assert_close(actual, expected, path='verification'):
+    if isinstance(expected, dict):
+        assert sorted(actual) == sorted(expected), path
+        for key in expected:
+            _assert_close(actual[key], expected[key], f"{path}.{key}")
+    else:
+        assert math.isclose(actual, expected, rel_tol=1e-9, abs_tol=1e-9), path
+
+
+@pytest.mark.parametrize('window_size', [1, 7, 200])
+def test_aggregates_match_per_document_reference(window_size):
+    documents = _documents(200)
+    table = VerificationTable()
+    for start in range(0, len(documents), window_size):
+        table.append_documents(documents[start:start + window_size])
+
+    assert len(table) == 200
+    verification = table.verification()
+    reference = _reference_verification(documents)
+    _assert_close(verification, reference)
+    assert list(verification['by_document_type']) == list(reference['by_document_type'])
+
+
+def test_state_round_trips_and_does_not_grow():
+    documents = _documents(300)
+    table = VerificationTable()
+    table.append_documents(documents[:10])
+    first_size = len(json.dumps(table.to_state()))
+    for start in range(10, 300, 10):
+        table.append_documents(documents[start:start + 10])
+
+    state = json.loads(json.dumps(table.to_state()))
+    assert len(json.dumps(state)) < first_size + 200
+    restored = VerificationTable.from_state(state)
+    assert len(restored) == 300
+    assert restored.verification() == table.verification()
+
+
+def test_empty_table_scores_zero():
+    verification = VerificationTable().verification()
+    assert verification['quality_score'] == 0
+    assert verification['by_document_type'] == {}
+
+
+@pytest.mark.parametrize('extension', ['csv', 'jsonl'])
+def test_export_streams_rows_per_window(tmp_path, extension):
+    documents = _documents(25)
+    path = str(tmp_path / f'verification.{extension}')
+    table = VerificationTable()
+    export = VerificationExport(path)
+    for start in range(0, 25, 10):
+        table.append_documents(documents[start:start + 10], export)
+        assert export.rows == min(start + 10, 25)
+    export.close()
+    export.close()
+
+    frame = _read(path, extension)
+    assert list(frame.columns) == list(EXPORT_COLUMNS)
+    assert list(frame['document_id']) == [str(number) for number in range(25)]
+    assert math.isclose(frame['quality_points'].sum(), table.totals['quality_points'])
+
+
+@pytest.mark.parametrize('extension', ['csv', 'jsonl'])
+def test_resumed_export_keeps_checkpointed_rows(tmp_path, extension):
+    documents = _documents(30)
+    path = str(tmp_path / f'verification.{extension}')
+    # The first attempt exported three windows, but only two were checkpointed
+    export = VerificationExport(path)
+    table = VerificationTable()
+    for start in (0, 10, 20):
+        table.append_documents(documents[start:start + 10], export)
+    export.close()
+
+    export = VerificationExport(path, keep_rows=20)
+    assert export.rows == 20
+    VerificationTable().append_documents(documents[20:], export)
+    export.close()
+
+    frame = _read(path, extension)
+    assert list(frame['document_id']) == [str(number) for number in range(30)]
+
+
+def test_export_rejects_unknown_formats(tmp_path):
+    with pytest.raises(ConfigurationError):
+        VerificationExport(str(tmp_path / 'verification.xlsx'))
+
+
+def _read(path, extension):
+    if extension == 'csv':
+        return pd.read_csv(path, dtype={'document_id': str})
+    return pd.read_json(path, lines=True, dtype={'document_id': str})
@@ -0,0 +1,79 @@
+"""
+Process-pool execution of enhancement stages 2-8
+
+Documents enhanced on worker processes must come back exactly as the serial
+run produces them, with the same statistics, and workers must resolve judges
+against the index built in the parent.
+"""
+
+import asyncio
+import copy
+
+import pytest
+
+from processor import RobustElevenStagePipeline
+from extractors import judge_index as judge_index_module
+from extractors.judge_index import JudgeIndex
+from utils.reporter import ErrorCollector
+
+CONTENT = (
+    "IN THE UNITED STATES DISTRICT COURT FOR THE EASTERN DISTRICT OF TEXAS\n"
+    "MEMORANDUM OPINION AND ORDER\n"
+    "See Bell Atlantic Corp. v. Twombly, 550 U.S. 544 (2007); 35 U.S.C. § 101.\n"
+    "The patent infringement claims turn on claim construction.\n"
+)
+
+
+def _documents():
+    return [
+        {'id': 1, 'case_number': '2:21-cv-00316', 'document_type': 'opinion', 'detected_type': 'opinion',
+         'content': CONTENT, 'metadata': {'court_id': 'txed', 'federal_dn_judge_initials_assigned': 'ZQX'}},
+        {'id': 2, 'case_number': '2:22-cv-00100', 'document_type': 'opinion', 'detected_type': 'opinion',
+         'content': CONTENT, 'metadata': {'court_id': 'txed', 'author_str': 'Xanthos'}},
+        {'id': 3, 'case_number': '2:22-cv-00101', 'document_type': 'opinion', 'detected_type': 'opinion',
+         'content': CONTENT, 'metadata': {'court_id': 'txed'}},
+    ]
+
+
+def _without_timestamps(value):
+    if isinstance(value, dict):
+        return {key: _without_timestamps(item) for key, item in value.items() if key != 'processing_timestamp'}
+    if isinstance(value, list):
+        return [_without_timestamps(item) for item in value]
+    return value
+
+
+@pytest.fixture
+def pipeline():
+    """Pipeline whose judge index knows one judge missing from the bundled roster"""
+    index = JudgeIndex()
+    index.add('Zelda Q. Xanthos', 'txed', ['ZQX'])
+    previous = judge_index_module._default_index
+    judge_index_module.set_judge_index(index)
+    pipeline = RobustElevenStagePipeline(connect_db=False, judge_index=index)
+    pipeline.error_collector = ErrorCollector('test_worker_pool')
+    yield pipeline
+    pipeline._shutdown_worker_pool()
+    judge_index_module.set_judge_index(previous)
+
+
+def _enhance(pipeline, workers):
+    pipeline.stats = pipeline._new_stats()
+    documents = asyncio.run(pipeline._enhance_documents(copy.deepcopy(_documents()), workers=workers))
+    return [_without_timestamps(doc) for doc in documents], dict(pipeline.stats)
+
+
+def test_pool_matches_serial_run(pipeline):
+    serial_documents, serial_stats = _enhance(pipeline, workers=1)
+    pool_documents, pool_stats = _enhance(pipeline, workers=2)
+
+    assert pool_documents == serial_documents
+    assert pool_stats == serial_stats
+
+
+def test_workers_use_the_parent_judge_index(pipeline):
+    documents, _ = _enhance(pipeline, workers=2)
+
+    assert documents[0]['judge_enhancement']['full_name'] == 'Zelda Q. Xanthos'
+    assert documents[0]['judge_enhancement']['source'] == 'judge_initials'
+    assert documents[1]['judge_enhancement']['full_name'] == 'Zelda Q. Xanthos'
@@ -0,0 +1,133 @@
+"""
+Batching, memoizing loader of records by id (in the style of DataLoader)
+
+Callers ask for one record at a time with load(key). Keys requested within a
+short window (or until max_batch_size are waiting) are deduplicated and
+fetched with one call of the batch function, which returns the records of
+a list of keys. Results are memoized, so a key is fetched once however many
+callers ask for it while it stays among the max_memo_size most recently
+used keys; a failed batch is forgotten so its keys can be retried.
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+BatchFunction = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class BatchLoader:
+    """Coalesce load(key) calls of coroutines on one event loop into batched fetches"""
+
+    def __init__(self, batch_fn: BatchFunction, max_batch_size: int = 100,
+                 batch_window: float = 0.01, name: str = 'records', max_memo_size: int = 10000):
+        """
+        Args:
+            batch_fn: Coroutine function mapping a list of unique keys to
+                {key: record}; keys missing from its result load as None
+            max_batch_size: Keys per call of batch_fn
+            batch_window: Seconds to wait for more keys before fetching
+            name: What is loaded, for statistics
+            max_memo_size: Keys memoized; the least recently used are
+                forgotten (and fetched again if asked for) beyond it
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_window = batch_window
+        self.name = name
+        self.max_memo_size = max(1, max_memo_size)
+        self._memo: 'OrderedDict[Hashable, asyncio.Future]' = OrderedDict()
+        # Waiting keys with the futures their callers await, so a key
+        # forgotten by clear() or eviction is still answered
+        self._queue: List[Tuple[Hashable, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.requested = 0
+        self.memo_hits = 0
+        self.batches = 0
+        self.evicted = 0
+
+    async def load(self, key: Hashable) -> Any:
+        """Record of a key, fetched in the next batch unless already loaded"""
+        self.requested += 1
+        future = self._memo.get(key)
+        if future is not None:
+            self.memo_hits += 1
+            self._memo.move_to_end(key)
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._remember(key, future)
+            self._queue.append((key, future))
+            if len(self._queue) >= self.max_batch_size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.batch_window, self._dispatch)
+        # Shielded: one caller being cancelled must not cancel the others' result
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        """Records of several keys, in order"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Hashable, value: Any):
+        """Memoize a record obtained elsewhere (kept if the key is already loaded)"""
+        if key not in self._memo:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._remember(key, future)
+
+    def clear(self, key: Optional[Hashable] = None):
+        """Forget one loaded key, or all of them"""
+        if key is None:
+            self._memo.clear()
+        else:
+            self._memo.pop(key, None)
+
+    def _remember(self, key: Hashable, future: asyncio.Future):
+        self._memo[key] = future
+        while len(self._memo) > self.max_memo_size:
+            self._memo.popitem(last=False)
+            self.evicted += 1
+
+    def _dispatch(self):
+        """Start fetching the waiting keys, max_batch_size per batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), self.max_batch_size):
+            asyncio.ensure_future(self._run_batch(queue[start:start + self.max_batch_size]))
+
+    async def _run_batch(self, batch: List[Tuple[Hashable, asyncio.Future]]):
+        """Fetch a batch and resolve, or fail, every future waiting on it"""
+        self.batches += 1
+        keys = [key for key, _ in batch]
+        try:
+            records = await self.batch_fn(keys)
+        except BaseException as e:
+            for key, future in batch:
+                if self._memo.get(key) is future:
+                    del self._memo[key]
+                if future.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for key, future in batch:
+            if not future.done():
+                future.set_result(records.get(key))
+
+    def stats(self) -> Dict[str, Any]:
+        """Loads requested, served from the memo, batches fetched, keys memoized and evicted"""
+        return {
+            'name': self.name,
+            'requested': self.requested,
+            'memo_hits': self.memo_hits,
+            'batches': self.batches,
+            'loaded': len(self._memo),
+            'evicted': self.evicted
+        }
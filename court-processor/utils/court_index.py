@@ -0,0 +1,147 @@
+"""
+Court id index built from courts_db
+
+Court ids and their aliases (citation strings such as 'E.D. Tex.' and name
+abbreviations, normalized like ids) are kept in one sorted array, so the ids
+starting with a prefix are found by bisection instead of a scan over every
+court. Ids are also bucketed by length, so nearest-id suggestions only
+compare an invalid id with ids whose length is within the edit-distance
+bound (rapidfuzz when installed). Suggestions are cached per value.
+"""
+
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from rapidfuzz import process
+    from rapidfuzz.distance import Levenshtein
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    process = Levenshtein = None
+    RAPIDFUZZ_AVAILABLE = False
+
+from courts_db import courts
+
+_NORMALIZE_PATTERN = re.compile(r'[^a-z0-9]+')
+
+# Largest edit distance at which an id is suggested for an unknown one
+MAX_SUGGESTION_DISTANCE = 2
+# Recent values kept by suggest_court_ids
+SUGGESTION_CACHE_SIZE = 4096
+
+
+def normalize_court_key(value: str) -> str:
+    """Lowercase letters and digits only: 'E.D. Tex.' -> 'edtex'"""
+    return _NORMALIZE_PATTERN.sub('', value.lower())
+
+
+def _build_index() -> Tuple[frozenset, Dict[str, str], List[str], List[str], Dict[int, List[str]]]:
+    """
+    Build the id set, alias table, sorted key array and length buckets
+
+    Ids take precedence over aliases, and the first court listed in
+    courts_db wins when two aliases normalize to the same key.
+    """
+    court_ids = [court['id'] for court in courts if isinstance(court, dict)]
+    aliases: Dict[str, str] = {court_id: court_id for court_id in court_ids}
+    for court in courts:
+        if not isinstance(court, dict):
+            continue
+        for alias in (court.get('citation_string'), court.get('name_abbreviation')):
+            key = normalize_court_key(alias) if isinstance(alias, str) else ''
+            if len(key) >= 2:
+                aliases.setdefault(key, court['id'])
+
+    keys = sorted(aliases)
+    by_length: Dict[int, List[str]] = {}
+    for court_id in sorted(set(court_ids)):
+        by_length.setdefault(len(court_id), []).append(court_id)
+    return frozenset(court_ids), aliases, keys, [aliases[key] for key in keys], by_length
+
+
+VALID_COURT_IDS, _ALIASES, _KEYS, _KEY_COURTS, _IDS_BY_LENGTH = _build_index()
+
+
+def resolve_court_alias(value: str) -> Optional[str]:
+    """Court id for an id in any case or a court's citation string ('E.D. Tex.' -> 'txed')"""
+    return _ALIASES.get(normalize_court_key(value)) if value else None
+
+
+def prefix_court_ids(prefix: str, limit: int = 3) -> List[str]:
+    """Court ids whose id or alias starts with prefix, in key order"""
+    key = normalize_court_key(prefix)
+    if not key:
+        return []
+    found: List[str] = []
+    position = bisect_left(_KEYS, key)
+    while position < len(_KEYS) and _KEYS[position].startswith(key) and len(found) < limit:
+        if _KEY_COURTS[position] not in found:
+            found.append(_KEY_COURTS[position])
+        position += 1
+    return found
+
+
+def _bounded_distance(first: str, second: str, max_distance: int) -> int:
+    """Levenshtein distance, or max_distance + 1 once it is known to be larger"""
+    previous = list(range(len(second) + 1))
+    for row, first_char in enumerate(first, 1):
+        current = [row]
+        for column, second_char in enumerate(second, 1):
+            current.append(min(previous[column] + 1, current[column - 1] + 1,
+                               previous[column - 1] + (first_char != second_char)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def nearest_court_ids(value: str, max_distance: int = MAX_SUGGESTION_DISTANCE, limit: int = 3) -> List[str]:
+    """Court ids within max_distance edits of value, closest first"""
+    key = value.lower().strip()
+    if not key:
+        return []
+    scored: List[Tuple[int, str]] = []
+    for length in range(max(1, len(key) - max_distance), len(key) + max_distance + 1):
+        choices = _IDS_BY_LENGTH.get(length)
+        if not choices:
+            continue
+        if RAPIDFUZZ_AVAILABLE:
+            scored.extend(
+                (int(distance), choice) for choice, distance, _ in process.extract(
+                    key, choices, scorer=Levenshtein.distance, score_cutoff=max_distance, limit=None
+                )
+            )
+        else:
+            scored.extend(
+                (distance, choice) for choice in choices
+                for distance in [_bounded_distance(key, choice, max_distance)] if distance <= max_distance
+            )
+    return [choice for _, choice in sorted(scored)[:limit]]
+
+
+@lru_cache(maxsize=SUGGESTION_CACHE_SIZE)
+def _suggest(value: str, limit: int) -> Tuple[str, ...]:
+    suggestions: List[str] = []
+    alias = resolve_court_alias(value)
+    if alias:
+        suggestions.append(alias)
+    suggestions.extend(nearest_court_ids(value, limit=limit))
+    # Then ids sharing the longest prefix with value
+    key = normalize_court_key(value)
+    for length in range(len(key), 1, -1):
+        if len(set(suggestions)) >= limit:
+            break
+        suggestions.extend(prefix_court_ids(key[:length], limit=limit))
+    return tuple(dict.fromkeys(suggestions))[:limit]
+
+
+def suggest_court_ids(value: str, limit: int = 3) -> List[str]:
+    """
+    Known court ids for an unknown one: the court it is an alias of, then
+    the nearest ids by edit distance, then ids sharing its longest prefix
+    """
+    if not isinstance(value, str) or not value.strip():
+        return []
+    return list(_suggest(value, limit))
@@ -0,0 +1,251 @@
+"""
+Stage instrumentation for the court processor pipeline
+
+Times every call of a wrapped stage method (wall time, CPU time, peak RSS
+growth and documents handled). Each stage keeps running totals, minimum and
+maximum, plus a fixed-size reservoir sample of calls for percentiles, so
+memory stays flat however many documents a run handles. Raw per-call records
+only go to the optional JSONL trace.
+"""
+
+import json
+import functools
+import inspect
+import os
+import random
+import sys
+import threading
+import time
+from array import array
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Calls kept per stage for percentiles
+RESERVOIR_SIZE = 1024
+
+METRICS = ('wall_seconds', 'cpu_seconds', 'rss_delta_kb')
+
+
+def _peak_rss_kb() -> float:
+    """Peak resident set size of this process in KB (0 when unavailable)"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak / 1024 if sys.platform == 'darwin' else float(peak)
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(percent / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class _StageSamples:
+    """Running aggregates of one stage's calls with a reservoir sample of them"""
+
+    __slots__ = ('calls', 'documents', 'totals', 'minimums', 'maximums', 'reservoir', '_random')
+
+    def __init__(self, stage: str):
+        self.calls = 0
+        self.documents = 0
+        self.totals = {metric: 0.0 for metric in METRICS}
+        self.minimums = {metric: float('inf') for metric in METRICS}
+        self.maximums = {metric: float('-inf') for metric in METRICS}
+        self.reservoir = {metric: array('d') for metric in METRICS}
+        # Seeded per stage so a run's percentiles are reproducible
+        self._random = random.Random(stage)
+
+    def add(self, values: Dict[str, float], documents: int):
+        self.calls += 1
+        self.documents += documents
+        # Algorithm R: every call is equally likely to be in the reservoir
+        filling = self.calls <= RESERVOIR_SIZE
+        slot = None if filling else self._random.randrange(self.calls)
+        for metric in METRICS:
+            value = values[metric]
+            self.totals[metric] += value
+            self.minimums[metric] = min(self.minimums[metric], value)
+            self.maximums[metric] = max(self.maximums[metric], value)
+            if filling:
+                self.reservoir[metric].append(value)
+            elif slot < RESERVOIR_SIZE:
+                self.reservoir[metric][slot] = value
+
+
+class StageProfiler:
+    """Collects per-stage timing aggregates for pipeline stage methods"""
+
+    # Document counting for a wrapped method:
+    #   'document' - one document per call
+    #   'batch'    - len() of the first list argument
+    COUNT_MODES = ('document', 'batch')
+
+    def __init__(self, buffer_calls: bool = False):
+        """
+        Args:
+            buffer_calls: Also keep every call until drain(); process pool
+                workers use this to hand one task's calls to their parent
+        """
+        self.samples: Dict[str, _StageSamples] = {}
+        self.run_id: Optional[str] = None
+        self.buffer_calls = buffer_calls
+        self._calls: List[tuple] = []
+        self._trace_file = None
+        # Stages on the thread executor record calls concurrently
+        self._lock = threading.Lock()
+
+    def reset(self, run_id: Optional[str] = None):
+        """Drop collected samples before a new run"""
+        with self._lock:
+            self.samples = {}
+            self._calls = []
+            self.run_id = run_id
+
+    def start_trace(self, trace_path: str):
+        """Append one JSON line per timed call to trace_path until stop_trace()"""
+        self.stop_trace()
+        directory = os.path.dirname(trace_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._trace_file = open(trace_path, 'a', encoding='utf-8')
+
+    def stop_trace(self):
+        """Close the trace file, if one is open"""
+        with self._lock:
+            if self._trace_file is not None:
+                self._trace_file.close()
+                self._trace_file = None
+
+    def wrap(self, func: Callable, stage: str, count: str = 'document') -> Callable:
+        """
+        Wrap a stage function so every call is timed under the given stage name
+
+        The wrapper keeps the function's signature; coroutine functions get
+        an async wrapper. A call is attributed to the document passed to it,
+        or to a document_id keyword argument for stages given only part of
+        a document.
+        """
+        if count not in self.COUNT_MODES:
+            raise ValueError(f"Unknown count mode: {count}")
+
+        def document_info(args, kwargs):
+            if count == 'batch':
+                batch = next((arg for arg in args if isinstance(arg, list)), [])
+                return len(batch), None
+            if 'document_id' in kwargs:
+                return 1, kwargs['document_id']
+            # Raw dicts and PipelineDocument wrappers alike
+            document = next((arg for arg in args if isinstance(arg, Mapping)), None)
+            return 1, (document.get('id') if document else None)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                wall, cpu, rss = time.perf_counter(), time.process_time(), _peak_rss_kb()
+                result = await func(*args, **kwargs)
+                documents, document_id = document_info(args, kwargs)
+                self.record(stage, time.perf_counter() - wall, time.process_time() - cpu,
+                            _peak_rss_kb() - rss, documents, document_id)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            wall, cpu, rss = time.perf_counter(), time.process_time(), _peak_rss_kb()
+            result = func(*args, **kwargs)
+            documents, document_id = document_info(args, kwargs)
+            self.record(stage, time.perf_counter() - wall, time.process_time() - cpu,
+                        _peak_rss_kb() - rss, documents, document_id)
+            return result
+        return wrapper
+
+    @contextmanager
+    def measure(self, stage: str):
+        """
+        Time a block of code under the given stage name
+
+        The block may set 'documents' and 'document_id' on the yielded dict.
+        """
+        info = {'documents': 0, 'document_id': None}
+        wall, cpu, rss = time.perf_counter(), time.process_time(), _peak_rss_kb()
+        yield info
+        self.record(stage, time.perf_counter() - wall, time.process_time() - cpu,
+                    _peak_rss_kb() - rss, info['documents'], info['document_id'])
+
+    def record(self, stage: str, wall_seconds: float, cpu_seconds: float,
+               rss_delta_kb: float, documents: int = 1, document_id: Any = None,
+               pid: Optional[int] = None):
+        """Add one timed call"""
+        with self._lock:
+            samples = self.samples.get(stage)
+            if samples is None:
+                samples = self.samples[stage] = _StageSamples(stage)
+            samples.add({'wall_seconds': wall_seconds, 'cpu_seconds': cpu_seconds,
+                         'rss_delta_kb': rss_delta_kb}, documents)
+            if self.buffer_calls:
+                self._calls.append((stage, wall_seconds, cpu_seconds, rss_delta_kb, documents,
+                                    pid or os.getpid()))
+
+            if self._trace_file is not None:
+                self._trace_file.write(json.dumps({
+                    'run_id': self.run_id,
+                    'stage': stage,
+                    'document_id': document_id,
+                    'documents': documents,
+                    'wall_seconds': round(wall_seconds, 6),
+                    'cpu_seconds': round(cpu_seconds, 6),
+                    'rss_delta_kb': rss_delta_kb,
+                    'pid': pid or os.getpid()
+                }, default=str) + '\n')
+
+    def drain(self) -> List[tuple]:
+        """
+        Return and clear the calls buffered since the last drain, as
+        picklable tuples
+
+        Used by process pool workers (buffer_calls=True) to hand one task's
+        timings to the parent pipeline, which replays them with replay().
+        """
+        with self._lock:
+            calls, self._calls = self._calls, []
+            self.samples = {}
+        return calls
+
+    def replay(self, calls: List[tuple], document_id: Any = None):
+        """Record calls drained from another profiler"""
+        for stage, wall, cpu, rss, documents, pid in calls:
+            self.record(stage, wall, cpu, rss, documents, document_id, pid)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage totals, throughput and percentiles (from the reservoir sample)"""
+        summary = {}
+        for stage, samples in self.samples.items():
+            wall_total = samples.totals['wall_seconds']
+            stage_summary = {
+                'calls': samples.calls,
+                'documents': samples.documents,
+                'documents_per_second': (samples.documents / wall_total) if wall_total > 0 else 0.0
+            }
+            for metric in METRICS:
+                values = sorted(samples.reservoir[metric])
+                stage_summary[metric] = {
+                    'total': samples.totals[metric],
+                    'mean': samples.totals[metric] / samples.calls if samples.calls else 0.0,
+                    'p50': _percentile(values, 50),
+                    'p90': _percentile(values, 90),
+                    'p99': _percentile(values, 99),
+                    'min': samples.minimums[metric] if samples.calls else 0.0,
+                    'max': samples.maximums[metric] if samples.calls else 0.0
+                }
+            summary[stage] = stage_summary
+        return summary
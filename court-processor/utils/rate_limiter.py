@@ -0,0 +1,97 @@
+"""
+Async token-bucket rate limiter
+
+Tokens accrue at `rate` per second up to `capacity`; each request takes one,
+waiting for it if the bucket is empty. Waiters are served in arrival order,
+so concurrent coroutines sharing one bucket together stay within the rate.
+
+The rate can follow a server's quota headers (see observe_quota): while
+plenty of the quota remains the configured rate applies, and once it runs
+low the remaining requests are spread over the time left until the quota
+resets.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+# Remaining quota below which the rate is lowered to make it last until reset
+LOW_QUOTA = 100
+# Slowest rate (requests per second) the bucket is lowered to
+MIN_RATE = 1 / 60
+# Pause when the quota is spent and the server gave no reset time (seconds)
+EXHAUSTED_PAUSE = 60.0
+
+
+class TokenBucket:
+    """Shared request budget for coroutines on one event loop"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Requests per second
+            capacity: Requests that may be made back to back after idling
+                (defaults to one second's worth, at least 1)
+        """
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self.waited = 0.0  # Total seconds callers spent waiting
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until tokens are available, then take them"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            started = time.monotonic()
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= tokens:
+                    self._tokens -= tokens
+                    break
+                else:
+                    delay = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+            self.waited += time.monotonic() - started
+
+    def observe_quota(self, remaining: Optional[int], reset_at: Optional[float] = None):
+        """
+        Adapt the rate to a server's remaining quota
+
+        Args:
+            remaining: Requests left in the current quota window
+            reset_at: Unix time at which the quota resets, if known
+        """
+        if remaining is None:
+            return
+        now = time.monotonic()
+        self._refill(now)
+        seconds_left = max(0.0, reset_at - time.time()) if reset_at is not None else None
+
+        if remaining <= 0:
+            self._paused_until = now + (seconds_left if seconds_left is not None else EXHAUSTED_PAUSE)
+            self._tokens = 0.0
+            return
+        self._paused_until = 0.0
+        if remaining < LOW_QUOTA:
+            if seconds_left:
+                rate = remaining / seconds_left
+            else:
+                rate = self.base_rate * remaining / LOW_QUOTA
+            self.rate = max(MIN_RATE, min(self.base_rate, rate))
+            self._tokens = min(self._tokens, 1.0)
+        else:
+            self.rate = self.base_rate
@@ -3,28 +3,211 @@ Error reporting system for the court processor pipeline
 
 Provides structured error collection, aggregation, and reporting
 throughout the pipeline execution.
+
+Counts are always exact. Full records are kept in memory up to a cap; past
+it every record is streamed to a JSONL spill file and memory keeps only a
+reservoir sample of examples per stage, so a long run's diagnostics stay
+small however many documents warn. Errors per document are kept for at most
+max_records documents (Misra-Gries heavy hitters), and failed documents are
+counted exactly window by window (see end_window).
 """
 
 import json
 import logging
+import os
+import random
+import re
+import threading
+from collections import defaultdict, Counter
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-from collections import defaultdict
-from pipeline_exceptions import PipelineError
+
+from exceptions import PipelineError
+from services.config import ERROR_COLLECTOR_MAX_RECORDS, ERROR_SAMPLE_SIZE, ERROR_SPILL_DIR
+
+RECORD_KINDS = ('errors', 'warnings', 'validation_failures')
 
 
 class ErrorCollector:
     """Collects and aggregates errors during pipeline execution"""
     
-    def __init__(self, run_id: Optional[str] = None):
+    def __init__(self, run_id: Optional[str] = None,
+                 max_records: int = ERROR_COLLECTOR_MAX_RECORDS,
+                 sample_size: int = ERROR_SAMPLE_SIZE,
+                 spill_dir: Optional[str] = ERROR_SPILL_DIR,
+                 spill_name: Optional[str] = None):
+        """
+        Args:
+            run_id: Identifier of the pipeline run
+            max_records: Records held in memory before spilling to disk
+            sample_size: Examples kept per stage and record kind after spilling
+            spill_dir: Directory for the spill file; None keeps samples only
+            spill_name: Name of the spill file (without extension); defaults
+                to run_id. Collectors merged into the run's collector (pool
+                workers) need their own, or they would spill into its file.
+        """
         self.run_id = run_id or datetime.now().isoformat()
-        self.errors: List[Dict[str, Any]] = []
-        self.warnings: List[Dict[str, Any]] = []
-        self.validation_failures: List[Dict[str, Any]] = []
-        self.stage_errors: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        self.document_errors: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.spill_name = spill_name or self.run_id
+        self.max_records = max_records
+        self.sample_size = sample_size
+        self.spill_dir = spill_dir
         self.start_time = datetime.now()
         
+        # Exact counts
+        self.counts = Counter()
+        self.error_types = Counter()
+        self.stage_error_types: Dict[str, Counter] = defaultdict(Counter)
+        self.stage_warnings = Counter()
+        self.stage_validation_failures = Counter()
+        # Documents with errors: a count for finished windows plus the ids of
+        # the current one; errors per document for the most frequent ones
+        self._failed_documents = 0
+        self._window_failed_documents = set()
+        self.document_error_counts = Counter()
+        
+        # Every record until the cap, then a reservoir sample per stage
+        self._records: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in RECORD_KINDS}
+        self._samples: Optional[Dict[str, Dict[str, List[Dict[str, Any]]]]] = None
+        self._seen: Dict[str, Counter] = {kind: Counter() for kind in RECORD_KINDS}
+        self._random = random.Random()
+        self.spill_path: Optional[str] = None
+        self._spill_file = None
+        # Stages on the thread executor record concurrently
+        self._lock = threading.RLock()
+    
+    @property
+    def failed_documents(self) -> int:
+        """Number of distinct documents with at least one error"""
+        return self._failed_documents + len(self._window_failed_documents)
+    
+    @property
+    def sampled(self) -> bool:
+        """True once the cap was reached and records are sampled"""
+        return self._samples is not None
+    
+    @property
+    def errors(self) -> List[Dict[str, Any]]:
+        return self._held('errors')
+    
+    @property
+    def warnings(self) -> List[Dict[str, Any]]:
+        return self._held('warnings')
+    
+    @property
+    def validation_failures(self) -> List[Dict[str, Any]]:
+        return self._held('validation_failures')
+    
+    @property
+    def stage_errors(self) -> Dict[str, List[Dict[str, Any]]]:
+        grouped = defaultdict(list)
+        for error_record in self.errors:
+            grouped[error_record['stage']].append(error_record)
+        return grouped
+    
+    @property
+    def document_errors(self) -> Dict[str, List[Dict[str, Any]]]:
+        grouped = defaultdict(list)
+        for error_record in self.errors:
+            if error_record['document_id']:
+                grouped[error_record['document_id']].append(error_record)
+        return grouped
+    
+    def _held(self, kind: str) -> List[Dict[str, Any]]:
+        if self._samples is None:
+            return self._records[kind]
+        records = [record for sample in self._samples[kind].values() for record in sample]
+        return sorted(records, key=lambda record: record['timestamp'])
+    
+    # Recording
+    
+    def _record(self, kind: str, record: Dict[str, Any]):
+        with self._lock:
+            stage = record['stage']
+            self.counts[kind] += 1
+            if kind == 'errors':
+                self.error_types[record['error_type']] += 1
+                self.stage_error_types[stage][record['error_type']] += 1
+                if record['document_id']:
+                    self._count_document_error(record['document_id'])
+            elif kind == 'warnings':
+                self.stage_warnings[stage] += 1
+            else:
+                self.stage_validation_failures[stage] += 1
+        
+            if self._samples is None:
+                if sum(len(records) for records in self._records.values()) < self.max_records:
+                    self._records[kind].append(record)
+                    return
+                self._start_spilling()
+            self._spill(kind, record)
+            self._sample(kind, record)
+    
+    def _count_document_error(self, document_id: Any):
+        """Count an error of a document; past max_records documents, Misra-Gries"""
+        self._window_failed_documents.add(document_id)
+        counts = self.document_error_counts
+        if document_id in counts or len(counts) < self.max_records:
+            counts[document_id] += 1
+            return
+        # Table full: the new document and every tracked one lose one error,
+        # and documents down to zero make room. Counts become lower bounds,
+        # off by at most errors / (max_records + 1).
+        for tracked in list(counts):
+            counts[tracked] -= 1
+            if counts[tracked] <= 0:
+                del counts[tracked]
+    
+    def end_window(self):
+        """
+        Fold the current window's failed documents into the exact count
+        
+        Call once the documents seen so far are finished, so none of them
+        can record another error (process_batch calls it after every window).
+        Memory for counting failed documents then stays at one window's
+        worth; a document that errs again later would be counted twice.
+        """
+        with self._lock:
+            self._failed_documents += len(self._window_failed_documents)
+            self._window_failed_documents = set()
+    
+    def _start_spilling(self):
+        """Move the held records to the spill file and keep samples from here on"""
+        held = sorted(
+            ((kind, record) for kind, records in self._records.items() for record in records),
+            key=lambda item: item[1]['timestamp']
+        )
+        self._records = {kind: [] for kind in RECORD_KINDS}
+        self._samples = {kind: {} for kind in RECORD_KINDS}
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            safe_name = re.sub(r'[^\w.-]', '_', self.spill_name)
+            self.spill_path = os.path.join(self.spill_dir, f"{safe_name}.errors.jsonl")
+            logging.getLogger(__name__).info(
+                f"Error records for {self.run_id} exceed {self.max_records}; spilling to {self.spill_path}"
+            )
+        for kind, record in held:
+            self._spill(kind, record)
+            self._sample(kind, record)
+    
+    def _spill(self, kind: str, record: Dict[str, Any]):
+        if self.spill_path is None:
+            return
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, 'a', encoding='utf-8')
+        self._spill_file.write(json.dumps({'kind': kind, **record}, default=str) + '\n')
+    
+    def _sample(self, kind: str, record: Dict[str, Any]):
+        """Reservoir sampling (algorithm R) per record kind and stage"""
+        stage = record['stage']
+        seen = self._seen[kind][stage] = self._seen[kind][stage] + 1
+        sample = self._samples[kind].setdefault(stage, [])
+        if len(sample) < self.sample_size:
+            sample.append(record)
+        else:
+            slot = self._random.randrange(seen)
+            if slot < self.sample_size:
+                sample[slot] = record
+    
     def add_error(self, error: Exception, stage: str, document_id: Optional[str] = None, context: Optional[Dict] = None):
         """Add an error to the collection"""
         error_record = {
@@ -40,11 +223,7 @@ class ErrorCollector:
         if isinstance(error, PipelineError):
             error_record['error_details'] = error.to_dict()
         
-        self.errors.append(error_record)
-        self.stage_errors[stage].append(error_record)
-        
-        if document_id:
-            self.document_errors[document_id].append(error_record)
+        self._record('errors', error_record)
     
     def add_warning(self, message: str, stage: str, document_id: Optional[str] = None, context: Optional[Dict] = None):
         """Add a warning to the collection"""
@@ -56,7 +235,7 @@ class ErrorCollector:
             'context': context or {}
         }
         
-        self.warnings.append(warning_record)
+        self._record('warnings', warning_record)
     
     def add_validation_failure(self, validation_result: Dict, stage: str, document_id: Optional[str] = None):
         """Add a validation failure"""
@@ -68,51 +247,161 @@ class ErrorCollector:
             'validation_warnings': validation_result.get('warnings', [])
         }
         
-        self.validation_failures.append(failure_record)
+        self._record('validation_failures', failure_record)
+    
+    def iter_records(self):
+        """Yield (kind, record) for every record, from the spill file once spilling"""
+        if self.spill_path is None:
+            for kind in RECORD_KINDS:
+                for record in self._held(kind):
+                    yield kind, record
+            return
+        if self._spill_file is not None:
+            self._spill_file.flush()
+        with open(self.spill_path, encoding='utf-8') as spill:
+            for line in spill:
+                record = json.loads(line)
+                yield record.pop('kind'), record
+    
+    def merge(self, other: 'ErrorCollector'):
+        """
+        Merge records collected elsewhere (e.g. in a pool worker) into this
+        collector; other's spill file is deleted once its records are read
+        """
+        if other.sampled and other.spill_path is None:
+            raise ValueError("Cannot merge a collector whose records were sampled without a spill file")
+        if other.spill_path is not None and other.spill_path == self.spill_path:
+            raise ValueError(f"Cannot merge a collector spilling to this collector's file {self.spill_path}")
+        with self._lock:
+            for kind, record in other.iter_records():
+                self._record(kind, record)
+        if other.spill_path is not None:
+            other.close()
+            try:
+                os.remove(other.spill_path)
+            except FileNotFoundError:
+                pass
+            other.spill_path = None
+    
+    def close(self):
+        """Flush and close the spill file; later records reopen it"""
+        with self._lock:
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
+    
+    def __getstate__(self):
+        with self._lock:
+            if self._spill_file is not None:
+                self._spill_file.flush()
+            state = self.__dict__.copy()
+        state['_spill_file'] = None
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+    
+    def to_state(self, records: bool = True) -> Dict[str, Any]:
+        """
+        Collected records and counts as JSON-serializable data (see from_state)
+        
+        Args:
+            records: Include the held records and per-document counts. Run
+                checkpoints leave them out and keep only the counts, the
+                most problematic documents and the spill file's path.
+        """
+        if self._spill_file is not None:
+            self._spill_file.flush()
+        state = {
+            'run_id': self.run_id,
+            'spill_name': self.spill_name,
+            'counts': dict(self.counts),
+            'error_types': dict(self.error_types),
+            'stage_error_types': {stage: dict(types) for stage, types in self.stage_error_types.items()},
+            'stage_warnings': dict(self.stage_warnings),
+            'stage_validation_failures': dict(self.stage_validation_failures),
+            'failed_documents': self.failed_documents,
+            'sampled': self.sampled,
+            'seen': {kind: dict(seen) for kind, seen in self._seen.items()},
+            'spill_path': self.spill_path
+        }
+        if not records:
+            state['document_error_counts'] = dict(self.document_error_counts.most_common(self.sample_size))
+            return state
+        state['document_error_counts'] = dict(self.document_error_counts)
+        state['errors'] = self.errors
+        state['warnings'] = self.warnings
+        state['validation_failures'] = self.validation_failures
+        return state
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'ErrorCollector':
+        """
+        Rebuild a collector from to_state() output, e.g. when resuming a run
+        
+        From a state without records the counts are restored exactly; the
+        earlier records are only in the spill file, if there was one.
+        """
+        collector = cls(state.get('run_id'), spill_name=state.get('spill_name'))
+        has_records = 'errors' in state
+        if has_records and not state.get('sampled'):
+            for kind in RECORD_KINDS:
+                for record in state.get(kind, []):
+                    collector._record(kind, record)
+            return collector
+        
+        collector.counts.update(state['counts'])
+        collector.error_types.update(state['error_types'])
+        for stage, types in state['stage_error_types'].items():
+            collector.stage_error_types[stage].update(types)
+        collector.stage_warnings.update(state['stage_warnings'])
+        collector.stage_validation_failures.update(state['stage_validation_failures'])
+        collector.document_error_counts.update(state['document_error_counts'])
+        collector._failed_documents = state.get('failed_documents', len(state['document_error_counts']))
+        collector.spill_path = state['spill_path']
+        if not state.get('sampled'):
+            return collector
+        collector._samples = {kind: {} for kind in RECORD_KINDS}
+        for kind in RECORD_KINDS:
+            collector._seen[kind].update(state['seen'].get(kind, {}))
+            for record in state.get(kind, []):
+                collector._samples[kind].setdefault(record['stage'], []).append(record)
+        return collector
         
     def get_summary(self) -> Dict[str, Any]:
         """Get error summary statistics"""
         processing_time = (datetime.now() - self.start_time).total_seconds()
         
-        # Group errors by type
-        error_types = defaultdict(int)
-        for error in self.errors:
-            error_types[error['error_type']] += 1
-        
         # Stage statistics
         stage_stats = {}
-        for stage, errors in self.stage_errors.items():
+        for stage, types in self.stage_error_types.items():
             stage_stats[stage] = {
-                'error_count': len(errors),
-                'error_types': defaultdict(int)
+                'error_count': sum(types.values()),
+                'error_types': dict(types)
             }
-            for error in errors:
-                stage_stats[stage]['error_types'][error['error_type']] += 1
-        
-        # Document statistics
-        failed_documents = len(self.document_errors)
-        document_error_counts = {
-            doc_id: len(errors) for doc_id, errors in self.document_errors.items()
-        }
         
         return {
             'run_id': self.run_id,
             'processing_time_seconds': processing_time,
-            'total_errors': len(self.errors),
-            'total_warnings': len(self.warnings),
-            'total_validation_failures': len(self.validation_failures),
-            'failed_documents': failed_documents,
-            'error_types': dict(error_types),
+            'total_errors': self.counts['errors'],
+            'total_warnings': self.counts['warnings'],
+            'total_validation_failures': self.counts['validation_failures'],
+            'failed_documents': self.failed_documents,
+            'error_types': dict(self.error_types),
             'stage_statistics': stage_stats,
-            'most_problematic_documents': sorted(
-                document_error_counts.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:10]
+            'warnings_by_stage': dict(self.stage_warnings),
+            'validation_failures_by_stage': dict(self.stage_validation_failures),
+            'most_problematic_documents': self.document_error_counts.most_common(10),
+            'records_sampled': self.sampled,
+            'spill_path': self.spill_path
         }
     
     def get_detailed_report(self) -> Dict[str, Any]:
-        """Get detailed error report"""
+        """Get detailed error report (records are examples once sampled; see spill_path)"""
+        if self._spill_file is not None:
+            self._spill_file.flush()
         return {
             'summary': self.get_summary(),
             'errors': self.errors,
@@ -141,6 +430,8 @@ class ErrorCollector:
         logger.info(f"Total warnings: {summary['total_warnings']}")
         logger.info(f"Validation failures: {summary['total_validation_failures']}")
         logger.info(f"Failed documents: {summary['failed_documents']}")
+        if summary['spill_path']:
+            logger.info(f"All records: {summary['spill_path']}")
         
         if summary['error_types']:
             logger.info("\nError Types:")
@@ -0,0 +1,96 @@
+"""
+Reporter normalization index built from reporters_db
+
+Maps every reporter edition and every listed variation to its canonical
+edition once at import time, so resolving a reporter string is a dict
+lookup instead of a scan over all of REPORTERS. Lookups fall back from an
+exact match to a case-insensitive one, and then to a case-folded,
+whitespace- and punctuation-insensitive key (so 'La.' is not taken for the
+neutral 'LA' when only the case differs).
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Any, Tuple
+
+from reporters_db import REPORTERS
+
+_NORMALIZE_PATTERN = re.compile(r"[\s.,']+")
+
+# Recent lookups kept by lookup_reporter
+LOOKUP_CACHE_SIZE = 4096
+
+
+def normalize_reporter_key(reporter: str) -> str:
+    """Case-fold and drop whitespace/punctuation: 'F. Supp. 2d' -> 'fsupp2d'"""
+    return _NORMALIZE_PATTERN.sub('', reporter.casefold())
+
+
+def _build_index() -> Tuple[Dict[str, Dict[str, Any]], ...]:
+    """
+    Build the exact, case-folded and normalized lookup tables
+
+    Editions take precedence over variations, and the first reporter listed
+    in reporters_db wins when two normalize to the same key.
+    """
+    editions = []
+    variations = []
+    for base_reporter, entries in REPORTERS.items():
+        for entry in entries:
+            info = {
+                'name': entry.get('name', ''),
+                'cite_type': entry.get('cite_type', ''),
+            }
+            for edition in entry.get('editions', {}):
+                editions.append((edition, {'base_reporter': base_reporter, 'edition': edition, **info}))
+            for variation, edition in entry.get('variations', {}).items():
+                variations.append((variation, {'base_reporter': base_reporter, 'edition': edition, **info}))
+
+    exact: Dict[str, Dict[str, Any]] = {}
+    casefolded: Dict[str, Dict[str, Any]] = {}
+    normalized: Dict[str, Dict[str, Any]] = {}
+    for source in (editions, variations):
+        for text, record in source:
+            exact.setdefault(text, record)
+    for index, key in ((casefolded, str.casefold), (normalized, normalize_reporter_key)):
+        for source in (editions, variations):
+            for text, record in source:
+                index.setdefault(key(text), record)
+    return exact, casefolded, normalized
+
+
+_EXACT_INDEX, _CASEFOLDED_INDEX, _NORMALIZED_INDEX = _build_index()
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _lookup(reporter: str) -> Tuple[Tuple[str, Any], ...]:
+    reporter_clean = reporter.strip()
+    record = (_EXACT_INDEX.get(reporter_clean)
+              or _CASEFOLDED_INDEX.get(reporter_clean.casefold())
+              or _NORMALIZED_INDEX.get(normalize_reporter_key(reporter_clean)))
+    if record is None:
+        return (
+            ('found', False),
+            ('base_reporter', reporter_clean),
+            ('edition', reporter_clean),
+            ('name', ''),
+            ('cite_type', ''),
+        )
+    return (('found', True),) + tuple(record.items())
+
+
+def lookup_reporter(reporter: str) -> Dict[str, Any]:
+    """
+    Resolve a reporter string to its canonical edition
+
+    Returns:
+        Dict with found, base_reporter (REPORTERS key), edition (canonical
+        edition), name and cite_type. Unknown reporters come back with
+        found=False and the stripped input as base_reporter and edition.
+    """
+    return dict(_lookup(reporter))
+
+
+def is_known_reporter(reporter: str) -> bool:
+    """Whether a reporter string resolves to any reporters_db edition"""
+    return bool(reporter) and _lookup(reporter)[0][1]
@@ -0,0 +1,118 @@
+"""
+Dependency-ordered scheduling of per-document pipeline stages
+
+Stages declare the stages whose output they read. The scheduler starts a
+stage as soon as all of its dependencies have finished, so independent
+stages run at the same time on a thread or process executor. Without an
+executor the stages run one after another in dependency order, which for
+the pipeline is plain stage order.
+"""
+
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
+
+
+class StageScheduler:
+    """Runs stages in dependency order, concurrently where the executor allows"""
+
+    EXECUTORS = ('serial', 'thread', 'process')
+
+    def __init__(self, dependencies: Dict[int, List[int]]):
+        """
+        Args:
+            dependencies: {stage: [stages whose output it reads]}
+
+        Raises:
+            ValueError: On an unknown dependency or a dependency cycle
+        """
+        for stage, needs in dependencies.items():
+            unknown = [need for need in needs if need not in dependencies]
+            if unknown:
+                raise ValueError(f"Stage {stage} depends on unknown stages {unknown}")
+        self.dependencies = {stage: list(needs) for stage, needs in dependencies.items()}
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[int]:
+        """Stages ordered so every stage follows its dependencies; ties by stage number"""
+        order = []
+        placed = set()
+        remaining = sorted(self.dependencies)
+        while remaining:
+            ready = [stage for stage in remaining if all(need in placed for need in self.dependencies[stage])]
+            if not ready:
+                raise ValueError(f"Stage dependency cycle among {remaining}")
+            stage = ready[0]
+            order.append(stage)
+            placed.add(stage)
+            remaining.remove(stage)
+        return order
+
+    def run(self, stages: Iterable[int],
+            prepare: Callable[[int], Tuple[Callable, ...]],
+            on_result: Callable[[int, Any], None],
+            executor: Optional[Executor] = None,
+            stop_on_error: bool = True) -> Dict[int, BaseException]:
+        """
+        Run the given stages
+
+        Stages not listed are treated as already complete. prepare and
+        on_result are always called from the calling thread, so they may
+        read and write the document freely.
+
+        Args:
+            stages: Stage numbers to run
+            prepare: Called when a stage's dependencies are done; returns
+                (function, *args) to run for the stage
+            on_result: Called with each finished stage's return value, before
+                any stage that depends on it is prepared
+            executor: Thread or process pool; None runs stages serially
+            stop_on_error: Start no further stages once one has failed.
+                Stages already running still finish and report results.
+
+        Returns:
+            {stage: exception} for the stages that failed, in stage order
+        """
+        to_run = set(stages)
+        errors: Dict[int, BaseException] = {}
+
+        if executor is None:
+            for stage in self.order:
+                if stage not in to_run:
+                    continue
+                try:
+                    function, *args = prepare(stage)
+                    on_result(stage, function(*args))
+                except Exception as e:
+                    errors[stage] = e
+                    if stop_on_error:
+                        break
+            return errors
+
+        waiting = [stage for stage in self.order if stage in to_run]
+        running = {}
+        while waiting or running:
+            if stop_on_error and errors:
+                waiting = []
+            unfinished = set(waiting) | set(running.values())
+            for stage in list(waiting):
+                if any(need in unfinished for need in self.dependencies[stage]):
+                    continue
+                waiting.remove(stage)
+                try:
+                    function, *args = prepare(stage)
+                    running[executor.submit(function, *args)] = stage
+                except Exception as e:
+                    errors[stage] = e
+                    unfinished.discard(stage)
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=running.get):
+                stage = running.pop(future)
+                try:
+                    on_result(stage, future.result())
+                except Exception as e:
+                    errors[stage] = e
+
+        return dict(sorted(errors.items()))
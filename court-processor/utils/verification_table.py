@@ -0,0 +1,326 @@
+"""
+Running aggregates of pipeline Stage 11 verification
+
+As each window of enhanced documents leaves the pipeline, the fields Stage 11
+scores (type, court/citation/reporter/judge/structure/keyword outcomes,
+validity) are copied into NumPy columns for that window only. Vectorized
+sums fold the window into run-wide and per-type totals, from which the
+verification scores, per-type breakdown and insights are computed, so
+memory and checkpoints stay the same size however long the run. The
+per-document rows can be streamed to an export file window by window.
+"""
+
+import importlib.util
+import logging
+import os
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+# Boolean outcome columns, in export order
+FLAG_COLUMNS = (
+    'court_resolved', 'court_valid', 'court_from_content',
+    'reporters_normalized',
+    'judge_found', 'judge_valid', 'judge_from_content',
+    'has_structure', 'has_keywords', 'fully_valid'
+)
+COUNT_COLUMNS = ('citation_count', 'valid_citation_count')
+EXPORT_COLUMNS = ('document_id', 'document_type', *FLAG_COLUMNS, *COUNT_COLUMNS,
+                  'valid_ratio', 'enhancements', 'quality_points')
+
+# Columns summed over the run, and per document type
+SUM_COLUMNS = (*FLAG_COLUMNS, 'has_citations', 'has_valid_citations', 'enhancements', 'quality_points')
+TYPE_SUM_COLUMNS = ('court_resolved', 'judge_found', 'has_citations', 'fully_valid',
+                    'enhancements', 'quality_points')
+
+# Enhancements Stage 11 checks for, and the quality points a document can earn
+MAX_ENHANCEMENTS = 6
+MAX_QUALITY_POINTS = 10
+
+
+def document_row(doc: Dict[str, Any]) -> tuple:
+    """(id, type, *FLAG_COLUMNS, *COUNT_COLUMNS) of one enhanced document"""
+    court_data = doc.get('court_enhancement', {})
+    court_resolved = bool(court_data.get('resolved'))
+    citations_data = doc.get('citations_extracted', {})
+    citation_count = citations_data.get('count', 0)
+    judge_data = doc.get('judge_enhancement', {})
+    judge_found = bool(judge_data.get('enhanced') or judge_data.get('judge_name_found'))
+    validation_summary = doc.get('comprehensive_metadata', {}).get('validation_summary', {})
+    return (
+        str(doc.get('id')),
+        doc.get('detected_type', 'unknown'),
+        court_resolved,
+        court_resolved and not court_data.get('validation', {}).get('errors'),
+        court_resolved and bool(court_data.get('extracted_from_content')),
+        doc.get('reporters_normalized', {}).get('normalized_count', 0) > 0,
+        judge_found,
+        judge_found and not judge_data.get('validation', {}).get('errors'),
+        judge_found and bool(judge_data.get('extracted_from_content')),
+        len(doc.get('structure_analysis', {}).get('elements', [])) > 0,
+        len(doc.get('keyword_extraction', {}).get('keywords', [])) > 0,
+        bool(validation_summary.get('is_valid', False)),
+        citation_count,
+        citations_data.get('valid_count', 0) if citation_count > 0 else 0
+    )
+
+
+def window_columns(documents: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Columns of one window of documents, with the derived scoring columns"""
+    ids, types, *values = zip(*(document_row(doc) for doc in documents))
+    columns = {
+        'document_id': np.array(ids, dtype=object),
+        'document_type': np.array(types, dtype=object)
+    }
+    for name, column in zip(FLAG_COLUMNS, values):
+        columns[name] = np.array(column, dtype=bool)
+    for name, column in zip(COUNT_COLUMNS, values[len(FLAG_COLUMNS):]):
+        columns[name] = np.array(column, dtype=np.int32)
+
+    has_citations = columns['has_citations'] = columns['citation_count'] > 0
+    has_valid_citations = columns['has_valid_citations'] = has_citations & (columns['valid_citation_count'] > 0)
+    columns['valid_ratio'] = np.divide(
+        columns['valid_citation_count'], columns['citation_count'],
+        out=np.zeros(len(ids)), where=has_citations
+    )
+    columns['enhancements'] = (
+        columns['court_resolved'].astype(np.int8) + has_citations +
+        columns['reporters_normalized'] + columns['judge_found'] +
+        columns['has_structure'] + columns['has_keywords']
+    )
+    # Valid data scores higher than data that carries validation errors
+    columns['quality_points'] = (
+        np.where(columns['court_valid'], 2.0, columns['court_resolved'] * 1.0) +
+        np.where(has_valid_citations, 2 * columns['valid_ratio'], has_citations * 0.5) +
+        columns['reporters_normalized'] +
+        np.where(columns['judge_valid'], 2.0, columns['judge_found'] * 1.0) +
+        columns['has_structure'] + columns['has_keywords']
+    )
+    return columns
+
+
+class VerificationTable:
+    """Run-wide and per-type Stage 11 totals, fed one window at a time"""
+
+    def __init__(self):
+        self.documents = 0
+        self.totals: Dict[str, float] = dict.fromkeys(SUM_COLUMNS, 0.0)
+        # Type -> {'total', *TYPE_SUM_COLUMNS}, in order of first appearance
+        self.by_type: Dict[str, Dict[str, float]] = {}
+
+    def __len__(self) -> int:
+        return self.documents
+
+    def append_documents(self, documents: List[Dict[str, Any]],
+                         export: Optional['VerificationExport'] = None):
+        """Fold one window of enhanced documents into the totals, and export its rows"""
+        if not documents:
+            return
+        columns = window_columns(documents)
+        self.documents += len(documents)
+        for name in SUM_COLUMNS:
+            self.totals[name] += float(columns[name].sum())
+
+        types = list(dict.fromkeys(columns['document_type']))
+        codes = np.array([types.index(doc_type) for doc_type in columns['document_type']])
+        type_totals = np.bincount(codes, minlength=len(types))
+        type_sums = {name: np.bincount(codes, weights=columns[name], minlength=len(types))
+                     for name in TYPE_SUM_COLUMNS}
+        for code, doc_type in enumerate(types):
+            sums = self.by_type.setdefault(doc_type, dict.fromkeys(('total', *TYPE_SUM_COLUMNS), 0.0))
+            sums['total'] += int(type_totals[code])
+            for name in TYPE_SUM_COLUMNS:
+                sums[name] += float(type_sums[name][code])
+
+        if export is not None:
+            export.write(pd.DataFrame({name: columns[name] for name in EXPORT_COLUMNS}))
+
+    # Stage 11
+
+    def verification(self) -> Dict[str, Any]:
+        """Stage 11 verification counts, scores and per-type breakdown"""
+        totals = self.totals
+        num_docs = self.documents
+
+        verification = {
+            'documents_with_court_resolution': int(totals['court_resolved']),
+            'documents_with_valid_court': int(totals['court_valid']),
+            'documents_with_citations': int(totals['has_citations']),
+            'documents_with_valid_citations': int(totals['has_valid_citations']),
+            'documents_with_normalized_reporters': int(totals['reporters_normalized']),
+            'documents_with_judge_info': int(totals['judge_found']),
+            'documents_with_valid_judge': int(totals['judge_valid']),
+            'documents_with_structure': int(totals['has_structure']),
+            'documents_with_keywords': int(totals['has_keywords']),
+            'documents_fully_valid': int(totals['fully_valid']),
+            'average_enhancements_per_doc': 0,
+            'completeness_score': 0,
+            'quality_score': 0,
+            'extraction_improvements': {
+                'courts_from_content': int(totals['court_from_content']),
+                'judges_from_content': int(totals['judge_from_content'])
+            },
+            'by_document_type': {}
+        }
+        if num_docs == 0:
+            return verification
+
+        verification['average_enhancements_per_doc'] = totals['enhancements'] / num_docs
+        # Completeness: how many enhancements were applied
+        verification['completeness_score'] = totals['enhancements'] / (num_docs * MAX_ENHANCEMENTS) * 100
+        # Quality: how good are the enhancements
+        verification['quality_score'] = totals['quality_points'] / (num_docs * MAX_QUALITY_POINTS) * 100
+
+        for doc_type, sums in self.by_type.items():
+            total = int(sums['total'])
+            if total == 0:
+                continue
+            verification['by_document_type'][doc_type] = {
+                'total': total,
+                'court_resolution_rate': sums['court_resolved'] / total * 100,
+                'judge_identification_rate': sums['judge_found'] / total * 100,
+                'citation_extraction_rate': sums['has_citations'] / total * 100,
+                'validity_rate': sums['fully_valid'] / total * 100,
+                'average_enhancements': sums['enhancements'] / total,
+                'completeness_score': (
+                    (sums['court_resolved'] + sums['judge_found'] + sums['has_citations']) / (total * 3)  # 3 key metrics
+                ) * 100,
+                'quality_score': sums['quality_points'] / (total * MAX_QUALITY_POINTS) * 100
+            }
+        return verification
+
+    # Checkpoints
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-safe copy of the totals (see from_state)"""
+        return {
+            'documents': self.documents,
+            'totals': dict(self.totals),
+            'by_type': {doc_type: dict(sums) for doc_type, sums in self.by_type.items()}
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'VerificationTable':
+        table = cls()
+        table.documents = state['documents']
+        table.totals.update(state['totals'])
+        table.by_type = {doc_type: dict(sums) for doc_type, sums in state['by_type'].items()}
+        return table
+
+    @staticmethod
+    def export_format(path: str) -> str:
+        """
+        Export format for a path, by extension
+
+        Raises:
+            ConfigurationError: Unsupported extension, or parquet without an engine
+        """
+        extension = os.path.splitext(path)[1].lower()
+        formats = {'.parquet': 'parquet', '.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+        if extension not in formats:
+            raise ConfigurationError(
+                f"Unsupported verification export format: {extension or path}",
+                details={'choices': sorted(formats)}
+            )
+        if formats[extension] == 'parquet' and not any(
+                importlib.util.find_spec(engine) for engine in ('pyarrow', 'fastparquet')):
+            raise ConfigurationError(
+                "Parquet export needs pyarrow or fastparquet",
+                details={'path': path}
+            )
+        return formats[extension]
+
+
+class VerificationExport:
+    """Streams per-document verification rows to a .parquet, .csv or .jsonl file"""
+
+    # Rows read at a time when carrying over an earlier attempt's rows
+    COPY_CHUNK_ROWS = 10000
+
+    def __init__(self, path: str, keep_rows: int = 0):
+        """
+        Args:
+            path: Export file; its extension picks the format
+            keep_rows: Leading rows of an existing file at path to keep, so
+                the export of a resumed run covers the windows its
+                checkpoint already counted
+
+        Raises:
+            ConfigurationError: Unsupported format (see VerificationTable.export_format)
+        """
+        self.path = path
+        self.format = VerificationTable.export_format(path)
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+        if keep_rows and os.path.exists(path):
+            previous = f"{path}.previous"
+            os.replace(path, previous)
+            try:
+                self._copy_rows(previous, keep_rows)
+            except Exception as e:
+                logger.warning(f"Could not read the earlier rows of {path}: {e}")
+            finally:
+                os.remove(previous)
+        if self.rows < keep_rows:
+            logger.warning(f"Verification export {path} is missing {keep_rows - self.rows} rows "
+                           f"of the windows processed before the run was resumed")
+
+    def _copy_rows(self, previous: str, keep_rows: int):
+        if self.format == 'parquet':
+            import pyarrow.parquet as pq
+            chunks = (batch.to_pandas() for batch in
+                      pq.ParquetFile(previous).iter_batches(batch_size=self.COPY_CHUNK_ROWS))
+        elif self.format == 'csv':
+            chunks = pd.read_csv(previous, chunksize=self.COPY_CHUNK_ROWS, dtype={'document_id': str})
+        else:
+            chunks = pd.read_json(previous, lines=True, chunksize=self.COPY_CHUNK_ROWS,
+                                  dtype={'document_id': str})
+        for chunk in chunks:
+            self.write(chunk.head(keep_rows - self.rows))
+            if self.rows >= keep_rows:
+                break
+
+    def write(self, frame: pd.DataFrame):
+        """Append one window's rows and flush them to disk"""
+        if frame.empty:
+            return
+        if self.format == 'parquet':
+            self._write_parquet(frame)
+        else:
+            if self._file is None:
+                self._file = open(self.path, 'w', encoding='utf-8', newline='')
+            if self.format == 'csv':
+                frame.to_csv(self._file, index=False, header=self.rows == 0)
+            else:
+                self._file.write(frame.to_json(orient='records', lines=True).rstrip('\n') + '\n')
+            self._file.flush()
+        self.rows += len(frame)
+
+    def _write_parquet(self, frame: pd.DataFrame):
+        """One row group per window (pyarrow), or an appended file part (fastparquet)"""
+        if importlib.util.find_spec('pyarrow'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            import fastparquet
+            fastparquet.write(self.path, frame, append=self.rows > 0)
+
+    def close(self):
+        """Finish the file; safe to call more than once"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -6,13 +6,14 @@ Each validator returns a tuple of (is_valid, error_message, cleaned_data)
 """
 
 import re
+from functools import lru_cache
 from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime
-from courts_db import courts
 from reporters_db import REPORTERS
+from utils.reporter_index import is_known_reporter
+from utils.court_index import VALID_COURT_IDS, suggest_court_ids
 
 # Create lookup sets for performance
-VALID_COURT_IDS = {court['id'] for court in courts if isinstance(court, dict)}
 VALID_REPORTERS = set(REPORTERS.keys())
 
 
@@ -92,15 +93,25 @@ class CourtValidator:
             result.add_error(f"Court ID must be string, got {type(court_id).__name__}")
             return result
         
-        if court_id not in VALID_COURT_IDS:
-            result.add_error(f"Court ID '{court_id}' not found in courts database")
-            # Suggest similar courts
-            similar = [cid for cid in VALID_COURT_IDS if cid.startswith(court_id[:2])]
-            if similar:
-                result.add_warning(f"Similar court IDs: {', '.join(similar[:3])}")
-        
+        errors, warnings = CourtValidator._court_id_messages(court_id)
+        for error in errors:
+            result.add_error(error)
+        result.warnings.extend(warnings)
         return result
     
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _court_id_messages(court_id: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Errors and warnings for a court ID string, computed once per ID"""
+        if court_id in VALID_COURT_IDS:
+            return (), ()
+        errors = (f"Court ID '{court_id}' not found in courts database",)
+        # Suggest similar courts
+        similar = suggest_court_ids(court_id)
+        if similar:
+            return errors, (f"Similar court IDs: {', '.join(similar)}",)
+        return errors, ()
+    
     @staticmethod
     def validate_court_enhancement(enhancement: Dict[str, Any]) -> ValidationResult:
         """Validate court enhancement result"""
@@ -139,13 +150,10 @@ class CitationValidator:
         if not citation.get('text'):
             result.add_error("Citation missing 'text' field")
         
-        # Validate reporter if present
+        # Validate reporter if present (any reporters_db edition or variation)
         reporter = citation.get('reporter')
-        if reporter and reporter not in VALID_REPORTERS:
-            # Check if it's a valid variation
-            base_reporters = ['F.', 'F. Supp.', 'U.S.', 'S. Ct.']
-            if not any(reporter.startswith(base) for base in base_reporters):
-                result.add_warning(f"Unknown reporter: {reporter}")
+        if reporter and not is_known_reporter(reporter):
+            result.add_warning(f"Unknown reporter: {reporter}")
         
         # Validate volume and page numbers
         volume = citation.get('volume')
@@ -288,7 +296,7 @@ class ReporterValidator:
             
             if edition and edition != original:
                 # This is a successful normalization
-                if edition not in VALID_REPORTERS and not any(edition.startswith(base) for base in ['F.', 'F. Supp.']):
+                if not is_known_reporter(edition):
                     result.add_warning(f"Normalization {i}: unknown edition '{edition}'")
         
         return result